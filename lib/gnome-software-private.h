@@ -20,5 +20,6 @@
 #include <gs-fedora-third-party.h>
 #include <gs-os-release.h>
 #include <gs-plugin-loader.h>
+#include <gs-plugin-loader-private.h>
 #include <gs-plugin-loader-sync.h>
 #include <gs-plugin-private.h>
@@ -25,6 +25,7 @@
 #include "gs-app-list-private.h"
 #include "gs-app-collation.h"
 #include "gs-enums.h"
+#include "gs-utils.h"
 
 struct _GsAppList
 {
@@ -646,6 +647,44 @@ gs_app_list_sort_cb (gconstpointer a, gconstpointer b, gpointer user_data)
 	return helper->func (app1, app2, helper->user_data);
 }
 
+typedef struct {
+	gchar		*key;  /* (owned) (nullable) */
+	GsApp		*app;  /* (unowned) */
+} GsAppListSortKey;
+
+static gint
+gs_app_list_sort_key_cb (gconstpointer a, gconstpointer b)
+{
+	const GsAppListSortKey *key1 = a;
+	const GsAppListSortKey *key2 = b;
+	return g_strcmp0 (key1->key, key2->key);
+}
+
+/* Sort by name by looking up each app’s sort key once, rather than twice
+ * for every comparison. g_array_sort() is stable, so this gives the same
+ * order as sorting with gs_utils_app_sort_name(). */
+static void
+gs_app_list_sort_by_name_safe (GsAppList *list)
+{
+	g_autoptr(GArray) keys = NULL;
+
+	keys = g_array_sized_new (FALSE, FALSE, sizeof (GsAppListSortKey), list->array->len);
+	for (guint i = 0; i < list->array->len; i++) {
+		GsAppListSortKey key;
+		key.app = g_ptr_array_index (list->array, i);
+		key.key = gs_app_dup_name_sort_key (key.app);
+		g_array_append_val (keys, key);
+	}
+
+	g_array_sort (keys, gs_app_list_sort_key_cb);
+
+	for (guint i = 0; i < keys->len; i++) {
+		GsAppListSortKey *key = &g_array_index (keys, GsAppListSortKey, i);
+		list->array->pdata[i] = key->app;
+		g_free (key->key);
+	}
+}
+
 /**
  * gs_app_list_sort:
  * @list: A #GsAppList
@@ -663,6 +702,12 @@ gs_app_list_sort (GsAppList *list, GsAppListSortFunc func, gpointer user_data)
 	GsAppListSortHelper helper;
 	g_return_if_fail (GS_IS_APP_LIST (list));
 	locker = g_mutex_locker_new (&list->mutex);
+
+	if (func == gs_utils_app_sort_name) {
+		gs_app_list_sort_by_name_safe (list);
+		return;
+	}
+
 	helper.func = func;
 	helper.user_data = user_data;
 	g_ptr_array_sort_with_data (list->array, gs_app_list_sort_cb, &helper);
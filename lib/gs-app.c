@@ -55,6 +55,7 @@
 
 #include "config.h"
 
+#include <locale.h>
 #include <string.h>
 #include <gtk/gtk.h>
 #include <glib/gi18n.h>
@@ -77,15 +78,17 @@ typedef struct
 	gchar			*id;
 	gchar			*unique_id;
 	gboolean		 unique_id_valid;
-	gchar			*branch;
+	const gchar		*branch;  /* (interned) */
 	gchar			*name;
+	gchar			*name_sort_key;  /* (owned) (nullable), cache for @name */
+	gchar			*name_sort_key_locale;  /* (owned) (nullable), LC_COLLATE of @name_sort_key */
 	gchar			*renamed_from;
 	GsAppQuality		 name_quality;
 	GPtrArray		*icons;  /* (nullable) (owned) (element-type AsIcon), sorted by pixel size, smallest first */
 	GPtrArray		*sources;
 	GPtrArray		*source_ids;
-	gchar			*project_group;
-	gchar			*developer_name;
+	const gchar		*project_group;  /* (interned) */
+	const gchar		*developer_name;  /* (interned) */
 	gchar			*agreement;
 	gchar			*version;
 	gchar			*version_ui;
@@ -101,13 +104,13 @@ typedef struct
 	GHashTable		*urls;  /* (element-type AsUrlKind utf8) (owned) (nullable) */
 	GHashTable		*launchables;
 	gchar			*url_missing;
-	gchar			*license;
+	const gchar		*license;  /* (interned) */
 	GsAppQuality		 license_quality;
 	gchar			**menu_path;
-	gchar			*origin;
+	const gchar		*origin;  /* (interned) */
 	gchar			*origin_ui;
-	gchar			*origin_appstream;
-	gchar			*origin_hostname;
+	const gchar		*origin_appstream;  /* (interned) */
+	const gchar		*origin_hostname;  /* (interned) */
 	gchar			*update_version;
 	gchar			*update_version_ui;
 	gchar			*update_details_markup;
@@ -140,7 +143,7 @@ typedef struct
 	AsBundleKind		 bundle_kind;
 	guint			 progress;  /* integer 0–100 (inclusive), or %GS_APP_PROGRESS_UNKNOWN */
 	gboolean		 allow_cancel;
-	GHashTable		*metadata;
+	GHashTable		*metadata;  /* (element-type interned-utf8 GVariant) */
 	GsAppList		*addons;
 	GsAppList		*related;
 	GsAppList		*history;
@@ -211,6 +214,23 @@ static GParamSpec *obj_props[PROP_MOK_KEY_PENDING + 1] = { NULL, };
 
 G_DEFINE_TYPE_WITH_PRIVATE (GsApp, gs_app, G_TYPE_OBJECT)
 
+/* Many fields, such as the origin or branch, only take a small set of values
+ * across all apps. Interning them means all apps share one copy of each
+ * string, and the strings can be compared by pointer. Interned strings are
+ * never freed, so only use this for low-cardinality fields. */
+static gboolean
+gs_app_set_interned_str (const gchar **str_ptr,
+			 const gchar  *new_str)
+{
+	const gchar *interned = g_intern_string (new_str);
+
+	if (*str_ptr == interned)
+		return FALSE;
+
+	*str_ptr = interned;
+	return TRUE;
+}
+
 static gboolean
 _g_set_strv (gchar ***strv_ptr, gchar **new_strv)
 {
@@ -1421,8 +1441,51 @@ gs_app_set_name (GsApp *app, GsAppQuality quality, const gchar *name)
 	if (quality < priv->name_quality)
 		return;
 	priv->name_quality = quality;
-	if (g_set_str (&priv->name, name))
+	if (g_set_str (&priv->name, name)) {
+		g_clear_pointer (&priv->name_sort_key, g_free);
 		gs_app_queue_notify (app, obj_props[PROP_NAME]);
+	}
+}
+
+/**
+ * gs_app_dup_name_sort_key:
+ * @app: a #GsApp
+ *
+ * Gets a collation key for the application name, as returned by
+ * gs_utils_sort_key(), so that apps can be sorted by name using strcmp().
+ *
+ * The key is computed when first needed and cached until the name or the
+ * collation locale changes. A copy is returned, as the cached key can be
+ * freed by another thread changing the name.
+ *
+ * Returns: (transfer full) (nullable): a sort key, or %NULL if the name is
+ *   unset
+ *
+ * Since: 50
+ **/
+gchar *
+gs_app_dup_name_sort_key (GsApp *app)
+{
+	GsAppPrivate *priv = gs_app_get_instance_private (app);
+	g_autoptr(GMutexLocker) locker = NULL;
+	const gchar *locale;
+
+	g_return_val_if_fail (GS_IS_APP (app), NULL);
+
+	locker = g_mutex_locker_new (&priv->mutex);
+
+	if (priv->name == NULL)
+		return NULL;
+
+	locale = setlocale (LC_COLLATE, NULL);
+	if (priv->name_sort_key == NULL ||
+	    g_strcmp0 (priv->name_sort_key_locale, locale) != 0) {
+		g_free (priv->name_sort_key);
+		priv->name_sort_key = gs_utils_sort_key (priv->name);
+		g_set_str (&priv->name_sort_key_locale, locale);
+	}
+
+	return g_strdup (priv->name_sort_key);
 }
 
 /**
@@ -1469,7 +1532,7 @@ gs_app_set_renamed_from (GsApp *app, const gchar *renamed_from)
  *
  * Gets the application branch.
  *
- * Returns: a string, or %NULL for unset
+ * Returns: an interned string (see g_intern_string()), or %NULL for unset
  *
  * Since: 3.22
  **/
@@ -1497,7 +1560,7 @@ gs_app_set_branch (GsApp *app, const gchar *branch)
 	g_autoptr(GMutexLocker) locker = NULL;
 	g_return_if_fail (GS_IS_APP (app));
 	locker = g_mutex_locker_new (&priv->mutex);
-	if (g_set_str (&priv->branch, branch))
+	if (gs_app_set_interned_str (&priv->branch, branch))
 		priv->unique_id_valid = FALSE;
 }
 
@@ -1711,7 +1774,7 @@ gs_app_add_source_id (GsApp *app, const gchar *source_id)
  * Applications belonging to other project groups may not be shown in
  * this software center.
  *
- * Returns: a string, or %NULL for unset
+ * Returns: an interned string (see g_intern_string()), or %NULL for unset
  *
  * Since: 3.22
  **/
@@ -1729,7 +1792,7 @@ gs_app_get_project_group (GsApp *app)
  *
  * Gets the developer name for the application.
  *
- * Returns: a string, or %NULL for unset
+ * Returns: an interned string (see g_intern_string()), or %NULL for unset
  *
  * Since: 3.22
  **/
@@ -1757,7 +1820,7 @@ gs_app_set_project_group (GsApp *app, const gchar *project_group)
 	g_autoptr(GMutexLocker) locker = NULL;
 	g_return_if_fail (GS_IS_APP (app));
 	locker = g_mutex_locker_new (&priv->mutex);
-	g_set_str (&priv->project_group, project_group);
+	gs_app_set_interned_str (&priv->project_group, project_group);
 }
 
 /**
@@ -1776,7 +1839,7 @@ gs_app_set_developer_name (GsApp *app, const gchar *developer_name)
 	g_autoptr(GMutexLocker) locker = NULL;
 	g_return_if_fail (GS_IS_APP (app));
 	locker = g_mutex_locker_new (&priv->mutex);
-	g_set_str (&priv->developer_name, developer_name);
+	gs_app_set_interned_str (&priv->developer_name, developer_name);
 }
 
 static GtkIconTheme *
@@ -2683,7 +2746,7 @@ gs_app_set_launchable (GsApp *app, AsLaunchableKind kind, const gchar *launchabl
  *
  * Gets the project license of the application.
  *
- * Returns: a string, or %NULL for unset
+ * Returns: an interned string (see g_intern_string()), or %NULL for unset
  *
  * Since: 3.22
  **/
@@ -2742,7 +2805,7 @@ gs_app_set_license (GsApp *app, GsAppQuality quality, const gchar *license)
 
 	priv->license_is_free = as_license_is_free_license (license);
 
-	if (g_set_str (&priv->license, license))
+	if (gs_app_set_interned_str (&priv->license, license))
 		gs_app_queue_notify (app, obj_props[PROP_LICENSE]);
 }
 
@@ -2882,7 +2945,7 @@ gs_app_set_menu_path (GsApp *app, gchar **menu_path)
  *
  * See the documentation for #GsApp for an overview of what origins are.
  *
- * Returns: a string, or %NULL for unset
+ * Returns: an interned string (see g_intern_string()), or %NULL for unset
  *
  * Since: 3.22
  **/
@@ -2913,7 +2976,8 @@ gs_app_set_origin (GsApp *app, const gchar *origin)
 	locker = g_mutex_locker_new (&priv->mutex);
 
 	/* same */
-	if (g_strcmp0 (origin, priv->origin) == 0)
+	origin = g_intern_string (origin);
+	if (origin == priv->origin)
 		return;
 
 	/* trying to change */
@@ -2925,8 +2989,7 @@ gs_app_set_origin (GsApp *app, const gchar *origin)
 		return;
 	}
 
-	g_free (priv->origin);
-	priv->origin = g_strdup (origin);
+	priv->origin = origin;
 
 	/* no longer valid */
 	priv->unique_id_valid = FALSE;
@@ -2938,7 +3001,7 @@ gs_app_set_origin (GsApp *app, const gchar *origin)
  *
  * Gets the appstream origin for the application, e.g. "fedora".
  *
- * Returns: a string, or %NULL for unset
+ * Returns: an interned string (see g_intern_string()), or %NULL for unset
  *
  * Since: 3.28
  **/
@@ -2968,12 +3031,7 @@ gs_app_set_origin_appstream (GsApp *app, const gchar *origin_appstream)
 
 	locker = g_mutex_locker_new (&priv->mutex);
 
-	/* same */
-	if (g_strcmp0 (origin_appstream, priv->origin_appstream) == 0)
-		return;
-
-	g_free (priv->origin_appstream);
-	priv->origin_appstream = g_strdup (origin_appstream);
+	gs_app_set_interned_str (&priv->origin_appstream, origin_appstream);
 }
 
 /**
@@ -2983,7 +3041,7 @@ gs_app_set_origin_appstream (GsApp *app, const gchar *origin_appstream)
  * Gets the hostname of the origin used to install the application, e.g.
  * "fedoraproject.org" or "sdk.gnome.org".
  *
- * Returns: a string, or %NULL for unset
+ * Returns: an interned string (see g_intern_string()), or %NULL for unset
  *
  * Since: 3.22
  **/
@@ -3025,7 +3083,6 @@ gs_app_set_origin_hostname (GsApp *app, const gchar *origin_hostname)
 	/* same */
 	if (g_strcmp0 (origin_hostname, priv->origin_hostname) == 0)
 		return;
-	g_free (priv->origin_hostname);
 
 	/* convert a URL */
 	uri = g_uri_parse (origin_hostname, SOUP_HTTP_URI_FLAGS, NULL);
@@ -3043,7 +3100,7 @@ gs_app_set_origin_hostname (GsApp *app, const gchar *origin_hostname)
 		origin_hostname = "localhost";
 
 	/* success */
-	priv->origin_hostname = g_strdup (origin_hostname);
+	gs_app_set_interned_str (&priv->origin_hostname, origin_hostname);
 }
 
 /**
@@ -4208,7 +4265,7 @@ gs_app_set_metadata_variant (GsApp *app, const gchar *key, GVariant *value)
 		}
 		return;
 	}
-	g_hash_table_insert (priv->metadata, g_strdup (key), g_variant_ref (value));
+	g_hash_table_insert (priv->metadata, (gpointer) g_intern_string (key), g_variant_ref (value));
 }
 
 /**
@@ -5584,22 +5641,17 @@ gs_app_finalize (GObject *object)
 	g_mutex_clear (&priv->mutex);
 	g_free (priv->id);
 	g_free (priv->unique_id);
-	g_free (priv->branch);
 	g_free (priv->name);
+	g_free (priv->name_sort_key);
+	g_free (priv->name_sort_key_locale);
 	g_free (priv->renamed_from);
 	g_free (priv->url_missing);
 	g_clear_pointer (&priv->urls, g_hash_table_unref);
 	g_hash_table_unref (priv->launchables);
-	g_free (priv->license);
 	g_strfreev (priv->menu_path);
-	g_free (priv->origin);
 	g_free (priv->origin_ui);
-	g_free (priv->origin_appstream);
-	g_free (priv->origin_hostname);
 	g_ptr_array_unref (priv->sources);
 	g_ptr_array_unref (priv->source_ids);
-	g_free (priv->project_group);
-	g_free (priv->developer_name);
 	g_free (priv->agreement);
 	g_free (priv->version);
 	g_free (priv->version_ui);
@@ -6102,7 +6154,7 @@ gs_app_init (GsApp *app)
 	priv->provided = g_ptr_array_new_with_free_func ((GDestroyNotify) g_object_unref);
 	priv->metadata = g_hash_table_new_full (g_str_hash,
 	                                        g_str_equal,
-	                                        g_free,
+	                                        NULL,
 	                                        (GDestroyNotify) g_variant_unref);
 	priv->launchables = g_hash_table_new_full (g_str_hash,
 	                                           g_str_equal,
@@ -294,6 +294,7 @@ const gchar	*gs_app_get_name		(GsApp		*app);
 void		 gs_app_set_name		(GsApp		*app,
 						 GsAppQuality	 quality,
 						 const gchar	*name);
+gchar		*gs_app_dup_name_sort_key	(GsApp		*app);
 const gchar	*gs_app_get_renamed_from	(GsApp		*app);
 void		 gs_app_set_renamed_from	(GsApp		*app,
 						 const gchar	*renamed_from);
@@ -1257,10 +1257,16 @@ gs_appstream_refine_app (GsPlugin *plugin,
 			}
 			break;
 		case ELEMENT_KIND_RELEASES: {
-			g_autoptr(GPtrArray) current_version_history = gs_app_get_version_history (app);
-			gboolean needs_version_history = current_version_history == NULL || current_version_history->len == 0;
+			g_autoptr(GPtrArray) current_version_history = NULL;
+			gboolean needs_version_history = FALSE;
 			gboolean needs_update_details = (require_flags & GS_PLUGIN_REFINE_REQUIRE_FLAGS_UPDATE_DETAILS) != 0 &&
 							silo != NULL && gs_app_is_updatable (app);
+			/* the release notes of every version are only formatted
+			 * when something is going to show them */
+			if ((require_flags & GS_PLUGIN_REFINE_REQUIRE_FLAGS_HISTORY) != 0) {
+				current_version_history = gs_app_get_version_history (app);
+				needs_version_history = current_version_history == NULL || current_version_history->len == 0;
+			}
 			/* set the release date */
 			if (gs_app_get_release_date (app) == 0) {
 				g_autoptr(XbNode) release = xb_node_get_child (child);
@@ -1286,6 +1292,7 @@ gs_appstream_refine_app (GsPlugin *plugin,
 				g_autoptr(GPtrArray) version_history = NULL; /* (element-type AsRelease) */
 				g_autoptr(GHashTable) installed = NULL;
 				g_autoptr(GPtrArray) updates_list = NULL;
+				g_autoptr(GPtrArray) updates_descs = NULL; /* (element-type utf8) */
 				g_autoptr(XbNode) rels_child = NULL;
 				g_autoptr(XbNode) rels_next = NULL;
 				AsUrgencyKind urgency_best = AS_URGENCY_KIND_UNKNOWN;
@@ -1298,6 +1305,7 @@ gs_appstream_refine_app (GsPlugin *plugin,
 
 					installed = g_hash_table_new_full (g_str_hash, g_str_equal, NULL, g_object_unref);
 					updates_list = g_ptr_array_new_with_free_func (g_object_unref);
+					updates_descs = g_ptr_array_new_with_free_func (g_free);
 
 					/* find out which releases are already installed */
 					xpath = g_strdup_printf ("component/id[text()='%s']/../releases/*[@version]",
@@ -1336,8 +1344,6 @@ gs_appstream_refine_app (GsPlugin *plugin,
 					if (version == NULL)
 						continue;
 
-					description = gs_appstream_format_release_text (rels_child);
-
 					if (version_history != NULL) {
 						g_autoptr(AsRelease) release = NULL;
 						guint64 timestamp;
@@ -1345,6 +1351,7 @@ gs_appstream_refine_app (GsPlugin *plugin,
 
 						timestamp = xb_node_get_attr_as_uint (rels_child, "timestamp");
 						date_str = xb_node_get_attr (rels_child, "date");
+						description = gs_appstream_format_release_text (rels_child);
 
 						release = as_release_new ();
 						as_release_set_version (release, version);
@@ -1375,9 +1382,14 @@ gs_appstream_refine_app (GsPlugin *plugin,
 						if (urgency_tmp > urgency_best)
 							urgency_best = urgency_tmp;
 
-						/* add updates with a description */
-						if (description != NULL && *description != '\0')
+						/* add updates with a description, keeping it
+						 * so it does not need formatting again */
+						if (description == NULL)
+							description = gs_appstream_format_release_text (rels_child);
+						if (description != NULL && *description != '\0') {
 							g_ptr_array_add (updates_list, g_object_ref (rels_child));
+							g_ptr_array_add (updates_descs, g_steal_pointer (&description));
+						}
 					}
 				}
 
@@ -1391,10 +1403,7 @@ gs_appstream_refine_app (GsPlugin *plugin,
 
 					/* no prefix on each release */
 					if (updates_list->len == 1) {
-						XbNode *release = g_ptr_array_index (updates_list, 0);
-						g_autofree gchar *desc = NULL;
-						desc = gs_appstream_format_release_text (release);
-						gs_app_set_update_details_markup (app, desc);
+						gs_app_set_update_details_markup (app, g_ptr_array_index (updates_descs, 0));
 
 					/* get the descriptions with a version prefix */
 					} else if (updates_list->len > 1) {
@@ -1403,14 +1412,12 @@ gs_appstream_refine_app (GsPlugin *plugin,
 						for (guint j = 0; j < updates_list->len; j++) {
 							XbNode *release = g_ptr_array_index (updates_list, j);
 							const gchar *release_version = xb_node_get_attr (release, "version");
-							g_autofree gchar *desc = NULL;
+							const gchar *desc = g_ptr_array_index (updates_descs, j);
 
 							/* use the first release description, then skip the currently installed version and all below it */
 							if (i != 0 && version != NULL && gs_utils_compare_versions (version, release_version) >= 0)
 								continue;
 
-							desc = gs_appstream_format_release_text (release);
-
 							g_string_append_printf (update_desc,
 										"Version %s:\n%s\n\n",
 										xb_node_get_attr (release, "version"),
@@ -1718,6 +1725,35 @@ typedef struct {
 	const gchar		*xpath;
 } Query;
 
+/* A matching component, kept as a cheap handle so that results can be ranked
+ * before any #GsApp is built for them. */
+typedef struct {
+	XbNode			*component;  /* (owned) */
+	guint16			 match_value;
+	guint			 position;  /* of the component in the silo */
+} GsAppstreamSearchResult;
+
+static void
+gs_appstream_search_result_clear (gpointer data)
+{
+	GsAppstreamSearchResult *result = data;
+	g_clear_object (&result->component);
+}
+
+static gint
+gs_appstream_search_result_cmp (gconstpointer a, gconstpointer b)
+{
+	const GsAppstreamSearchResult *result1 = a;
+	const GsAppstreamSearchResult *result2 = b;
+
+	/* best match first, then in silo order */
+	if (result1->match_value != result2->match_value)
+		return result1->match_value > result2->match_value ? -1 : 1;
+	if (result1->position != result2->position)
+		return result1->position < result2->position ? -1 : 1;
+	return 0;
+}
+
 static gboolean
 gs_appstream_do_search (GsPlugin *plugin,
 			XbSilo *silo,
@@ -1732,6 +1768,8 @@ gs_appstream_do_search (GsPlugin *plugin,
 	g_autoptr(GError) error_local = NULL;
 	g_autoptr(GPtrArray) array = g_ptr_array_new_with_free_func ((GDestroyNotify) gs_appstream_search_helper_free);
 	g_autoptr(GPtrArray) components = NULL;
+	g_autoptr(GArray) results = NULL;
+	g_autoptr(GHashTable) wildcards = NULL;
 	g_autoptr(GTimer) timer = g_timer_new ();
 	g_autoptr(XbQuery) extends_query = NULL;
 #if AS_CHECK_VERSION(1, 0, 0)
@@ -1770,45 +1808,81 @@ gs_appstream_do_search (GsPlugin *plugin,
 	if (components->len > 0)
 		gs_appstream_read_silo_info_from_component (g_ptr_array_index (components, 0), &silo_filename, &default_scope);
 
-	extends_query = xb_silo_lookup_query (silo, "extends");
+	/* find and rank all the matches first; building a #GsApp is much more
+	 * expensive than matching, so only do that once the matches are known */
+	results = g_array_new (FALSE, FALSE, sizeof (GsAppstreamSearchResult));
+	g_array_set_clear_func (results, gs_appstream_search_result_clear);
 
 	for (guint i = 0; i < components->len; i++) {
 		XbNode *component = g_ptr_array_index (components, i);
 		guint16 match_value = gs_appstream_silo_search_component (array, component, values);
 		if (match_value != 0) {
-			g_autoptr(GsApp) app = gs_appstream_create_app (plugin, silo, component, silo_filename ? silo_filename : "", default_scope, error);
-			if (app == NULL)
-				return FALSE;
-			if (gs_app_has_quirk (app, GS_APP_QUIRK_IS_WILDCARD)) {
-				g_debug ("not returning wildcard %s",
-					 gs_app_get_unique_id (app));
-				continue;
-			}
-			g_debug ("add %s", gs_app_get_unique_id (app));
-
 			/* The match value is used for prioritising results.
 			 * Drop the ID token from it as it’s the highest
 			 * numeric value but isn’t visible to the user in the
 			 * UI, which leads to confusing results ordering. */
-			gs_app_set_match_value (app, match_value & (~component_id_weight));
-			gs_app_list_add (list, app);
+			GsAppstreamSearchResult result = {
+				.component = g_object_ref (component),
+				.match_value = match_value & (~component_id_weight),
+				.position = i,
+			};
+			g_array_append_val (results, result);
+		}
 
-			if (gs_app_get_kind (app) == AS_COMPONENT_KIND_ADDON) {
-				g_autoptr(GPtrArray) extends = NULL;
-
-				/* add the parent app as a wildcard, to be refined later */
-				extends = xb_node_query_full (component, extends_query, NULL);
-				for (guint jj = 0; extends && jj < extends->len; jj++) {
-					XbNode *extend = g_ptr_array_index (extends, jj);
-					g_autoptr(GsApp) app2 = NULL;
-					const gchar *tmp;
-					app2 = gs_app_new (xb_node_get_text (extend));
-					gs_app_add_quirk (app2, GS_APP_QUIRK_IS_WILDCARD);
-					tmp = xb_node_query_attr (extend, "../..", "origin", NULL);
-					if (gs_appstream_origin_valid (tmp))
-						gs_app_set_origin_appstream (app2, tmp);
-					gs_app_list_add (list, app2);
-				}
+		if (g_cancellable_set_error_if_cancelled (cancellable, error))
+			return FALSE;
+	}
+
+	g_array_sort (results, gs_appstream_search_result_cmp);
+	g_debug ("search matched %u of %u components in %fms",
+		 results->len, components->len, g_timer_elapsed (timer, NULL) * 1000);
+
+	extends_query = xb_silo_lookup_query (silo, "extends");
+	wildcards = g_hash_table_new_full (g_str_hash, g_str_equal, g_free, NULL);
+
+	for (guint i = 0; i < results->len; i++) {
+		const GsAppstreamSearchResult *result = &g_array_index (results, GsAppstreamSearchResult, i);
+		g_autoptr(GsApp) app = NULL;
+
+		app = gs_appstream_create_app (plugin, silo, result->component, silo_filename ? silo_filename : "", default_scope, error);
+		if (app == NULL)
+			return FALSE;
+		if (gs_app_has_quirk (app, GS_APP_QUIRK_IS_WILDCARD)) {
+			g_debug ("not returning wildcard %s",
+				 gs_app_get_unique_id (app));
+			continue;
+		}
+		g_debug ("add %s", gs_app_get_unique_id (app));
+
+		gs_app_set_match_value (app, result->match_value);
+		gs_app_list_add (list, app);
+
+		if (gs_app_get_kind (app) == AS_COMPONENT_KIND_ADDON) {
+			g_autoptr(GPtrArray) extends = NULL;
+
+			/* add the parent app as a wildcard, to be refined later;
+			 * many addons can match for the same parent, so only
+			 * create each wildcard once */
+			extends = xb_node_query_full (result->component, extends_query, NULL);
+			for (guint jj = 0; extends && jj < extends->len; jj++) {
+				XbNode *extend = g_ptr_array_index (extends, jj);
+				g_autoptr(GsApp) app2 = NULL;
+				const gchar *tmp;
+
+				tmp = xb_node_query_attr (extend, "../..", "origin", NULL);
+				if (!gs_appstream_origin_valid (tmp))
+					tmp = NULL;
+				if (!g_hash_table_add (wildcards,
+						       g_strdup_printf ("%s\n%s",
+									xb_node_get_text (extend),
+									tmp != NULL ? tmp : "")))
+					continue;
+
+				app2 = gs_app_new (xb_node_get_text (extend));
+				gs_app_add_quirk (app2, GS_APP_QUIRK_IS_WILDCARD);
+				if (tmp != NULL)
+					gs_app_set_origin_appstream (app2, tmp);
+				gs_app_list_add (list, app2);
 			}
 		}
 
@@ -1898,6 +1972,363 @@ gs_appstream_search_developer_apps (GsPlugin *plugin,
 	return gs_appstream_do_search (plugin, silo, values, queries, list, cancellable, error);
 }
 
+/* Indexes derived from a silo, computed once by walking all its components and
+ * then attached to the silo, so they have the same lifetime as it. As silos
+ * are immutable, a rebuilt silo gets new indexes.
+ *
+ * The nodes held here are only valid for as long as the silo is, which is
+ * guaranteed by them being freed along with it. */
+typedef struct {
+	GStringChunk	*strings;  /* (owned) */
+	/* desktop group → component IDs, in silo order; strings owned by @strings.
+	 * Every "Main::Sub" group from the desktop data has an entry, so a
+	 * missing "Main::Sub" entry means the group has not been indexed. */
+	GHashTable	*category_components;  /* (element-type utf8 GPtrArray<utf8>) (owned) */
+	/* IDs of components with the GnomeSoftware::popular kudo, in silo order */
+	GPtrArray	*popular_ids;  /* (element-type utf8) (owned) */
+	/* components with a feature tile, in silo order */
+	GPtrArray	*featured;  /* (element-type XbNode) (owned) */
+	/* one entry per GnomeSoftware::DeploymentFeatured value, in silo order */
+	GArray		*deployment_featured;  /* (element-type GsAppstreamDeploymentEntry) (owned) */
+	/* components with a release timestamp newer than @recent_since, newest
+	 * first; older ones are not indexed to bound the memory used */
+	GArray		*recent;  /* (element-type GsAppstreamRecentEntry) (owned) */
+	guint64		 recent_since;  /* seconds since the epoch */
+} GsAppstreamSiloIndex;
+
+/* How far back releases are indexed for gs_appstream_add_recent() */
+#define RECENT_INDEX_AGE (365 * 24 * 60 * 60) /* s */
+
+typedef struct {
+	guint		 position;  /* of the component in the silo */
+	XbNode		*component;  /* (owned) */
+	const gchar	*deployment;  /* (not owned) */
+} GsAppstreamDeploymentEntry;
+
+typedef struct {
+	guint64		 timestamp;  /* newest `timestamp` attribute of any release */
+	guint		 position;  /* of the component in the silo */
+	XbNode		*component;  /* (owned) */
+} GsAppstreamRecentEntry;
+
+static GMutex silo_index_mutex;
+
+static void
+gs_appstream_deployment_entry_clear (GsAppstreamDeploymentEntry *entry)
+{
+	g_clear_object (&entry->component);
+}
+
+static void
+gs_appstream_recent_entry_clear (GsAppstreamRecentEntry *entry)
+{
+	g_clear_object (&entry->component);
+}
+
+static gint
+gs_appstream_recent_entry_compare_timestamp (gconstpointer a,
+					     gconstpointer b)
+{
+	const GsAppstreamRecentEntry *entry_a = a;
+	const GsAppstreamRecentEntry *entry_b = b;
+
+	if (entry_a->timestamp != entry_b->timestamp)
+		return (entry_a->timestamp > entry_b->timestamp) ? -1 : 1;
+	return (entry_a->position < entry_b->position) ? -1 : (entry_a->position > entry_b->position) ? 1 : 0;
+}
+
+static gint
+gs_appstream_recent_entry_compare_position (gconstpointer a,
+					    gconstpointer b)
+{
+	const GsAppstreamRecentEntry *entry_a = *((const GsAppstreamRecentEntry * const *) a);
+	const GsAppstreamRecentEntry *entry_b = *((const GsAppstreamRecentEntry * const *) b);
+
+	return (entry_a->position < entry_b->position) ? -1 : (entry_a->position > entry_b->position) ? 1 : 0;
+}
+
+static void
+gs_appstream_silo_index_free (GsAppstreamSiloIndex *index)
+{
+	g_array_unref (index->recent);
+	g_array_unref (index->deployment_featured);
+	g_ptr_array_unref (index->featured);
+	g_ptr_array_unref (index->popular_ids);
+	g_hash_table_unref (index->category_components);
+	g_string_chunk_free (index->strings);
+	g_free (index);
+}
+
+static void
+gs_appstream_silo_index_add_category (GsAppstreamSiloIndex *index,
+				      const gchar          *desktop_group,
+				      const gchar          *id)
+{
+	GPtrArray *ids = g_hash_table_lookup (index->category_components, desktop_group);
+
+	if (ids == NULL) {
+		ids = g_ptr_array_new ();
+		g_hash_table_insert (index->category_components,
+				     g_string_chunk_insert_const (index->strings, desktop_group),
+				     ids);
+	}
+	g_ptr_array_add (ids, (gpointer) id);
+}
+
+static void
+gs_appstream_silo_index_add_categories (GsAppstreamSiloIndex *index,
+					GHashTable           *subcategories,
+					XbNode               *categories_node,
+					const gchar          *id,
+					GPtrArray            *categories)
+{
+	g_autoptr(XbNode) child = NULL;
+	g_autoptr(XbNode) next = NULL;
+
+	g_ptr_array_set_size (categories, 0);
+	for (child = xb_node_get_child (categories_node); child != NULL; g_object_unref (child), child = g_steal_pointer (&next)) {
+		const gchar *tmp;
+
+		next = xb_node_get_next (child);
+		if (g_strcmp0 (xb_node_get_element (child), "category") != 0)
+			continue;
+		tmp = xb_node_get_text (child);
+		if (tmp != NULL && !g_ptr_array_find_with_equal_func (categories, tmp, g_str_equal, NULL))
+			g_ptr_array_add (categories, (gpointer) tmp);
+	}
+
+	for (guint i = 0; i < categories->len; i++) {
+		const gchar *category = g_ptr_array_index (categories, i);
+		GPtrArray *subs = g_hash_table_lookup (subcategories, category);
+
+		gs_appstream_silo_index_add_category (index, category, id);
+
+		for (guint j = 0; subs != NULL && j < subs->len; j++) {
+			const gchar *sub = g_ptr_array_index (subs, j);
+			g_autofree gchar *desktop_group = NULL;
+
+			if (!g_ptr_array_find_with_equal_func (categories, sub, g_str_equal, NULL))
+				continue;
+			desktop_group = g_strdup_printf ("%s::%s", category, sub);
+			gs_appstream_silo_index_add_category (index, desktop_group, id);
+		}
+	}
+}
+
+static GsAppstreamSiloIndex *
+gs_appstream_silo_index_build (XbSilo *silo)
+{
+	GsAppstreamSiloIndex *index = g_new0 (GsAppstreamSiloIndex, 1);
+	const GsDesktopData *msdata = gs_desktop_get_data ();
+	g_autoptr(GHashTable) subcategories = NULL;  /* (element-type utf8 GPtrArray<utf8>) */
+	g_autoptr(GPtrArray) components = NULL;
+	g_autoptr(GPtrArray) categories = g_ptr_array_new ();
+	g_autoptr(GTimer) timer = g_timer_new ();
+
+	index->strings = g_string_chunk_new (4096);
+	index->category_components = g_hash_table_new_full (g_str_hash, g_str_equal,
+							    NULL, (GDestroyNotify) g_ptr_array_unref);
+	index->popular_ids = g_ptr_array_new ();
+	index->featured = g_ptr_array_new_with_free_func (g_object_unref);
+	index->deployment_featured = g_array_new (FALSE, FALSE, sizeof (GsAppstreamDeploymentEntry));
+	g_array_set_clear_func (index->deployment_featured, (GDestroyNotify) gs_appstream_deployment_entry_clear);
+	index->recent = g_array_new (FALSE, FALSE, sizeof (GsAppstreamRecentEntry));
+	g_array_set_clear_func (index->recent, (GDestroyNotify) gs_appstream_recent_entry_clear);
+	index->recent_since = (guint64) g_get_real_time () / G_USEC_PER_SEC;
+	index->recent_since = (index->recent_since > RECENT_INDEX_AGE) ? index->recent_since - RECENT_INDEX_AGE : 0;
+
+	/* The desktop groups made of two freedesktop categories, such as
+	 * `AudioVideo::Music`, mapped as `AudioVideo` → [`Music`, …]. Only
+	 * these pairs are indexed, rather than every pair in every component. */
+	subcategories = g_hash_table_new_full (g_str_hash, g_str_equal,
+					       g_free, (GDestroyNotify) g_ptr_array_unref);
+	for (guint i = 0; msdata[i].id != NULL; i++) {
+		for (guint j = 0; msdata[i].mapping[j].id != NULL; j++) {
+			for (guint k = 0; msdata[i].mapping[j].fdo_cats[k] != NULL; k++) {
+				const gchar *desktop_group = msdata[i].mapping[j].fdo_cats[k];
+				g_auto(GStrv) split = g_strsplit (desktop_group, "::", -1);
+				GPtrArray *subs;
+
+				if (g_strv_length (split) != 2 ||
+				    g_hash_table_contains (index->category_components, desktop_group))
+					continue;
+
+				g_hash_table_insert (index->category_components,
+						     g_string_chunk_insert_const (index->strings, desktop_group),
+						     g_ptr_array_new ());
+
+				subs = g_hash_table_lookup (subcategories, split[0]);
+				if (subs == NULL) {
+					subs = g_ptr_array_new_with_free_func (g_free);
+					g_hash_table_insert (subcategories, g_strdup (split[0]), subs);
+				}
+				g_ptr_array_add (subs, g_strdup (split[1]));
+			}
+		}
+	}
+
+	components = xb_silo_query (silo, "components/component", 0, NULL);
+	for (guint i = 0; components != NULL && i < components->len; i++) {
+		XbNode *component = g_ptr_array_index (components, i);
+		g_autoptr(XbNode) child = NULL;
+		g_autoptr(XbNode) next = NULL;
+		g_autoptr(XbNode) categories_node = NULL;
+		const gchar *id = NULL;
+		gboolean is_featured = FALSE;
+		gboolean is_popular = FALSE;
+		guint64 newest_timestamp = G_MAXUINT64;
+
+		for (child = xb_node_get_child (component); child != NULL; g_object_unref (child), child = g_steal_pointer (&next)) {
+			const gchar *element = xb_node_get_element (child);
+			g_autoptr(XbNode) grandchild = NULL;
+			g_autoptr(XbNode) grandchild_next = NULL;
+
+			next = xb_node_get_next (child);
+
+			if (g_strcmp0 (element, "id") == 0) {
+				id = xb_node_get_text (child);
+			} else if (g_strcmp0 (element, "categories") == 0) {
+				if (categories_node == NULL)
+					categories_node = g_object_ref (child);
+			} else if (g_strcmp0 (element, "kudos") == 0) {
+				for (grandchild = xb_node_get_child (child); grandchild != NULL; g_object_unref (grandchild), grandchild = g_steal_pointer (&grandchild_next)) {
+					grandchild_next = xb_node_get_next (grandchild);
+					if (g_strcmp0 (xb_node_get_element (grandchild), "kudo") == 0 &&
+					    g_strcmp0 (xb_node_get_text (grandchild), "GnomeSoftware::popular") == 0)
+						is_popular = TRUE;
+				}
+			} else if (g_strcmp0 (element, "custom") == 0) {
+				for (grandchild = xb_node_get_child (child); grandchild != NULL; g_object_unref (grandchild), grandchild = g_steal_pointer (&grandchild_next)) {
+					const gchar *key;
+
+					grandchild_next = xb_node_get_next (grandchild);
+					if (g_strcmp0 (xb_node_get_element (grandchild), "value") != 0)
+						continue;
+
+					key = xb_node_get_attr (grandchild, "key");
+					if (g_strcmp0 (key, "GnomeSoftware::FeatureTile") == 0 ||
+					    g_strcmp0 (key, "GnomeSoftware::FeatureTile-css") == 0) {
+						is_featured = TRUE;
+					} else if (g_strcmp0 (key, "GnomeSoftware::DeploymentFeatured") == 0 &&
+						   xb_node_get_text (grandchild) != NULL) {
+						GsAppstreamDeploymentEntry entry = {
+							.position = i,
+							.component = g_object_ref (component),
+							.deployment = g_string_chunk_insert_const (index->strings,
+												   xb_node_get_text (grandchild)),
+						};
+						g_array_append_val (index->deployment_featured, entry);
+					}
+				}
+			} else if (g_strcmp0 (element, "releases") == 0) {
+				for (grandchild = xb_node_get_child (child); grandchild != NULL; g_object_unref (grandchild), grandchild = g_steal_pointer (&grandchild_next)) {
+					guint64 timestamp;
+
+					grandchild_next = xb_node_get_next (grandchild);
+					if (g_strcmp0 (xb_node_get_element (grandchild), "release") != 0)
+						continue;
+
+					timestamp = xb_node_get_attr_as_uint (grandchild, "timestamp");
+					if (timestamp != G_MAXUINT64 &&
+					    (newest_timestamp == G_MAXUINT64 || timestamp > newest_timestamp))
+						newest_timestamp = timestamp;
+				}
+			}
+		}
+
+		if (is_featured)
+			g_ptr_array_add (index->featured, g_object_ref (component));
+
+		if (newest_timestamp != G_MAXUINT64 && newest_timestamp > index->recent_since) {
+			GsAppstreamRecentEntry entry = {
+				.timestamp = newest_timestamp,
+				.position = i,
+				.component = g_object_ref (component),
+			};
+			g_array_append_val (index->recent, entry);
+		}
+
+		if (id == NULL)
+			continue;
+		id = g_string_chunk_insert_const (index->strings, id);
+
+		if (is_popular)
+			g_ptr_array_add (index->popular_ids, (gpointer) id);
+
+		/* merge components do not define apps of their own */
+		if (categories_node != NULL && xb_node_get_attr (component, "merge") == NULL)
+			gs_appstream_silo_index_add_categories (index, subcategories, categories_node, id, categories);
+	}
+
+	g_array_sort (index->recent, gs_appstream_recent_entry_compare_timestamp);
+
+	g_debug ("Indexed %u components into %u desktop groups, %u popular, "
+		 "%u featured, %u deployment-featured and %u released in %.0fms",
+		 components != NULL ? components->len : 0,
+		 g_hash_table_size (index->category_components),
+		 index->popular_ids->len,
+		 index->featured->len,
+		 index->deployment_featured->len,
+		 index->recent->len,
+		 g_timer_elapsed (timer, NULL) * 1000);
+
+	return index;
+}
+
+static GsAppstreamSiloIndex *
+gs_appstream_silo_get_index (XbSilo *silo)
+{
+	g_autoptr(GMutexLocker) locker = g_mutex_locker_new (&silo_index_mutex);
+	GsAppstreamSiloIndex *index;
+
+	index = g_object_get_data (G_OBJECT (silo), "GsAppstream::silo-index");
+	if (index == NULL) {
+		index = gs_appstream_silo_index_build (silo);
+		g_object_set_data_full (G_OBJECT (silo), "GsAppstream::silo-index",
+					index, (GDestroyNotify) gs_appstream_silo_index_free);
+	}
+
+	return index;
+}
+
+/* Returns: %TRUE if @desktop_group is indexed, in which case @out_ids is set
+ * to the IDs of the components in it, or %NULL if there are none */
+static gboolean
+gs_appstream_silo_lookup_desktop_group (XbSilo       *silo,
+					const gchar  *desktop_group,
+					GPtrArray   **out_ids)
+{
+	GsAppstreamSiloIndex *index = gs_appstream_silo_get_index (silo);
+	GPtrArray *ids = g_hash_table_lookup (index->category_components, desktop_group);
+
+	if (ids == NULL && strstr (desktop_group, "::") != NULL)
+		return FALSE;
+
+	*out_ids = ids;
+	return TRUE;
+}
+
+/**
+ * gs_appstream_ensure_silo_index:
+ * @silo: a #XbSilo
+ *
+ * Build the indexes used to look up components in @silo by category, and
+ * for the popular, featured, deployment-featured and recent lists, if they
+ * have not been built already.
+ *
+ * They are otherwise built the first time they are needed; this allows a
+ * plugin to build them straight after building @silo, in the same thread.
+ *
+ * Since: 50
+ */
+void
+gs_appstream_ensure_silo_index (XbSilo *silo)
+{
+	g_return_if_fail (XB_IS_SILO (silo));
+
+	gs_appstream_silo_get_index (silo);
+}
+
 gboolean
 gs_appstream_add_category_apps (GsPlugin *plugin,
 				XbSilo *silo,
@@ -1921,11 +2352,24 @@ gs_appstream_add_category_apps (GsPlugin *plugin,
 	for (guint j = 0; j < desktop_groups->len; j++) {
 		const gchar *desktop_group = g_ptr_array_index (desktop_groups, j);
 		g_autofree gchar *xpath = NULL;
-		g_auto(GStrv) split = g_strsplit (desktop_group, "::", -1);
+		g_auto(GStrv) split = NULL;
 		g_autoptr(GPtrArray) components = NULL;
 		g_autoptr(GError) error_local = NULL;
+		GPtrArray *ids = NULL;
+
+		if (gs_appstream_silo_lookup_desktop_group (silo, desktop_group, &ids)) {
+			for (guint i = 0; ids != NULL && i < ids->len; i++) {
+				g_autoptr(GsApp) app = gs_app_new (g_ptr_array_index (ids, i));
+				gs_app_set_metadata (app, "GnomeSoftware::Creator",
+						     gs_plugin_get_name (plugin));
+				gs_app_add_quirk (app, GS_APP_QUIRK_IS_WILDCARD);
+				gs_app_list_add (list, app);
+			}
+			continue;
+		}
 
 		/* generate query */
+		split = g_strsplit (desktop_group, "::", -1);
 		if (g_strv_length (split) == 1) {
 			xpath = g_strdup_printf ("components/component[not(@merge)]/categories/"
 						 "category[text()='%s']/../..",
@@ -1969,10 +2413,15 @@ gs_appstream_count_component_for_groups (XbSilo      *silo,
 	/* the overview page checks for 100 apps, then try to get them */
 	const guint limit = 100;
 	g_autofree gchar *xpath = NULL;
-	g_auto(GStrv) split = g_strsplit (desktop_group, "::", -1);
+	g_auto(GStrv) split = NULL;
 	g_autoptr(GPtrArray) array = NULL;
 	g_autoptr(GError) error_local = NULL;
+	GPtrArray *ids = NULL;
+
+	if (gs_appstream_silo_lookup_desktop_group (silo, desktop_group, &ids))
+		return (ids != NULL) ? MIN (ids->len, limit) : 0;
 
+	split = g_strsplit (desktop_group, "::", -1);
 	if (g_strv_length (split) == 1) { /* "all" group for a parent category */
 		xpath = g_strdup_printf ("components/component[not(@merge)]/categories/"
 					 "category[text()='%s']/../..",
@@ -2072,30 +2521,15 @@ gs_appstream_add_popular (XbSilo *silo,
 			  GCancellable *cancellable,
 			  GError **error)
 {
-	g_autoptr(GError) error_local = NULL;
-	g_autoptr(GPtrArray) array = NULL;
+	GsAppstreamSiloIndex *index;
 
 	g_return_val_if_fail (XB_IS_SILO (silo), FALSE);
 	g_return_val_if_fail (GS_IS_APP_LIST (list), FALSE);
 
-	/* find out how many packages are in each category */
-	array = xb_silo_query (silo,
-			       "components/component/kudos/"
-			       "kudo[text()='GnomeSoftware::popular']/../..",
-			       0, &error_local);
-	if (array == NULL) {
-		if (g_error_matches (error_local, G_IO_ERROR, G_IO_ERROR_NOT_FOUND))
-			return TRUE;
-		g_propagate_error (error, g_steal_pointer (&error_local));
-		return FALSE;
-	}
-	for (guint i = 0; i < array->len; i++) {
-		g_autoptr(GsApp) app = NULL;
-		XbNode *component = g_ptr_array_index (array, i);
-		const gchar *component_id = xb_node_query_text (component, "id", NULL);
-		if (component_id == NULL)
-			continue;
-		app = gs_app_new (component_id);
+	/* components with the GnomeSoftware::popular kudo */
+	index = gs_appstream_silo_get_index (silo);
+	for (guint i = 0; i < index->popular_ids->len; i++) {
+		g_autoptr(GsApp) app = gs_app_new (g_ptr_array_index (index->popular_ids, i));
 		gs_app_add_quirk (app, GS_APP_QUIRK_IS_WILDCARD);
 		gs_app_list_add (list, app);
 	}
@@ -2112,25 +2546,53 @@ gs_appstream_add_recent (GsPlugin *plugin,
 {
 	AsComponentScope default_scope = AS_COMPONENT_SCOPE_UNKNOWN;
 	guint64 now = (guint64) g_get_real_time () / G_USEC_PER_SEC, max_future_timestamp;
-	g_autofree gchar *xpath = NULL;
+	guint64 since;
 	g_autofree gchar *silo_filename = NULL;
-	g_autoptr(GError) error_local = NULL;
 	g_autoptr(GPtrArray) array = NULL;
+	GsAppstreamSiloIndex *index;
 
 	g_return_val_if_fail (GS_IS_PLUGIN (plugin), FALSE);
 	g_return_val_if_fail (XB_IS_SILO (silo), FALSE);
 	g_return_val_if_fail (GS_IS_APP_LIST (list), FALSE);
 
-	/* use predicate conditions to the max */
-	xpath = g_strdup_printf ("components/component/releases/"
-				 "release[@timestamp>%" G_GUINT64_FORMAT "]/../..",
-				 now - age);
-	array = xb_silo_query (silo, xpath, 0, &error_local);
-	if (array == NULL) {
-		if (g_error_matches (error_local, G_IO_ERROR, G_IO_ERROR_NOT_FOUND))
-			return TRUE;
-		g_propagate_error (error, g_steal_pointer (&error_local));
-		return FALSE;
+	/* an @age reaching back before the epoch includes every release */
+	since = (age < now) ? now - age : 0;
+
+	index = gs_appstream_silo_get_index (silo);
+	if (since >= index->recent_since) {
+		g_autoptr(GPtrArray) entries = g_ptr_array_new ();
+
+		/* the index is sorted newest first, so this only visits the
+		 * components which have a release newer than @age, then
+		 * returns them in silo order as the query below would */
+		for (guint i = 0; i < index->recent->len; i++) {
+			GsAppstreamRecentEntry *entry = &g_array_index (index->recent, GsAppstreamRecentEntry, i);
+			if (entry->timestamp <= since)
+				break;
+			g_ptr_array_add (entries, entry);
+		}
+		g_ptr_array_sort (entries, gs_appstream_recent_entry_compare_position);
+
+		array = g_ptr_array_new_full (entries->len, g_object_unref);
+		for (guint i = 0; i < entries->len; i++) {
+			GsAppstreamRecentEntry *entry = g_ptr_array_index (entries, i);
+			g_ptr_array_add (array, g_object_ref (entry->component));
+		}
+	} else {
+		g_autofree gchar *xpath = NULL;
+		g_autoptr(GError) error_local = NULL;
+
+		/* use predicate conditions to the max */
+		xpath = g_strdup_printf ("components/component/releases/"
+					 "release[@timestamp>%" G_GUINT64_FORMAT "]/../..",
+					 since);
+		array = xb_silo_query (silo, xpath, 0, &error_local);
+		if (array == NULL) {
+			if (g_error_matches (error_local, G_IO_ERROR, G_IO_ERROR_NOT_FOUND))
+				return TRUE;
+			g_propagate_error (error, g_steal_pointer (&error_local));
+			return FALSE;
+		}
 	}
 	if (array->len > 0)
 		gs_appstream_read_silo_info_from_component (g_ptr_array_index (array, 0), &silo_filename, &default_scope);
@@ -2220,38 +2682,20 @@ gs_appstream_add_alternates (XbSilo *silo,
 }
 
 static gboolean
-gs_appstream_add_featured_with_query (XbSilo *silo,
-				      const gchar *query,
-				      GsAppList *list,
-				      GCancellable *cancellable,
-				      GError **error)
+gs_appstream_add_featured_component (XbNode *component,
+				     GsAppList *list,
+				     GError **error)
 {
-	g_autoptr(GError) error_local = NULL;
-	g_autoptr(GPtrArray) array = NULL;
+	g_autoptr(GsApp) app = NULL;
+	const gchar *component_id = xb_node_query_text (component, "id", NULL);
 
-	g_return_val_if_fail (XB_IS_SILO (silo), FALSE);
-	g_return_val_if_fail (GS_IS_APP_LIST (list), FALSE);
-
-	/* find out how many packages are in each category */
-	array = xb_silo_query (silo, query, 0, &error_local);
-	if (array == NULL) {
-		if (g_error_matches (error_local, G_IO_ERROR, G_IO_ERROR_NOT_FOUND))
-			return TRUE;
-		g_propagate_error (error, g_steal_pointer (&error_local));
+	if (component_id == NULL)
+		return TRUE;
+	app = gs_app_new (component_id);
+	gs_app_add_quirk (app, GS_APP_QUIRK_IS_WILDCARD);
+	if (!gs_appstream_copy_metadata (app, component, error))
 		return FALSE;
-	}
-	for (guint i = 0; i < array->len; i++) {
-		g_autoptr(GsApp) app = NULL;
-		XbNode *component = g_ptr_array_index (array, i);
-		const gchar *component_id = xb_node_query_text (component, "id", NULL);
-		if (component_id == NULL)
-			continue;
-		app = gs_app_new (component_id);
-		gs_app_add_quirk (app, GS_APP_QUIRK_IS_WILDCARD);
-		if (!gs_appstream_copy_metadata (app, component, error))
-			return FALSE;
-		gs_app_list_add (list, app);
-	}
+	gs_app_list_add (list, app);
 	return TRUE;
 }
 
@@ -2261,9 +2705,19 @@ gs_appstream_add_featured (XbSilo *silo,
 			   GCancellable *cancellable,
 			   GError **error)
 {
-	const gchar *query = "components/component/custom/value[@key='GnomeSoftware::FeatureTile']/../..|"
-			     "components/component/custom/value[@key='GnomeSoftware::FeatureTile-css']/../..";
-	return gs_appstream_add_featured_with_query (silo, query, list, cancellable, error);
+	GsAppstreamSiloIndex *index;
+
+	g_return_val_if_fail (XB_IS_SILO (silo), FALSE);
+	g_return_val_if_fail (GS_IS_APP_LIST (list), FALSE);
+
+	/* components with a GnomeSoftware::FeatureTile or
+	 * GnomeSoftware::FeatureTile-css custom value */
+	index = gs_appstream_silo_get_index (silo);
+	for (guint i = 0; i < index->featured->len; i++) {
+		if (!gs_appstream_add_featured_component (g_ptr_array_index (index->featured, i), list, error))
+			return FALSE;
+	}
+	return TRUE;
 }
 
 gboolean
@@ -2273,21 +2727,28 @@ gs_appstream_add_deployment_featured (XbSilo *silo,
 				      GCancellable *cancellable,
 				      GError **error)
 {
-	g_autoptr(GString) query = g_string_new (NULL);
+	GsAppstreamSiloIndex *index;
+	guint last_position = G_MAXUINT;
+
 	g_return_val_if_fail (XB_IS_SILO (silo), FALSE);
 	g_return_val_if_fail (deployments != NULL, FALSE);
 	g_return_val_if_fail (GS_IS_APP_LIST (list), FALSE);
-	for (guint ii = 0; deployments[ii] != NULL; ii++) {
-		g_autofree gchar *escaped = xb_string_escape (deployments[ii]);
-		if (escaped != NULL && *escaped != '\0') {
-			xb_string_append_union (query,
-				"components/component/custom/value[@key='GnomeSoftware::DeploymentFeatured'][text()='%s']/../..",
-				escaped);
-		}
+
+	/* the entries are in silo order, so a component matching several of
+	 * the @deployments has consecutive entries and is only added once */
+	index = gs_appstream_silo_get_index (silo);
+	for (guint i = 0; i < index->deployment_featured->len; i++) {
+		GsAppstreamDeploymentEntry *entry = &g_array_index (index->deployment_featured, GsAppstreamDeploymentEntry, i);
+
+		if (entry->position == last_position ||
+		    !g_strv_contains (deployments, entry->deployment))
+			continue;
+
+		last_position = entry->position;
+		if (!gs_appstream_add_featured_component (entry->component, list, error))
+			return FALSE;
 	}
-	if (!query->len)
-		return TRUE;
-	return gs_appstream_add_featured_with_query (silo, query->str, list, cancellable, error);
+	return TRUE;
 }
 
 gboolean
@@ -2332,6 +2793,101 @@ gs_appstream_url_to_app (GsPlugin *plugin,
 	return TRUE;
 }
 
+/* Desktop files converted to AppStream XML, shared between all the plugins
+ * which load them into a silo. Entries are keyed by directory and then by
+ * file name, and are only used while the file’s mtime and size match. */
+typedef struct {
+	guint64		 mtime_usec;
+	goffset		 size;
+	GBytes		*xml;  /* (owned) */
+} GsAppstreamDesktopEntry;
+
+static GMutex desktop_cache_mutex;
+static GHashTable *desktop_cache = NULL;  /* (mutex desktop_cache_mutex) (owned) (nullable) (element-type filename GHashTable) */
+
+static void
+gs_appstream_desktop_entry_free (GsAppstreamDesktopEntry *entry)
+{
+	g_bytes_unref (entry->xml);
+	g_free (entry);
+}
+
+static GBytes *
+gs_appstream_desktop_cache_lookup (const gchar    *filename,
+				   const GStatBuf *buf)
+{
+	GsAppstreamDesktopEntry *entry = NULL;
+	GHashTable *entries;
+	g_autofree gchar *path = g_path_get_dirname (filename);
+	g_autofree gchar *fn = g_path_get_basename (filename);
+	g_autoptr(GMutexLocker) locker = g_mutex_locker_new (&desktop_cache_mutex);
+
+	if (desktop_cache == NULL)
+		return NULL;
+	entries = g_hash_table_lookup (desktop_cache, path);
+	if (entries != NULL)
+		entry = g_hash_table_lookup (entries, fn);
+	if (entry == NULL ||
+	    entry->mtime_usec != (guint64) buf->st_mtim.tv_sec * G_USEC_PER_SEC + (guint64) buf->st_mtim.tv_nsec / 1000 ||
+	    entry->size != (goffset) buf->st_size)
+		return NULL;
+	return g_bytes_ref (entry->xml);
+}
+
+static void
+gs_appstream_desktop_cache_insert (const gchar    *filename,
+				   const GStatBuf *buf,
+				   GBytes         *xml)
+{
+	GsAppstreamDesktopEntry *entry;
+	GHashTable *entries;
+	g_autofree gchar *path = g_path_get_dirname (filename);
+	g_autoptr(GMutexLocker) locker = g_mutex_locker_new (&desktop_cache_mutex);
+
+	if (desktop_cache == NULL)
+		desktop_cache = g_hash_table_new_full (g_str_hash, g_str_equal, g_free,
+						       (GDestroyNotify) g_hash_table_unref);
+	entries = g_hash_table_lookup (desktop_cache, path);
+	if (entries == NULL) {
+		entries = g_hash_table_new_full (g_str_hash, g_str_equal, g_free,
+						 (GDestroyNotify) gs_appstream_desktop_entry_free);
+		g_hash_table_insert (desktop_cache, g_steal_pointer (&path), entries);
+	}
+
+	entry = g_new0 (GsAppstreamDesktopEntry, 1);
+	entry->mtime_usec = (guint64) buf->st_mtim.tv_sec * G_USEC_PER_SEC + (guint64) buf->st_mtim.tv_nsec / 1000;
+	entry->size = (goffset) buf->st_size;
+	entry->xml = g_bytes_ref (xml);
+	g_hash_table_replace (entries, g_path_get_basename (filename), entry);
+}
+
+/* Drops the entries for files in @path which are not in @names, or all of
+ * them if @names is %NULL. */
+static void
+gs_appstream_desktop_cache_prune (const gchar *path,
+				  GHashTable  *names)
+{
+	GHashTable *entries;
+	GHashTableIter iter;
+	gpointer key;
+	g_autoptr(GMutexLocker) locker = g_mutex_locker_new (&desktop_cache_mutex);
+
+	if (desktop_cache == NULL)
+		return;
+	if (names == NULL) {
+		g_hash_table_remove (desktop_cache, path);
+		return;
+	}
+	entries = g_hash_table_lookup (desktop_cache, path);
+	if (entries == NULL)
+		return;
+	g_hash_table_iter_init (&iter, entries);
+	while (g_hash_table_iter_next (&iter, &key, NULL)) {
+		if (!g_hash_table_contains (names, key))
+			g_hash_table_iter_remove (&iter);
+	}
+}
+
 static GInputStream *
 gs_appstream_load_desktop_cb (XbBuilderSource *self,
 			      XbBuilderSourceCtx *ctx,
@@ -2339,12 +2895,24 @@ gs_appstream_load_desktop_cb (XbBuilderSource *self,
 			      GCancellable *cancellable,
 			      GError **error)
 {
-	g_autofree gchar *xml = NULL;
+	const gchar *filename = user_data;
+	GStatBuf buf;
+	gboolean have_stat;
+	gchar *xml;
 	g_autoptr(AsComponent) cpt = as_component_new ();
 	g_autoptr(AsContext) actx = as_context_new ();
 	g_autoptr(GBytes) bytes = NULL;
+	g_autoptr(GBytes) xml_bytes = NULL;
 	gboolean ret;
 
+	/* only parse the file again if it has changed */
+	have_stat = g_stat (filename, &buf) == 0;
+	if (have_stat) {
+		xml_bytes = gs_appstream_desktop_cache_lookup (filename, &buf);
+		if (xml_bytes != NULL)
+			return g_memory_input_stream_new_from_bytes (xml_bytes);
+	}
+
 	bytes = xb_builder_source_ctx_get_bytes (ctx, cancellable, error);
 	if (bytes == NULL)
 		return NULL;
@@ -2360,7 +2928,10 @@ gs_appstream_load_desktop_cb (XbBuilderSource *self,
 	xml = as_component_to_xml_data (cpt, actx, error);
 	if (xml == NULL)
 		return NULL;
-	return g_memory_input_stream_new_from_data (g_steal_pointer (&xml), (gssize) -1, g_free);
+	xml_bytes = g_bytes_new_take (xml, strlen (xml));
+	if (have_stat)
+		gs_appstream_desktop_cache_insert (filename, &buf, xml_bytes);
+	return g_memory_input_stream_new_from_bytes (xml_bytes);
 }
 
 static gboolean
@@ -2373,9 +2944,12 @@ gs_appstream_load_desktop_fn (XbBuilder     *builder,
 	g_autoptr(XbBuilderNode) info = NULL;
 	g_autoptr(XbBuilderSource) source = xb_builder_source_new ();
 
-	/* add support for desktop files */
+	/* add support for desktop files; this is only called if the silo
+	 * needs compiling, and reuses the XML from the last time the file was
+	 * converted if it has not changed since */
 	xb_builder_source_add_simple_adapter (source, "application/x-desktop",
-					      gs_appstream_load_desktop_cb, NULL, NULL);
+					      gs_appstream_load_desktop_cb,
+					      g_strdup (filename), g_free);
 
 	/* add source */
 	if (!xb_builder_source_load_file (source, file, 0, cancellable, error))
@@ -2402,10 +2976,13 @@ gs_appstream_load_desktop_files (XbBuilder      *builder,
 	const gchar *fn;
 	g_autoptr(GDir) dir = NULL;
 	g_autoptr(GFile) parent = g_file_new_for_path (path);
+	g_autoptr(GHashTable) names = NULL;
 	if (out_any_loaded)
 		*out_any_loaded = FALSE;
 	if (!g_file_query_exists (parent, cancellable)) {
 		g_debug ("appstream: Skipping desktop path '%s' as %s", path, g_cancellable_is_cancelled (cancellable) ? "cancelled" : "does not exist");
+		if (!g_cancellable_is_cancelled (cancellable))
+			gs_appstream_desktop_cache_prune (path, NULL);
 		return TRUE;
 	}
 
@@ -2422,12 +2999,14 @@ gs_appstream_load_desktop_files (XbBuilder      *builder,
 			g_debug ("appstream: Failed to create file monitor for '%s': %s", path, error_local->message);
 	}
 
+	names = g_hash_table_new_full (g_str_hash, g_str_equal, g_free, NULL);
 	while ((fn = g_dir_read_name (dir)) != NULL) {
 		if (g_str_has_suffix (fn, ".desktop")) {
 			g_autofree gchar *filename = g_build_filename (path, fn, NULL);
 			g_autoptr(GError) error_local = NULL;
 			if (g_strcmp0 (fn, "mimeinfo.cache") == 0)
 				continue;
+			g_hash_table_add (names, g_strdup (fn));
 			if (!gs_appstream_load_desktop_fn (builder,
 							   filename,
 							   cancellable,
@@ -2440,10 +3019,52 @@ gs_appstream_load_desktop_files (XbBuilder      *builder,
 		}
 	}
 
+	/* forget the files which have been removed */
+	gs_appstream_desktop_cache_prune (path, names);
+
 	/* success */
 	return TRUE;
 }
 
+/**
+ * gs_appstream_clear_desktop_file_cache:
+ *
+ * Drop the desktop files which were converted to AppStream XML for the
+ * silos built with gs_appstream_load_desktop_files(). They are converted
+ * again the next time a silo containing them is compiled.
+ *
+ * Returns: an estimate of the number of bytes freed
+ *
+ * Since: 50
+ */
+gsize
+gs_appstream_clear_desktop_file_cache (void)
+{
+	gsize n_bytes = 0;
+	g_autoptr(GHashTable) cache = NULL;
+	GHashTableIter iter;
+	gpointer value;
+
+	g_mutex_lock (&desktop_cache_mutex);
+	cache = g_steal_pointer (&desktop_cache);
+	g_mutex_unlock (&desktop_cache_mutex);
+
+	if (cache == NULL)
+		return 0;
+
+	g_hash_table_iter_init (&iter, cache);
+	while (g_hash_table_iter_next (&iter, NULL, &value)) {
+		GHashTableIter entry_iter;
+		gpointer entry;
+
+		g_hash_table_iter_init (&entry_iter, value);
+		while (g_hash_table_iter_next (&entry_iter, NULL, &entry))
+			n_bytes += g_bytes_get_size (((GsAppstreamDesktopEntry *) entry)->xml);
+	}
+
+	return n_bytes;
+}
+
 static void
 gs_add_appstream_catalog_location (GPtrArray *locations,
 				   const gchar *root)
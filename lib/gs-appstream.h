@@ -40,6 +40,7 @@ gboolean	 gs_appstream_search_developer_apps	(GsPlugin	*plugin,
 							 GsAppList	*list,
 							 GCancellable	*cancellable,
 							 GError		**error);
+void		 gs_appstream_ensure_silo_index		(XbSilo		*silo);
 gboolean	 gs_appstream_refine_category_sizes	(XbSilo		*silo,
 							 GPtrArray	*list,
 							 GCancellable	*cancellable,
@@ -91,6 +92,7 @@ gboolean	 gs_appstream_load_desktop_files	(XbBuilder	*builder,
 							 GFileMonitor  **out_file_monitor,
 							 GCancellable	*cancellable,
 							 GError		**error);
+gsize		 gs_appstream_clear_desktop_file_cache	(void);
 GPtrArray	*gs_appstream_get_appstream_data_dirs	(void);
 void		 gs_appstream_add_current_locales	(XbBuilder	*builder);
 void		 gs_appstream_add_data_merge_fixup	(XbBuilder	*builder,
@@ -17,6 +17,9 @@
 
 #include "gs-debug.h"
 
+/* How long to wait for plugins whose setup was deferred */
+#define DEFERRED_SETUP_TIMEOUT	60  /* s */
+
 typedef struct {
 	GsPluginLoader	*plugin_loader;
 	guint64		 require_flags;
@@ -80,6 +83,52 @@ gs_cmd_show_results_categories (GPtrArray *list)
 	}
 }
 
+static gboolean
+deferred_setup_timeout_cb (gpointer user_data)
+{
+	gboolean *timed_out = user_data;
+
+	*timed_out = TRUE;
+
+	return G_SOURCE_REMOVE;
+}
+
+/* Wait for plugins whose setup was deferred, so they are included in the
+ * action and in the startup timeline. A plugin which never finishes its
+ * setup is given up on after a while, rather than blocking the command. */
+static void
+gs_cmd_wait_for_deferred_setup (GsPluginLoader *plugin_loader)
+{
+	gboolean running;
+	gboolean timed_out = FALSE;
+	g_autoptr(GSource) timeout_source = NULL;
+
+	timeout_source = g_timeout_source_new_seconds (DEFERRED_SETUP_TIMEOUT);
+	g_source_set_callback (timeout_source, deferred_setup_timeout_cb, &timed_out, NULL);
+	g_source_set_name (timeout_source, "[gnome-software] deferred_setup_timeout_cb");
+	g_source_attach (timeout_source, NULL);
+
+	do {
+		g_autoptr(GVariant) timeline = g_variant_ref_sink (gs_plugin_loader_get_startup_timeline (plugin_loader));
+		GVariantIter iter;
+		const gchar *status;
+
+		running = FALSE;
+		g_variant_iter_init (&iter, timeline);
+		while (!running && g_variant_iter_next (&iter, "(&s&s&sxx)", NULL, NULL, &status, NULL, NULL))
+			running = g_str_equal (status, "running");
+
+		if (running && !timed_out)
+			g_main_context_iteration (NULL, TRUE);
+	} while (running && !timed_out);
+
+	if (running)
+		g_printerr ("Warning: Deferred plugin setup did not finish within %u seconds\n",
+			    (guint) DEFERRED_SETUP_TIMEOUT);
+
+	g_source_destroy (timeout_source);
+}
+
 static GsPluginRefineRequireFlags
 gs_cmd_refine_require_flag_from_string (const gchar *flag, GError **error)
 {
@@ -370,6 +419,7 @@ main (int argc, char **argv)
 		g_print ("Failed to setup plugins: %s\n", error->message);
 		return EXIT_FAILURE;
 	}
+	gs_cmd_wait_for_deferred_setup (self->plugin_loader);
 	gs_plugin_loader_dump_state (self->plugin_loader);
 
 	/* ensure that at least some metadata of any age is present, and also
@@ -770,6 +820,25 @@ main (int argc, char **argv)
 		plugin_job = gs_plugin_job_refresh_metadata_new (cache_age_secs, refresh_metadata_flags);
 		ret = gs_plugin_loader_job_process (self->plugin_loader, plugin_job,
 						    NULL, &error);
+	} else if (argc == 2 && g_strcmp0 (argv[1], "startup-timeline") == 0) {
+		g_autoptr(GVariant) timeline = g_variant_ref_sink (gs_plugin_loader_get_startup_timeline (self->plugin_loader));
+		GVariantIter iter;
+		const gchar *kind, *name, *status;
+		gint64 offset_usec, duration_usec;
+
+		g_variant_iter_init (&iter, timeline);
+		while (g_variant_iter_next (&iter, "(&s&s&sxx)", &kind, &name, &status, &offset_usec, &duration_usec)) {
+			g_autofree gchar *tmp = g_strdup_printf ("%s %s", kind, name);
+			g_autofree gchar *padded = gs_cmd_pad_spaces (tmp, 40);
+
+			if (duration_usec >= 0)
+				g_print ("+%6" G_GINT64_FORMAT "ms %s %-8s %" G_GINT64_FORMAT "ms\n",
+					 offset_usec / 1000, padded, status, duration_usec / 1000);
+			else
+				g_print ("+%6" G_GINT64_FORMAT "ms %s %s\n",
+					 offset_usec / 1000, padded, status);
+		}
+		ret = TRUE;
 	} else if (argc >= 1 && g_strcmp0 (argv[1], "user-hash") == 0) {
 		g_autofree gchar *user_hash = gs_utils_get_user_hash (&error);
 		if (user_hash == NULL) {
@@ -787,7 +856,7 @@ main (int argc, char **argv)
 				     "'updates', 'popular', 'get-categories', "
 				     "'get-category-apps', 'get-alternates', 'filename-to-app', "
 				     "'install', 'remove', "
-				     "'sources', 'refresh', 'launch' or 'search'");
+				     "'sources', 'refresh', 'launch', 'startup-timeline' or 'search'");
 	}
 	if (!ret) {
 		g_print ("Failed: %s\n", error->message);
@@ -14,6 +14,27 @@
  *
  * A set of utilities for downloading things and doing HTTP requests.
  *
+ * gs_download_file_async() downloads into a `.partial` file next to the
+ * output file, which is only moved into place once the download is complete.
+ * If a download is interrupted, the partial file is kept along with the ETag
+ * or Last-Modified date of the response it came from. The next download of the
+ * same file then uses an HTTP range request to fetch only the remainder. The
+ * server validates the range against that ETag or date, so a partial file
+ * from an older version of the resource is never appended to.
+ *
+ * Only one download to a given output file runs at a time. Further calls to
+ * gs_download_file_async() for the same file wait for the earlier ones to
+ * finish, so they never write to the same partial file at once.
+ *
+ * A bandwidth cap can be set on a #SoupSession with
+ * gs_download_session_set_max_rate(). It is shared by all downloads done
+ * through these utilities with that session. Sessions built with
+ * gs_build_soup_session() follow the `download-max-rate` GSettings key.
+ *
+ * Downloads on a #SoupSession can be paused with
+ * gs_download_session_set_paused(), for example while the download scheduler
+ * does not allow downloading (see gs_metered_pause_download_session()).
+ *
  * Since: 42
  */
 
@@ -28,8 +49,154 @@
 #include "gs-download-utils.h"
 #include "gs-utils.h"
 
+/* Stores the validator (a strong ETag or a Last-Modified date) of the response
+ * a partial download came from, for use in an If-Range header. */
+#define PARTIAL_VALIDATOR_ATTRIBUTE "xattr::gnome-software::partial-validator"
+
 G_DEFINE_QUARK (gs-download-error-quark, gs_download_error)
 
+/* How often a paused download checks whether it can carry on. */
+#define PAUSE_POLL_INTERVAL_USEC G_USEC_PER_SEC
+
+/* Limits shared by all downloads using a #SoupSession. The bandwidth cap is a
+ * token bucket, represented by the time at which it will next be empty. */
+typedef struct {
+	GMutex mutex;
+	gsize max_bytes_per_second;
+	gint64 empty_time_usec;  /* monotonic */
+	gboolean paused;
+} SessionLimits;
+
+static void
+session_limits_free (SessionLimits *limits)
+{
+	g_mutex_clear (&limits->mutex);
+	g_free (limits);
+}
+
+static SessionLimits *
+get_session_limits (SoupSession *soup_session)
+{
+	return g_object_get_data (G_OBJECT (soup_session), "gs-download-limits");
+}
+
+/* Every download attaches the limits to its session when it starts, so that
+ * pausing or limiting the session later reaches it. */
+static SessionLimits *
+ensure_session_limits (SoupSession *soup_session)
+{
+	static GMutex ensure_mutex;
+	g_autoptr(GMutexLocker) locker = g_mutex_locker_new (&ensure_mutex);
+	SessionLimits *limits = get_session_limits (soup_session);
+
+	if (limits == NULL) {
+		limits = g_new0 (SessionLimits, 1);
+		g_mutex_init (&limits->mutex);
+		g_object_set_data_full (G_OBJECT (soup_session), "gs-download-limits",
+					limits, (GDestroyNotify) session_limits_free);
+	}
+
+	return limits;
+}
+
+/* Returns how long to wait, in microseconds, before transferring any more data
+ * after @n_bytes have been transferred. Up to a second’s worth of data may be
+ * transferred in a burst. */
+static gint64
+session_limits_consume (SessionLimits *limits,
+                        gsize          n_bytes)
+{
+	g_autoptr(GMutexLocker) locker = g_mutex_locker_new (&limits->mutex);
+	gint64 now = g_get_monotonic_time ();
+
+	if (limits->max_bytes_per_second == 0)
+		return 0;
+
+	limits->empty_time_usec = MAX (limits->empty_time_usec, now) +
+				  (gint64) (n_bytes * G_USEC_PER_SEC / limits->max_bytes_per_second);
+
+	return MAX (limits->empty_time_usec - now - G_USEC_PER_SEC, 0);
+}
+
+static gboolean
+session_limits_is_paused (SessionLimits *limits)
+{
+	g_autoptr(GMutexLocker) locker = g_mutex_locker_new (&limits->mutex);
+
+	return limits->paused;
+}
+
+/**
+ * gs_download_session_set_max_rate:
+ * @soup_session: a #SoupSession
+ * @max_bytes_per_second: maximum download rate, in bytes per second, or `0`
+ *   for no limit
+ *
+ * Limit the combined download rate of all downloads done with @soup_session
+ * through gs_download_stream_async() and gs_download_file_async().
+ *
+ * The limit applies to downloads which are in progress as well as to new ones.
+ *
+ * Since: 50
+ */
+void
+gs_download_session_set_max_rate (SoupSession *soup_session,
+                                  gsize        max_bytes_per_second)
+{
+	SessionLimits *limits;
+
+	g_return_if_fail (SOUP_IS_SESSION (soup_session));
+
+	limits = ensure_session_limits (soup_session);
+
+	g_mutex_lock (&limits->mutex);
+	limits->max_bytes_per_second = max_bytes_per_second;
+	g_mutex_unlock (&limits->mutex);
+}
+
+/**
+ * gs_download_session_set_paused:
+ * @soup_session: a #SoupSession
+ * @paused: %TRUE to pause downloads, %FALSE to resume them
+ *
+ * Pause or resume all downloads done with @soup_session through
+ * gs_download_stream_async() and gs_download_file_async().
+ *
+ * A paused download stops reading from the network after its current chunk,
+ * and carries on within a second of being resumed. Cancelling a paused
+ * download still completes it promptly. If the server drops the connection
+ * while a download is paused, the download fails; downloads to a file can
+ * then be resumed from where they stopped by calling gs_download_file_async()
+ * again.
+ *
+ * Since: 50
+ */
+void
+gs_download_session_set_paused (SoupSession *soup_session,
+                                gboolean     paused)
+{
+	SessionLimits *limits;
+
+	g_return_if_fail (SOUP_IS_SESSION (soup_session));
+
+	limits = ensure_session_limits (soup_session);
+
+	g_mutex_lock (&limits->mutex);
+	limits->paused = paused;
+	g_mutex_unlock (&limits->mutex);
+}
+
+static void
+max_rate_changed_cb (GSettings   *settings,
+                     const gchar *key,
+                     gpointer     user_data)
+{
+	SoupSession *soup_session = SOUP_SESSION (user_data);
+
+	gs_download_session_set_max_rate (soup_session,
+					  (gsize) g_settings_get_uint (settings, "download-max-rate") * 1024);
+}
+
 /**
  * gs_build_soup_session:
  *
@@ -40,15 +207,32 @@ G_DEFINE_QUARK (gs-download-error-quark, gs_download_error)
  * authentication information, and these likely needn’t be shared between
  * plugins. Using separate sessions reduces thread contention.
  *
+ * The session’s download rate is limited according to the `download-max-rate`
+ * GSettings key, using gs_download_session_set_max_rate().
+ *
  * Returns: (transfer full): a new #SoupSession
  * Since: 42
  */
 SoupSession *
 gs_build_soup_session (void)
 {
-	return soup_session_new_with_options ("user-agent", gs_user_agent (),
-					      "timeout", 10,
-					      NULL);
+	g_autoptr(SoupSession) soup_session = NULL;
+	g_autoptr(GSettings) settings = NULL;
+
+	soup_session = soup_session_new_with_options ("user-agent", gs_user_agent (),
+						      "timeout", 10,
+						      NULL);
+
+	/* The settings object lives as long as the session, so changes to the
+	 * limit apply to existing sessions too. */
+	settings = g_settings_new ("org.gnome.software");
+	g_signal_connect_object (settings, "changed::download-max-rate",
+				 G_CALLBACK (max_rate_changed_cb), soup_session, G_CONNECT_DEFAULT);
+	max_rate_changed_cb (settings, "download-max-rate", soup_session);
+	g_object_set_data_full (G_OBJECT (soup_session), "gs-download-settings",
+				g_steal_pointer (&settings), g_object_unref);
+
+	return g_steal_pointer (&soup_session);
 }
 
 /* See https://httpwg.org/specs/rfc7231.html#http.date
@@ -76,9 +260,13 @@ typedef struct {
 	int io_priority;
 	GsDownloadProgressCallback progress_callback;  /* (nullable) */
 	gpointer progress_user_data;
+	GFile *partial_file;  /* (nullable) (owned) */
+	goffset resume_offset;
 
 	/* In-progress state. */
 	SoupMessage *message;  /* (nullable) (owned) */
+	SessionLimits *limits;  /* (unowned) */
+	gint64 throttle_delay_usec;
 	gboolean close_input_stream;
 	gboolean close_output_stream;
 	gboolean discard_output_stream;
@@ -107,6 +295,7 @@ download_data_free (DownloadData *data)
 	g_clear_pointer (&data->last_etag, g_free);
 	g_clear_pointer (&data->last_modified_date, g_date_time_unref);
 	g_clear_object (&data->message);
+	g_clear_object (&data->partial_file);
 	g_clear_pointer (&data->uri, g_free);
 	g_clear_pointer (&data->new_etag, g_free);
 	g_clear_pointer (&data->new_last_modified_date, g_date_time_unref);
@@ -127,12 +316,28 @@ static void read_bytes_cb (GObject      *source_object,
 static void write_bytes_cb (GObject      *source_object,
                             GAsyncResult *result,
                             gpointer      user_data);
+static void read_next_chunk (GTask *task);
+static gboolean throttle_cb (gpointer user_data);
 static void finish_download (GTask  *task,
                              GError *error);
 static void close_stream_cb (GObject      *source_object,
                              GAsyncResult *result,
                              gpointer      user_data);
 static void download_progress (GTask *task);
+static void download_stream_internal_async (SoupSession                *soup_session,
+                                            const gchar                *uri,
+                                            GOutputStream              *output_stream,
+                                            const gchar                *last_etag,
+                                            GDateTime                  *last_modified_date,
+                                            GFile                      *partial_file,
+                                            goffset                     resume_offset,
+                                            const gchar                *resume_validator,
+                                            int                         io_priority,
+                                            GsDownloadProgressCallback  progress_callback,
+                                            gpointer                    progress_user_data,
+                                            GCancellable               *cancellable,
+                                            GAsyncReadyCallback         callback,
+                                            gpointer                    user_data);
 
 /**
  * gs_download_stream_async:
@@ -178,6 +383,34 @@ gs_download_stream_async (SoupSession                *soup_session,
                           GCancellable               *cancellable,
                           GAsyncReadyCallback         callback,
                           gpointer                    user_data)
+{
+	download_stream_internal_async (soup_session, uri, output_stream,
+					last_etag, last_modified_date,
+					NULL, 0, NULL,
+					io_priority, progress_callback, progress_user_data,
+					cancellable, callback, user_data);
+}
+
+/* If @partial_file is set, @output_stream is writing to it, and it will be
+ * kept if the download fails so that it can be resumed later. If
+ * @resume_offset is non-zero, @output_stream has been opened for appending to
+ * @partial_file, which is @resume_offset bytes long and came from a response
+ * with the given @resume_validator. */
+static void
+download_stream_internal_async (SoupSession                *soup_session,
+                                const gchar                *uri,
+                                GOutputStream              *output_stream,
+                                const gchar                *last_etag,
+                                GDateTime                  *last_modified_date,
+                                GFile                      *partial_file,
+                                goffset                     resume_offset,
+                                const gchar                *resume_validator,
+                                int                         io_priority,
+                                GsDownloadProgressCallback  progress_callback,
+                                gpointer                    progress_user_data,
+                                GCancellable               *cancellable,
+                                GAsyncReadyCallback         callback,
+                                gpointer                    user_data)
 {
 	g_autoptr(GTask) task = NULL;
 	g_autoptr(SoupMessage) msg = NULL;
@@ -200,11 +433,18 @@ gs_download_stream_async (SoupSession                *soup_session,
 	data->io_priority = io_priority;
 	data->progress_callback = progress_callback;
 	data->progress_user_data = progress_user_data;
+	data->partial_file = (partial_file != NULL) ? g_object_ref (partial_file) : NULL;
+	data->resume_offset = resume_offset;
+	data->limits = ensure_session_limits (soup_session);
 
 	g_task_set_task_data (task, g_steal_pointer (&data_owned), (GDestroyNotify) download_data_free);
 
+	g_assert (resume_offset == 0 || (partial_file != NULL && resume_validator != NULL));
+
 	/* local */
 	if (g_str_has_prefix (uri, "file://")) {
+		g_assert (resume_offset == 0);
+
 		g_autoptr(GFile) local_file = g_file_new_for_path (uri + strlen ("file://"));
 		g_file_read_async (local_file, io_priority, cancellable, open_input_stream_cb, g_steal_pointer (&task));
 		return;
@@ -239,9 +479,87 @@ gs_download_stream_async (SoupSession                *soup_session,
 		soup_message_headers_append (soup_message_get_request_headers (msg), "If-Modified-Since", last_modified_date_str);
 	}
 
+	/* Resume support. The server will only return the requested range if
+	 * the resource still matches the validator of the partial file;
+	 * otherwise it will return the whole resource. */
+	if (resume_offset > 0) {
+		g_debug ("Requesting %s from byte %" G_GOFFSET_FORMAT, uri, resume_offset);
+		soup_message_headers_set_range (soup_message_get_request_headers (msg), resume_offset, -1);
+		soup_message_headers_append (soup_message_get_request_headers (msg), "If-Range", resume_validator);
+	}
+
 	soup_session_send_async (soup_session, msg, data->io_priority, cancellable, open_input_stream_cb, g_steal_pointer (&task));
 }
 
+static gchar *
+get_partial_validator (GFile        *partial_file,
+                       goffset      *size_out,
+                       GCancellable *cancellable)
+{
+	g_autoptr(GFileInfo) info = NULL;
+	const gchar *validator;
+
+	*size_out = 0;
+
+	info = g_file_query_info (partial_file,
+				  PARTIAL_VALIDATOR_ATTRIBUTE "," G_FILE_ATTRIBUTE_STANDARD_SIZE,
+				  G_FILE_QUERY_INFO_NONE, cancellable, NULL);
+	if (info == NULL)
+		return NULL;
+
+	validator = g_file_info_get_attribute_string (info, PARTIAL_VALIDATOR_ATTRIBUTE);
+	if (validator == NULL || *validator == '\0')
+		return NULL;
+
+	*size_out = g_file_info_get_size (info);
+
+	return g_strdup (validator);
+}
+
+static void
+set_partial_validator (GFile        *partial_file,
+                       const gchar  *validator,
+                       GCancellable *cancellable)
+{
+	g_autoptr(GError) local_error = NULL;
+	gboolean success;
+
+	if (validator != NULL && *validator != '\0')
+		success = g_file_set_attribute_string (partial_file, PARTIAL_VALIDATOR_ATTRIBUTE, validator,
+						       G_FILE_QUERY_INFO_NONE, cancellable, &local_error);
+	else
+		success = g_file_set_attribute (partial_file, PARTIAL_VALIDATOR_ATTRIBUTE, G_FILE_ATTRIBUTE_TYPE_INVALID,
+						NULL, G_FILE_QUERY_INFO_NONE, cancellable, &local_error);
+
+	/* This just means the download can’t be resumed if it’s interrupted. */
+	if (!success)
+		g_debug ("Error setting attribute ‘%s’ on file ‘%s’: %s",
+			 PARTIAL_VALIDATOR_ATTRIBUTE, g_file_peek_path (partial_file), local_error->message);
+}
+
+/* Truncate the partial file being resumed, so nothing already in it is kept. */
+static gboolean
+discard_partial_output (GTask *task)
+{
+	DownloadData *data = g_task_get_task_data (task);
+	g_autoptr(GError) local_error = NULL;
+
+	if (data->resume_offset == 0)
+		return TRUE;
+
+	data->resume_offset = 0;
+
+	if (!G_IS_SEEKABLE (data->output_stream) ||
+	    !g_seekable_truncate (G_SEEKABLE (data->output_stream), 0, NULL, &local_error)) {
+		g_debug ("Error truncating partial file ‘%s’: %s",
+			 g_file_peek_path (data->partial_file),
+			 (local_error != NULL) ? local_error->message : "Not seekable");
+		return FALSE;
+	}
+
+	return TRUE;
+}
+
 static void
 open_input_stream_cb (GObject      *source_object,
                       GAsyncResult *result,
@@ -302,10 +620,16 @@ open_input_stream_cb (GObject      *source_object,
 						      "Skipped downloading ‘%s’: %s",
 						      data->uri, soup_status_get_phrase (status_code)));
 			return;
-		} else if (status_code != SOUP_STATUS_OK) {
+		} else if (status_code != SOUP_STATUS_OK &&
+			   !(status_code == SOUP_STATUS_PARTIAL_CONTENT && data->resume_offset > 0)) {
 			g_autoptr(GString) str = g_string_new (NULL);
 			g_string_append (str, soup_status_get_phrase (status_code));
 
+			/* The partial file can never be resumed from if it’s
+			 * not a valid range of the resource. */
+			if (status_code == SOUP_STATUS_REQUESTED_RANGE_NOT_SATISFIABLE)
+				discard_partial_output (task);
+
 			if (local_error != NULL) {
 				g_string_append (str, ": ");
 				g_string_append (str, local_error->message);
@@ -325,8 +649,44 @@ open_input_stream_cb (GObject      *source_object,
 
 		g_assert (input_stream != NULL);
 
+		if (status_code == SOUP_STATUS_PARTIAL_CONTENT) {
+			goffset range_start, range_end, range_total_length;
+
+			if (!soup_message_headers_get_content_range (soup_message_get_response_headers (data->message),
+								     &range_start, &range_end, &range_total_length) ||
+			    range_start != data->resume_offset) {
+				discard_partial_output (task);
+				finish_download (task,
+						 g_error_new (G_IO_ERROR,
+							      G_IO_ERROR_FAILED,
+							      "Failed to download ‘%s’: Server returned an unexpected range",
+							      data->uri));
+				return;
+			}
+
+			g_debug ("Resuming download of %s from byte %" G_GOFFSET_FORMAT,
+				 data->uri, data->resume_offset);
+			data->total_read_bytes = data->resume_offset;
+			data->total_written_bytes = data->resume_offset;
+		} else if (data->resume_offset > 0) {
+			/* The resource has changed since the partial file was
+			 * downloaded, so the server has returned all of it.
+			 * Start again from the beginning. */
+			g_debug ("Restarting download of %s from the beginning", data->uri);
+
+			if (!discard_partial_output (task)) {
+				finish_download (task,
+						 g_error_new (G_IO_ERROR,
+							      G_IO_ERROR_FAILED,
+							      "Failed to download ‘%s’: Failed to truncate partial file",
+							      data->uri));
+				return;
+			}
+		}
+
 		/* Get the expected download size. */
-		data->expected_stream_size_bytes = soup_message_headers_get_content_length (soup_message_get_response_headers (data->message));
+		data->expected_stream_size_bytes = data->total_written_bytes +
+						   soup_message_headers_get_content_length (soup_message_get_response_headers (data->message));
 
 		/* Store the new ETag for later use. */
 		new_etag = soup_message_headers_get_one (soup_message_get_response_headers (data->message), "ETag");
@@ -340,6 +700,20 @@ open_input_stream_cb (GObject      *source_object,
 			new_last_modified_str = NULL;
 		if (new_last_modified_str != NULL)
 			data->new_last_modified_date = date_time_from_rfc7231 (new_last_modified_str);
+
+		/* Record what the partial file is a part of, so the download
+		 * can be resumed if it’s interrupted. Weak ETags can’t be used
+		 * for range requests. */
+		if (data->partial_file != NULL) {
+			const gchar *validator = NULL;
+
+			if (new_etag != NULL && !g_str_has_prefix (new_etag, "W/"))
+				validator = new_etag;
+			else
+				validator = new_last_modified_str;
+
+			set_partial_validator (data->partial_file, validator, cancellable);
+		}
 	} else {
 		g_assert_not_reached ();
 	}
@@ -347,8 +721,7 @@ open_input_stream_cb (GObject      *source_object,
 	/* Splice in an asynchronous loop. We unfortunately can’t use
 	 * g_output_stream_splice_async() here, as it doesn’t provide a progress
 	 * callback. The approach is the same though. */
-	g_input_stream_read_bytes_async (input_stream, data->buffer_size_bytes, data->io_priority,
-					 cancellable, read_bytes_cb, g_steal_pointer (&task));
+	read_next_chunk (g_steal_pointer (&task));
 }
 
 static void
@@ -375,6 +748,10 @@ read_bytes_cb (GObject      *source_object,
 	data->expected_stream_size_bytes = MAX (data->expected_stream_size_bytes, data->total_read_bytes);
 	download_progress (task);
 
+	/* Work out how long to wait before reading the next chunk, if the
+	 * download rate is limited. */
+	data->throttle_delay_usec = session_limits_consume (data->limits, g_bytes_get_size (bytes));
+
 	/* Write the downloaded data. */
 	if (g_bytes_get_size (bytes) > 0) {
 		g_clear_pointer (&data->currently_unwritten_chunk, g_bytes_unref);
@@ -429,10 +806,48 @@ write_bytes_cb (GObject      *source_object,
 	} else {
 		/* Full write succeeded. Start the next read. */
 		g_clear_pointer (&data->currently_unwritten_chunk, g_bytes_unref);
+		read_next_chunk (g_steal_pointer (&task));
+	}
+}
+
+/* Start reading the next chunk of the download, once the session’s rate
+ * limit allows it and while the session is not paused. Consumes @task. */
+static void
+read_next_chunk (GTask *task)
+{
+	g_autoptr(GTask) task_owned = task;
+	DownloadData *data = g_task_get_task_data (task);
+	GCancellable *cancellable = g_task_get_cancellable (task);
+	gint64 delay_usec = data->throttle_delay_usec;
+
+	data->throttle_delay_usec = 0;
+
+	/* Check again later while paused. A cancelled download carries on, so
+	 * the read fails and the download completes. */
+	if (delay_usec == 0 &&
+	    session_limits_is_paused (data->limits) &&
+	    !g_cancellable_is_cancelled (cancellable))
+		delay_usec = PAUSE_POLL_INTERVAL_USEC;
 
-		g_input_stream_read_bytes_async (data->input_stream, data->buffer_size_bytes, data->io_priority,
-						 cancellable, read_bytes_cb, g_steal_pointer (&task));
+	if (delay_usec > 0) {
+		g_autoptr(GSource) source = g_timeout_source_new (delay_usec / 1000);
+
+		g_source_set_priority (source, data->io_priority);
+		g_source_set_callback (source, throttle_cb, g_steal_pointer (&task_owned), NULL);
+		g_source_attach (source, g_main_context_get_thread_default ());
+		return;
 	}
+
+	g_input_stream_read_bytes_async (data->input_stream, data->buffer_size_bytes, data->io_priority,
+					 cancellable, read_bytes_cb, g_steal_pointer (&task_owned));
+}
+
+static gboolean
+throttle_cb (gpointer user_data)
+{
+	read_next_chunk (G_TASK (user_data));
+
+	return G_SOURCE_REMOVE;
 }
 
 static inline gboolean
@@ -463,17 +878,21 @@ finish_download (GTask  *task,
 
 	if (data->close_output_stream) {
 		g_autoptr(GCancellable) output_cancellable = NULL;
+		gboolean failed = (data->error != NULL && !is_not_modidifed_error (data->error));
 
 		g_assert (data->output_stream != NULL);
 
 		/* If there’s been a prior error, or we are aborting writing the
 		 * output stream (perhaps because of a cache hit), close the
 		 * output stream but cancel the close operation so that the old
-		 * output file is not overwritten. */
-		if ((data->error != NULL && !is_not_modidifed_error (data->error)) || data->discard_output_stream) {
+		 * output file is not overwritten.
+		 *
+		 * A partial file is closed normally after an error, so what
+		 * has been downloaded so far is kept to be resumed from. */
+		if ((failed && data->partial_file == NULL) || data->discard_output_stream) {
 			output_cancellable = g_cancellable_new ();
 			g_cancellable_cancel (output_cancellable);
-		} else if (g_task_get_cancellable (task) != NULL) {
+		} else if (!failed && g_task_get_cancellable (task) != NULL) {
 			output_cancellable = g_object_ref (g_task_get_cancellable (task));
 		}
 
@@ -606,6 +1025,9 @@ typedef struct {
 	/* In-progress data. */
 	gchar *last_etag;  /* (nullable) (owned) */
 	GDateTime *last_modified_date;  /* (nullable) (owned) */
+	GFile *partial_file;  /* (not nullable) (owned) */
+	goffset resume_offset;
+	gchar *resume_validator;  /* (nullable) (owned) */
 } DownloadFileData;
 
 static void
@@ -613,6 +1035,8 @@ download_file_data_free (DownloadFileData *data)
 {
 	g_free (data->uri);
 	g_clear_object (&data->output_file);
+	g_clear_object (&data->partial_file);
+	g_free (data->resume_validator);
 	g_free (data->last_etag);
 	g_clear_pointer (&data->last_modified_date, g_date_time_unref);
 	g_free (data);
@@ -620,9 +1044,95 @@ download_file_data_free (DownloadFileData *data)
 
 G_DEFINE_AUTOPTR_CLEANUP_FUNC (DownloadFileData, download_file_data_free)
 
-static void download_replace_file_cb (GObject      *source_object,
-                                      GAsyncResult *result,
-                                      gpointer      user_data);
+/* Downloads to each output file which are waiting for an earlier download to
+ * the same file to finish, as only one at a time can use its partial file.
+ * A path is in the table while a download to it is running. */
+static GMutex active_downloads_mutex;
+static GHashTable *active_downloads = NULL;  /* (mutex active_downloads_mutex) (owned) (element-type filename GQueue) (nullable) */
+
+static void
+free_waiting_downloads (GQueue *queue)
+{
+	g_queue_free_full (queue, g_object_unref);
+}
+
+/* Returns %TRUE if @task can start now, or %FALSE if it has been queued until
+ * the running download to the same file finishes. */
+static gboolean
+download_file_claim (GTask *task)
+{
+	DownloadFileData *data = g_task_get_task_data (task);
+	const gchar *path = g_file_peek_path (data->output_file);
+	g_autoptr(GMutexLocker) locker = g_mutex_locker_new (&active_downloads_mutex);
+	GQueue *waiting;
+
+	if (active_downloads == NULL)
+		active_downloads = g_hash_table_new_full (g_str_hash, g_str_equal, g_free,
+							  (GDestroyNotify) free_waiting_downloads);
+
+	waiting = g_hash_table_lookup (active_downloads, path);
+	if (waiting == NULL) {
+		g_hash_table_insert (active_downloads, g_strdup (path), g_queue_new ());
+		return TRUE;
+	}
+
+	g_debug ("Waiting for an earlier download to ‘%s’ to finish", path);
+	g_queue_push_tail (waiting, g_object_ref (task));
+
+	return FALSE;
+}
+
+static void download_file_start (GTask *task);
+
+static gboolean
+download_file_start_cb (gpointer user_data)
+{
+	download_file_start (G_TASK (user_data));
+	return G_SOURCE_REMOVE;
+}
+
+/* Complete @task, which must have claimed its output file, and start the next
+ * download waiting for the same file. This is called just before @task
+ * returns. The next download is started in its own #GMainContext. */
+static void
+download_file_release (GTask *task)
+{
+	DownloadFileData *data = g_task_get_task_data (task);
+	const gchar *path = g_file_peek_path (data->output_file);
+	g_autoptr(GMutexLocker) locker = g_mutex_locker_new (&active_downloads_mutex);
+	GQueue *waiting;
+	GTask *next;
+
+	waiting = g_hash_table_lookup (active_downloads, path);
+	g_assert (waiting != NULL);
+
+	next = g_queue_pop_head (waiting);
+	if (next == NULL)
+		g_hash_table_remove (active_downloads, path);
+
+	g_clear_pointer (&locker, g_mutex_locker_free);
+
+	if (next != NULL)
+		g_main_context_invoke_full (g_task_get_context (next), g_task_get_priority (next),
+					    download_file_start_cb, next, NULL);
+}
+
+/* @error is (transfer full) if non-%NULL */
+static void
+download_file_return (GTask  *task,
+                      GError *error)
+{
+	download_file_release (task);
+
+	if (error != NULL)
+		g_task_return_error (task, error);
+	else
+		g_task_return_boolean (task, TRUE);
+}
+
+static void download_open_partial_file_cb (GObject      *source_object,
+                                           GAsyncResult *result,
+                                           gpointer      user_data);
 static void download_file_cb (GObject      *source_object,
                               GAsyncResult *result,
                               gpointer      user_data);
@@ -646,6 +1156,15 @@ static void download_file_cb (GObject      *source_object,
  * The ETag and modification time of @output_file will be queried and, if known,
  * used to skip the download if @output_file is already up to date.
  *
+ * The download is written to a partial file alongside @output_file, which is
+ * moved over @output_file once the download is complete. If the download
+ * fails part way through, the partial file is kept, and the next call for the
+ * same @output_file will resume the download from where it stopped if the
+ * server supports range requests and the resource has not changed.
+ *
+ * If another download to @output_file is already in progress, this one starts
+ * once that has finished.
+ *
  * If specified, @progress_callback will be called zero or more times until
  * @callback is called, providing progress updates on the download.
  *
@@ -665,16 +1184,16 @@ gs_download_file_async (SoupSession                *soup_session,
 	g_autoptr(GTask) task = NULL;
 	DownloadFileData *data;
 	g_autoptr(DownloadFileData) data_owned = NULL;
-	g_autoptr(GFile) output_file_parent = NULL;
-	g_autoptr(GError) local_error = NULL;
 
 	g_return_if_fail (SOUP_IS_SESSION (soup_session));
 	g_return_if_fail (uri != NULL);
 	g_return_if_fail (G_IS_FILE (output_file));
+	g_return_if_fail (g_file_peek_path (output_file) != NULL);
 	g_return_if_fail (cancellable == NULL || G_IS_CANCELLABLE (cancellable));
 
 	task = g_task_new (soup_session, cancellable, callback, user_data);
 	g_task_set_source_tag (task, gs_download_file_async);
+	g_task_set_priority (task, io_priority);
 
 	data = data_owned = g_new0 (DownloadFileData, 1);
 	data->uri = g_strdup (uri);
@@ -684,51 +1203,87 @@ gs_download_file_async (SoupSession                *soup_session,
 	data->progress_user_data = progress_user_data;
 	g_task_set_task_data (task, g_steal_pointer (&data_owned), (GDestroyNotify) download_file_data_free);
 
+	if (download_file_claim (task))
+		download_file_start (g_steal_pointer (&task));
+}
+
+/* Consumes @task, which must have claimed its output file. */
+static void
+download_file_start (GTask *task)
+{
+	g_autoptr(GTask) task_owned = task;
+	DownloadFileData *data = g_task_get_task_data (task);
+	GCancellable *cancellable = g_task_get_cancellable (task);
+	g_autoptr(GFile) output_file_parent = NULL;
+	g_autofree gchar *partial_path = NULL;
+	g_autoptr(GError) local_error = NULL;
+
+	/* It may have been cancelled while waiting for an earlier download. */
+	if (g_cancellable_set_error_if_cancelled (cancellable, &local_error)) {
+		download_file_return (task, g_steal_pointer (&local_error));
+		return;
+	}
+
 	/* Create the destination file’s directory.
 	 * FIXME: This should be made async; it hasn’t done for now as it’s
 	 * likely to be fast. */
-	output_file_parent = g_file_get_parent (output_file);
+	output_file_parent = g_file_get_parent (data->output_file);
 
 	if (output_file_parent != NULL &&
 	    !g_file_make_directory_with_parents (output_file_parent, cancellable, &local_error) &&
 	    !g_error_matches (local_error, G_IO_ERROR, G_IO_ERROR_EXISTS)) {
-		g_task_return_error (task, g_steal_pointer (&local_error));
+		download_file_return (task, g_steal_pointer (&local_error));
 		return;
 	}
 
 	g_clear_error (&local_error);
 
 	/* Query the old ETag and modification date if the file already exists. */
-	data->last_etag = gs_utils_get_file_etag (output_file, &data->last_modified_date, cancellable);
+	data->last_etag = gs_utils_get_file_etag (data->output_file, &data->last_modified_date, cancellable);
+
+	/* Check for a partial file left by an earlier interrupted download. */
+	partial_path = g_strconcat (g_file_peek_path (data->output_file), ".partial", NULL);
+	data->partial_file = g_file_new_for_path (partial_path);
+
+	if (!g_str_has_prefix (data->uri, "file://"))
+		data->resume_validator = get_partial_validator (data->partial_file, &data->resume_offset, cancellable);
+
+	if (data->resume_validator != NULL && data->resume_offset > 0) {
+		g_file_append_to_async (data->partial_file,
+					G_FILE_CREATE_PRIVATE,
+					data->io_priority,
+					cancellable,
+					download_open_partial_file_cb,
+					g_steal_pointer (&task_owned));
+		return;
+	}
 
-	/* Create the output file.
-	 *
-	 * Note that `data->last_etag` is *not* passed in here, as the ETag from
-	 * the server and the file modification ETag that GLib uses are
-	 * different things. For g_file_replace_async(), GLib always uses an
-	 * ETag it generates internally based on the file mtime (see
-	 * _g_local_file_info_create_etag()), which will never match what the
-	 * server returns in its ETag header.
-	 *
-	 * This is fine, as we are using the ETag to avoid an unnecessary HTTP
-	 * download if possible. We don’t care about tracking changes to the
-	 * file on disk. */
-	g_file_replace_async (output_file,
-			      NULL,  /* ETag */
-			      FALSE,  /* make_backup */
-			      G_FILE_CREATE_PRIVATE | G_FILE_CREATE_REPLACE_DESTINATION,
-			      io_priority,
-			      cancellable,
-			      download_replace_file_cb,
-			      g_steal_pointer (&task));
+	/* Otherwise start from the beginning. The partial file is created
+	 * rather than replaced, so that data is written straight into it and
+	 * survives the download failing. */
+	g_clear_pointer (&data->resume_validator, g_free);
+	data->resume_offset = 0;
+
+	if (!g_file_delete (data->partial_file, cancellable, &local_error) &&
+	    !g_error_matches (local_error, G_IO_ERROR, G_IO_ERROR_NOT_FOUND)) {
+		download_file_return (task, g_steal_pointer (&local_error));
+		return;
+	}
+
+	g_file_create_async (data->partial_file,
+			     G_FILE_CREATE_PRIVATE,
+			     data->io_priority,
+			     cancellable,
+			     download_open_partial_file_cb,
+			     g_steal_pointer (&task_owned));
 }
 
 static void
-download_replace_file_cb (GObject      *source_object,
-                          GAsyncResult *result,
-                          gpointer      user_data)
+download_open_partial_file_cb (GObject      *source_object,
+                               GAsyncResult *result,
+                               gpointer      user_data)
 {
-	GFile *output_file = G_FILE (source_object);
+	GFile *partial_file = G_FILE (source_object);
 	g_autoptr(GTask) task = g_steal_pointer (&user_data);
 	SoupSession *soup_session = g_task_get_source_object (task);
 	GCancellable *cancellable = g_task_get_cancellable (task);
@@ -736,18 +1291,29 @@ download_replace_file_cb (GObject      *source_object,
 	g_autoptr(GFileOutputStream) output_stream = NULL;
 	g_autoptr(GError) local_error = NULL;
 
-	output_stream = g_file_replace_finish (output_file, result, &local_error);
+	if (data->resume_offset > 0)
+		output_stream = g_file_append_to_finish (partial_file, result, &local_error);
+	else
+		output_stream = g_file_create_finish (partial_file, result, &local_error);
 
 	if (output_stream == NULL) {
-		g_task_return_error (task, g_steal_pointer (&local_error));
+		download_file_return (task, g_steal_pointer (&local_error));
 		return;
 	}
 
-	/* Do the download. */
-	gs_download_stream_async (soup_session, data->uri, G_OUTPUT_STREAM (output_stream),
-				  data->last_etag, data->last_modified_date, data->io_priority,
-				  data->progress_callback, data->progress_user_data,
-				  cancellable, download_file_cb, g_steal_pointer (&task));
+	/* Do the download.
+	 *
+	 * Note that `data->last_etag` is the ETag returned by the server, not
+	 * the file modification ETag that GLib generates internally based on
+	 * the file mtime. We are using it to avoid an unnecessary HTTP
+	 * download if possible; we don’t care about tracking changes to the
+	 * file on disk. */
+	download_stream_internal_async (soup_session, data->uri, G_OUTPUT_STREAM (output_stream),
+					data->last_etag, data->last_modified_date,
+					data->partial_file, data->resume_offset, data->resume_validator,
+					data->io_priority,
+					data->progress_callback, data->progress_user_data,
+					cancellable, download_file_cb, g_steal_pointer (&task));
 }
 
 static void
@@ -763,10 +1329,30 @@ download_file_cb (GObject      *source_object,
 	g_autoptr(GError) local_error = NULL;
 
 	if (!gs_download_stream_finish (soup_session, result, &new_etag, NULL, &local_error)) {
-		g_task_return_error (task, g_steal_pointer (&local_error));
+		/* The existing output file is up to date, so anything in the
+		 * partial file is stale. On other errors, the partial file is
+		 * kept so the download can be resumed. This is done before the
+		 * next download to the same file can start, so it doesn’t
+		 * delete that download’s partial file. */
+		if (g_error_matches (local_error, GS_DOWNLOAD_ERROR, GS_DOWNLOAD_ERROR_NOT_MODIFIED))
+			g_file_delete (data->partial_file, NULL, NULL);
+
+		download_file_return (task, g_steal_pointer (&local_error));
 		return;
 	}
 
+	/* Move the complete download into place.
+	 * FIXME: This should be made async; it hasn’t done for now as it’s
+	 * a rename, so likely to be fast. */
+	if (!g_file_move (data->partial_file, data->output_file,
+			  G_FILE_COPY_OVERWRITE | G_FILE_COPY_NOFOLLOW_SYMLINKS,
+			  cancellable, NULL, NULL, &local_error)) {
+		download_file_return (task, g_steal_pointer (&local_error));
+		return;
+	}
+
+	set_partial_validator (data->output_file, NULL, cancellable);
+
 	/* Update the stored HTTP ETag.
 	 *
 	 * Under the assumption that this code is only ever used for locally
@@ -780,7 +1366,7 @@ download_file_cb (GObject      *source_object,
 	 * the file. */
 	gs_utils_set_file_etag (data->output_file, new_etag, cancellable);
 
-	g_task_return_boolean (task, TRUE);
+	download_file_return (task, NULL);
 }
 
 /**
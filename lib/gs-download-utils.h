@@ -18,6 +18,10 @@
 G_BEGIN_DECLS
 
 SoupSession *gs_build_soup_session (void);
+void	     gs_download_session_set_max_rate	(SoupSession *soup_session,
+						 gsize        max_bytes_per_second);
+void	     gs_download_session_set_paused	(SoupSession *soup_session,
+						 gboolean     paused);
 
 /**
  * GsDownloadProgressCallback:
@@ -22,10 +22,23 @@
  * run to copy them to the system location.
  *
  * All the downloads are done in the default #GMainContext for the thread which
- * calls gs_external_appstream_refresh_async(). They are done in parallel and
- * the async refresh function will only complete once the last download is
+ * calls gs_external_appstream_refresh_async(). They are done in parallel, with
+ * at most %MAX_DOWNLOADS_PER_HOST downloads from any one host running at once,
+ * and the async refresh function will only complete once the last download is
  * complete.
  *
+ * Non-interactive refreshes wait for the download scheduler to allow them
+ * before starting, and their downloads are paused whenever the scheduler
+ * withdraws permission to download (see gs_metered_pause_download_session()).
+ *
+ * Each download is a conditional request, using the ETag or modification date
+ * of the previously downloaded file, so an unchanged file costs a single round
+ * trip to the server. The response body is written to the cache file as it
+ * arrives, without being buffered in memory, and an interrupted download is
+ * resumed from where it stopped on the next refresh (see
+ * gs_download_file_async()). Compressed files are stored as-is, as libxmlb
+ * decompresses them when building the silo.
+ *
  * Progress data is reported via a callback, and gives the total progress of all
  * parallel downloads. Internally this is done by updating #ProgressTuple
  * structs as each download progresses. A periodic timeout callback sums these
@@ -60,6 +73,10 @@
 
 #define APPSTREAM_SYSTEM_DIR LOCALSTATEDIR "/cache/swcatalog/xml"
 
+/* Maximum number of downloads from the same host to run at once. Downloads
+ * from different hosts are not limited. */
+#define MAX_DOWNLOADS_PER_HOST 2
+
 G_DEFINE_QUARK (gs-external-appstream-error-quark, gs_external_appstream_error)
 
 gchar *
@@ -112,12 +129,9 @@ gs_external_appstream_install (const gchar   *appstream_file,
 	return g_subprocess_wait_check (subprocess, cancellable, error);
 }
 
-static void download_replace_file_cb (GObject      *source_object,
-				      GAsyncResult *result,
-				      gpointer      user_data);
-static void download_stream_cb (GObject      *source_object,
-                                GAsyncResult *result,
-                                gpointer      user_data);
+static void download_file_cb (GObject      *source_object,
+                              GAsyncResult *result,
+                              gpointer      user_data);
 
 /* A tuple to store the last-received progress data for a single download.
  * Each download (refresh_url_async()) has a pointer to the relevant
@@ -137,10 +151,6 @@ typedef struct {
 	ProgressTuple *progress_tuple;  /* (not nullable) */
 	SoupSession *soup_session;  /* (not nullable) (owned) */
 	gboolean system_wide;
-
-	/* In-progress data. */
-	gchar *last_etag;  /* (nullable) (owned) */
-	GDateTime *last_modified_date;  /* (nullable) (owned) */
 } DownloadAppStreamData;
 
 static void
@@ -150,8 +160,6 @@ download_appstream_data_free (DownloadAppStreamData *data)
 	g_clear_object (&data->task);
 	g_clear_object (&data->output_file);
 	g_clear_object (&data->soup_session);
-	g_free (data->last_etag);
-	g_clear_pointer (&data->last_modified_date, g_date_time_unref);
 	g_free (data);
 }
 
@@ -190,7 +198,6 @@ refresh_url_async (GSettings            *settings,
 	g_autofree gchar *hash = NULL;
 	g_autofree gchar *target_file_path = NULL;
 	g_autoptr(GFile) target_file = NULL;
-	g_autoptr(GFile) tmp_file_parent = NULL;
 	g_autoptr(GFile) tmp_file = NULL;
 	g_autoptr(GsApp) app_dl = gs_app_new ("external-appstream");
 	g_autoptr(GError) local_error = NULL;
@@ -301,90 +308,65 @@ refresh_url_async (GSettings            *settings,
 	data->system_wide = system_wide;
 	g_task_set_task_data (task, data, (GDestroyNotify) download_appstream_data_free);
 
-	/* Create the destination file’s directory.
-	 * FIXME: This should be made async; it hasn’t done for now as it’s
-	 * likely to be fast. */
-	tmp_file_parent = g_file_get_parent (tmp_file);
-
-	if (tmp_file_parent != NULL &&
-	    !g_file_make_directory_with_parents (tmp_file_parent, cancellable, &local_error) &&
-	    !g_error_matches (local_error, G_IO_ERROR, G_IO_ERROR_EXISTS)) {
-		g_task_return_error (task, g_steal_pointer (&local_error));
-		return;
-	}
+	/* For system-wide installs, the temporary file is kept between
+	 * refreshes as a copy of what was last installed, and its ETag is used
+	 * to skip unchanged downloads. If the system-wide file has gone, the
+	 * temporary file must be downloaded and installed again. */
+	if (system_wide && !g_file_query_exists (target_file, cancellable) &&
+	    !g_file_delete (tmp_file, cancellable, &local_error) &&
+	    !g_error_matches (local_error, G_IO_ERROR, G_IO_ERROR_NOT_FOUND))
+		g_debug ("Failed to delete %s: %s", g_file_peek_path (tmp_file), local_error->message);
 
 	g_clear_error (&local_error);
 
-	/* Query the ETag and modification date of the target file, if the file already exists. For
-	 * system-wide installations, this is the ETag of the AppStream file installed system-wide.
-	 * For local installations, this is just the local output file. */
-	data->last_etag = gs_utils_get_file_etag (target_file, &data->last_modified_date, cancellable);
-	g_debug ("Queried ETag of file %s: %s", g_file_peek_path (target_file), data->last_etag);
-
-	/* Create the output file */
-	g_file_replace_async (tmp_file,
-			      NULL,  /* ETag */
-			      FALSE,  /* make_backup */
-			      G_FILE_CREATE_PRIVATE | G_FILE_CREATE_REPLACE_DESTINATION,
-			      G_PRIORITY_LOW,
-			      cancellable,
-			      download_replace_file_cb,
-			      g_steal_pointer (&task));
+	/* Do the download. This is a conditional request, using the ETag and
+	 * modification date of the existing file, and an interrupted download
+	 * is resumed from where it stopped the next time. */
+	gs_download_file_async (soup_session,
+				url,
+				tmp_file,
+				G_PRIORITY_LOW,
+				refresh_url_progress_cb,
+				data->progress_tuple,
+				cancellable,
+				download_file_cb,
+				g_steal_pointer (&task));
 }
 
 static void
-download_replace_file_cb (GObject      *source_object,
-                          GAsyncResult *result,
-                          gpointer      user_data)
-{
-	GFile *output_file = G_FILE (source_object);
-	g_autoptr(GTask) task = g_steal_pointer (&user_data);
-	GCancellable *cancellable = g_task_get_cancellable (task);
-	DownloadAppStreamData *data = g_task_get_task_data (task);
-	g_autoptr(GFileOutputStream) output_stream = NULL;
-	g_autoptr(GError) local_error = NULL;
-
-	output_stream = g_file_replace_finish (output_file, result, &local_error);
-
-	if (output_stream == NULL) {
-		g_task_return_error (task, g_steal_pointer (&local_error));
-		return;
-	}
-
-	/* Do the download. */
-	gs_download_stream_async (data->soup_session,
-				  data->url,
-				  G_OUTPUT_STREAM (output_stream),
-				  data->last_etag,
-				  data->last_modified_date,
-				  G_PRIORITY_LOW,
-				  refresh_url_progress_cb,
-				  data->progress_tuple,
-				  cancellable,
-				  download_stream_cb,
-				  g_steal_pointer (&task));
-}
-
-static void
-download_stream_cb (GObject      *source_object,
-                    GAsyncResult *result,
-                    gpointer      user_data)
+download_file_cb (GObject      *source_object,
+                  GAsyncResult *result,
+                  gpointer      user_data)
 {
 	SoupSession *soup_session = SOUP_SESSION (source_object);
 	g_autoptr(GTask) task = g_steal_pointer (&user_data);
 	GCancellable *cancellable = g_task_get_cancellable (task);
 	DownloadAppStreamData *data = g_task_get_task_data (task);
 	g_autoptr(GError) local_error = NULL;
-	g_autofree gchar *new_etag = NULL;
 
-	if (!gs_download_stream_finish (soup_session, result, &new_etag, NULL, &local_error)) {
+	if (!gs_download_file_finish (soup_session, result, &local_error)) {
 		if (data->system_wide && g_error_matches (local_error, GS_DOWNLOAD_ERROR, GS_DOWNLOAD_ERROR_NOT_MODIFIED)) {
-			g_debug ("External AppStream file not modified, removing temporary download file %s",
+			g_debug ("External AppStream file %s not modified, already installed",
 				 g_file_peek_path (data->output_file));
+			g_task_return_boolean (task, TRUE);
+		} else if (g_error_matches (local_error, GS_DOWNLOAD_ERROR, GS_DOWNLOAD_ERROR_NOT_MODIFIED)) {
+			g_autoptr(GError) local_error2 = NULL;
+
+			g_debug ("External AppStream file %s not modified",
+				 g_file_peek_path (data->output_file));
+
+			/* The existing file has been kept. Bump its modification
+			 * time so the cache age check does not query the server
+			 * again until the file is next due for a refresh. */
+			if (!g_file_set_attribute_uint64 (data->output_file,
+							  G_FILE_ATTRIBUTE_TIME_MODIFIED,
+							  (guint64) g_get_real_time () / G_USEC_PER_SEC,
+							  G_FILE_QUERY_INFO_NONE,
+							  cancellable,
+							  &local_error2))
+				g_debug ("Failed to update modification time of %s: %s",
+					 g_file_peek_path (data->output_file), local_error2->message);
 
-			/* System-wide installs should delete the empty file created when preparing to
-			 * download the external AppStream file. */
-			g_file_delete_async (data->output_file, G_PRIORITY_LOW, NULL, NULL, NULL);
 			g_task_return_boolean (task, TRUE);
 		} else if (!g_network_monitor_get_network_available (g_network_monitor_get_default ())) {
 			g_task_return_new_error (task,
@@ -403,13 +385,14 @@ download_stream_cb (GObject      *source_object,
 
 	g_debug ("Downloaded appstream file %s", g_file_peek_path (data->output_file));
 
-	gs_utils_set_file_etag (data->output_file, new_etag, cancellable);
-
 	if (data->system_wide) {
 		/* install file systemwide */
 		if (!gs_external_appstream_install (g_file_peek_path (data->output_file),
 						    cancellable,
 						    &local_error)) {
+			/* Make sure the next refresh downloads and installs
+			 * it again, rather than finding it not modified. */
+			g_file_delete (data->output_file, NULL, NULL);
 			g_task_return_new_error (task,
 						 GS_EXTERNAL_APPSTREAM_ERROR,
 						 GS_EXTERNAL_APPSTREAM_ERROR_INSTALLING_ON_SYSTEM,
@@ -429,6 +412,9 @@ refresh_url_finish (GAsyncResult  *result,
 	return g_task_propagate_boolean (G_TASK (result), error);
 }
 
+static void refresh_schedule_cb (GObject      *source_object,
+                                 GAsyncResult *result,
+                                 gpointer      user_data);
 static void refresh_cb (GObject      *source_object,
                         GAsyncResult *result,
                         gpointer      user_data);
@@ -436,12 +422,33 @@ static gboolean progress_cb (gpointer user_data);
 static void finish_refresh_op (GTask  *task,
                                GError *error);
 
+/* Per-host download queue, used to limit the number of concurrent downloads
+ * from each host to %MAX_DOWNLOADS_PER_HOST. */
+typedef struct {
+	guint n_active;
+	GQueue pending;  /* (element-type gsize) indices into appstream_urls */
+} HostQueue;
+
+static void
+host_queue_free (HostQueue *queue)
+{
+	g_queue_clear (&queue->pending);
+	g_free (queue);
+}
+
 typedef struct {
 	/* Input data. */
+	gchar *cache_kind;  /* (nullable) (owned) */
+	GStrv appstream_urls;  /* (not nullable) (owned) */
 	guint64 cache_age_secs;
+	gboolean interactive;
+	GSettings *settings;  /* (not nullable) (owned) */
+	SoupSession *soup_session;  /* (not nullable) (owned) */
 
 	/* In-progress data. */
+	gpointer schedule_entry_handle;  /* (nullable) (owned) */
 	guint n_pending_ops;
+	GHashTable *hosts;  /* (element-type utf8 HostQueue) (owned) */
 	GError *error;  /* (nullable) (owned) */
 	GsDownloadProgressCallback progress_callback;  /* (nullable) */
 	gpointer progress_user_data;  /* (closure progress_callback) */
@@ -460,6 +467,7 @@ static void
 refresh_data_free (RefreshData *data)
 {
 	g_assert (data->n_pending_ops == 0);
+	g_assert (data->schedule_entry_handle == NULL);
 
 	/* If this was set it should have been stolen for g_task_return_error()
 	 * by now. */
@@ -470,6 +478,11 @@ refresh_data_free (RefreshData *data)
 	g_source_unref (data->progress_source);
 
 	g_free (data->progress_tuples);
+	g_free (data->cache_kind);
+	g_strfreev (data->appstream_urls);
+	g_clear_object (&data->settings);
+	g_clear_object (&data->soup_session);
+	g_clear_pointer (&data->hosts, g_hash_table_unref);
 
 	/* This doesn’t use g_strfreev() because it is a fixed-sized array, any
 	 * element of data->appstream_paths may be NULL. It itself can be NULL
@@ -486,11 +499,55 @@ refresh_data_free (RefreshData *data)
 
 G_DEFINE_AUTOPTR_CLEANUP_FUNC (RefreshData, refresh_data_free)
 
+/* Closure for a single refresh_url_async() call. */
+typedef struct {
+	GTask *task;  /* (not nullable) (owned) */
+	HostQueue *host_queue;  /* (not nullable) (unowned) */
+} RefreshOpData;
+
+static gchar *
+get_url_host (const gchar *url)
+{
+	g_autoptr(GUri) uri = g_uri_parse (url, G_URI_FLAGS_NONE, NULL);
+
+	if (uri == NULL || g_uri_get_host (uri) == NULL)
+		return g_strdup ("");
+
+	return g_ascii_strdown (g_uri_get_host (uri), -1);
+}
+
+static void
+start_refresh_op (GTask     *task,
+                  HostQueue *host_queue,
+                  gsize      url_index)
+{
+	RefreshData *data = g_task_get_task_data (task);
+	RefreshOpData *op_data;
+
+	host_queue->n_active++;
+
+	op_data = g_new0 (RefreshOpData, 1);
+	op_data->task = g_object_ref (task);
+	op_data->host_queue = host_queue;
+
+	refresh_url_async (data->settings,
+			   data->cache_kind,
+			   data->appstream_urls[url_index],
+			   data->soup_session,
+			   data->cache_age_secs,
+			   &data->progress_tuples[url_index],
+			   &data->appstream_paths[url_index],
+			   g_task_get_cancellable (task),
+			   refresh_cb,
+			   op_data);
+}
+
 /**
  * gs_external_appstream_refresh_async:
  * @cache_kind: (nullable): a cache kind, e.g. "fwupd" or "screenshots/123x456", or %NULL
  * @appstream_urls: a %NULL-terminated array of URLs
  * @cache_age_secs: cache age, in seconds, as passed to #GsPluginClass.refresh_metadata_async()
+ * @interactive: whether the refresh was requested by the user
  * @progress_callback: (nullable): callback to call with progress information
  * @progress_user_data: (nullable) (closure progress_callback): data to pass
  *   to @progress_callback
@@ -510,21 +567,23 @@ G_DEFINE_AUTOPTR_CLEANUP_FUNC (RefreshData, refresh_data_free)
  * -- gnome-software will not ever clean the cache for the plugin.
  * For this reason it is a good idea to use the plugin name as @cache_kind.
  *
+ * If @interactive is %FALSE, the downloads wait for the download scheduler to
+ * allow them, and are paused while it does not.
+ *
  * Since: 48
  */
 void
 gs_external_appstream_refresh_async (const gchar                *cache_kind,
                                      GStrv                       appstream_urls,
                                      guint64                     cache_age_secs,
+                                     gboolean                    interactive,
                                      GsDownloadProgressCallback  progress_callback,
                                      gpointer                    progress_user_data,
                                      GCancellable               *cancellable,
                                      GAsyncReadyCallback         callback,
                                      gpointer                    user_data)
 {
-	g_autoptr(GSettings) settings = NULL;
 	gsize n_appstream_urls;
-	g_autoptr(SoupSession) soup_session = NULL;
 	g_autoptr(GTask) task = NULL;
 	RefreshData *data;
 	g_autoptr(RefreshData) data_owned = NULL;
@@ -536,11 +595,18 @@ gs_external_appstream_refresh_async (const gchar                *cache_kind,
 	task = g_task_new (NULL, cancellable, callback, user_data);
 	g_task_set_source_tag (task, gs_external_appstream_refresh_async);
 
-	settings = g_settings_new ("org.gnome.software");
-	soup_session = gs_build_soup_session ();
 	n_appstream_urls = g_strv_length (appstream_urls);
 
 	data = data_owned = g_new0 (RefreshData, 1);
+	data->cache_kind = g_strdup (cache_kind);
+	data->appstream_urls = g_strdupv (appstream_urls);
+	data->cache_age_secs = cache_age_secs;
+	data->interactive = interactive;
+	data->settings = g_settings_new ("org.gnome.software");
+	/* A single session is shared by all the downloads, so connections to
+	 * the same host are reused. */
+	data->soup_session = gs_build_soup_session ();
+	data->hosts = g_hash_table_new_full (g_str_hash, g_str_equal, g_free, (GDestroyNotify) host_queue_free);
 	data->progress_callback = progress_callback;
 	data->progress_user_data = progress_user_data;
 	data->n_appstream_urls = n_appstream_urls;
@@ -559,34 +625,81 @@ gs_external_appstream_refresh_async (const gchar                *cache_kind,
 	g_source_set_callback (data->progress_source, progress_cb, g_object_ref (task), g_object_unref);
 	g_source_attach (data->progress_source, g_main_context_get_thread_default ());
 
-	/* Refresh all the URIs in parallel. */
+	/* Wait for permission to download, if needed. */
+	if (!interactive) {
+		g_auto(GVariantDict) parameters_dict = G_VARIANT_DICT_INIT (NULL);
+
+		g_variant_dict_insert (&parameters_dict, "resumable", "b", FALSE);
+
+		gs_metered_block_on_download_scheduler_async (g_variant_dict_end (&parameters_dict),
+							      cancellable,
+							      refresh_schedule_cb,
+							      g_steal_pointer (&task));
+	} else {
+		refresh_schedule_cb (NULL, NULL, g_steal_pointer (&task));
+	}
+}
+
+static void
+refresh_schedule_cb (GObject      *source_object,
+                     GAsyncResult *result,
+                     gpointer      user_data)
+{
+	g_autoptr(GTask) task = g_steal_pointer (&user_data);
+	RefreshData *data = g_task_get_task_data (task);
+	g_autoptr(GError) local_error = NULL;
+
+	if (result != NULL &&
+	    !gs_metered_block_on_download_scheduler_finish (result, &data->schedule_entry_handle, &local_error)) {
+		if (g_error_matches (local_error, G_IO_ERROR, G_IO_ERROR_CANCELLED)) {
+			data->n_pending_ops = 1;
+			finish_refresh_op (task, g_steal_pointer (&local_error));
+			return;
+		}
+
+		g_warning ("Failed to block on download scheduler: %s",
+			   local_error->message);
+		g_clear_error (&local_error);
+	}
+
+	gs_metered_pause_download_session (data->schedule_entry_handle, data->soup_session);
+
+	/* Refresh all the URIs in parallel, queueing any beyond the per-host
+	 * limit until an earlier download from the same host finishes. */
 	data->n_pending_ops = 1;
 
-	for (gsize i = 0; i < n_appstream_urls; i++) {
+	for (gsize i = 0; i < data->n_appstream_urls; i++) {
+		const gchar *appstream_url = data->appstream_urls[i];
+		g_autofree gchar *host = NULL;
+		HostQueue *host_queue;
+
 		/* localhost is safe to communicate with in an unencrypted way.
 		 * It is unlikely to be used in real life scenarios, but it's
 		 * used in some tests. We could use TLS in the tests, but it
 		 * would needlessly complexify them. */
-		if (!g_str_has_prefix (appstream_urls[i], "https:") &&
-		    !g_str_has_prefix (appstream_urls[i], "http://localhost/") &&
-		    !g_str_has_prefix (appstream_urls[i], "http://localhost:")) {
+		if (!g_str_has_prefix (appstream_url, "https:") &&
+		    !g_str_has_prefix (appstream_url, "http://localhost/") &&
+		    !g_str_has_prefix (appstream_url, "http://localhost:")) {
 			g_warning ("Not considering %s as an external "
 				   "appstream source: please use an https URL",
-				   appstream_urls[i]);
+				   appstream_url);
 			continue;
 		}
 
+		host = get_url_host (appstream_url);
+		host_queue = g_hash_table_lookup (data->hosts, host);
+		if (host_queue == NULL) {
+			host_queue = g_new0 (HostQueue, 1);
+			g_queue_init (&host_queue->pending);
+			g_hash_table_insert (data->hosts, g_steal_pointer (&host), host_queue);
+		}
+
 		data->n_pending_ops++;
-		refresh_url_async (settings,
-				   cache_kind,
-				   appstream_urls[i],
-				   soup_session,
-				   cache_age_secs,
-				   &data->progress_tuples[i],
-				   &data->appstream_paths[i],
-				   cancellable,
-				   refresh_cb,
-				   g_object_ref (task));
+
+		if (host_queue->n_active < MAX_DOWNLOADS_PER_HOST)
+			start_refresh_op (task, host_queue, i);
+		else
+			g_queue_push_tail (&host_queue->pending, GSIZE_TO_POINTER (i));
 	}
 
 	finish_refresh_op (task, NULL);
@@ -597,10 +710,24 @@ refresh_cb (GObject      *source_object,
             GAsyncResult *result,
             gpointer      user_data)
 {
-	g_autoptr(GTask) task = g_steal_pointer (&user_data);
+	RefreshOpData *op_data = user_data;
+	g_autoptr(GTask) task = g_steal_pointer (&op_data->task);
+	HostQueue *host_queue = op_data->host_queue;
 	g_autoptr(GError) local_error = NULL;
 
+	g_free (op_data);
+
 	refresh_url_finish (result, &local_error);
+
+	/* Start the next queued download from the same host, if any. This is
+	 * done before finishing this operation so the overall operation is
+	 * not considered complete in between. */
+	g_assert (host_queue->n_active > 0);
+	host_queue->n_active--;
+
+	if (!g_queue_is_empty (&host_queue->pending))
+		start_refresh_op (task, host_queue, GPOINTER_TO_SIZE (g_queue_pop_head (&host_queue->pending)));
+
 	finish_refresh_op (task, g_steal_pointer (&local_error));
 }
 
@@ -658,6 +785,11 @@ finish_refresh_op (GTask  *task,
 	progress_cb (task);
 	g_source_destroy (data->progress_source);
 
+	/* Fire this call off into the void, it’s not worth tracking it.
+	 * Don’t pass a cancellable in, as the refresh may have been cancelled. */
+	if (data->schedule_entry_handle != NULL)
+		gs_metered_remove_from_download_scheduler_async (g_steal_pointer (&data->schedule_entry_handle), NULL, NULL, NULL);
+
 	/* All complete. */
 	if (data->error != NULL)
 		g_task_return_error (task, g_steal_pointer (&data->error));
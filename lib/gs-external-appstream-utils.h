@@ -41,6 +41,7 @@ gchar		*gs_external_appstream_utils_get_legacy_file_cache_path (const gchar *fil
 void		 gs_external_appstream_refresh_async (const gchar                *cache_kind,
 						      GStrv                       appstream_urls,
 						      guint64                     cache_age_secs,
+						      gboolean                    interactive,
 						      GsDownloadProgressCallback  progress_callback,
 						      gpointer                    progress_user_data,
 						      GCancellable               *cancellable,
@@ -37,6 +37,7 @@
 #include <linux/unistd.h>
 #endif
 
+#include <sched.h>
 #include <sys/syscall.h>
 #include <unistd.h>
 
@@ -116,6 +117,15 @@ set_io_priority (int ioprio,
 	return ioprio_set (IOPRIO_WHO_PROCESS, 0, ioprio | (ioclass << IOPRIO_CLASS_SHIFT));
 }
 
+static int
+set_cpu_policy (int policy)
+{
+	struct sched_param param = { 0, };
+
+	/* On Linux, a PID of 0 means the calling thread, not the process. */
+	return sched_setscheduler (0, policy, &param);
+}
+
 static const gchar *
 ioclass_to_string (int ioclass)
 {
@@ -138,6 +148,11 @@ ioclass_to_string (int ioclass)
  *
  * The @priority is quantised before being passed to the kernel.
  *
+ * The CPU scheduling policy of the current thread is also set, to
+ * `SCHED_BATCH` for priorities lower than default and `SCHED_OTHER` otherwise.
+ * `SCHED_IDLE` is not used, as an unprivileged thread cannot switch back out
+ * of it, and worker threads are reused for tasks of varying priority.
+ *
  * This function may fail if the process doesn’t have permission to change its
  * I/O priority to the given value. If so, a warning will be printed, as the
  * quantised priority values are chosen so they shouldn’t typically require
@@ -147,6 +162,7 @@ void
 gs_ioprio_set (gint priority)
 {
 	int ioprio, ioclass;
+	int cpu_policy = (priority > G_PRIORITY_DEFAULT) ? SCHED_BATCH : SCHED_OTHER;
 
 	/* If the priority is lower than default, use an idle I/O priority. The
 	 * condition looks wrong because higher integers indicate lower priority
@@ -185,6 +201,12 @@ gs_ioprio_set (gint priority)
 				g_warning ("Could not set best effort IO priority either, giving up");
 		}
 	}
+
+	if (set_cpu_policy (cpu_policy) == -1)
+		g_debug ("Could not set CPU scheduling policy of thread %p to %s: %s",
+			 g_thread_self (),
+			 (cpu_policy == SCHED_BATCH) ? "SCHED_BATCH" : "SCHED_OTHER",
+			 g_strerror (errno));
 }
 
 #else  /* __linux__ */
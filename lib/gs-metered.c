@@ -38,6 +38,7 @@
 #include <libmogwai-schedule-client/scheduler.h>
 #endif
 
+#include "gs-download-utils.h"
 #include "gs-metered.h"
 #include "gs-utils.h"
 
@@ -482,6 +483,75 @@ gs_metered_remove_from_download_scheduler_finish (gpointer       schedule_entry_
 	return g_task_propagate_boolean (G_TASK (result), error);
 }
 
+#ifdef HAVE_MOGWAI
+static void
+pause_session_cb (MwscScheduleEntry *entry,
+                  gpointer           user_data)
+{
+	SoupSession *soup_session = SOUP_SESSION (user_data);
+	gboolean download_now = mwsc_schedule_entry_get_download_now (entry);
+
+	g_debug ("%s: %s downloads", G_STRFUNC, download_now ? "Resuming" : "Pausing");
+	gs_download_session_set_paused (soup_session, !download_now);
+}
+
+static void
+pause_session_notify_cb (GObject    *obj,
+                         GParamSpec *pspec,
+                         gpointer    user_data)
+{
+	pause_session_cb (MWSC_SCHEDULE_ENTRY (obj), user_data);
+}
+
+static void
+pause_session_invalidated_cb (MwscScheduleEntry *entry,
+                              const GError      *error,
+                              gpointer           user_data)
+{
+	/* Without a scheduler, nothing will ever resume the downloads. */
+	gs_download_session_set_paused (SOUP_SESSION (user_data), FALSE);
+}
+#endif  /* HAVE_MOGWAI */
+
+/**
+ * gs_metered_pause_download_session:
+ * @schedule_entry_handle: (nullable): schedule entry handle as returned by
+ *    gs_metered_block_on_download_scheduler_finish()
+ * @soup_session: a #SoupSession
+ *
+ * Pause the downloads done with @soup_session using gs_download_file_async()
+ * or gs_download_stream_async() whenever the scheduler withdraws permission to
+ * download for @schedule_entry_handle, and resume them when it allows
+ * downloading again.
+ *
+ * This lasts until @schedule_entry_handle is removed with
+ * gs_metered_remove_from_download_scheduler(). If @schedule_entry_handle is
+ * %NULL, or Mogwai support is compiled out, this does nothing.
+ *
+ * Since: 50
+ */
+void
+gs_metered_pause_download_session (gpointer     schedule_entry_handle,
+                                   SoupSession *soup_session)
+{
+#ifdef HAVE_MOGWAI
+	MwscScheduleEntry *schedule_entry = schedule_entry_handle;
+#endif
+
+	g_return_if_fail (SOUP_IS_SESSION (soup_session));
+
+#ifdef HAVE_MOGWAI
+	if (schedule_entry == NULL)
+		return;
+
+	g_signal_connect_object (schedule_entry, "notify::download-now",
+				 G_CALLBACK (pause_session_notify_cb), soup_session, G_CONNECT_DEFAULT);
+	g_signal_connect_object (schedule_entry, "invalidated",
+				 G_CALLBACK (pause_session_invalidated_cb), soup_session, G_CONNECT_DEFAULT);
+	pause_session_cb (schedule_entry, soup_session);
+#endif
+}
+
 /**
  * gs_metered_build_scheduler_parameters_for_app:
  * @app: a #GsApp to get the scheduler parameters from
@@ -10,6 +10,7 @@
 
 #include <glib-object.h>
 #include <gio/gio.h>
+#include <libsoup/soup.h>
 
 #include "gs-app.h"
 #include "gs-app-list.h"
@@ -39,6 +40,9 @@ gboolean gs_metered_remove_from_download_scheduler_finish (gpointer       schedu
                                                            GAsyncResult  *result,
                                                            GError       **error);
 
+void gs_metered_pause_download_session (gpointer     schedule_entry_handle,
+                                        SoupSession *soup_session);
+
 GVariant *gs_metered_build_scheduler_parameters_for_app (GsApp *app);
 
 gboolean gs_metered_block_app_list_on_download_scheduler (GsAppList     *app_list,
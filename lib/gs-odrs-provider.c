@@ -2161,3 +2161,38 @@ gs_odrs_provider_remove_review_finish (GsOdrsProvider  *self,
 {
 	return gs_odrs_provider_vote_finish (self, result, error);
 }
+
+/**
+ * gs_odrs_provider_release_memory:
+ * @self: a #GsOdrsProvider
+ *
+ * Release the in-memory copy of the ratings, for example in response to
+ * memory pressure. They will be reloaded from the on-disk cache the next
+ * time they are needed.
+ *
+ * Returns: an estimate of the number of bytes released
+ *
+ * Since: 50
+ */
+gsize
+gs_odrs_provider_release_memory (GsOdrsProvider *self)
+{
+	g_autoptr(GArray) ratings = NULL;
+	g_autoptr(GMutexLocker) locker = NULL;
+	gsize size;
+
+	g_return_val_if_fail (GS_IS_ODRS_PROVIDER (self), 0);
+
+	locker = g_mutex_locker_new (&self->ratings_mutex);
+	ratings = g_steal_pointer (&self->ratings);
+	g_clear_pointer (&locker, g_mutex_locker_free);
+
+	if (ratings == NULL)
+		return 0;
+
+	size = ratings->len * sizeof (GsOdrsRating);
+	for (guint i = 0; i < ratings->len; i++)
+		size += strlen (g_array_index (ratings, GsOdrsRating, i).app_id) + 1;
+
+	return size;
+}
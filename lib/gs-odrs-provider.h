@@ -134,4 +134,6 @@ void		 gs_odrs_provider_remove_review_async	(GsOdrsProvider		 *self,
 gboolean	 gs_odrs_provider_remove_review_finish	(GsOdrsProvider		 *self,
 							 GAsyncResult		 *result,
 							 GError			**error);
+
+gsize		 gs_odrs_provider_release_memory	(GsOdrsProvider		 *self);
 G_END_DECLS
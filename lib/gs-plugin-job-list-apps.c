@@ -27,6 +27,13 @@
  * Retrieve the resulting #GsAppList using
  * gs_plugin_job_list_apps_get_result_list().
  *
+ * If a handler is connected to #GsPluginJobListApps::partial-results before
+ * the job is run, the results from each plugin are refined as soon as that
+ * plugin returns them, rather than all together at the end, and the filtered,
+ * deduplicated and sorted results so far are emitted after each batch. This
+ * allows the UI to show the results from fast plugins without waiting for the
+ * slowest one. The final result list is the same either way.
+ *
  * See also: #GsPluginClass.list_apps_async
  * Since: 43
  */
@@ -61,6 +68,7 @@ struct _GsPluginJobListApps
 	GsAppList *merged_list;  /* (owned) (nullable) */
 	GError *saved_error;  /* (owned) (nullable) */
 	guint n_pending_ops;
+	gboolean emit_partial_results;
 
 	/* Results. */
 	GsAppList *result_list;  /* (owned) (nullable) */
@@ -79,6 +87,12 @@ typedef enum {
 
 static GParamSpec *props[PROP_FLAGS + 1] = { NULL, };
 
+typedef enum {
+	SIGNAL_PARTIAL_RESULTS,
+} GsPluginJobListAppsSignal;
+
+static guint signals[SIGNAL_PARTIAL_RESULTS + 1] = { 0, };
+
 static void
 gs_plugin_job_list_apps_dispose (GObject *object)
 {
@@ -250,11 +264,64 @@ static void plugin_list_apps_cb (GObject      *source_object,
                                  gpointer      user_data);
 static void finish_op (GTask  *task,
                        GError *error);
+static void refine_batch_cb (GObject      *source_object,
+                             GAsyncResult *result,
+                             gpointer      user_data);
 static void refine_cb (GObject      *source_object,
                        GAsyncResult *result,
                        gpointer      user_data);
 static void finish_task (GTask     *task,
                          GsAppList *merged_list);
+static void filter_and_sort (GsPluginJobListApps *self,
+                             GsPluginLoader      *plugin_loader,
+                             GsAppList           *merged_list);
+
+/* Emit the results so far, unless the op calling this is the last one
+ * pending, in which case the final results follow immediately. */
+static void
+maybe_emit_partial_results (GTask *task)
+{
+	GsPluginJobListApps *self = g_task_get_source_object (task);
+	GsPluginLoader *plugin_loader = g_task_get_task_data (task);
+	g_autoptr(GsAppList) partial_list = NULL;
+
+	if (!self->emit_partial_results ||
+	    self->n_pending_ops <= 1 ||
+	    self->saved_error != NULL ||
+	    g_cancellable_is_cancelled (g_task_get_cancellable (task)))
+		return;
+
+	partial_list = gs_app_list_copy (self->merged_list);
+	filter_and_sort (self, plugin_loader, partial_list);
+
+	if (gs_app_list_length (partial_list) > 0)
+		g_signal_emit (self, signals[SIGNAL_PARTIAL_RESULTS], 0, partial_list);
+}
+
+static void
+get_refine_flags (GsPluginJobListApps        *self,
+                  GsPluginRefineFlags        *out_refine_flags,
+                  GsPluginRefineRequireFlags *out_require_flags)
+{
+	GsPluginRefineFlags refine_flags = GS_PLUGIN_REFINE_FLAGS_NONE;
+	GsPluginRefineRequireFlags require_flags = GS_PLUGIN_REFINE_REQUIRE_FLAGS_NONE;
+	GsAppQueryLicenseType license_type = GS_APP_QUERY_LICENSE_ANY;
+
+	if (self->query != NULL) {
+		refine_flags = gs_app_query_get_refine_flags (self->query);
+		require_flags = gs_app_query_get_refine_require_flags (self->query);
+		license_type = gs_app_query_get_license_type (self->query);
+	}
+
+	if (!(require_flags & GS_PLUGIN_REFINE_REQUIRE_FLAGS_LICENSE) &&
+	    license_type != GS_APP_QUERY_LICENSE_ANY) {
+		/* Needs the license information when filtering with it */
+		require_flags |= GS_PLUGIN_REFINE_REQUIRE_FLAGS_LICENSE;
+	}
+
+	*out_refine_flags = refine_flags | GS_PLUGIN_REFINE_FLAGS_DISABLE_FILTERING;
+	*out_require_flags = require_flags;
+}
 
 static void
 gs_plugin_job_list_apps_run_async (GsPluginJob         *job,
@@ -279,6 +346,10 @@ gs_plugin_job_list_apps_run_async (GsPluginJob         *job,
 	self->merged_list = gs_app_list_new ();
 	plugins = gs_plugin_loader_get_plugins (plugin_loader);
 
+	/* Only refine each plugin’s results separately if someone is
+	 * listening for them; otherwise one big refine is cheaper. */
+	self->emit_partial_results = g_signal_has_handler_pending (self, signals[SIGNAL_PARTIAL_RESULTS], 0, TRUE);
+
 #ifdef HAVE_SYSPROF
 	self->begin_time_nsec = SYSPROF_CAPTURE_CURRENT_TIME;
 #endif
@@ -335,12 +406,33 @@ plugin_list_apps_cb (GObject      *source_object,
 	g_autoptr(GTask) task = G_TASK (user_data);
 	GsPluginJobListApps *self = g_task_get_source_object (task);
 	g_autoptr(GsAppList) plugin_apps = NULL;
+	GsPluginRefineFlags refine_flags;
+	GsPluginRefineRequireFlags require_flags;
 	g_autoptr(GError) local_error = NULL;
 
 	plugin_apps = plugin_class->list_apps_finish (plugin, result, &local_error);
+	get_refine_flags (self, &refine_flags, &require_flags);
+
+	if (plugin_apps != NULL &&
+	    self->emit_partial_results &&
+	    gs_app_list_length (plugin_apps) > 0 &&
+	    require_flags != GS_PLUGIN_REFINE_REQUIRE_FLAGS_NONE) {
+		GsPluginLoader *plugin_loader = g_task_get_task_data (task);
+		g_autoptr(GsPluginJob) refine_job = NULL;
 
-	if (plugin_apps != NULL)
+		/* Refine this batch now, rather than waiting for the other
+		 * plugins. It’s an extra pending op, finished in
+		 * refine_batch_cb(). */
+		self->n_pending_ops++;
+		refine_job = gs_plugin_job_refine_new (plugin_apps, refine_flags, require_flags);
+		gs_plugin_loader_job_process_async (plugin_loader, refine_job,
+						    g_task_get_cancellable (task),
+						    refine_batch_cb,
+						    g_object_ref (task));
+	} else if (plugin_apps != NULL) {
 		gs_app_list_add_list (self->merged_list, plugin_apps);
+		maybe_emit_partial_results (task);
+	}
 
 	/* Only log errors from plugins. No need to discard everything when one plugin fails. */
 	if (local_error != NULL &&
@@ -362,6 +454,29 @@ plugin_list_apps_cb (GObject      *source_object,
 	finish_op (task, g_steal_pointer (&local_error));
 }
 
+static void
+refine_batch_cb (GObject      *source_object,
+                 GAsyncResult *result,
+                 gpointer      user_data)
+{
+	GsPluginLoader *plugin_loader = GS_PLUGIN_LOADER (source_object);
+	g_autoptr(GTask) task = G_TASK (user_data);
+	GsPluginJobListApps *self = g_task_get_source_object (task);
+	g_autoptr(GsPluginJobRefine) refine_job = NULL;
+	g_autoptr(GError) local_error = NULL;
+
+	if (!gs_plugin_loader_job_process_finish (plugin_loader, result, (GsPluginJob **) &refine_job, &local_error)) {
+		gs_utils_error_convert_gio (&local_error);
+		finish_op (task, g_steal_pointer (&local_error));
+		return;
+	}
+
+	gs_app_list_add_list (self->merged_list, gs_plugin_job_refine_get_result_list (refine_job));
+	maybe_emit_partial_results (task);
+
+	finish_op (task, NULL);
+}
+
 /* @error is (transfer full) if non-%NULL */
 static void
 finish_op (GTask  *task,
@@ -371,9 +486,8 @@ finish_op (GTask  *task,
 	GCancellable *cancellable = g_task_get_cancellable (task);
 	GsPluginLoader *plugin_loader = g_task_get_task_data (task);
 	g_autoptr(GsAppList) merged_list = NULL;
-	GsPluginRefineFlags refine_flags = GS_PLUGIN_REFINE_FLAGS_NONE;
-	GsPluginRefineRequireFlags require_flags = GS_PLUGIN_REFINE_REQUIRE_FLAGS_NONE;
-	GsAppQueryLicenseType license_type = GS_APP_QUERY_LICENSE_ANY;
+	GsPluginRefineFlags refine_flags;
+	GsPluginRefineRequireFlags require_flags;
 	g_autoptr(GError) error_owned = g_steal_pointer (&error);
 
 	if (error_owned != NULL && self->saved_error == NULL)
@@ -396,27 +510,17 @@ finish_op (GTask  *task,
 		return;
 	}
 
-	/* run refine() on each one if required */
-	if (self->query != NULL) {
-		refine_flags = gs_app_query_get_refine_flags (self->query);
-		require_flags = gs_app_query_get_refine_require_flags (self->query);
-		license_type = gs_app_query_get_license_type (self->query);
-	}
-
-	if (!(require_flags & GS_PLUGIN_REFINE_REQUIRE_FLAGS_LICENSE) &&
-	    license_type != GS_APP_QUERY_LICENSE_ANY) {
-		/* Needs the license information when filtering with it */
-		require_flags |= GS_PLUGIN_REFINE_REQUIRE_FLAGS_LICENSE;
-	}
+	/* run refine() on each one if required; when emitting partial results
+	 * each batch has already been refined in refine_batch_cb() */
+	get_refine_flags (self, &refine_flags, &require_flags);
 
-	if (merged_list != NULL &&
+	if (!self->emit_partial_results &&
+	    merged_list != NULL &&
 	    gs_app_list_length (merged_list) > 0 &&
 	    require_flags != GS_PLUGIN_REFINE_REQUIRE_FLAGS_NONE) {
 		g_autoptr(GsPluginJob) refine_job = NULL;
 
-		refine_job = gs_plugin_job_refine_new (merged_list,
-						       refine_flags | GS_PLUGIN_REFINE_FLAGS_DISABLE_FILTERING,
-						       require_flags);
+		refine_job = gs_plugin_job_refine_new (merged_list, refine_flags, require_flags);
 		gs_plugin_loader_job_process_async (plugin_loader, refine_job,
 						    cancellable,
 						    refine_cb,
@@ -448,12 +552,14 @@ refine_cb (GObject      *source_object,
 	finish_task (task, gs_plugin_job_refine_get_result_list (refine_job));
 }
 
+/* Apply the query’s filters, deduplication, sorting and truncation to
+ * @merged_list, in place. This is used for the final results and for each
+ * set of partial results. */
 static void
-finish_task (GTask     *task,
-             GsAppList *merged_list)
+filter_and_sort (GsPluginJobListApps *self,
+                 GsPluginLoader      *plugin_loader,
+                 GsAppList           *merged_list)
 {
-	GsPluginJobListApps *self = g_task_get_source_object (task);
-	GsPluginLoader *plugin_loader = g_task_get_task_data (task);
 	GsAppListFilterFlags dedupe_flags = GS_APP_LIST_FILTER_FLAG_NONE;
 	GsAppListSortFunc sort_func = NULL;
 	gpointer sort_func_data = NULL;
@@ -464,7 +570,6 @@ finish_task (GTask     *task,
 	GsAppListFilterFunc filter_func = NULL;
 	gpointer filter_func_data = NULL;
 	guint max_results = 0;
-	g_autofree gchar *job_debug = NULL;
 
 	if (self->query != NULL) {
 		license_type = gs_app_query_get_license_type (self->query);
@@ -528,6 +633,17 @@ finish_task (GTask     *task,
 			 gs_app_list_length (merged_list), max_results);
 		gs_app_list_truncate (merged_list, max_results);
 	}
+}
+
+static void
+finish_task (GTask     *task,
+             GsAppList *merged_list)
+{
+	GsPluginJobListApps *self = g_task_get_source_object (task);
+	GsPluginLoader *plugin_loader = g_task_get_task_data (task);
+	g_autofree gchar *job_debug = NULL;
+
+	filter_and_sort (self, plugin_loader, merged_list);
 
 	/* show elapsed time */
 	job_debug = gs_plugin_job_to_string (GS_PLUGIN_JOB (self));
@@ -606,6 +722,33 @@ gs_plugin_job_list_apps_class_init (GsPluginJobListAppsClass *klass)
 				    G_PARAM_STATIC_STRINGS | G_PARAM_EXPLICIT_NOTIFY);
 
 	g_object_class_install_properties (object_class, G_N_ELEMENTS (props), props);
+
+	/**
+	 * GsPluginJobListApps::partial-results:
+	 * @list: (transfer none) (not nullable): the results so far
+	 *
+	 * Emitted during #GsPluginJob.run_async() each time a plugin’s results
+	 * have been refined, while other plugins are still running.
+	 *
+	 * @list contains all the results so far, filtered, deduplicated,
+	 * sorted and truncated as the final result list will be. It is not
+	 * emitted for the last batch of results; get those using
+	 * gs_plugin_job_list_apps_get_result_list() once the job is complete.
+	 *
+	 * Connecting to this signal before the job is run changes it to refine
+	 * each plugin’s results separately.
+	 *
+	 * It’s emitted in the thread which is running the #GMainContext which
+	 * was the thread-default context when #GsPluginJob.run_async() was
+	 * called.
+	 *
+	 * Since: 50
+	 */
+	signals[SIGNAL_PARTIAL_RESULTS] =
+		g_signal_new ("partial-results",
+			      G_TYPE_FROM_CLASS (object_class), G_SIGNAL_RUN_LAST,
+			      0, NULL, NULL, g_cclosure_marshal_VOID__OBJECT,
+			      G_TYPE_NONE, 1, GS_TYPE_APP_LIST);
 }
 
 static void
@@ -27,6 +27,15 @@
  * calling it for all loaded plugins. In addition it will refresh ODRS data on
  * the #GsOdrsProvider set on the #GsPluginLoader.
  *
+ * The refreshes for each plugin, ODRS and external AppStream are run in
+ * parallel, with at most %MAX_PARALLEL_OPS of them in progress at once. The
+ * rest are queued and started as earlier ones complete. Plugins run their
+ * refreshes in worker threads with an I/O priority and CPU scheduling policy
+ * based on whether the refresh is interactive (see gs_ioprio_set()). The time
+ * taken by, and the number of bytes downloaded for, each source are logged
+ * once it completes, and can be queried afterwards with
+ * gs_plugin_job_refresh_metadata_get_source_stats().
+ *
  * Once the refresh is complete, signals may be asynchronously emitted on
  * plugins, apps and the #GsPluginLoader to indicate what metadata or sets of
  * apps have changed.
@@ -54,6 +63,11 @@
 #include "gs-odrs-provider.h"
 #include "gs-utils.h"
 
+/* Maximum number of refresh operations to run at once. Each operation is
+ * typically a mix of network and disk I/O, so running a few in parallel keeps
+ * both busy without them all competing with each other. */
+#define MAX_PARALLEL_OPS 4
+
 /* A tuple to store the last-received progress data for a single download.
  * See progress_cb() for more details. */
 typedef struct {
@@ -61,6 +75,43 @@ typedef struct {
 	gsize total_download_size;
 } ProgressTuple;
 
+typedef enum {
+	REFRESH_OP_PLUGIN,
+	REFRESH_OP_ODRS,
+#ifdef ENABLE_EXTERNAL_APPSTREAM
+	REFRESH_OP_EXTERNAL_APPSTREAM,
+#endif
+} RefreshOpKind;
+
+/* A single refresh operation, which may be queued until there is capacity to
+ * run it. */
+typedef struct {
+	GTask *task;  /* (owned) (not nullable) */
+	RefreshOpKind kind;
+	GsPlugin *plugin;  /* (owned) (nullable) */
+	ProgressTuple *progress;  /* (unowned) (nullable) */
+	gint64 begin_time_usec;
+#ifdef HAVE_SYSPROF
+	gint64 begin_time_nsec;
+#endif
+} RefreshOp;
+
+static void
+refresh_op_free (RefreshOp *op)
+{
+	g_clear_object (&op->task);
+	g_clear_object (&op->plugin);
+	g_free (op);
+}
+
+G_DEFINE_AUTOPTR_CLEANUP_FUNC (RefreshOp, refresh_op_free)
+
+/* What a completed refresh operation cost. */
+typedef struct {
+	guint64 duration_usec;
+	guint64 bytes_downloaded;  /* 0 if unknown */
+} SourceStats;
+
 struct _GsPluginJobRefreshMetadata
 {
 	GsPluginJob parent;
@@ -72,6 +123,8 @@ struct _GsPluginJobRefreshMetadata
 	/* In-progress data. */
 	GError *saved_error;  /* (owned) (nullable) */
 	guint n_pending_ops;
+	guint n_running_ops;
+	GQueue queued_ops;  /* (element-type RefreshOp) (owned) */
 #ifdef ENABLE_EXTERNAL_APPSTREAM
 	ProgressTuple external_appstream_progress;
 #endif
@@ -82,6 +135,7 @@ struct _GsPluginJobRefreshMetadata
 	} plugins_progress;
 	GSource *progress_source;  /* (owned) (nullable) */
 	guint last_reported_progress;
+	GHashTable *source_stats;  /* (element-type utf8 SourceStats) (owned) */
 
 #ifdef HAVE_SYSPROF
 	gint64 begin_time_nsec;
@@ -110,6 +164,8 @@ gs_plugin_job_refresh_metadata_dispose (GObject *object)
 
 	g_assert (self->saved_error == NULL);
 	g_assert (self->n_pending_ops == 0);
+	g_assert (self->n_running_ops == 0);
+	g_assert (g_queue_is_empty (&self->queued_ops));
 
 	/* Progress reporting should have been stopped by now. */
 	if (self->progress_source != NULL) {
@@ -120,6 +176,16 @@ gs_plugin_job_refresh_metadata_dispose (GObject *object)
 	G_OBJECT_CLASS (gs_plugin_job_refresh_metadata_parent_class)->dispose (object);
 }
 
+static void
+gs_plugin_job_refresh_metadata_finalize (GObject *object)
+{
+	GsPluginJobRefreshMetadata *self = GS_PLUGIN_JOB_REFRESH_METADATA (object);
+
+	g_clear_pointer (&self->source_stats, g_hash_table_unref);
+
+	G_OBJECT_CLASS (gs_plugin_job_refresh_metadata_parent_class)->finalize (object);
+}
+
 static void
 gs_plugin_job_refresh_metadata_get_property (GObject    *object,
                                              guint       prop_id,
@@ -193,6 +259,12 @@ static void odrs_provider_refresh_ratings_cb (GObject      *source_object,
 static void plugin_refresh_metadata_cb (GObject      *source_object,
                                         GAsyncResult *result,
                                         gpointer      user_data);
+static void queue_op (GTask         *task,
+                      RefreshOpKind  kind,
+                      GsPlugin      *plugin,
+                      ProgressTuple *progress);
+static void start_queued_ops (GsPluginJobRefreshMetadata *self);
+static void finish_refresh_op (RefreshOp *op);
 static void finish_op (GTask  *task,
                        GError *error);
 
@@ -234,31 +306,16 @@ gs_plugin_job_refresh_metadata_run_async (GsPluginJob         *job,
 	plugins = gs_plugin_loader_get_plugins (plugin_loader);
 	odrs_provider = gs_plugin_loader_get_odrs_provider (plugin_loader);
 
-	/* Start downloading updated external appstream before anything else */
-#ifdef ENABLE_EXTERNAL_APPSTREAM
-	if (!g_cancellable_is_cancelled (cancellable)) {
-		g_autoptr(GSettings) settings = NULL;
-		g_auto(GStrv) appstream_urls = NULL;
-
-		self->n_pending_ops++;
-		settings = g_settings_new ("org.gnome.software");
-		appstream_urls = g_settings_get_strv (settings,
-						      "external-appstream-urls");
-		gs_external_appstream_refresh_async (NULL,
-						     appstream_urls,
-						     self->cache_age_secs,
-						     refresh_progress_tuple_cb,
-						     &self->external_appstream_progress,
-						     cancellable,
-						     external_appstream_refresh_cb,
-						     g_object_ref (task));
-	}
-#endif
-
 #ifdef HAVE_SYSPROF
 	self->begin_time_nsec = SYSPROF_CAPTURE_CURRENT_TIME;
 #endif
 
+	/* Start downloading updated external appstream before anything else */
+#ifdef ENABLE_EXTERNAL_APPSTREAM
+	if (!g_cancellable_is_cancelled (cancellable))
+		queue_op (task, REFRESH_OP_EXTERNAL_APPSTREAM, NULL, &self->external_appstream_progress);
+#endif
+
 	for (guint i = 0; i < plugins->len; i++) {
 		GsPlugin *plugin = g_ptr_array_index (plugins, i);
 		GsPluginClass *plugin_class = GS_PLUGIN_GET_CLASS (plugin);
@@ -279,28 +336,12 @@ gs_plugin_job_refresh_metadata_run_async (GsPluginJob         *job,
 		self->plugins_progress.n_plugins++;
 
 		/* run the plugin */
-		self->n_pending_ops++;
-		plugin_class->refresh_metadata_async (plugin,
-						      self->cache_age_secs,
-						      self->flags,
-						      plugin_event_cb,
-						      task,
-						      cancellable,
-						      plugin_refresh_metadata_cb,
-						      g_object_ref (task));
+		queue_op (task, REFRESH_OP_PLUGIN, plugin, NULL);
 	}
 
 	if (odrs_provider != NULL &&
-	    !g_cancellable_is_cancelled (cancellable)) {
-		self->n_pending_ops++;
-		gs_odrs_provider_refresh_ratings_async (odrs_provider,
-							self->cache_age_secs,
-							refresh_progress_tuple_cb,
-							&self->odrs_progress,
-							cancellable,
-							odrs_provider_refresh_ratings_cb,
-							g_object_ref (task));
-	}
+	    !g_cancellable_is_cancelled (cancellable))
+		queue_op (task, REFRESH_OP_ODRS, NULL, &self->odrs_progress);
 
 	/* some functions are really required for proper operation */
 	if (!any_plugins_ran) {
@@ -313,6 +354,157 @@ gs_plugin_job_refresh_metadata_run_async (GsPluginJob         *job,
 	finish_op (task, g_steal_pointer (&local_error));
 }
 
+static void
+queue_op (GTask         *task,
+          RefreshOpKind  kind,
+          GsPlugin      *plugin,
+          ProgressTuple *progress)
+{
+	GsPluginJobRefreshMetadata *self = g_task_get_source_object (task);
+	RefreshOp *op;
+
+	op = g_new0 (RefreshOp, 1);
+	op->task = g_object_ref (task);
+	op->kind = kind;
+	op->plugin = (plugin != NULL) ? g_object_ref (plugin) : NULL;
+	op->progress = progress;
+
+	self->n_pending_ops++;
+	g_queue_push_tail (&self->queued_ops, op);
+
+	start_queued_ops (self);
+}
+
+static const gchar *
+refresh_op_get_name (RefreshOp *op)
+{
+	switch (op->kind) {
+	case REFRESH_OP_PLUGIN:
+		return gs_plugin_get_name (op->plugin);
+	case REFRESH_OP_ODRS:
+		return "odrs";
+#ifdef ENABLE_EXTERNAL_APPSTREAM
+	case REFRESH_OP_EXTERNAL_APPSTREAM:
+		return "external-appstream";
+#endif
+	default:
+		g_assert_not_reached ();
+	}
+}
+
+static void
+start_op (RefreshOp *op)
+{
+	GsPluginJobRefreshMetadata *self = g_task_get_source_object (op->task);
+	GsPluginLoader *plugin_loader = g_task_get_task_data (op->task);
+	GCancellable *cancellable = g_task_get_cancellable (op->task);
+
+	op->begin_time_usec = g_get_monotonic_time ();
+#ifdef HAVE_SYSPROF
+	op->begin_time_nsec = SYSPROF_CAPTURE_CURRENT_TIME;
+#endif
+
+	switch (op->kind) {
+	case REFRESH_OP_PLUGIN:
+		GS_PLUGIN_GET_CLASS (op->plugin)->refresh_metadata_async (op->plugin,
+									  self->cache_age_secs,
+									  self->flags,
+									  plugin_event_cb,
+									  op->task,
+									  cancellable,
+									  plugin_refresh_metadata_cb,
+									  op);
+		break;
+	case REFRESH_OP_ODRS:
+		gs_odrs_provider_refresh_ratings_async (gs_plugin_loader_get_odrs_provider (plugin_loader),
+							self->cache_age_secs,
+							refresh_progress_tuple_cb,
+							op->progress,
+							cancellable,
+							odrs_provider_refresh_ratings_cb,
+							op);
+		break;
+#ifdef ENABLE_EXTERNAL_APPSTREAM
+	case REFRESH_OP_EXTERNAL_APPSTREAM: {
+		g_autoptr(GSettings) settings = NULL;
+		g_auto(GStrv) appstream_urls = NULL;
+
+		settings = g_settings_new ("org.gnome.software");
+		appstream_urls = g_settings_get_strv (settings,
+						      "external-appstream-urls");
+		gs_external_appstream_refresh_async (NULL,
+						     appstream_urls,
+						     self->cache_age_secs,
+						     (self->flags & GS_PLUGIN_REFRESH_METADATA_FLAGS_INTERACTIVE) != 0,
+						     refresh_progress_tuple_cb,
+						     op->progress,
+						     cancellable,
+						     external_appstream_refresh_cb,
+						     op);
+		break;
+	}
+#endif
+	default:
+		g_assert_not_reached ();
+	}
+}
+
+static void
+start_queued_ops (GsPluginJobRefreshMetadata *self)
+{
+	while (self->n_running_ops < MAX_PARALLEL_OPS &&
+	       !g_queue_is_empty (&self->queued_ops)) {
+		self->n_running_ops++;
+		start_op (g_queue_pop_head (&self->queued_ops));
+	}
+}
+
+/* Record and log how long @op took and how much it downloaded, then start the
+ * next queued operation and finish @op. Consumes @op. */
+static void
+finish_refresh_op (RefreshOp *op)
+{
+	g_autoptr(RefreshOp) op_owned = op;
+	g_autoptr(GTask) task = g_object_ref (op->task);
+	GsPluginJobRefreshMetadata *self = g_task_get_source_object (task);
+	gint64 duration_usec = g_get_monotonic_time () - op->begin_time_usec;
+	SourceStats *stats;
+	g_autofree gchar *description = NULL;
+
+	/* Plugins don’t report download progress, so how much they downloaded
+	 * is unknown. */
+	stats = g_new0 (SourceStats, 1);
+	stats->duration_usec = duration_usec;
+	stats->bytes_downloaded = (op->progress != NULL) ? op->progress->bytes_downloaded : 0;
+	g_hash_table_replace (self->source_stats, g_strdup (refresh_op_get_name (op)), stats);
+
+	if (op->progress != NULL)
+		description = g_strdup_printf ("%" G_GSIZE_FORMAT " bytes", op->progress->bytes_downloaded);
+	else
+		description = g_strdup ("unknown bytes");
+
+	g_debug ("Refreshing %s took %" G_GINT64_FORMAT " ms, downloaded %s",
+		 refresh_op_get_name (op),
+		 duration_usec / 1000,
+		 description);
+
+	GS_PROFILER_ADD_MARK_TAKE (PluginJobRefreshMetadata,
+				   op->begin_time_nsec,
+				   g_strdup_printf ("%s:%s",
+						    G_OBJECT_TYPE_NAME (self),
+						    refresh_op_get_name (op)),
+				   g_steal_pointer (&description));
+
+	g_clear_pointer (&op_owned, refresh_op_free);
+
+	g_assert (self->n_running_ops > 0);
+	self->n_running_ops--;
+	start_queued_ops (self);
+
+	/* Intentionally ignore errors, to not block other plugins */
+	finish_op (task, NULL);
+}
+
 static void
 refresh_progress_tuple_cb (gsize    bytes_downloaded,
                            gsize    total_download_size,
@@ -395,13 +587,13 @@ external_appstream_refresh_cb (GObject      *source_object,
                                GAsyncResult *result,
                                gpointer      user_data)
 {
-	g_autoptr(GTask) task = G_TASK (user_data);
+	RefreshOp *op = user_data;
 	g_autoptr(GError) local_error = NULL;
 
 	if (!gs_external_appstream_refresh_finish (result, NULL, &local_error))
 		g_debug ("Failed to refresh external appstream: %s", local_error->message);
-	/* Intentionally ignore errors, to not block other plugins */
-	finish_op (task, NULL);
+
+	finish_refresh_op (op);
 }
 #endif  /* ENABLE_EXTERNAL_APPSTREAM */
 
@@ -411,22 +603,13 @@ odrs_provider_refresh_ratings_cb (GObject      *source_object,
                                   gpointer      user_data)
 {
 	GsOdrsProvider *odrs_provider = GS_ODRS_PROVIDER (source_object);
-	g_autoptr(GTask) task = G_TASK (user_data);
+	RefreshOp *op = user_data;
 	g_autoptr(GError) local_error = NULL;
-#ifdef HAVE_SYSPROF
-	GsPluginJobRefreshMetadata *self = g_task_get_source_object (task);
-#endif
 
 	if (!gs_odrs_provider_refresh_ratings_finish (odrs_provider, result, &local_error))
 		g_debug ("Failed to refresh ratings: %s", local_error->message);
 
-	GS_PROFILER_ADD_MARK_TAKE (PluginJobRefreshMetadata,
-				   self->begin_time_nsec,
-				   g_strdup_printf ("%s:odrs", G_OBJECT_TYPE_NAME (self)),
-				   NULL);
-
-	/* Intentionally ignore errors, to not block other plugins */
-	finish_op (task, NULL);
+	finish_refresh_op (op);
 }
 
 static void
@@ -436,8 +619,8 @@ plugin_refresh_metadata_cb (GObject      *source_object,
 {
 	GsPlugin *plugin = GS_PLUGIN (source_object);
 	GsPluginClass *plugin_class = GS_PLUGIN_GET_CLASS (plugin);
-	g_autoptr(GTask) task = G_TASK (user_data);
-	GsPluginJobRefreshMetadata *self = g_task_get_source_object (task);
+	RefreshOp *op = user_data;
+	GsPluginJobRefreshMetadata *self = g_task_get_source_object (op->task);
 	g_autoptr(GError) local_error = NULL;
 
 	if (!plugin_class->refresh_metadata_finish (plugin, result, &local_error))
@@ -446,15 +629,7 @@ plugin_refresh_metadata_cb (GObject      *source_object,
 	/* Update progress reporting. */
 	self->plugins_progress.n_plugins_complete++;
 
-	GS_PROFILER_ADD_MARK_TAKE (PluginJobRefreshMetadata,
-				   self->begin_time_nsec,
-				   g_strdup_printf ("%s:%s",
-						    G_OBJECT_TYPE_NAME (self),
-						    gs_plugin_get_name (plugin)),
-				   NULL);
-
-	/* Intentionally ignore errors, to not block other plugins */
-	finish_op (task, NULL);
+	finish_refresh_op (op);
 }
 
 /* @error is (transfer full) if non-%NULL */
@@ -523,6 +698,7 @@ gs_plugin_job_refresh_metadata_class_init (GsPluginJobRefreshMetadataClass *klas
 	GsPluginJobClass *job_class = GS_PLUGIN_JOB_CLASS (klass);
 
 	object_class->dispose = gs_plugin_job_refresh_metadata_dispose;
+	object_class->finalize = gs_plugin_job_refresh_metadata_finalize;
 	object_class->get_property = gs_plugin_job_refresh_metadata_get_property;
 	object_class->set_property = gs_plugin_job_refresh_metadata_set_property;
 
@@ -583,6 +759,8 @@ gs_plugin_job_refresh_metadata_class_init (GsPluginJobRefreshMetadataClass *klas
 static void
 gs_plugin_job_refresh_metadata_init (GsPluginJobRefreshMetadata *self)
 {
+	g_queue_init (&self->queued_ops);
+	self->source_stats = g_hash_table_new_full (g_str_hash, g_str_equal, g_free, g_free);
 }
 
 /**
@@ -607,3 +785,45 @@ gs_plugin_job_refresh_metadata_new (guint64                      cache_age_secs,
 			     "flags", flags,
 			     NULL);
 }
+
+/**
+ * gs_plugin_job_refresh_metadata_get_source_stats:
+ * @self: a #GsPluginJobRefreshMetadata
+ * @source_name: name of the source: a plugin name, `odrs` or
+ *   `external-appstream`
+ * @duration_usec_out: (out) (optional): return location for how long the
+ *   source took to refresh, in microseconds
+ * @bytes_downloaded_out: (out) (optional): return location for how many bytes
+ *   the source downloaded, or 0 if that is unknown
+ *
+ * Get what refreshing @source_name cost, once it has completed.
+ *
+ * Plugins do not report how much they download, so for them the number of
+ * bytes downloaded is always 0.
+ *
+ * Returns: %TRUE if @source_name has been refreshed by this job, %FALSE
+ *   otherwise
+ * Since: 50
+ */
+gboolean
+gs_plugin_job_refresh_metadata_get_source_stats (GsPluginJobRefreshMetadata *self,
+                                                 const gchar                *source_name,
+                                                 guint64                    *duration_usec_out,
+                                                 guint64                    *bytes_downloaded_out)
+{
+	SourceStats *stats;
+
+	g_return_val_if_fail (GS_IS_PLUGIN_JOB_REFRESH_METADATA (self), FALSE);
+	g_return_val_if_fail (source_name != NULL, FALSE);
+
+	stats = g_hash_table_lookup (self->source_stats, source_name);
+	if (stats == NULL)
+		return FALSE;
+
+	if (duration_usec_out != NULL)
+		*duration_usec_out = stats->duration_usec;
+	if (bytes_downloaded_out != NULL)
+		*bytes_downloaded_out = stats->bytes_downloaded;
+
+	return TRUE;
+}
@@ -25,4 +25,10 @@ G_DECLARE_FINAL_TYPE (GsPluginJobRefreshMetadata, gs_plugin_job_refresh_metadata
 GsPluginJob	*gs_plugin_job_refresh_metadata_new	(guint64                      cache_age_secs,
 							 GsPluginRefreshMetadataFlags flags);
 
+gboolean	 gs_plugin_job_refresh_metadata_get_source_stats
+							(GsPluginJobRefreshMetadata *self,
+							 const gchar                *source_name,
+							 guint64                    *duration_usec_out,
+							 guint64                    *bytes_downloaded_out);
+
 G_END_DECLS
@@ -48,6 +48,18 @@
  * Once that is completed, the apps will typically be set to the state
  * %GS_APP_STATE_INSTALLED, or %GS_APP_STATE_UNKNOWN.
  *
+ * If %GS_PLUGIN_UPDATE_APPS_FLAGS_PIPELINED is specified, and neither step is
+ * skipped, the apps are instead passed through a download stage and then an
+ * apply stage one at a time, calling #GsPluginClass.update_apps_async() on
+ * each app’s management plugin with %GS_PLUGIN_UPDATE_APPS_FLAGS_PIPELINED
+ * and %GS_PLUGIN_UPDATE_APPS_FLAGS_NO_APPLY, and then with
+ * %GS_PLUGIN_UPDATE_APPS_FLAGS_PIPELINED and
+ * %GS_PLUGIN_UPDATE_APPS_FLAGS_NO_DOWNLOAD. Up to %MAX_PARALLEL_DOWNLOADS apps
+ * are downloaded, and up to %MAX_PARALLEL_APPLIES applied, at once, so that
+ * the network and disk are both kept busy. Only apps whose management plugin
+ * has called gs_plugin_set_pipelined_updates() are pipelined. Proxy apps, and
+ * all other apps, are updated together as normal.
+ *
  * On failure the error message returned will usually only be shown on the
  * console, but they can also be retrieved using gs_plugin_loader_get_events().
  *
@@ -72,6 +84,31 @@
 #include "gs-profiler.h"
 #include "gs-utils.h"
 
+/* Bounds on the parallelism of the stages of a pipelined update. Downloads are
+ * mostly network-bound, so a couple can usefully run in parallel; applying
+ * updates is mostly disk-bound, so running more than one at once doesn’t help. */
+#define MAX_PARALLEL_DOWNLOADS 2
+#define MAX_PARALLEL_APPLIES 1
+
+/* An app being passed through the stages of a pipelined update. */
+typedef struct {
+	GTask *task;  /* (owned) (not nullable) */
+	GsPlugin *plugin;  /* (owned) (not nullable) */
+	GsApp *app;  /* (owned) (not nullable) */
+	gboolean applying;
+	guint download_progress;
+	guint apply_progress;
+} PipelineItem;
+
+static void
+pipeline_item_free (PipelineItem *item)
+{
+	g_clear_object (&item->task);
+	g_clear_object (&item->plugin);
+	g_clear_object (&item->app);
+	g_free (item);
+}
+
 struct _GsPluginJobUpdateApps
 {
 	GsPluginJob parent;
@@ -84,6 +121,11 @@ struct _GsPluginJobUpdateApps
 	GError *saved_error;  /* (owned) (nullable) */
 	guint n_pending_ops;
 	GHashTable *plugins_progress;  /* (element-type GsPlugin guint) (owned) (nullable) */
+	GPtrArray *pipeline_items;  /* (element-type PipelineItem) (owned) (nullable) */
+	GQueue download_queue;  /* (element-type PipelineItem) (unowned) */
+	GQueue apply_queue;  /* (element-type PipelineItem) (unowned) */
+	guint n_downloading;
+	guint n_applying;
 	GSource *progress_source;  /* (owned) (nullable) */
 	guint last_reported_progress;
 
@@ -122,7 +164,11 @@ gs_plugin_job_update_apps_dispose (GObject *object)
 		g_clear_pointer (&self->progress_source, g_source_unref);
 	}
 
+	g_assert (g_queue_is_empty (&self->download_queue));
+	g_assert (g_queue_is_empty (&self->apply_queue));
+
 	g_clear_pointer (&self->plugins_progress, g_hash_table_unref);
+	g_clear_pointer (&self->pipeline_items, g_ptr_array_unref);
 	g_clear_object (&self->apps);
 
 	G_OBJECT_CLASS (gs_plugin_job_update_apps_parent_class)->dispose (object);
@@ -214,6 +260,9 @@ static void plugin_event_cb (GsPlugin      *plugin,
 static void plugin_update_apps_cb (GObject      *source_object,
                                    GAsyncResult *result,
                                    gpointer      user_data);
+static void start_pipeline (GTask     *task,
+                            GPtrArray *plugins,
+                            GsAppList *remaining_apps);
 static void finish_op (GTask  *task,
                        GError *error);
 
@@ -228,6 +277,8 @@ gs_plugin_job_update_apps_run_async (GsPluginJob         *job,
 	g_autoptr(GTask) task = NULL;
 	GPtrArray *plugins;  /* (element-type GsPlugin) */
 	gboolean any_plugins_ran = FALSE;
+	g_autoptr(GsAppList) apps = NULL;
+	GsPluginUpdateAppsFlags plugin_flags;
 	g_autoptr(GError) local_error = NULL;
 
 	/* Chosen to allow a few UI updates per second without updating the
@@ -258,7 +309,20 @@ gs_plugin_job_update_apps_run_async (GsPluginJob         *job,
 	self->begin_time_nsec = SYSPROF_CAPTURE_CURRENT_TIME;
 #endif
 
-	for (guint i = 0; i < plugins->len; i++) {
+	/* Work out which apps are passed to every plugin in one go. In a
+	 * pipelined update, that’s only the ones which can’t be pipelined. */
+	plugin_flags = self->flags & ~GS_PLUGIN_UPDATE_APPS_FLAGS_PIPELINED;
+
+	if ((self->flags & GS_PLUGIN_UPDATE_APPS_FLAGS_PIPELINED) &&
+	    !(self->flags & (GS_PLUGIN_UPDATE_APPS_FLAGS_NO_DOWNLOAD | GS_PLUGIN_UPDATE_APPS_FLAGS_NO_APPLY)) &&
+	    !g_cancellable_is_cancelled (cancellable)) {
+		apps = gs_app_list_new ();
+		start_pipeline (task, plugins, apps);
+	} else {
+		apps = g_object_ref (self->apps);
+	}
+
+	for (guint i = 0; i < plugins->len && (self->pipeline_items == NULL || gs_app_list_length (apps) > 0); i++) {
 		GsPlugin *plugin = g_ptr_array_index (plugins, i);
 		GsPluginClass *plugin_class = GS_PLUGIN_GET_CLASS (plugin);
 
@@ -280,8 +344,8 @@ gs_plugin_job_update_apps_run_async (GsPluginJob         *job,
 		/* run the plugin */
 		self->n_pending_ops++;
 		plugin_class->update_apps_async (plugin,
-						 self->apps,
-						 self->flags,
+						 apps,
+						 plugin_flags,
 						 plugin_progress_cb,
 						 task,
 						 plugin_event_cb,
@@ -294,7 +358,7 @@ gs_plugin_job_update_apps_run_async (GsPluginJob         *job,
 	}
 
 	/* some functions are really required for proper operation */
-	if (!any_plugins_ran) {
+	if (!any_plugins_ran && self->pipeline_items == NULL) {
 		g_set_error_literal (&local_error,
 				     GS_PLUGIN_ERROR,
 				     GS_PLUGIN_ERROR_NOT_SUPPORTED,
@@ -304,6 +368,242 @@ gs_plugin_job_update_apps_run_async (GsPluginJob         *job,
 	finish_op (task, g_steal_pointer (&local_error));
 }
 
+static void pipeline_progress_cb (GsPlugin *plugin,
+                                  guint     progress,
+                                  gpointer  user_data);
+static void pipeline_download_cb (GObject      *source_object,
+                                  GAsyncResult *result,
+                                  gpointer      user_data);
+static void pipeline_apply_cb (GObject      *source_object,
+                               GAsyncResult *result,
+                               gpointer      user_data);
+static void pipeline_start_queued (GsPluginJobUpdateApps *self);
+
+static GsPlugin *
+find_pipeline_plugin (GPtrArray *plugins,
+                      GsApp     *app)
+{
+	if (gs_app_has_quirk (app, GS_APP_QUIRK_IS_PROXY))
+		return NULL;
+
+	for (guint i = 0; i < plugins->len; i++) {
+		GsPlugin *plugin = g_ptr_array_index (plugins, i);
+
+		if (gs_plugin_get_enabled (plugin) &&
+		    gs_plugin_get_pipelined_updates (plugin) &&
+		    GS_PLUGIN_GET_CLASS (plugin)->update_apps_async != NULL &&
+		    gs_app_has_management_plugin (app, plugin))
+			return plugin;
+	}
+
+	return NULL;
+}
+
+/* Queue each app which can be pipelined for downloading, and add the rest to
+ * @remaining_apps. */
+static void
+start_pipeline (GTask     *task,
+                GPtrArray *plugins,
+                GsAppList *remaining_apps)
+{
+	GsPluginJobUpdateApps *self = g_task_get_source_object (task);
+
+	self->pipeline_items = g_ptr_array_new_with_free_func ((GDestroyNotify) pipeline_item_free);
+
+	for (guint i = 0; i < gs_app_list_length (self->apps); i++) {
+		GsApp *app = gs_app_list_index (self->apps, i);
+		GsPlugin *plugin = find_pipeline_plugin (plugins, app);
+		PipelineItem *item;
+
+		if (plugin == NULL) {
+			gs_app_list_add (remaining_apps, app);
+			continue;
+		}
+
+		item = g_new0 (PipelineItem, 1);
+		item->task = g_object_ref (task);
+		item->plugin = g_object_ref (plugin);
+		item->app = g_object_ref (app);
+		g_ptr_array_add (self->pipeline_items, item);
+
+		/* Each app is one pending op until it’s been applied, or has
+		 * failed to download. */
+		self->n_pending_ops++;
+		g_queue_push_tail (&self->download_queue, item);
+	}
+
+	g_debug ("Pipelining update of %u apps; updating %u others together",
+		 self->pipeline_items->len, gs_app_list_length (remaining_apps));
+
+	pipeline_start_queued (self);
+}
+
+static void
+pipeline_run_stage (PipelineItem            *item,
+                    GsPluginUpdateAppsFlags  stage_flag,
+                    GAsyncReadyCallback      callback)
+{
+	GsPluginJobUpdateApps *self = g_task_get_source_object (item->task);
+	g_autoptr(GsAppList) list = gs_app_list_new ();
+	GsPluginUpdateAppsFlags flags;
+
+	gs_app_list_add (list, item->app);
+	flags = self->flags | stage_flag;
+
+	GS_PLUGIN_GET_CLASS (item->plugin)->update_apps_async (item->plugin,
+							       list,
+							       flags,
+							       pipeline_progress_cb,
+							       item,
+							       plugin_event_cb,
+							       item->task,
+							       app_needs_user_action_cb,
+							       item->task,
+							       g_task_get_cancellable (item->task),
+							       callback,
+							       item);
+}
+
+static void
+pipeline_start_queued (GsPluginJobUpdateApps *self)
+{
+	PipelineItem *item;
+
+	/* Don’t start anything new once cancelled. Each queued app is still a
+	 * pending op, so finish them. */
+	while (!g_queue_is_empty (&self->download_queue) || !g_queue_is_empty (&self->apply_queue)) {
+		GCancellable *cancellable;
+		g_autoptr(GError) local_error = NULL;
+
+		item = g_queue_peek_head (!g_queue_is_empty (&self->apply_queue) ? &self->apply_queue : &self->download_queue);
+		cancellable = g_task_get_cancellable (item->task);
+
+		if (!g_cancellable_set_error_if_cancelled (cancellable, &local_error))
+			break;
+
+		if (!g_queue_remove (&self->apply_queue, item))
+			g_queue_remove (&self->download_queue, item);
+		item->download_progress = 100;
+		item->apply_progress = 100;
+		finish_op (item->task, g_steal_pointer (&local_error));
+	}
+
+	/* Prefer applying, so apps finish in order and their downloaded
+	 * data doesn’t pile up. */
+	while (self->n_applying < MAX_PARALLEL_APPLIES &&
+	       !g_queue_is_empty (&self->apply_queue)) {
+		item = g_queue_pop_head (&self->apply_queue);
+		item->applying = TRUE;
+		self->n_applying++;
+		pipeline_run_stage (item,
+				    GS_PLUGIN_UPDATE_APPS_FLAGS_NO_DOWNLOAD,
+				    pipeline_apply_cb);
+	}
+
+	while (self->n_downloading < MAX_PARALLEL_DOWNLOADS &&
+	       !g_queue_is_empty (&self->download_queue)) {
+		self->n_downloading++;
+		pipeline_run_stage (g_queue_pop_head (&self->download_queue),
+				    GS_PLUGIN_UPDATE_APPS_FLAGS_NO_APPLY,
+				    pipeline_download_cb);
+	}
+}
+
+/* Called in the same thread as gs_plugin_job_update_apps_run_async(), to
+ * report the progress for a stage of a pipelined app. */
+static void
+pipeline_progress_cb (GsPlugin *plugin,
+                      guint     progress,
+                      gpointer  user_data)
+{
+	PipelineItem *item = user_data;
+
+	g_assert (g_main_context_is_owner (g_task_get_context (item->task)));
+
+	if (item->applying)
+		item->apply_progress = progress;
+	else
+		item->download_progress = progress;
+}
+
+/* Returns %TRUE if the stage succeeded. Cancellation errors are returned in
+ * @error; all other errors are logged and ignored, as in
+ * plugin_update_apps_cb(). */
+static gboolean
+pipeline_stage_finish (PipelineItem  *item,
+                       GAsyncResult  *result,
+                       const gchar   *stage_name,
+                       GError       **error)
+{
+	GsPluginClass *plugin_class = GS_PLUGIN_GET_CLASS (item->plugin);
+	g_autoptr(GError) local_error = NULL;
+
+	if (plugin_class->update_apps_finish (item->plugin, result, &local_error))
+		return TRUE;
+
+	if (g_error_matches (local_error, G_IO_ERROR, G_IO_ERROR_CANCELLED) ||
+	    g_error_matches (local_error, GS_PLUGIN_ERROR, GS_PLUGIN_ERROR_CANCELLED)) {
+		g_propagate_error (error, g_steal_pointer (&local_error));
+		return FALSE;
+	}
+
+	g_debug ("Plugin ‘%s’ failed to %s %s: %s",
+		 gs_plugin_get_name (item->plugin), stage_name,
+		 gs_app_get_unique_id (item->app), local_error->message);
+
+	return FALSE;
+}
+
+static void
+pipeline_download_cb (GObject      *source_object,
+                      GAsyncResult *result,
+                      gpointer      user_data)
+{
+	PipelineItem *item = user_data;
+	g_autoptr(GTask) task = g_object_ref (item->task);
+	GsPluginJobUpdateApps *self = g_task_get_source_object (task);
+	g_autoptr(GError) local_error = NULL;
+	gboolean success;
+
+	success = pipeline_stage_finish (item, result, "download", &local_error);
+
+	item->download_progress = 100;
+	g_assert (self->n_downloading > 0);
+	self->n_downloading--;
+
+	if (success) {
+		/* Queue it to be applied. It stays pending until then. */
+		g_queue_push_tail (&self->apply_queue, item);
+		pipeline_start_queued (self);
+		return;
+	}
+
+	/* There is nothing to apply if the download failed. */
+	item->apply_progress = 100;
+	pipeline_start_queued (self);
+	finish_op (task, g_steal_pointer (&local_error));
+}
+
+static void
+pipeline_apply_cb (GObject      *source_object,
+                   GAsyncResult *result,
+                   gpointer      user_data)
+{
+	PipelineItem *item = user_data;
+	g_autoptr(GTask) task = g_object_ref (item->task);
+	GsPluginJobUpdateApps *self = g_task_get_source_object (task);
+	g_autoptr(GError) local_error = NULL;
+
+	pipeline_stage_finish (item, result, "apply", &local_error);
+
+	item->apply_progress = 100;
+	g_assert (self->n_applying > 0);
+	self->n_applying--;
+
+	pipeline_start_queued (self);
+	finish_op (task, g_steal_pointer (&local_error));
+}
+
 /* Called in the same thread as gs_plugin_job_update_apps_run_async(), to
  * report the progress for the given plugin. */
 static void
@@ -334,6 +634,8 @@ progress_cb (gpointer user_data)
 	 * this context, an operation is a call to a plugin’s
 	 * update_apps_async() vfunc. */
 	n_portions = g_hash_table_size (self->plugins_progress);
+	if (self->pipeline_items != NULL)
+		n_portions += 2 * self->pipeline_items->len;
 	progress = 0.0;
 	g_hash_table_iter_init (&iter, self->plugins_progress);
 
@@ -348,6 +650,22 @@ progress_cb (gpointer user_data)
 		progress += (100.0 / n_portions) * ((gdouble) plugin_progress / 100.0);
 	}
 
+	/* In a pipelined update, each app’s download and apply stages are each
+	 * an operation. */
+	for (guint i = 0; self->pipeline_items != NULL && i < self->pipeline_items->len; i++) {
+		const PipelineItem *item = g_ptr_array_index (self->pipeline_items, i);
+		const guint stage_progress[] = { item->download_progress, item->apply_progress };
+
+		for (gsize j = 0; j < G_N_ELEMENTS (stage_progress); j++) {
+			if (stage_progress[j] == GS_APP_PROGRESS_UNKNOWN)
+				continue;
+			else
+				all_unknown = FALSE;
+
+			progress += (100.0 / n_portions) * ((gdouble) stage_progress[j] / 100.0);
+		}
+	}
+
 	if (all_unknown)
 		progress = GS_APP_PROGRESS_UNKNOWN;
 
@@ -439,6 +757,8 @@ finish_op (GTask  *task,
 	progress_cb (self);
 	g_source_destroy (self->progress_source);
 	g_clear_pointer (&self->plugins_progress, g_hash_table_unref);
+	/* This drops the items’ references to @task. */
+	g_clear_pointer (&self->pipeline_items, g_ptr_array_unref);
 
 	/* Get the results of the parallel ops. */
 	if (self->saved_error != NULL) {
@@ -571,6 +891,8 @@ gs_plugin_job_update_apps_class_init (GsPluginJobUpdateAppsClass *klass)
 static void
 gs_plugin_job_update_apps_init (GsPluginJobUpdateApps *self)
 {
+	g_queue_init (&self->download_queue);
+	g_queue_init (&self->apply_queue);
 }
 
 /**
@@ -0,0 +1,18 @@
+/* -*- Mode: C; tab-width: 8; indent-tabs-mode: t; c-basic-offset: 8 -*-
+ * vi:set noexpandtab tabstop=8 shiftwidth=8:
+ *
+ * Copyright (C) 2026 GNOME Foundation, Inc.
+ *
+ * SPDX-License-Identifier: GPL-2.0-or-later
+ */
+
+#pragma once
+
+#include "gs-app-list.h"
+
+G_BEGIN_DECLS
+
+GsAppList	*gs_plugin_loader_replay_install_queue	(const gchar	*contents,
+							 guint		*out_n_lines);
+
+G_END_DECLS
@@ -10,6 +10,9 @@
 #include "config.h"
 
 #include <locale.h>
+#ifdef __GLIBC__
+#include <malloc.h>
+#endif
 #include <glib/gi18n.h>
 #include <glib/gstdio.h>
 #include <appstream.h>
@@ -20,6 +23,7 @@
 #endif
 
 #include "gs-app-collation.h"
+#include "gs-appstream.h"
 #include "gs-app-private.h"
 #include "gs-app-list-private.h"
 #include "gs-category-manager.h"
@@ -28,6 +32,7 @@
 #include "gs-ioprio.h"
 #include "gs-os-release.h"
 #include "gs-plugin-loader.h"
+#include "gs-plugin-loader-private.h"
 #include "gs-plugin.h"
 #include "gs-plugin-event.h"
 #include "gs-plugin-job-private.h"
@@ -38,12 +43,20 @@
 #define GS_PLUGIN_LOADER_UPDATES_CHANGED_DELAY	3	/* s */
 #define GS_PLUGIN_LOADER_RELOAD_DELAY		5	/* s */
 
+/* The install queue file is an append-only journal of ‘+’ (queued) and ‘-’
+ * (dequeued) lines; it’s rewritten with only the live entries once it has
+ * grown to this many lines more than twice the number of queued apps. */
+#define INSTALL_QUEUE_JOURNAL_SLACK		32
+
 struct _GsPluginLoader
 {
 	GObject			 parent;
 
 	gboolean		 setup_complete;
 	GCancellable		*setup_complete_cancellable;  /* (nullable) (owned) */
+	gint64			 setup_begin_time_usec;  /* monotonic */
+	GPtrArray		*startup_timeline;  /* (owned) (element-type StartupTimelineEntry) */
+	GHashTable		*deferred_setup_plugins;  /* (owned) (element-type GsPlugin StartupTimelineEntry) */
 
 	GPtrArray		*plugins;
 	GPtrArray		*locations;
@@ -51,9 +64,10 @@ struct _GsPluginLoader
 	gboolean		 plugin_dir_dirty;
 	GPtrArray		*file_monitors;
 
-	GMutex			 pending_apps_mutex;
+	GMutex			 pending_apps_mutex;  /* also serialises writes to the install-queue file */
 	GsAppList		*pending_apps;		/* (nullable) (owned) */
 	GCancellable		*pending_apps_cancellable;  /* (nullable) (owned) */
+	guint			 install_queue_journal_lines;  /* (locked-by pending_apps_mutex) */
 
 	gint			 active_jobs;
 
@@ -77,6 +91,9 @@ struct _GsPluginLoader
 
 	GPowerProfileMonitor	*power_profile_monitor;  /* (owned) (nullable) */
 
+	GMemoryMonitor		*memory_monitor;  /* (owned) (nullable) */
+	gulong			 low_memory_warning_handler;
+
 	GsJobManager		*job_manager;  /* (owned) (not nullable) */
 	GsCategoryManager	*category_manager;
 	GsOdrsProvider		*odrs_provider;  /* (owned) (nullable) */
@@ -85,6 +102,24 @@ struct _GsPluginLoader
 	GDBusConnection		*system_bus_connection;  /* (owned); (not nullable) after setup */
 };
 
+/* An entry in the startup timeline, recording how long a setup stage or the
+ * setup of an individual plugin took. @end_time_usec is zero while the entry
+ * is still running. Both times are from g_get_monotonic_time(). */
+typedef struct {
+	const gchar	*kind;  /* (not nullable) static string */
+	gchar		*name;  /* (not nullable) (owned) */
+	const gchar	*status;  /* (not nullable) static string */
+	gint64		 begin_time_usec;
+	gint64		 end_time_usec;
+} StartupTimelineEntry;
+
+static void
+startup_timeline_entry_free (StartupTimelineEntry *entry)
+{
+	g_free (entry->name);
+	g_free (entry);
+}
+
 static void gs_plugin_loader_monitor_network (GsPluginLoader *plugin_loader);
 static void add_app_to_install_queue (GsPluginLoader *plugin_loader, GsApp *app);
 static gboolean remove_apps_from_install_queue (GsPluginLoader *plugin_loader, GsAppList *apps);
@@ -629,22 +664,110 @@ gs_plugin_loader_pending_apps_remove (GsPluginLoader *plugin_loader,
 	g_idle_add (emit_pending_apps_idle, g_object_ref (plugin_loader));
 }
 
+static gchar *
+get_install_queue_filename (void)
+{
+	return g_build_filename (g_get_user_data_dir (),
+				 "gnome-software",
+				 "install-queue",
+				 NULL);
+}
+
+/**
+ * gs_plugin_loader_replay_install_queue:
+ * @contents: contents of the install-queue file
+ * @out_n_lines: (out) (optional): return location for the number of entries
+ *   in the journal, including obsolete ones
+ *
+ * Replays the install-queue journal in @contents.
+ *
+ * The file is a journal: each line is a unique ID and component kind
+ * separated by a tab, prefixed with ‘+’ if the app was queued or ‘-’ if it
+ * was removed from the queue. Lines without a prefix are from older versions
+ * which rewrote the whole file, and are treated as ‘+’.
+ *
+ * Returns: (transfer full): wildcard apps which are still queued, in the
+ *   order they were first queued
+ * Since: 50
+ */
+GsAppList *
+gs_plugin_loader_replay_install_queue (const gchar *contents,
+                                       guint       *out_n_lines)
+{
+	g_auto(GStrv) lines = NULL;
+	g_autoptr(GsAppList) list = NULL;
+	g_autoptr(GHashTable) kinds = NULL;  /* (element-type utf8 AsComponentKind) */
+	g_autoptr(GPtrArray) order = NULL;  /* (element-type utf8) (not owned) */
+	guint n_lines = 0;
+
+	/* replay the journal, keeping the order in which apps were first queued */
+	kinds = g_hash_table_new (g_str_hash, g_str_equal);
+	order = g_ptr_array_new ();
+	lines = g_strsplit (contents, "\n", 0);
+	for (guint i = 0; lines[i] != NULL; i++) {
+		gchar *line = lines[i];
+		gchar *kind;
+		gboolean queued = TRUE;
+
+		if (line[0] == '+') {
+			line++;
+		} else if (line[0] == '-') {
+			queued = FALSE;
+			line++;
+		}
+
+		kind = strchr (line, '\t');
+		if (kind == NULL)
+			continue;
+		*kind++ = '\0';
+		n_lines++;
+
+		if (queued) {
+			g_hash_table_insert (kinds, line,
+					     GINT_TO_POINTER (as_component_kind_from_string (kind)));
+			g_ptr_array_add (order, line);
+		} else {
+			g_hash_table_remove (kinds, line);
+		}
+	}
+
+	/* add to GsAppList, deduplicating if required */
+	list = gs_app_list_new ();
+	for (guint i = 0; i < order->len; i++) {
+		const gchar *unique_id = g_ptr_array_index (order, i);
+		gpointer kind;
+		g_autoptr(GsApp) app = NULL;
+
+		if (!g_hash_table_steal_extended (kinds, unique_id, NULL, &kind))
+			continue;
+
+		app = gs_app_new (NULL);
+		gs_app_set_from_unique_id (app, unique_id, GPOINTER_TO_INT (kind));
+		gs_app_set_state (app, GS_APP_STATE_QUEUED_FOR_INSTALL);
+		gs_app_add_quirk (app, GS_APP_QUIRK_IS_WILDCARD);
+		gs_app_list_add (list, app);
+	}
+
+	if (out_n_lines != NULL)
+		*out_n_lines = n_lines;
+
+	return g_steal_pointer (&list);
+}
+
 /* This will load the install queue and add it to #GsPluginLoader.pending_apps,
- * but it won’t refine the loaded apps. */
+ * but it won’t refine the loaded apps. See
+ * gs_plugin_loader_replay_install_queue() for the file format. */
 static GsAppList *
 load_install_queue (GsPluginLoader  *plugin_loader,
                     GError         **error)
 {
 	g_autofree gchar *contents = NULL;
 	g_autofree gchar *file = NULL;
-	g_auto(GStrv) names = NULL;
 	g_autoptr(GsAppList) list = NULL;
+	guint n_lines = 0;
 
 	/* load from file */
-	file = g_build_filename (g_get_user_data_dir (),
-				 "gnome-software",
-				 "install-queue",
-				 NULL);
+	file = get_install_queue_filename ();
 	if (!g_file_test (file, G_FILE_TEST_EXISTS))
 		return gs_app_list_new ();
 
@@ -652,23 +775,11 @@ load_install_queue (GsPluginLoader  *plugin_loader,
 	if (!g_file_get_contents (file, &contents, NULL, error))
 		return NULL;
 
-	/* add to GsAppList, deduplicating if required */
-	list = gs_app_list_new ();
-	names = g_strsplit (contents, "\n", 0);
-	for (guint i = 0; names[i] != NULL; i++) {
-		g_autoptr(GsApp) app = NULL;
-		g_auto(GStrv) split = g_strsplit (names[i], "\t", -1);
-		if (split[0] == NULL || split[1] == NULL)
-			continue;
-		app = gs_app_new (NULL);
-		gs_app_set_from_unique_id (app, split[0], as_component_kind_from_string (split[1]));
-		gs_app_set_state (app, GS_APP_STATE_QUEUED_FOR_INSTALL);
-		gs_app_add_quirk (app, GS_APP_QUIRK_IS_WILDCARD);
-		gs_app_list_add (list, app);
-	}
+	list = gs_plugin_loader_replay_install_queue (contents, &n_lines);
 
 	/* add to pending list */
 	g_mutex_lock (&plugin_loader->pending_apps_mutex);
+	plugin_loader->install_queue_journal_lines = n_lines;
 	for (guint i = 0; i < gs_app_list_length (list); i++) {
 		GsApp *app = gs_app_list_index (list, i);
 		g_debug ("adding pending app %s", gs_app_get_unique_id (app));
@@ -682,32 +793,43 @@ load_install_queue (GsPluginLoader  *plugin_loader,
 }
 
 static void
-save_install_queue (GsPluginLoader *plugin_loader)
+append_install_queue_entry (GString *s,
+                            GsApp   *app,
+                            gchar    prefix)
+{
+	if (prefix != '\0')
+		g_string_append_c (s, prefix);
+	g_string_append (s, gs_app_get_unique_id (app));
+	g_string_append_c (s, '\t');
+	g_string_append (s, as_component_kind_to_string (gs_app_get_kind (app)));
+	g_string_append_c (s, '\n');
+}
+
+/* Rewrites the install queue file with only the currently queued apps,
+ * compacting the journal. The caller must hold pending_apps_mutex, so the
+ * file always matches #GsPluginLoader.pending_apps. */
+static void
+save_install_queue_locked (GsPluginLoader *plugin_loader)
 {
 	gboolean ret;
+	guint n_queued = 0;
 	g_autoptr(GError) error = NULL;
 	g_autoptr(GString) s = NULL;
 	g_autofree gchar *file = NULL;
 
 	s = g_string_new ("");
-	g_mutex_lock (&plugin_loader->pending_apps_mutex);
 	for (guint i = 0; plugin_loader->pending_apps != NULL && i < gs_app_list_length (plugin_loader->pending_apps); i++) {
 		GsApp *app = gs_app_list_index (plugin_loader->pending_apps, i);
 		if (gs_app_get_state (app) == GS_APP_STATE_QUEUED_FOR_INSTALL &&
 		    gs_app_get_unique_id (app) != NULL) {
-			g_string_append (s, gs_app_get_unique_id (app));
-			g_string_append_c (s, '\t');
-			g_string_append (s, as_component_kind_to_string (gs_app_get_kind (app)));
-			g_string_append_c (s, '\n');
+			append_install_queue_entry (s, app, '+');
+			n_queued++;
 		}
 	}
-	g_mutex_unlock (&plugin_loader->pending_apps_mutex);
 
 	/* save file */
-	file = g_build_filename (g_get_user_data_dir (),
-				 "gnome-software",
-				 "install-queue",
-				 NULL);
+	file = get_install_queue_filename ();
+	plugin_loader->install_queue_journal_lines = 0;
 	if (s->len == 0) {
 		if (g_unlink (file) == -1 && errno != ENOENT) {
 			gint errn = errno;
@@ -725,31 +847,96 @@ save_install_queue (GsPluginLoader *plugin_loader)
 	ret = g_file_set_contents (file, s->str, (gssize) s->len, &error);
 	if (!ret)
 		g_warning ("failed to save install queue: %s", error->message);
+	else
+		plugin_loader->install_queue_journal_lines = n_queued;
+}
+
+static void
+save_install_queue (GsPluginLoader *plugin_loader)
+{
+	g_autoptr(GMutexLocker) locker = g_mutex_locker_new (&plugin_loader->pending_apps_mutex);
+
+	save_install_queue_locked (plugin_loader);
+}
+
+/* Records @apps as being queued (if @queued is %TRUE) or dequeued in the
+ * install queue journal, without rewriting the entries already in it. Once
+ * the journal has accumulated enough obsolete lines, it’s compacted.
+ *
+ * The caller must hold pending_apps_mutex, and must have already updated
+ * #GsPluginLoader.pending_apps, so that journal entries are written in the
+ * same order as the changes they record. */
+static void
+journal_install_queue_locked (GsPluginLoader *plugin_loader,
+                              GsAppList      *apps,
+                              gboolean        queued)
+{
+	g_autoptr(GString) s = g_string_new ("");
+	g_autofree gchar *file = NULL;
+	g_autoptr(GFile) queue_file = NULL;
+	g_autoptr(GFileOutputStream) stream = NULL;
+	g_autoptr(GError) error = NULL;
+	guint n_lines = 0;
+	guint n_queued;
+
+	for (guint i = 0; i < gs_app_list_length (apps); i++) {
+		GsApp *app = gs_app_list_index (apps, i);
+		if (gs_app_get_unique_id (app) == NULL)
+			continue;
+		append_install_queue_entry (s, app, queued ? '+' : '-');
+		n_lines++;
+	}
+	if (n_lines == 0)
+		return;
+
+	n_queued = (plugin_loader->pending_apps != NULL) ? gs_app_list_length (plugin_loader->pending_apps) : 0;
+	if (n_queued == 0 ||
+	    plugin_loader->install_queue_journal_lines + n_lines > 2 * n_queued + INSTALL_QUEUE_JOURNAL_SLACK) {
+		save_install_queue_locked (plugin_loader);
+		return;
+	}
+
+	file = get_install_queue_filename ();
+	queue_file = g_file_new_for_path (file);
+
+	if (gs_mkdir_parent (file, &error))
+		stream = g_file_append_to (queue_file, G_FILE_CREATE_NONE, NULL, &error);
+	if (stream == NULL ||
+	    !g_output_stream_write_all (G_OUTPUT_STREAM (stream), s->str, s->len, NULL, NULL, &error) ||
+	    !g_output_stream_close (G_OUTPUT_STREAM (stream), NULL, &error)) {
+		g_debug ("failed to append to install queue, rewriting it: %s", error->message);
+		save_install_queue_locked (plugin_loader);
+		return;
+	}
+
+	plugin_loader->install_queue_journal_lines += n_lines;
 }
 
 static void
 add_app_to_install_queue (GsPluginLoader *plugin_loader, GsApp *app)
 {
 	g_autoptr(GsAppList) addons = NULL;
+	g_autoptr(GsAppList) queued_apps = NULL;
 	g_autoptr(GSource) source = NULL;
 	guint i;
 
 	/* queue the app itself */
+	queued_apps = gs_app_list_new ();
+	gs_app_list_add (queued_apps, app);
+
 	g_mutex_lock (&plugin_loader->pending_apps_mutex);
 	if (plugin_loader->pending_apps == NULL)
 		plugin_loader->pending_apps = gs_app_list_new ();
 	gs_app_list_add (plugin_loader->pending_apps, app);
-	g_mutex_unlock (&plugin_loader->pending_apps_mutex);
-
 	gs_app_set_state (app, GS_APP_STATE_QUEUED_FOR_INSTALL);
+	journal_install_queue_locked (plugin_loader, queued_apps, TRUE);
+	g_mutex_unlock (&plugin_loader->pending_apps_mutex);
 
 	source = g_idle_source_new ();
 	g_source_set_callback (source, emit_pending_apps_idle, g_object_ref (plugin_loader), NULL);
 	g_source_set_name (source, "[gnome-software] emit_pending_apps_idle");
 	g_source_attach (source, NULL);
 
-	save_install_queue (plugin_loader);
-
 	/* recursively queue any addons */
 	addons = gs_app_dup_addons (app);
 	for (i = 0; addons != NULL && i < gs_app_list_length (addons); i++) {
@@ -780,6 +967,8 @@ remove_apps_from_install_queue (GsPluginLoader *plugin_loader, GsAppList *apps)
 			all_removed = FALSE;
 		}
 	}
+	if (any_removed)
+		journal_install_queue_locked (plugin_loader, removed_apps, FALSE);
 	g_mutex_unlock (&plugin_loader->pending_apps_mutex);
 
 	if (any_removed) {
@@ -796,8 +985,6 @@ remove_apps_from_install_queue (GsPluginLoader *plugin_loader, GsAppList *apps)
 		g_source_set_name (source, "[gnome-software] emit_pending_apps_idle");
 		g_source_attach (source, NULL);
 
-		save_install_queue (plugin_loader);
-
 		/* recursively remove any queued addons */
 		for (guint i = 0; i < gs_app_list_length (removed_apps); i++) {
 			GsApp *app = gs_app_list_index (removed_apps, i);
@@ -831,6 +1018,122 @@ gs_plugin_loader_get_allow_updates (GsPluginLoader *plugin_loader)
 	return FALSE;
 }
 
+/**
+ * gs_plugin_loader_dup_updates_stamp:
+ * @plugin_loader: a #GsPluginLoader
+ *
+ * Combine the #GsPluginClass.get_updates_stamp of all enabled plugins which
+ * can list apps into a single stamp. If two stamps returned by this function
+ * are equal, listing updates would return the same results both times, so the
+ * caller can avoid repeating the query.
+ *
+ * This is cheap to call and does not block on network access.
+ *
+ * Returns: (transfer full) (nullable): a stamp, or %NULL if any plugin
+ *   cannot tell whether its updates have changed
+ * Since: 50
+ */
+gchar *
+gs_plugin_loader_dup_updates_stamp (GsPluginLoader *plugin_loader)
+{
+	g_autoptr(GString) stamp = g_string_new (NULL);
+
+	g_return_val_if_fail (GS_IS_PLUGIN_LOADER (plugin_loader), NULL);
+
+	for (guint i = 0; i < plugin_loader->plugins->len; i++) {
+		GsPlugin *plugin = g_ptr_array_index (plugin_loader->plugins, i);
+		GsPluginClass *plugin_class = GS_PLUGIN_GET_CLASS (plugin);
+		g_autofree gchar *plugin_stamp = NULL;
+
+		if (!gs_plugin_get_enabled (plugin))
+			continue;
+		if (plugin_class->list_apps_async == NULL)
+			continue;
+
+		if (plugin_class->get_updates_stamp != NULL)
+			plugin_stamp = plugin_class->get_updates_stamp (plugin);
+		if (plugin_stamp == NULL) {
+			g_debug ("no updates stamp from %s", gs_plugin_get_name (plugin));
+			return NULL;
+		}
+
+		g_string_append_printf (stamp, "%s:%s\n",
+					gs_plugin_get_name (plugin), plugin_stamp);
+	}
+
+	return g_string_free (g_steal_pointer (&stamp), FALSE);
+}
+
+/**
+ * gs_plugin_loader_release_memory:
+ * @plugin_loader: a #GsPluginLoader
+ * @level: how severe the memory pressure is
+ *
+ * Release memory which can be rebuilt lazily the next time it’s needed.
+ * This is called automatically when the #GMemoryMonitor warns about low
+ * memory, but can also be called directly.
+ *
+ * Each enabled plugin is asked to release memory at every @level, using
+ * #GsPluginClass.release_memory. From %G_MEMORY_MONITOR_WARNING_LEVEL_MEDIUM,
+ * the ODRS ratings and the parsed desktop files are also dropped, as are
+ * cached apps which nothing else is using and which can be rebuilt from
+ * metadata. At %G_MEMORY_MONITOR_WARNING_LEVEL_CRITICAL, freed heap memory
+ * is also returned to the OS where supported.
+ *
+ * Returns: an estimate of the number of bytes released; this does not
+ *   include pruned apps, which are only counted in the debug output
+ * Since: 50
+ */
+gsize
+gs_plugin_loader_release_memory (GsPluginLoader             *plugin_loader,
+                                 GMemoryMonitorWarningLevel  level)
+{
+	gsize n_bytes = 0;
+	guint n_apps = 0;
+
+	g_return_val_if_fail (GS_IS_PLUGIN_LOADER (plugin_loader), 0);
+
+	for (guint i = 0; i < plugin_loader->plugins->len; i++) {
+		GsPlugin *plugin = g_ptr_array_index (plugin_loader->plugins, i);
+		GsPluginClass *plugin_class = GS_PLUGIN_GET_CLASS (plugin);
+
+		if (!gs_plugin_get_enabled (plugin))
+			continue;
+
+		if (plugin_class->release_memory != NULL)
+			n_bytes += plugin_class->release_memory (plugin, level);
+		if (level >= G_MEMORY_MONITOR_WARNING_LEVEL_MEDIUM)
+			n_apps += gs_plugin_cache_prune_unused (plugin);
+	}
+
+	if (level >= G_MEMORY_MONITOR_WARNING_LEVEL_MEDIUM &&
+	    plugin_loader->odrs_provider != NULL)
+		n_bytes += gs_odrs_provider_release_memory (plugin_loader->odrs_provider);
+	if (level >= G_MEMORY_MONITOR_WARNING_LEVEL_MEDIUM)
+		n_bytes += gs_appstream_clear_desktop_file_cache ();
+
+#ifdef __GLIBC__
+	if (level >= G_MEMORY_MONITOR_WARNING_LEVEL_CRITICAL)
+		malloc_trim (0);
+#endif
+
+	g_debug ("released about %" G_GSIZE_FORMAT " bytes and %u cached apps "
+		 "for memory pressure level %u",
+		 n_bytes, n_apps, (guint) level);
+
+	return n_bytes;
+}
+
+static void
+gs_plugin_loader_low_memory_warning_cb (GMemoryMonitor             *monitor,
+                                        GMemoryMonitorWarningLevel  level,
+                                        gpointer                    user_data)
+{
+	GsPluginLoader *plugin_loader = GS_PLUGIN_LOADER (user_data);
+
+	gs_plugin_loader_release_memory (plugin_loader, level);
+}
+
 GsAppList *
 gs_plugin_loader_get_pending (GsPluginLoader *plugin_loader)
 {
@@ -1350,6 +1653,7 @@ gs_plugin_loader_shutdown (GsPluginLoader *plugin_loader,
 	/* Clear some internal data structures. */
 	gs_plugin_loader_remove_all_plugins (plugin_loader);
 	gs_plugin_loader_remove_all_file_monitors (plugin_loader);
+	g_hash_table_remove_all (plugin_loader->deferred_setup_plugins);
 	plugin_loader->setup_complete = FALSE;
 	g_clear_object (&plugin_loader->setup_complete_cancellable);
 	plugin_loader->setup_complete_cancellable = g_cancellable_new ();
@@ -1407,6 +1711,8 @@ typedef struct {
 	guint n_pending;
 	gchar **allowlist;
 	gchar **blocklist;
+	StartupTimelineEntry *bus_entry;  /* (unowned) */
+	GHashTable *plugin_entries;  /* (owned) (element-type GsPlugin StartupTimelineEntry) */
 #ifdef HAVE_SYSPROF
 	gint64 setup_begin_time_nsec;
 	gint64 plugins_begin_time_nsec;
@@ -1418,6 +1724,7 @@ setup_data_free (SetupData *data)
 {
 	g_clear_pointer (&data->allowlist, g_strfreev);
 	g_clear_pointer (&data->blocklist, g_strfreev);
+	g_clear_pointer (&data->plugin_entries, g_hash_table_unref);
 	g_free (data);
 }
 
@@ -1433,17 +1740,52 @@ static void finish_setup_get_bus (GTask *task);
 static void plugin_setup_cb (GObject      *source_object,
                              GAsyncResult *result,
                              gpointer      user_data);
+static void plugin_setup_deferred_cb (GObject      *source_object,
+                                      GAsyncResult *result,
+                                      gpointer      user_data);
 static void finish_setup_op (GTask *task);
 static void finish_setup_install_queue_cb (GObject      *source_object,
                                            GAsyncResult *result,
                                            gpointer      user_data);
 
+/* Start a new entry in the startup timeline. The returned entry is owned by
+ * the timeline. */
+static StartupTimelineEntry *
+startup_timeline_begin (GsPluginLoader *plugin_loader,
+                        const gchar    *kind,
+                        const gchar    *name)
+{
+	StartupTimelineEntry *entry = g_new0 (StartupTimelineEntry, 1);
+
+	entry->kind = kind;
+	entry->name = g_strdup (name);
+	entry->status = "running";
+	entry->begin_time_usec = g_get_monotonic_time ();
+	g_ptr_array_add (plugin_loader->startup_timeline, entry);
+
+	return entry;
+}
+
+static void
+startup_timeline_end (StartupTimelineEntry *entry,
+                      const gchar          *status)
+{
+	entry->status = status;
+	entry->end_time_usec = g_get_monotonic_time ();
+}
+
 /* Mark the asynchronous setup operation as complete. This will notify any
  * waiting tasks by cancelling the #GCancellable. It’s safe to clear the
  * #GCancellable as each waiting task holds its own reference. */
 static void
 notify_setup_complete (GsPluginLoader *plugin_loader)
 {
+	StartupTimelineEntry *entry;
+
+	entry = startup_timeline_begin (plugin_loader, "stage", "setup-complete");
+	entry->begin_time_usec = plugin_loader->setup_begin_time_usec;
+	startup_timeline_end (entry, "done");
+
 	plugin_loader->setup_complete = TRUE;
 	g_cancellable_cancel (plugin_loader->setup_complete_cancellable);
 	g_clear_object (&plugin_loader->setup_complete_cancellable);
@@ -1486,10 +1828,16 @@ gs_plugin_loader_setup_async (GsPluginLoader      *plugin_loader,
 		return;
 	}
 
+	/* Start a new startup timeline. */
+	plugin_loader->setup_begin_time_usec = g_get_monotonic_time ();
+	g_ptr_array_set_size (plugin_loader->startup_timeline, 0);
+
 	/* Setup data closure. */
 	setup_data = setup_data_owned = g_new0 (SetupData, 1);
 	setup_data->allowlist = g_strdupv ((gchar **) allowlist);
 	setup_data->blocklist = g_strdupv ((gchar **) blocklist);
+	setup_data->bus_entry = startup_timeline_begin (plugin_loader, "stage", "bus-connections");
+	setup_data->plugin_entries = g_hash_table_new (NULL, NULL);
 #ifdef HAVE_SYSPROF
 	setup_data->setup_begin_time_nsec = begin_time_nsec;
 #endif
@@ -1564,6 +1912,7 @@ finish_setup_get_bus (GTask *task)
 	guint dep_loop_check = 0;
 	guint i;
 	guint j;
+	StartupTimelineEntry *load_entry;
 	g_autoptr(GPtrArray) locations = NULL;
 	g_autoptr(GError) local_error = NULL;
 
@@ -1572,6 +1921,9 @@ finish_setup_get_bus (GTask *task)
 	    plugin_loader->system_bus_connection == NULL)
 		return;
 
+	startup_timeline_end (data->bus_entry, "done");
+	load_entry = startup_timeline_begin (plugin_loader, "stage", "load-plugins");
+
 	/* use the default, but this requires a 'make install' */
 	if (plugin_loader->locations->len == 0) {
 		g_autofree gchar *filename = NULL;
@@ -1774,19 +2126,43 @@ finish_setup_get_bus (GTask *task)
 		}
 	} while (changes);
 
-	/* run setup */
+	startup_timeline_end (load_entry, "done");
+
+	/* run setup
+	 *
+	 * The setup of all plugins is started at once and runs concurrently;
+	 * ordering rules only affect the order in which plugins are run for
+	 * jobs. Plugins which have opted in to deferred setup don’t block
+	 * completion of the setup operation: they are kept disabled until their
+	 * setup finishes, and are then enabled and a reload is triggered. */
 	data->n_pending = 1;  /* incremented until all operations have been started */
 #ifdef HAVE_SYSPROF
 	data->plugins_begin_time_nsec = SYSPROF_CAPTURE_CURRENT_TIME;
 #endif
 
 	for (i = 0; i < plugin_loader->plugins->len; i++) {
+		StartupTimelineEntry *entry;
+
 		plugin = GS_PLUGIN (plugin_loader->plugins->pdata[i]);
 
 		if (!gs_plugin_get_enabled (plugin))
 			continue;
 
-		if (GS_PLUGIN_GET_CLASS (plugin)->setup_async != NULL) {
+		if (GS_PLUGIN_GET_CLASS (plugin)->setup_async == NULL)
+			continue;
+
+		if (gs_plugin_get_setup_deferrable (plugin)) {
+			entry = startup_timeline_begin (plugin_loader, "plugin-deferred",
+							gs_plugin_get_name (plugin));
+			g_hash_table_insert (plugin_loader->deferred_setup_plugins, plugin, entry);
+			gs_plugin_set_enabled (plugin, FALSE);
+			GS_PLUGIN_GET_CLASS (plugin)->setup_async (plugin, cancellable,
+								   plugin_setup_deferred_cb,
+								   g_object_ref (plugin_loader));
+		} else {
+			entry = startup_timeline_begin (plugin_loader, "plugin",
+							gs_plugin_get_name (plugin));
+			g_hash_table_insert (data->plugin_entries, plugin, entry);
 			data->n_pending++;
 			GS_PLUGIN_GET_CLASS (plugin)->setup_async (plugin, cancellable,
 								   plugin_setup_cb, g_object_ref (task));
@@ -1803,18 +2179,22 @@ plugin_setup_cb (GObject      *source_object,
 {
 	GsPlugin *plugin = GS_PLUGIN (source_object);
 	g_autoptr(GTask) task = g_steal_pointer (&user_data);
-	g_autoptr(GError) local_error = NULL;
-#ifdef HAVE_SYSPROF
 	SetupData *data = g_task_get_task_data (task);
-#endif
+	StartupTimelineEntry *entry;
+	g_autoptr(GError) local_error = NULL;
 
 	g_assert (GS_PLUGIN_GET_CLASS (plugin)->setup_finish != NULL);
 
+	entry = g_hash_table_lookup (data->plugin_entries, plugin);
+
 	if (!GS_PLUGIN_GET_CLASS (plugin)->setup_finish (plugin, result, &local_error)) {
 		g_debug ("disabling %s as setup failed: %s",
 			 gs_plugin_get_name (plugin),
 			 local_error->message);
 		gs_plugin_set_enabled (plugin, FALSE);
+		startup_timeline_end (entry, "failed");
+	} else {
+		startup_timeline_end (entry, "ok");
 	}
 
 	GS_PROFILER_ADD_MARK (PluginLoader,
@@ -1825,12 +2205,51 @@ plugin_setup_cb (GObject      *source_object,
 	finish_setup_op (task);
 }
 
+static void
+plugin_setup_deferred_cb (GObject      *source_object,
+                          GAsyncResult *result,
+                          gpointer      user_data)
+{
+	GsPlugin *plugin = GS_PLUGIN (source_object);
+	g_autoptr(GsPluginLoader) plugin_loader = g_steal_pointer (&user_data);
+	StartupTimelineEntry *entry;
+	gboolean success;
+	g_autoptr(GError) local_error = NULL;
+
+	g_assert (GS_PLUGIN_GET_CLASS (plugin)->setup_finish != NULL);
+
+	success = GS_PLUGIN_GET_CLASS (plugin)->setup_finish (plugin, result, &local_error);
+
+	/* The plugin loader may have been shut down in the meantime, in which
+	 * case the plugin must stay disabled. */
+	entry = g_hash_table_lookup (plugin_loader->deferred_setup_plugins, plugin);
+	if (entry == NULL)
+		return;
+
+	startup_timeline_end (entry, success ? "ok" : "failed");
+	g_hash_table_remove (plugin_loader->deferred_setup_plugins, plugin);
+
+	if (!success) {
+		g_debug ("disabling %s as deferred setup failed: %s",
+			 gs_plugin_get_name (plugin),
+			 local_error->message);
+		return;
+	}
+
+	/* The plugin is now ready; enable it and let the UI know that it may
+	 * have new results. */
+	g_debug ("deferred setup of %s complete", gs_plugin_get_name (plugin));
+	gs_plugin_set_enabled (plugin, TRUE);
+	gs_plugin_reload (plugin);
+}
+
 static void
 finish_setup_op (GTask *task)
 {
 	SetupData *data = g_task_get_task_data (task);
 	GsPluginLoader *plugin_loader = g_task_get_source_object (task);
 	GCancellable *cancellable = g_task_get_cancellable (task);
+	StartupTimelineEntry *entry;
 	g_autoptr(GsAppList) install_queue = NULL;
 	g_autoptr(GError) local_error = NULL;
 
@@ -1841,7 +2260,9 @@ finish_setup_op (GTask *task)
 		return;
 
 	/* now we can load the install-queue */
+	entry = startup_timeline_begin (plugin_loader, "stage", "load-install-queue");
 	install_queue = load_install_queue (plugin_loader, &local_error);
+	startup_timeline_end (entry, (install_queue != NULL) ? "done" : "failed");
 	if (install_queue == NULL) {
 		notify_setup_complete (plugin_loader);
 		g_task_return_error (task, g_steal_pointer (&local_error));
@@ -1975,6 +2396,63 @@ gs_plugin_loader_dump_state (GsPluginLoader *plugin_loader)
 		g_string_truncate (str_disabled, str_disabled->len - 2);
 	g_info ("enabled plugins: %s", str_enabled->str);
 	g_info ("disabled plugins: %s", str_disabled->str);
+
+	/* print the startup timeline */
+	for (guint i = 0; i < plugin_loader->startup_timeline->len; i++) {
+		const StartupTimelineEntry *entry = g_ptr_array_index (plugin_loader->startup_timeline, i);
+		gint64 offset_usec = entry->begin_time_usec - plugin_loader->setup_begin_time_usec;
+
+		if (entry->end_time_usec == 0) {
+			g_info ("startup: +%" G_GINT64_FORMAT "ms\t%s %s: %s",
+				offset_usec / 1000,
+				entry->kind, entry->name, entry->status);
+		} else {
+			g_info ("startup: +%" G_GINT64_FORMAT "ms\t%s %s: %s after %" G_GINT64_FORMAT "ms",
+				offset_usec / 1000,
+				entry->kind, entry->name, entry->status,
+				(entry->end_time_usec - entry->begin_time_usec) / 1000);
+		}
+	}
+}
+
+/**
+ * gs_plugin_loader_get_startup_timeline:
+ * @plugin_loader: a #GsPluginLoader
+ *
+ * Get a timeline of the most recent gs_plugin_loader_setup_async() call.
+ *
+ * The timeline is a list of entries of type `(sssxx)`, one for each setup
+ * stage and each plugin which was set up, in the order they were started.
+ * The members are:
+ *  - the kind of entry: `stage`, `plugin` or `plugin-deferred`
+ *  - the name of the stage or plugin
+ *  - the status of the entry, such as `running`, `ok` or `failed`
+ *  - the offset in microseconds from the start of setup to the start of
+ *    the entry
+ *  - the duration of the entry in microseconds, or `-1` if it’s still running
+ *
+ * Returns: (transfer full): a floating #GVariant of type `a(sssxx)`
+ * Since: 50
+ */
+GVariant *
+gs_plugin_loader_get_startup_timeline (GsPluginLoader *plugin_loader)
+{
+	g_auto(GVariantBuilder) builder = G_VARIANT_BUILDER_INIT (G_VARIANT_TYPE ("a(sssxx)"));
+
+	g_return_val_if_fail (GS_IS_PLUGIN_LOADER (plugin_loader), NULL);
+
+	for (guint i = 0; i < plugin_loader->startup_timeline->len; i++) {
+		const StartupTimelineEntry *entry = g_ptr_array_index (plugin_loader->startup_timeline, i);
+
+		g_variant_builder_add (&builder, "(sssxx)",
+				       entry->kind,
+				       entry->name,
+				       entry->status,
+				       entry->begin_time_usec - plugin_loader->setup_begin_time_usec,
+				       (entry->end_time_usec != 0) ? entry->end_time_usec - entry->begin_time_usec : -1);
+	}
+
+	return g_variant_builder_end (&builder);
 }
 
 static void
@@ -2072,6 +2550,12 @@ gs_plugin_loader_dispose (GObject *object)
 	}
 	g_clear_object (&plugin_loader->network_monitor);
 	g_clear_object (&plugin_loader->power_profile_monitor);
+	if (plugin_loader->low_memory_warning_handler != 0) {
+		g_signal_handler_disconnect (plugin_loader->memory_monitor,
+					     plugin_loader->low_memory_warning_handler);
+		plugin_loader->low_memory_warning_handler = 0;
+	}
+	g_clear_object (&plugin_loader->memory_monitor);
 	g_clear_object (&plugin_loader->settings);
 	g_clear_object (&plugin_loader->pending_apps);
 	g_clear_object (&plugin_loader->job_manager);
@@ -2097,6 +2581,8 @@ gs_plugin_loader_finalize (GObject *object)
 	g_ptr_array_unref (plugin_loader->file_monitors);
 	g_hash_table_unref (plugin_loader->events_by_id);
 	g_hash_table_unref (plugin_loader->disallow_updates);
+	g_ptr_array_unref (plugin_loader->startup_timeline);
+	g_hash_table_unref (plugin_loader->deferred_setup_plugins);
 
 	g_mutex_clear (&plugin_loader->pending_apps_mutex);
 	g_mutex_clear (&plugin_loader->events_by_id_mutex);
@@ -2268,6 +2754,8 @@ gs_plugin_loader_init (GsPluginLoader *plugin_loader)
 	plugin_loader->pending_apps = NULL;
 	plugin_loader->file_monitors = g_ptr_array_new_with_free_func (g_object_unref);
 	plugin_loader->locations = g_ptr_array_new_with_free_func (g_free);
+	plugin_loader->startup_timeline = g_ptr_array_new_with_free_func ((GDestroyNotify) startup_timeline_entry_free);
+	plugin_loader->deferred_setup_plugins = g_hash_table_new (NULL, NULL);
 	plugin_loader->settings = g_settings_new ("org.gnome.software");
 	g_signal_connect (plugin_loader->settings, "changed",
 			  G_CALLBACK (gs_plugin_loader_settings_changed_cb), plugin_loader);
@@ -2343,6 +2831,14 @@ gs_plugin_loader_init (GsPluginLoader *plugin_loader)
 
 	plugin_loader->power_profile_monitor = g_power_profile_monitor_dup_default ();
 
+	/* we run as a long-lived service, so give memory back when asked */
+	plugin_loader->memory_monitor = g_memory_monitor_dup_default ();
+	if (plugin_loader->memory_monitor != NULL) {
+		plugin_loader->low_memory_warning_handler =
+			g_signal_connect (plugin_loader->memory_monitor, "low-memory-warning",
+					  G_CALLBACK (gs_plugin_loader_low_memory_warning_cb), plugin_loader);
+	}
+
 	/* by default we only show project-less apps or compatible projects */
 	tmp = g_getenv ("GNOME_SOFTWARE_COMPATIBLE_PROJECTS");
 	if (tmp == NULL) {
@@ -2476,7 +2972,9 @@ gs_plugin_loader_pending_apps_refined_cb (GObject      *source,
 	g_autoptr(GsPluginJobRefine) refine_job = NULL;
 	GsAppList *refined_queue;
 	g_autoptr(GsAppList) to_remove = NULL;
-	g_autoptr(GsAppList) to_install = NULL;
+	g_autoptr(GHashTable) to_install_by_plugin = NULL;  /* (element-type GsPlugin GsAppList) */
+	GHashTableIter iter;
+	gpointer key, value;
 	g_autoptr(GError) error = NULL;
 
 	if (!gs_plugin_loader_job_process_finish (plugin_loader, res, (GsPluginJob **) &refine_job, &error)) {
@@ -2508,8 +3006,11 @@ gs_plugin_loader_pending_apps_refined_cb (GObject      *source,
 	if (gs_app_list_length (to_remove) > 0)
 		remove_apps_from_install_queue (plugin_loader, to_remove);
 
-	/* Install apps */
-	to_install = gs_app_list_new ();
+	/* Install apps, batched by the plugin which manages them so that each
+	 * backend can install its apps in a single transaction (resolving and
+	 * downloading shared dependencies once), and so a failure in one backend
+	 * doesn’t fail the apps queued for the others */
+	to_install_by_plugin = g_hash_table_new_full (NULL, NULL, NULL, g_object_unref);
 
 	for (guint i = 0; i < gs_app_list_length (refined_queue); i++) {
 		GsApp *app = gs_app_list_index (refined_queue, i);
@@ -2527,20 +3028,33 @@ gs_plugin_loader_pending_apps_refined_cb (GObject      *source,
 							    gs_plugin_loader_apps_installed_cb,
 							    g_steal_pointer (&single_element_app_list));
 		} else {
+			g_autoptr(GsPlugin) management_plugin = gs_app_dup_management_plugin (app);
+			GsAppList *to_install = g_hash_table_lookup (to_install_by_plugin, management_plugin);
+
+			if (to_install == NULL) {
+				to_install = gs_app_list_new ();
+				g_hash_table_insert (to_install_by_plugin, management_plugin, to_install);
+			}
 			gs_app_list_add (to_install, app);
 		}
 	}
 
-	if (gs_app_list_length (to_install) > 0) {
+	g_hash_table_iter_init (&iter, to_install_by_plugin);
+	while (g_hash_table_iter_next (&iter, &key, &value)) {
+		GsAppList *to_install = value;
 		g_autoptr(GsPluginJob) plugin_job = NULL;
 
+		g_debug ("installing %u queued apps managed by %s",
+			 gs_app_list_length (to_install),
+			 (key != NULL) ? gs_plugin_get_name (key) : "(unknown)");
+
 		/* The 'interactive' is needed for credentials prompt, otherwise it just fails */
 		plugin_job = gs_plugin_job_install_apps_new (to_install,
 							     GS_PLUGIN_INSTALL_APPS_FLAGS_INTERACTIVE);
 		gs_plugin_loader_job_process_async (plugin_loader, plugin_job,
 						    plugin_loader->pending_apps_cancellable,
 						    gs_plugin_loader_apps_installed_cb,
-						    g_steal_pointer (&to_install));
+						    g_object_ref (to_install));
 	}
 
 	g_clear_object (&plugin_loader->pending_apps_cancellable);
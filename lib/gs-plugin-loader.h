@@ -51,6 +51,7 @@ void		 gs_plugin_loader_shutdown		(GsPluginLoader	*plugin_loader,
 							 GCancellable	*cancellable);
 
 void		 gs_plugin_loader_dump_state		(GsPluginLoader	*plugin_loader);
+GVariant	*gs_plugin_loader_get_startup_timeline	(GsPluginLoader	*plugin_loader);
 gboolean	 gs_plugin_loader_get_enabled		(GsPluginLoader	*plugin_loader,
 							 const gchar	*plugin_name);
 void		 gs_plugin_loader_add_location		(GsPluginLoader	*plugin_loader,
@@ -64,6 +65,9 @@ gboolean	 gs_plugin_loader_get_network_available	(GsPluginLoader *plugin_loader)
 gboolean	 gs_plugin_loader_get_network_metered	(GsPluginLoader *plugin_loader);
 gboolean	 gs_plugin_loader_get_power_saver	(GsPluginLoader *plugin_loader);
 gboolean	 gs_plugin_loader_get_game_mode		(GsPluginLoader *plugin_loader);
+gchar		*gs_plugin_loader_dup_updates_stamp	(GsPluginLoader	*plugin_loader);
+gsize		 gs_plugin_loader_release_memory	(GsPluginLoader	*plugin_loader,
+							 GMemoryMonitorWarningLevel level);
 
 GPtrArray	*gs_plugin_loader_get_plugins		(GsPluginLoader	*plugin_loader);
 
@@ -38,5 +38,6 @@ gchar		*gs_plugin_refine_flags_to_string	(GsPluginRefineFlags refine_flags);
 gchar		*gs_plugin_refine_require_flags_to_string	(GsPluginRefineRequireFlags require_flags);
 void		 gs_plugin_set_network_monitor		(GsPlugin		*plugin,
 							 GNetworkMonitor	*monitor);
+guint		 gs_plugin_cache_prune_unused		(GsPlugin		*plugin);
 
 G_END_DECLS
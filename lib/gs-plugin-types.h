@@ -275,6 +275,13 @@ typedef enum {
  *   and error if they don’t exist.
  * @GS_PLUGIN_UPDATE_APPS_FLAGS_NO_APPLY: Only download the resources, and don’t
  *   apply the updates.
+ * @GS_PLUGIN_UPDATE_APPS_FLAGS_PIPELINED: Download and apply apps one at a
+ *   time, so downloading later apps overlaps with applying earlier ones. This
+ *   is handled by #GsPluginJobUpdateApps, which only passes it to plugins
+ *   which support it, together with
+ *   %GS_PLUGIN_UPDATE_APPS_FLAGS_NO_APPLY or
+ *   %GS_PLUGIN_UPDATE_APPS_FLAGS_NO_DOWNLOAD to select a stage. See
+ *   gs_plugin_set_pipelined_updates(). (Since: 50)
  *
  * Flags for an operation to download or update apps.
  *
@@ -285,6 +292,7 @@ typedef enum {
 	GS_PLUGIN_UPDATE_APPS_FLAGS_INTERACTIVE = 1 << 0,
 	GS_PLUGIN_UPDATE_APPS_FLAGS_NO_DOWNLOAD = 1 << 1,
 	GS_PLUGIN_UPDATE_APPS_FLAGS_NO_APPLY = 1 << 2,
+	GS_PLUGIN_UPDATE_APPS_FLAGS_PIPELINED = 1 << 3,
 } GsPluginUpdateAppsFlags;
 
 /**
@@ -53,6 +53,8 @@ typedef struct
 	GHashTable		*vfuncs;		/* string:pointer */
 	GMutex			 vfuncs_mutex;
 	gboolean		 enabled;
+	gboolean		 setup_deferrable;
+	gboolean		 pipelined_updates;
 	gchar			*language;		/* allow-none */
 	gchar			*name;
 	guint			 scale;
@@ -240,6 +242,95 @@ gs_plugin_set_enabled (GsPlugin *plugin, gboolean enabled)
 	priv->enabled = enabled;
 }
 
+/**
+ * gs_plugin_get_setup_deferrable:
+ * @plugin: a #GsPlugin
+ *
+ * Gets whether the plugin’s setup may finish after the #GsPluginLoader has
+ * finished setting up. See gs_plugin_set_setup_deferrable().
+ *
+ * Returns: %TRUE if setup of the plugin is deferrable
+ *
+ * Since: 50
+ **/
+gboolean
+gs_plugin_get_setup_deferrable (GsPlugin *plugin)
+{
+	GsPluginPrivate *priv = gs_plugin_get_instance_private (plugin);
+	return priv->setup_deferrable;
+}
+
+/**
+ * gs_plugin_set_setup_deferrable:
+ * @plugin: a #GsPlugin
+ * @setup_deferrable: whether setup of the plugin is deferrable
+ *
+ * Sets whether the #GsPluginLoader may complete its setup before the setup of
+ * this plugin has finished.
+ *
+ * This should only be set by plugins which are not needed to show the first
+ * page of the UI, or to answer search provider queries. While a deferrable
+ * plugin is still setting up it is treated as disabled, so jobs will skip it;
+ * once its setup succeeds it is enabled and gs_plugin_reload() is called so
+ * that the UI refreshes.
+ *
+ * This is normally only called from the init function for a #GsPlugin instance.
+ *
+ * Since: 50
+ **/
+void
+gs_plugin_set_setup_deferrable (GsPlugin *plugin,
+                                gboolean  setup_deferrable)
+{
+	GsPluginPrivate *priv = gs_plugin_get_instance_private (plugin);
+	priv->setup_deferrable = setup_deferrable;
+}
+
+/**
+ * gs_plugin_get_pipelined_updates:
+ * @plugin: a #GsPlugin
+ *
+ * Gets whether the plugin can update apps in separate download and apply
+ * stages. See gs_plugin_set_pipelined_updates().
+ *
+ * Returns: %TRUE if the plugin supports pipelined updates
+ *
+ * Since: 50
+ **/
+gboolean
+gs_plugin_get_pipelined_updates (GsPlugin *plugin)
+{
+	GsPluginPrivate *priv = gs_plugin_get_instance_private (plugin);
+	return priv->pipelined_updates;
+}
+
+/**
+ * gs_plugin_set_pipelined_updates:
+ * @plugin: a #GsPlugin
+ * @pipelined_updates: whether the plugin supports pipelined updates
+ *
+ * Sets whether #GsPluginJobUpdateApps may pipeline updates of this plugin’s
+ * apps when %GS_PLUGIN_UPDATE_APPS_FLAGS_PIPELINED is used.
+ *
+ * If this is set, #GsPluginClass.update_apps_async() must only download the
+ * apps when passed %GS_PLUGIN_UPDATE_APPS_FLAGS_PIPELINED and
+ * %GS_PLUGIN_UPDATE_APPS_FLAGS_NO_APPLY, and must only apply the previously
+ * downloaded apps when passed %GS_PLUGIN_UPDATE_APPS_FLAGS_PIPELINED and
+ * %GS_PLUGIN_UPDATE_APPS_FLAGS_NO_DOWNLOAD. Apps of other plugins are
+ * updated together, as if the flag wasn’t used.
+ *
+ * This is normally only called from the init function for a #GsPlugin instance.
+ *
+ * Since: 50
+ **/
+void
+gs_plugin_set_pipelined_updates (GsPlugin *plugin,
+                                 gboolean  pipelined_updates)
+{
+	GsPluginPrivate *priv = gs_plugin_get_instance_private (plugin);
+	priv->pipelined_updates = pipelined_updates;
+}
+
 /**
  * gs_plugin_get_name:
  * @plugin: a #GsPlugin
@@ -1184,6 +1275,50 @@ gs_plugin_cache_invalidate (GsPlugin *plugin)
 	g_hash_table_remove_all (priv->cache);
 }
 
+/*
+ * gs_plugin_cache_prune_unused:
+ * @plugin: a #GsPlugin
+ *
+ * Removes apps from the per-plugin cache which are only referenced by the
+ * cache, and which are only known from metadata (i.e. are not installed or
+ * being acted on). Such apps can be rebuilt from the plugin’s metadata on
+ * next use without anybody noticing a different #GsApp instance.
+ *
+ * Returns: the number of apps removed
+ */
+guint
+gs_plugin_cache_prune_unused (GsPlugin *plugin)
+{
+	GsPluginPrivate *priv = gs_plugin_get_instance_private (plugin);
+	GHashTableIter iter;
+	gpointer value;
+	guint n_removed = 0;
+	g_autoptr(GMutexLocker) locker = NULL;
+
+	g_return_val_if_fail (GS_IS_PLUGIN (plugin), 0);
+
+	/* lookups take their reference with the lock held, so the refcount
+	 * can’t go up from 1 while we’re iterating */
+	locker = g_mutex_locker_new (&priv->cache_mutex);
+	g_hash_table_iter_init (&iter, priv->cache);
+	while (g_hash_table_iter_next (&iter, NULL, &value)) {
+		GsApp *app = value;
+		GsAppState state = gs_app_get_state (app);
+
+		if (G_OBJECT (app)->ref_count != 1)
+			continue;
+		if (state != GS_APP_STATE_UNKNOWN &&
+		    state != GS_APP_STATE_AVAILABLE &&
+		    state != GS_APP_STATE_UNAVAILABLE)
+			continue;
+
+		g_hash_table_iter_remove (&iter);
+		n_removed++;
+	}
+
+	return n_removed;
+}
+
 /**
  * gs_plugin_list_cached:
  * @plugin: a #GsPlugin
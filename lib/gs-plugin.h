@@ -135,6 +135,15 @@ G_DECLARE_DERIVABLE_TYPE (GsPlugin, gs_plugin, GS, PLUGIN, GObject)
  * @set_offline_update_action_finish: (nullable): Finish method for
  *   @set_offline_update_action_async. Must be implemented if
  *   @set_offline_update_action_async is implemented. (Since: 50)
+ * @get_updates_stamp: (nullable): Returns a cheap stamp which changes whenever
+ *   the result of listing updates could have changed, or %NULL if the plugin
+ *   cannot tell without doing a full query. Must be implemented by plugins
+ *   which implement @list_apps_async, otherwise update checks can never be
+ *   skipped. Must not block on network or D-Bus calls. (Since: 50)
+ * @release_memory: (nullable): Releases memory which can be lazily rebuilt on
+ *   next use, such as caches, in response to system memory pressure of the
+ *   given level. Returns an estimate of the number of bytes released, or 0 if
+ *   unknown. Called in the main thread, so must not block. (Since: 50)
  *
  * The class structure for a #GsPlugin. Virtual methods here should be
  * implemented by plugin implementations derived from #GsPlugin to provide their
@@ -417,7 +426,12 @@ struct _GsPluginClass
 								 GAsyncResult			*result,
 								 GError				**error);
 
-	gpointer		 padding[19];
+	gchar *			(*get_updates_stamp)		(GsPlugin			*plugin);
+
+	gsize			(*release_memory)		(GsPlugin			*plugin,
+								 GMemoryMonitorWarningLevel	 level);
+
+	gpointer		 padding[17];
 };
 
 /* helpers */
@@ -430,6 +444,12 @@ const gchar	*gs_plugin_get_name			(GsPlugin	*plugin);
 gboolean	 gs_plugin_get_enabled			(GsPlugin	*plugin);
 void		 gs_plugin_set_enabled			(GsPlugin	*plugin,
 							 gboolean	 enabled);
+gboolean	 gs_plugin_get_setup_deferrable		(GsPlugin	*plugin);
+void		 gs_plugin_set_setup_deferrable		(GsPlugin	*plugin,
+							 gboolean	 setup_deferrable);
+gboolean	 gs_plugin_get_pipelined_updates	(GsPlugin	*plugin);
+void		 gs_plugin_set_pipelined_updates	(GsPlugin	*plugin,
+							 gboolean	 pipelined_updates);
 guint		 gs_plugin_get_scale			(GsPlugin	*plugin);
 const gchar	*gs_plugin_get_language			(GsPlugin	*plugin);
 void		 gs_plugin_add_rule			(GsPlugin	*plugin,
@@ -9,8 +9,12 @@
 
 #include "config.h"
 
+#include <glib/gstdio.h>
+#include <utime.h>
+
 #include "gnome-software-private.h"
 
+#include "gs-appstream.h"
 #include "gs-debug.h"
 #include "gs-test.h"
 
@@ -211,6 +215,302 @@ gs_plugin_download_rewrite_func (void)
 	g_assert (css != NULL);
 }
 
+/* Serves a single resource, with support for conditional and range
+ * requests, and records what was asked for. */
+typedef struct {
+	const gchar *body;
+	const gchar *etag;
+	guint n_requests;
+	goffset last_range_start;  /* -1 if the last request was not served a range */
+	gboolean last_not_modified;
+} DownloadServerData;
+
+static void
+download_server_cb (SoupServer        *server,
+                    SoupServerMessage *msg,
+                    const char        *path,
+                    GHashTable        *query,
+                    gpointer           user_data)
+{
+	DownloadServerData *server_data = user_data;
+	SoupMessageHeaders *request_headers = soup_server_message_get_request_headers (msg);
+	SoupMessageHeaders *response_headers = soup_server_message_get_response_headers (msg);
+	gsize len = strlen (server_data->body);
+	SoupRange *ranges = NULL;
+	int n_ranges = 0;
+
+	server_data->n_requests++;
+	server_data->last_range_start = -1;
+	server_data->last_not_modified = FALSE;
+
+	soup_message_headers_replace (response_headers, "ETag", server_data->etag);
+
+	if (g_strcmp0 (soup_message_headers_get_one (request_headers, "If-None-Match"), server_data->etag) == 0) {
+		server_data->last_not_modified = TRUE;
+		soup_server_message_set_status (msg, SOUP_STATUS_NOT_MODIFIED, NULL);
+		return;
+	}
+
+	if (g_strcmp0 (soup_message_headers_get_one (request_headers, "If-Range"), server_data->etag) == 0 &&
+	    soup_message_headers_get_ranges (request_headers, len, &ranges, &n_ranges)) {
+		goffset start = ranges[0].start;
+
+		soup_message_headers_free_ranges (request_headers, ranges);
+		server_data->last_range_start = start;
+		soup_message_headers_set_content_range (response_headers, start, len - 1, len);
+		soup_server_message_set_status (msg, SOUP_STATUS_PARTIAL_CONTENT, NULL);
+		soup_server_message_set_response (msg, "text/plain", SOUP_MEMORY_COPY,
+						  server_data->body + start, len - start);
+		return;
+	}
+
+	/* The resource doesn’t match the If-Range validator, so return all of it */
+	soup_message_headers_remove (request_headers, "Range");
+	soup_server_message_set_status (msg, SOUP_STATUS_OK, NULL);
+	soup_server_message_set_response (msg, "text/plain", SOUP_MEMORY_COPY,
+					  server_data->body, len);
+}
+
+static gboolean
+download_file (SoupSession  *soup_session,
+               const gchar  *uri,
+               GFile        *output_file,
+               GError      **error)
+{
+	g_autoptr(GAsyncResult) result = NULL;
+
+	gs_download_file_async (soup_session, uri, output_file, G_PRIORITY_DEFAULT,
+				NULL, NULL, NULL, async_result_cb, &result);
+	while (result == NULL)
+		g_main_context_iteration (g_main_context_get_thread_default (), TRUE);
+
+	return gs_download_file_finish (soup_session, result, error);
+}
+
+static void
+assert_file_contents (GFile       *file,
+                      const gchar *expected)
+{
+	g_autofree gchar *contents = NULL;
+	g_autoptr(GError) error = NULL;
+
+	g_file_load_contents (file, NULL, &contents, NULL, NULL, &error);
+	g_assert_no_error (error);
+	g_assert_cmpstr (contents, ==, expected);
+}
+
+static void
+write_partial_file (GFile       *partial_file,
+                    const gchar *contents,
+                    const gchar *validator)
+{
+	g_autoptr(GError) error = NULL;
+
+	g_file_replace_contents (partial_file, contents, strlen (contents), NULL, FALSE,
+				 G_FILE_CREATE_NONE, NULL, NULL, &error);
+	g_assert_no_error (error);
+	g_file_set_attribute_string (partial_file, "xattr::gnome-software::partial-validator",
+				     validator, G_FILE_QUERY_INFO_NONE, NULL, &error);
+	g_assert_no_error (error);
+}
+
+static void
+gs_download_file_func (void)
+{
+	g_autoptr(GMainContext) context = g_main_context_new ();
+	g_autoptr(GMainContextPusher) context_pusher = g_main_context_pusher_new (context);
+	DownloadServerData server_data = {
+		.body = "The quick brown fox jumps over the lazy dog",
+		.etag = "\"v2\"",
+	};
+	g_autoptr(SoupServer) server = NULL;
+	g_autoptr(SoupSession) soup_session = NULL;
+	g_autoptr(GSList) uris = NULL;
+	g_autofree gchar *uri = NULL;
+	g_autofree gchar *dir = NULL;
+	g_autofree gchar *output_path = NULL;
+	g_autofree gchar *partial_path = NULL;
+	g_autoptr(GFile) output_file = NULL;
+	g_autoptr(GFile) partial_file = NULL;
+	g_autoptr(GAsyncResult) result1 = NULL;
+	g_autoptr(GAsyncResult) result2 = NULL;
+	g_autoptr(GError) error = NULL;
+
+	server = soup_server_new (NULL, NULL);
+	soup_server_listen_local (server, 0, 0, &error);
+	g_assert_no_error (error);
+	soup_server_add_handler (server, NULL, download_server_cb, &server_data, NULL);
+	uris = soup_server_get_uris (server);
+	uri = g_uri_to_string (uris->data);
+	g_slist_free_full (g_steal_pointer (&uris), (GDestroyNotify) g_uri_unref);
+
+	soup_session = gs_build_soup_session ();
+	dir = g_build_filename (g_get_user_cache_dir (), "download-test", NULL);
+	output_path = g_build_filename (dir, "output.txt", NULL);
+	partial_path = g_strconcat (output_path, ".partial", NULL);
+	output_file = g_file_new_for_path (output_path);
+	partial_file = g_file_new_for_path (partial_path);
+
+	/* a complete download is moved into place from the partial file */
+	g_assert_true (download_file (soup_session, uri, output_file, &error));
+	g_assert_no_error (error);
+	assert_file_contents (output_file, server_data.body);
+	g_assert_false (g_file_query_exists (partial_file, NULL));
+	g_assert_cmpint (server_data.last_range_start, ==, -1);
+
+	/* the rest relies on the ETag and validator being stored in xattrs */
+	if (!g_file_set_attribute_string (output_file, "xattr::gnome-software::test", "1",
+					  G_FILE_QUERY_INFO_NONE, NULL, NULL)) {
+		g_test_skip ("xattrs not supported");
+		return;
+	}
+
+	/* a 304 response leaves the output alone and deletes a stale partial
+	 * file */
+	write_partial_file (partial_file, "stale", "\"v1\"");
+	g_assert_false (download_file (soup_session, uri, output_file, &error));
+	g_assert_error (error, GS_DOWNLOAD_ERROR, GS_DOWNLOAD_ERROR_NOT_MODIFIED);
+	g_clear_error (&error);
+	g_assert_true (server_data.last_not_modified);
+	assert_file_contents (output_file, server_data.body);
+	g_assert_false (g_file_query_exists (partial_file, NULL));
+
+	/* an interrupted download resumes from the end of the partial file if
+	 * the resource still matches it */
+	g_file_delete (output_file, NULL, &error);
+	g_assert_no_error (error);
+	write_partial_file (partial_file, "The quick ", server_data.etag);
+	g_assert_true (download_file (soup_session, uri, output_file, &error));
+	g_assert_no_error (error);
+	g_assert_cmpint (server_data.last_range_start, ==, strlen ("The quick "));
+	assert_file_contents (output_file, server_data.body);
+	g_assert_false (g_file_query_exists (partial_file, NULL));
+
+	/* if the resource has changed, it is downloaded from the start */
+	g_file_delete (output_file, NULL, &error);
+	g_assert_no_error (error);
+	write_partial_file (partial_file, "Old content", "\"v1\"");
+	g_assert_true (download_file (soup_session, uri, output_file, &error));
+	g_assert_no_error (error);
+	g_assert_cmpint (server_data.last_range_start, ==, -1);
+	assert_file_contents (output_file, server_data.body);
+	g_assert_false (g_file_query_exists (partial_file, NULL));
+
+	/* two downloads to the same file run one after the other, so the
+	 * second one is a cache hit rather than sharing the partial file */
+	g_file_delete (output_file, NULL, &error);
+	g_assert_no_error (error);
+	server_data.n_requests = 0;
+	gs_download_file_async (soup_session, uri, output_file, G_PRIORITY_DEFAULT,
+				NULL, NULL, NULL, async_result_cb, &result1);
+	gs_download_file_async (soup_session, uri, output_file, G_PRIORITY_DEFAULT,
+				NULL, NULL, NULL, async_result_cb, &result2);
+	while (result1 == NULL || result2 == NULL)
+		g_main_context_iteration (context, TRUE);
+
+	g_assert_true (gs_download_file_finish (soup_session, result1, &error));
+	g_assert_no_error (error);
+	g_assert_false (gs_download_file_finish (soup_session, result2, &error));
+	g_assert_error (error, GS_DOWNLOAD_ERROR, GS_DOWNLOAD_ERROR_NOT_MODIFIED);
+	g_clear_error (&error);
+	g_assert_cmpuint (server_data.n_requests, ==, 2);
+	assert_file_contents (output_file, server_data.body);
+	g_assert_false (g_file_query_exists (partial_file, NULL));
+}
+
+typedef struct {
+	SoupSession *soup_session;
+	gsize n_bytes;
+	gsize n_bytes_when_paused;
+	gboolean paused;
+} DownloadPauseData;
+
+static void
+download_pause_progress_cb (gsize    bytes_downloaded,
+                            gsize    total_download_size,
+                            gpointer user_data)
+{
+	DownloadPauseData *pause_data = user_data;
+
+	pause_data->n_bytes = bytes_downloaded;
+
+	/* pause the session once the download is under way */
+	if (!pause_data->paused && bytes_downloaded > 0) {
+		gs_download_session_set_paused (pause_data->soup_session, TRUE);
+		pause_data->paused = TRUE;
+		pause_data->n_bytes_when_paused = bytes_downloaded;
+	}
+}
+
+static gboolean
+download_pause_timeout_cb (gpointer user_data)
+{
+	gboolean *timed_out = user_data;
+
+	*timed_out = TRUE;
+
+	return G_SOURCE_REMOVE;
+}
+
+static void
+gs_download_pause_func (void)
+{
+	g_autoptr(GMainContext) context = g_main_context_new ();
+	g_autoptr(GMainContextPusher) context_pusher = g_main_context_pusher_new (context);
+	g_autofree gchar *body = g_strnfill (1024 * 1024, 'x');
+	DownloadServerData server_data = {
+		.body = body,
+		.etag = "\"v1\"",
+	};
+	g_autoptr(SoupServer) server = NULL;
+	g_autoptr(SoupSession) soup_session = NULL;
+	g_autoptr(GSList) uris = NULL;
+	g_autofree gchar *uri = NULL;
+	g_autoptr(GOutputStream) output_stream = g_memory_output_stream_new_resizable ();
+	g_autoptr(GAsyncResult) result = NULL;
+	g_autoptr(GSource) timeout_source = NULL;
+	g_autoptr(GError) error = NULL;
+	DownloadPauseData pause_data = { NULL, };
+	gboolean timed_out = FALSE;
+
+	server = soup_server_new (NULL, NULL);
+	soup_server_listen_local (server, 0, 0, &error);
+	g_assert_no_error (error);
+	soup_server_add_handler (server, NULL, download_server_cb, &server_data, NULL);
+	uris = soup_server_get_uris (server);
+	uri = g_uri_to_string (uris->data);
+	g_slist_free_full (g_steal_pointer (&uris), (GDestroyNotify) g_uri_unref);
+
+	/* a plain session, so nothing has set any limits on it before the
+	 * download starts */
+	soup_session = soup_session_new ();
+	pause_data.soup_session = soup_session;
+
+	gs_download_stream_async (soup_session, uri, output_stream, NULL, NULL, G_PRIORITY_DEFAULT,
+				  download_pause_progress_cb, &pause_data, NULL, async_result_cb, &result);
+
+	/* the download stops soon after being paused, part way through */
+	timeout_source = g_timeout_source_new (500);
+	g_source_set_callback (timeout_source, download_pause_timeout_cb, &timed_out, NULL);
+	g_source_attach (timeout_source, context);
+	while (!timed_out && result == NULL)
+		g_main_context_iteration (context, TRUE);
+
+	g_assert_true (pause_data.paused);
+	g_assert_null (result);
+	g_assert_cmpuint (pause_data.n_bytes, <, strlen (body));
+	g_assert_cmpuint (pause_data.n_bytes, <=, pause_data.n_bytes_when_paused + 2 * 8192);
+
+	/* and carries on to the end once resumed */
+	gs_download_session_set_paused (soup_session, FALSE);
+	while (result == NULL)
+		g_main_context_iteration (context, TRUE);
+
+	g_assert_true (gs_download_stream_finish (soup_session, result, NULL, NULL, &error));
+	g_assert_no_error (error);
+	g_assert_cmpuint (g_memory_output_stream_get_data_size (G_MEMORY_OUTPUT_STREAM (output_stream)), ==, strlen (body));
+}
+
 static void
 gs_plugin_func (void)
 {
@@ -577,6 +877,97 @@ gs_app_addons_func (void)
 	gs_app_remove_addon (app, addon);
 }
 
+static void
+gs_utils_glob_matcher_func (void)
+{
+	const gchar *patterns[] = {
+		"links.desktop",
+		"*release-notes*.desktop",
+		"Rodent-*.desktop",
+		"wine-?.desktop",
+		"fedora-[0-9][0-9]",
+		"london*",
+		"*-testing",
+		"back\\*slash",
+		NULL
+	};
+	const gchar *strs[] = {
+		"links.desktop",
+		"links.desktop2",
+		"foo-release-notes-bar.desktop",
+		"release-notes.desktop",
+		"release-notes.desktop.bak",
+		"Rodent-.desktop",
+		"rodent-x.desktop",
+		"wine-1.desktop",
+		"wine-12.desktop",
+		"fedora-40",
+		"fedora-4x",
+		"london",
+		"londonderry",
+		"updates-testing",
+		"-testing",
+		"testing",
+		"back*slash",
+		"backxslash",
+		"",
+		NULL
+	};
+	g_autoptr(GsUtilsGlobMatcher) matcher = gs_utils_glob_matcher_new (patterns);
+	g_autoptr(GsUtilsGlobMatcher) empty = gs_utils_glob_matcher_new (NULL);
+
+	g_assert_false (gs_utils_glob_matcher_is_empty (matcher));
+	g_assert_true (gs_utils_glob_matcher_is_empty (empty));
+
+	/* must match exactly the same as fnmatch() on each pattern */
+	for (guint i = 0; strs[i] != NULL; i++) {
+		g_assert_cmpint (gs_utils_glob_matcher_match (matcher, strs[i]), ==,
+				 gs_utils_strv_fnmatch ((gchar **) patterns, strs[i]));
+		g_assert_false (gs_utils_glob_matcher_match (empty, strs[i]));
+	}
+
+	g_assert_true (gs_utils_glob_matcher_match (matcher, "Rodent-1.desktop"));
+	g_assert_false (gs_utils_glob_matcher_match (matcher, "plank.desktop"));
+}
+
+static void
+gs_app_interned_func (void)
+{
+	g_autoptr(GsApp) app1 = gs_app_new ("one.desktop");
+	g_autoptr(GsApp) app2 = gs_app_new ("two.desktop");
+	g_autofree gchar *origin = g_strdup ("flathub");
+
+	/* equal strings from different apps share storage */
+	gs_app_set_origin (app1, "flathub");
+	gs_app_set_origin (app2, origin);
+	g_assert_cmpstr (gs_app_get_origin (app1), ==, "flathub");
+	g_assert_true (gs_app_get_origin (app1) == gs_app_get_origin (app2));
+	g_assert_true (gs_app_get_origin (app2) != origin);
+
+	gs_app_set_branch (app1, "stable");
+	gs_app_set_branch (app2, "stable");
+	g_assert_true (gs_app_get_branch (app1) == gs_app_get_branch (app2));
+	gs_app_set_branch (app2, "beta");
+	g_assert_cmpstr (gs_app_get_branch (app2), ==, "beta");
+	g_assert_true (gs_app_get_branch (app1) != gs_app_get_branch (app2));
+	gs_app_set_branch (app2, NULL);
+	g_assert_null (gs_app_get_branch (app2));
+
+	/* the hostname is interned after being cleaned up */
+	gs_app_set_origin_hostname (app1, "https://download.example.org/repo/");
+	gs_app_set_origin_hostname (app2, "example.org");
+	g_assert_cmpstr (gs_app_get_origin_hostname (app1), ==, "example.org");
+	g_assert_true (gs_app_get_origin_hostname (app1) == gs_app_get_origin_hostname (app2));
+
+	/* metadata keys are interned too, but values are not shared */
+	gs_app_set_metadata (app1, "GnomeSoftware::test", "one");
+	gs_app_set_metadata (app2, "GnomeSoftware::test", "two");
+	g_assert_cmpstr (gs_app_get_metadata_item (app1, "GnomeSoftware::test"), ==, "one");
+	g_assert_cmpstr (gs_app_get_metadata_item (app2, "GnomeSoftware::test"), ==, "two");
+	gs_app_set_metadata (app1, "GnomeSoftware::test", NULL);
+	g_assert_null (gs_app_get_metadata_item (app1, "GnomeSoftware::test"));
+}
+
 static void
 gs_app_func (void)
 {
@@ -663,6 +1054,78 @@ gs_app_list_wildcard_dedupe_func (void)
 	g_assert_cmpint (gs_app_list_length (list), ==, 1);
 }
 
+static void
+gs_plugin_loader_install_queue_replay_func (void)
+{
+	g_autoptr(GsAppList) list = NULL;
+	GsApp *app;
+	guint n_lines = 0;
+	const gchar *contents =
+		"+system/flatpak/flathub/org.example.A/stable\tdesktop-application\n"
+		"+system/flatpak/flathub/org.example.B/stable\tdesktop-application\n"
+		"+system/flatpak/flathub/org.example.C/stable\taddon\n"
+		"-system/flatpak/flathub/org.example.A/stable\tdesktop-application\n"
+		"-system/flatpak/flathub/org.example.C/stable\taddon\n"
+		"+system/flatpak/flathub/org.example.C/stable\taddon\n"
+		"-system/flatpak/flathub/org.example.D/stable\tdesktop-application\n"
+		"+system/flatpak/flathub/org.example.A/stable\tdesktop-application\n"
+		"not a valid line\n"
+		"\n";
+
+	list = gs_plugin_loader_replay_install_queue (contents, &n_lines);
+
+	/* removed and re-added apps keep their original position */
+	g_assert_cmpuint (n_lines, ==, 8);
+	g_assert_cmpuint (gs_app_list_length (list), ==, 3);
+
+	app = gs_app_list_index (list, 0);
+	g_assert_cmpstr (gs_app_get_unique_id (app), ==, "system/flatpak/flathub/org.example.A/stable");
+	g_assert_cmpint (gs_app_get_kind (app), ==, AS_COMPONENT_KIND_DESKTOP_APP);
+	g_assert_cmpint (gs_app_get_state (app), ==, GS_APP_STATE_QUEUED_FOR_INSTALL);
+	g_assert_true (gs_app_has_quirk (app, GS_APP_QUIRK_IS_WILDCARD));
+
+	app = gs_app_list_index (list, 1);
+	g_assert_cmpstr (gs_app_get_unique_id (app), ==, "system/flatpak/flathub/org.example.B/stable");
+
+	app = gs_app_list_index (list, 2);
+	g_assert_cmpstr (gs_app_get_unique_id (app), ==, "system/flatpak/flathub/org.example.C/stable");
+	g_assert_cmpint (gs_app_get_kind (app), ==, AS_COMPONENT_KIND_ADDON);
+
+	/* once compacted, only the queued entries remain */
+	g_clear_object (&list);
+	list = gs_plugin_loader_replay_install_queue ("-system/flatpak/flathub/org.example.A/stable\tdesktop-application\n",
+						      &n_lines);
+	g_assert_cmpuint (n_lines, ==, 1);
+	g_assert_cmpuint (gs_app_list_length (list), ==, 0);
+}
+
+static void
+gs_plugin_loader_install_queue_legacy_func (void)
+{
+	g_autoptr(GsAppList) list = NULL;
+	guint n_lines = 0;
+
+	/* older versions rewrote the file with no prefixes */
+	list = gs_plugin_loader_replay_install_queue ("system/flatpak/flathub/org.example.A/stable\tdesktop-application\n"
+						      "system/flatpak/flathub/org.example.B/stable\truntime\n"
+						      "system/flatpak/flathub/org.example.A/stable\tdesktop-application\n",
+						      &n_lines);
+	g_assert_cmpuint (n_lines, ==, 3);
+	g_assert_cmpuint (gs_app_list_length (list), ==, 2);
+	g_assert_cmpstr (gs_app_get_unique_id (gs_app_list_index (list, 0)), ==, "system/flatpak/flathub/org.example.A/stable");
+	g_assert_cmpstr (gs_app_get_unique_id (gs_app_list_index (list, 1)), ==, "system/flatpak/flathub/org.example.B/stable");
+	g_assert_cmpint (gs_app_get_kind (gs_app_list_index (list, 1)), ==, AS_COMPONENT_KIND_RUNTIME);
+
+	/* and can be mixed with journal entries appended by newer versions */
+	g_clear_object (&list);
+	list = gs_plugin_loader_replay_install_queue ("system/flatpak/flathub/org.example.A/stable\tdesktop-application\n"
+						      "system/flatpak/flathub/org.example.B/stable\tdesktop-application\n"
+						      "-system/flatpak/flathub/org.example.A/stable\tdesktop-application\n",
+						      NULL);
+	g_assert_cmpuint (gs_app_list_length (list), ==, 1);
+	g_assert_cmpstr (gs_app_get_unique_id (gs_app_list_index (list, 0)), ==, "system/flatpak/flathub/org.example.B/stable");
+}
+
 static void
 gs_app_list_func (void)
 {
@@ -734,6 +1197,72 @@ gs_app_list_performance_func (void)
 	g_print ("%.2fms ", g_timer_elapsed (timer, NULL) * 1000);
 }
 
+static gint
+gs_app_list_sort_name_uncached_cb (GsApp    *app1,
+                                   GsApp    *app2,
+                                   gpointer  user_data)
+{
+	return gs_utils_sort_strcmp (gs_app_get_name (app1), gs_app_get_name (app2));
+}
+
+static void
+gs_app_list_sort_name_performance_func (void)
+{
+	const gchar *prefixes[] = { "Éditeur", "editor", "Zebra", "äpfel", "Apple", "ZEBRA", NULL };
+	g_autoptr(GsAppList) list = gs_app_list_new ();
+	g_autoptr(GsAppList) list_uncached = NULL;
+	g_autoptr(GTimer) timer = NULL;
+	gdouble uncached_ms, cached_ms, resort_ms;
+	GsApp *app;
+
+	/* create a lot of apps, in no particular order */
+	for (guint i = 0; i < 5000; i++) {
+		g_autofree gchar *id = g_strdup_printf ("%04u.desktop", i);
+		g_autofree gchar *name = g_strdup_printf ("%s %u", prefixes[i % (G_N_ELEMENTS (prefixes) - 1)], (i * 7919) % 5000);
+		g_autoptr(GsApp) new_app = gs_app_new (id);
+
+		gs_app_set_name (new_app, GS_APP_QUALITY_NORMAL, name);
+		gs_app_list_add (list, new_app);
+	}
+	list_uncached = gs_app_list_copy (list);
+
+	/* sort by computing the collation keys in every comparison */
+	timer = g_timer_new ();
+	gs_app_list_sort (list_uncached, gs_app_list_sort_name_uncached_cb, NULL);
+	uncached_ms = g_timer_elapsed (timer, NULL) * 1000;
+
+	/* sort using the cached keys, computing them the first time */
+	g_timer_reset (timer);
+	gs_app_list_sort (list, gs_utils_app_sort_name, NULL);
+	cached_ms = g_timer_elapsed (timer, NULL) * 1000;
+
+	/* and again, with the keys already cached */
+	gs_app_list_randomize (list);
+	g_timer_reset (timer);
+	gs_app_list_sort (list, gs_utils_app_sort_name, NULL);
+	resort_ms = g_timer_elapsed (timer, NULL) * 1000;
+
+	g_print ("uncached %.2fms, cached %.2fms, re-sorted %.2fms ",
+		 uncached_ms, cached_ms, resort_ms);
+
+	/* both give the same order */
+	g_assert_cmpuint (gs_app_list_length (list), ==, gs_app_list_length (list_uncached));
+	for (guint i = 0; i < gs_app_list_length (list); i++) {
+		g_assert_cmpstr (gs_app_get_name (gs_app_list_index (list, i)), ==,
+				 gs_app_get_name (gs_app_list_index (list_uncached, i)));
+	}
+
+	/* renaming an app invalidates its key; the uncached list holds the
+	 * same apps, so it gets renamed too */
+	app = gs_app_list_index (list, 0);
+	gs_app_set_name (app, GS_APP_QUALITY_HIGHEST, "Zzzz");
+	gs_app_list_sort (list, gs_utils_app_sort_name, NULL);
+	gs_app_list_sort (list_uncached, gs_app_list_sort_name_uncached_cb, NULL);
+	g_assert_true (gs_app_list_index (list, 0) != app);
+	for (guint i = 0; i < gs_app_list_length (list); i++)
+		g_assert_true (gs_app_list_index (list, i) == gs_app_list_index (list_uncached, i));
+}
+
 static void
 gs_app_list_related_func (void)
 {
@@ -754,6 +1283,242 @@ gs_app_list_related_func (void)
 	g_assert_cmpint (gs_app_list_get_progress (list), ==, 50);
 }
 
+static void
+gs_appstream_category_sizes_func (void)
+{
+	gboolean ret;
+	GsCategory *child;
+	const gchar *xml =
+		"<components>\n"
+		"  <component type=\"desktop-application\">\n"
+		"    <id>org.example.Viewer</id>\n"
+		"    <categories><category>Graphics</category><category>Viewer</category></categories>\n"
+		"  </component>\n"
+		"  <component type=\"desktop-application\">\n"
+		"    <id>org.example.Paint</id>\n"
+		"    <categories><category>Graphics</category><category>Graphics</category></categories>\n"
+		"  </component>\n"
+		"  <component type=\"desktop-application\">\n"
+		"    <id>org.example.Music</id>\n"
+		"    <categories><category>AudioVideo</category><category>Music</category></categories>\n"
+		"  </component>\n"
+		"  <component type=\"desktop-application\" merge=\"append\">\n"
+		"    <id>org.example.Merged</id>\n"
+		"    <categories><category>Graphics</category><category>Viewer</category></categories>\n"
+		"  </component>\n"
+		"</components>\n";
+	g_autoptr(GError) error = NULL;
+	g_autoptr(XbBuilder) builder = xb_builder_new ();
+	g_autoptr(XbBuilderSource) source = xb_builder_source_new ();
+	g_autoptr(XbSilo) silo = NULL;
+	g_autoptr(GsCategory) category = NULL;
+	g_autoptr(GPtrArray) list = g_ptr_array_new_with_free_func (g_object_unref);
+
+	ret = xb_builder_source_load_xml (source, xml, XB_BUILDER_SOURCE_FLAG_NONE, &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+	xb_builder_import_source (builder, source);
+	silo = xb_builder_compile (builder, XB_BUILDER_COMPILE_FLAG_NONE, NULL, &error);
+	g_assert_no_error (error);
+	g_assert_nonnull (silo);
+
+	/* the first desktop data entry is ‘Create’ */
+	category = gs_category_new_for_desktop_data (&gs_desktop_get_data ()[0]);
+	g_assert_cmpstr (gs_category_get_id (category), ==, "create");
+	g_ptr_array_add (list, g_object_ref (category));
+
+	/* counted from the index built on first use; merge components and
+	 * duplicate categories must not be counted */
+	ret = gs_appstream_refine_category_sizes (silo, list, NULL, &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+
+	child = gs_category_find_child (category, "viewers");
+	g_assert_nonnull (child);
+	g_assert_cmpuint (gs_category_get_size (child), ==, 1);
+	child = gs_category_find_child (category, "music-players");
+	g_assert_nonnull (child);
+	g_assert_cmpuint (gs_category_get_size (child), ==, 1);
+	child = gs_category_find_child (category, "3d");
+	g_assert_nonnull (child);
+	g_assert_cmpuint (gs_category_get_size (child), ==, 0);
+}
+
+static void
+set_file_mtime (const gchar *filename,
+		time_t       mtime)
+{
+	struct utimbuf times = { .actime = mtime, .modtime = mtime };
+
+	g_assert_cmpint (g_utime (filename, &times), ==, 0);
+}
+
+static XbSilo *
+load_desktop_files (const gchar *path,
+		    gboolean    *out_any_loaded)
+{
+	gboolean ret;
+	g_autoptr(GError) error = NULL;
+	g_autoptr(XbBuilder) builder = xb_builder_new ();
+
+	ret = gs_appstream_load_desktop_files (builder, path, out_any_loaded, NULL, NULL, &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+	if (!*out_any_loaded)
+		return NULL;
+	return xb_builder_compile (builder, XB_BUILDER_COMPILE_FLAG_NONE, NULL, NULL);
+}
+
+static void
+gs_appstream_desktop_files_func (void)
+{
+	gboolean ret;
+	gboolean any_loaded = FALSE;
+	g_autoptr(GError) error = NULL;
+	g_autoptr(XbNode) node = NULL;
+	g_autoptr(XbSilo) silo = NULL;
+	g_autofree gchar *path = NULL;
+	g_autofree gchar *filename = NULL;
+
+	path = g_dir_make_tmp ("gs-self-test-desktop-XXXXXX", &error);
+	g_assert_no_error (error);
+	filename = g_build_filename (path, "org.example.Foo.desktop", NULL);
+	ret = g_file_set_contents (filename,
+				   "[Desktop Entry]\n"
+				   "Type=Application\n"
+				   "Name=Foo\n"
+				   "Exec=foo\n",
+				   -1, &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+
+	set_file_mtime (filename, 1000000);
+
+	/* parsed the first time */
+	silo = load_desktop_files (path, &any_loaded);
+	g_assert_true (any_loaded);
+	node = xb_silo_query_first (silo, "component/name", NULL);
+	g_assert_nonnull (node);
+	g_assert_cmpstr (xb_node_get_text (node), ==, "Foo");
+	g_clear_object (&node);
+	g_clear_object (&silo);
+
+	/* and reused when loaded again; the file is changed behind the cache’s
+	 * back, keeping its size and mtime, so the old name is only returned if
+	 * it was not parsed again */
+	ret = g_file_set_contents (filename,
+				   "[Desktop Entry]\n"
+				   "Type=Application\n"
+				   "Name=Baz\n"
+				   "Exec=foo\n",
+				   -1, &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+	set_file_mtime (filename, 1000000);
+	silo = load_desktop_files (path, &any_loaded);
+	g_assert_true (any_loaded);
+	node = xb_silo_query_first (silo, "component/name", NULL);
+	g_assert_nonnull (node);
+	g_assert_cmpstr (xb_node_get_text (node), ==, "Foo");
+	g_clear_object (&node);
+	g_clear_object (&silo);
+
+	/* a changed file is parsed again */
+	ret = g_file_set_contents (filename,
+				   "[Desktop Entry]\n"
+				   "Type=Application\n"
+				   "Name=Foo Bar\n"
+				   "Exec=foo\n",
+				   -1, &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+	silo = load_desktop_files (path, &any_loaded);
+	g_assert_true (any_loaded);
+	node = xb_silo_query_first (silo, "component/name", NULL);
+	g_assert_nonnull (node);
+	g_assert_cmpstr (xb_node_get_text (node), ==, "Foo Bar");
+	g_clear_object (&node);
+	g_clear_object (&silo);
+	g_assert_cmpuint (gs_appstream_clear_desktop_file_cache (), >, 0);
+
+	/* and a removed one is dropped */
+	g_assert_cmpint (g_unlink (filename), ==, 0);
+	silo = load_desktop_files (path, &any_loaded);
+	g_assert_false (any_loaded);
+	g_assert_null (silo);
+	g_assert_cmpuint (gs_appstream_clear_desktop_file_cache (), ==, 0);
+
+	g_assert_cmpint (g_rmdir (path), ==, 0);
+}
+
+static void
+gs_appstream_featured_func (void)
+{
+	gboolean ret;
+	const gchar *deployments[] = { "example-os", "other-os", NULL };
+	const gchar *xml =
+		"<components>\n"
+		"  <component type=\"desktop-application\">\n"
+		"    <id>org.example.Popular</id>\n"
+		"    <kudos><kudo>GnomeSoftware::popular</kudo></kudos>\n"
+		"  </component>\n"
+		"  <component type=\"desktop-application\">\n"
+		"    <id>org.example.Featured</id>\n"
+		"    <custom>\n"
+		"      <value key=\"GnomeSoftware::FeatureTile-css\">border: 0;</value>\n"
+		"      <value key=\"GnomeSoftware::DeploymentFeatured\">example-os</value>\n"
+		"      <value key=\"GnomeSoftware::DeploymentFeatured\">other-os</value>\n"
+		"    </custom>\n"
+		"  </component>\n"
+		"  <component type=\"desktop-application\">\n"
+		"    <id>org.example.Deployment</id>\n"
+		"    <custom><value key=\"GnomeSoftware::DeploymentFeatured\">other-os</value></custom>\n"
+		"  </component>\n"
+		"  <component type=\"desktop-application\">\n"
+		"    <id>org.example.Elsewhere</id>\n"
+		"    <custom><value key=\"GnomeSoftware::DeploymentFeatured\">unknown-os</value></custom>\n"
+		"  </component>\n"
+		"</components>\n";
+	g_autoptr(GError) error = NULL;
+	g_autoptr(XbBuilder) builder = xb_builder_new ();
+	g_autoptr(XbBuilderSource) source = xb_builder_source_new ();
+	g_autoptr(XbSilo) silo = NULL;
+	g_autoptr(GsAppList) popular = gs_app_list_new ();
+	g_autoptr(GsAppList) featured = gs_app_list_new ();
+	g_autoptr(GsAppList) deployment_featured = gs_app_list_new ();
+
+	ret = xb_builder_source_load_xml (source, xml, XB_BUILDER_SOURCE_FLAG_NONE, &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+	xb_builder_import_source (builder, source);
+	silo = xb_builder_compile (builder, XB_BUILDER_COMPILE_FLAG_NONE, NULL, &error);
+	g_assert_no_error (error);
+	g_assert_nonnull (silo);
+
+	gs_appstream_ensure_silo_index (silo);
+
+	ret = gs_appstream_add_popular (silo, popular, NULL, &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+	g_assert_cmpuint (gs_app_list_length (popular), ==, 1);
+	g_assert_cmpstr (gs_app_get_id (gs_app_list_index (popular, 0)), ==, "org.example.Popular");
+
+	ret = gs_appstream_add_featured (silo, featured, NULL, &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+	g_assert_cmpuint (gs_app_list_length (featured), ==, 1);
+	g_assert_cmpstr (gs_app_get_id (gs_app_list_index (featured, 0)), ==, "org.example.Featured");
+	g_assert_cmpstr (gs_app_get_metadata_item (gs_app_list_index (featured, 0), "GnomeSoftware::FeatureTile-css"), ==, "border: 0;");
+
+	/* a component featured for several of the deployments is listed once */
+	ret = gs_appstream_add_deployment_featured (silo, deployments, deployment_featured, NULL, &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+	g_assert_cmpuint (gs_app_list_length (deployment_featured), ==, 2);
+	g_assert_cmpstr (gs_app_get_id (gs_app_list_index (deployment_featured, 0)), ==, "org.example.Featured");
+	g_assert_cmpstr (gs_app_get_id (gs_app_list_index (deployment_featured, 1)), ==, "org.example.Deployment");
+}
+
 int
 main (int argc, char **argv)
 {
@@ -767,8 +1532,10 @@ main (int argc, char **argv)
 	g_test_add_func ("/gnome-software/lib/utils{error}", gs_utils_error_func);
 	g_test_add_func ("/gnome-software/lib/utils{cache}", gs_utils_cache_func);
 	g_test_add_func ("/gnome-software/lib/utils{append-kv}", gs_utils_append_kv_func);
+	g_test_add_func ("/gnome-software/lib/utils{glob-matcher}", gs_utils_glob_matcher_func);
 	g_test_add_func ("/gnome-software/lib/os-release", gs_os_release_func);
 	g_test_add_func ("/gnome-software/lib/app", gs_app_func);
+	g_test_add_func ("/gnome-software/lib/app{interned}", gs_app_interned_func);
 	g_test_add_func ("/gnome-software/lib/app/progress-clamping", gs_app_progress_clamping_func);
 	g_test_add_func ("/gnome-software/lib/app{addons}", gs_app_addons_func);
 	g_test_add_func ("/gnome-software/lib/app{unique-id}", gs_app_unique_id_func);
@@ -776,9 +1543,17 @@ main (int argc, char **argv)
 	g_test_add_func ("/gnome-software/lib/app{list}", gs_app_list_func);
 	g_test_add_func ("/gnome-software/lib/app{list-wildcard-dedupe}", gs_app_list_wildcard_dedupe_func);
 	g_test_add_func ("/gnome-software/lib/app{list-performance}", gs_app_list_performance_func);
+	g_test_add_func ("/gnome-software/lib/app{list-sort-name-performance}", gs_app_list_sort_name_performance_func);
 	g_test_add_func ("/gnome-software/lib/app{list-related}", gs_app_list_related_func);
 	g_test_add_func ("/gnome-software/lib/plugin", gs_plugin_func);
+	g_test_add_func ("/gnome-software/lib/plugin-loader{install-queue-replay}", gs_plugin_loader_install_queue_replay_func);
+	g_test_add_func ("/gnome-software/lib/plugin-loader{install-queue-legacy}", gs_plugin_loader_install_queue_legacy_func);
+	g_test_add_func ("/gnome-software/lib/appstream{category-sizes}", gs_appstream_category_sizes_func);
+	g_test_add_func ("/gnome-software/lib/appstream{featured}", gs_appstream_featured_func);
+	g_test_add_func ("/gnome-software/lib/appstream{desktop-files}", gs_appstream_desktop_files_func);
 	g_test_add_func ("/gnome-software/lib/plugin{download-rewrite}", gs_plugin_download_rewrite_func);
+	g_test_add_func ("/gnome-software/lib/download{file}", gs_download_file_func);
+	g_test_add_func ("/gnome-software/lib/download{pause}", gs_download_pause_func);
 
 	return g_test_run ();
 }
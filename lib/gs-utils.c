@@ -460,6 +460,198 @@ gs_utils_strv_fnmatch (gchar **strv, const gchar *str)
 	return FALSE;
 }
 
+typedef struct {
+	gchar	*pattern;  /* (owned) */
+	gsize	 prefix_len;  /* literal characters at the start of @pattern */
+	gsize	 suffix_len;  /* literal characters at the end of @pattern */
+} GsUtilsGlob;
+
+struct _GsUtilsGlobMatcher {
+	GHashTable	*exact;  /* (owned) (element-type utf8 utf8) */
+	GPtrArray	*unprefixed;  /* (owned) (element-type GsUtilsGlob) */
+	GPtrArray	*buckets[256];  /* (owned) (nullable) (element-type GsUtilsGlob), by first byte */
+};
+
+static void
+gs_utils_glob_free (GsUtilsGlob *glob)
+{
+	g_free (glob->pattern);
+	g_free (glob);
+}
+
+static gboolean
+gs_utils_glob_matches (const GsUtilsGlob *glob,
+		       const gchar       *str,
+		       gsize              str_len)
+{
+	/* cheap checks on the literal parts before calling fnmatch() */
+	if (str_len < glob->prefix_len + glob->suffix_len)
+		return FALSE;
+	if (strncmp (str, glob->pattern, glob->prefix_len) != 0)
+		return FALSE;
+	if (glob->suffix_len > 0 &&
+	    memcmp (str + str_len - glob->suffix_len,
+		    glob->pattern + strlen (glob->pattern) - glob->suffix_len,
+		    glob->suffix_len) != 0)
+		return FALSE;
+	return fnmatch (glob->pattern, str, 0) == 0;
+}
+
+static void
+gs_utils_glob_matcher_free (GsUtilsGlobMatcher *self)
+{
+	g_hash_table_unref (self->exact);
+	g_ptr_array_unref (self->unprefixed);
+	for (gsize i = 0; i < G_N_ELEMENTS (self->buckets); i++)
+		g_clear_pointer (&self->buckets[i], g_ptr_array_unref);
+}
+
+/**
+ * gs_utils_glob_matcher_new:
+ * @patterns: (nullable) (array zero-terminated=1): globs to match, as
+ *   accepted by fnmatch()
+ *
+ * Builds a matcher for checking strings against all of @patterns at once,
+ * giving the same result as gs_utils_strv_fnmatch() but without calling
+ * fnmatch() for each pattern.
+ *
+ * Patterns without wildcards are looked up in a hash table. The others are
+ * grouped by their first character, and only tried if the string starts and
+ * ends with their literal prefix and suffix.
+ *
+ * Returns: (transfer full): a new #GsUtilsGlobMatcher
+ * Since: 50
+ **/
+GsUtilsGlobMatcher *
+gs_utils_glob_matcher_new (const gchar * const *patterns)
+{
+	GsUtilsGlobMatcher *self = g_atomic_rc_box_new0 (GsUtilsGlobMatcher);
+
+	self->exact = g_hash_table_new_full (g_str_hash, g_str_equal, g_free, NULL);
+	self->unprefixed = g_ptr_array_new_with_free_func ((GDestroyNotify) gs_utils_glob_free);
+
+	for (gsize i = 0; patterns != NULL && patterns[i] != NULL; i++) {
+		const gchar *pattern = patterns[i];
+		gsize len = strlen (pattern);
+		GsUtilsGlob *glob;
+		guchar first;
+
+		if (strpbrk (pattern, "*?[\\") == NULL) {
+			g_hash_table_add (self->exact, g_strdup (pattern));
+			continue;
+		}
+
+		glob = g_new0 (GsUtilsGlob, 1);
+		glob->pattern = g_strdup (pattern);
+		glob->prefix_len = strcspn (pattern, "*?[\\");
+
+		/* nothing after the last special character can be part of
+		 * a bracket expression or an escape, so it is literal */
+		while (glob->suffix_len < len - glob->prefix_len &&
+		       strchr ("*?[]\\", pattern[len - glob->suffix_len - 1]) == NULL)
+			glob->suffix_len++;
+
+		if (glob->prefix_len == 0) {
+			g_ptr_array_add (self->unprefixed, glob);
+			continue;
+		}
+
+		first = (guchar) pattern[0];
+		if (self->buckets[first] == NULL)
+			self->buckets[first] = g_ptr_array_new_with_free_func ((GDestroyNotify) gs_utils_glob_free);
+		g_ptr_array_add (self->buckets[first], glob);
+	}
+
+	return self;
+}
+
+/**
+ * gs_utils_glob_matcher_ref:
+ * @self: a #GsUtilsGlobMatcher
+ *
+ * Adds a reference to @self.
+ *
+ * Returns: (transfer full): @self
+ * Since: 50
+ **/
+GsUtilsGlobMatcher *
+gs_utils_glob_matcher_ref (GsUtilsGlobMatcher *self)
+{
+	return g_atomic_rc_box_acquire (self);
+}
+
+/**
+ * gs_utils_glob_matcher_unref:
+ * @self: (transfer full): a #GsUtilsGlobMatcher
+ *
+ * Removes a reference from @self, freeing it when the last one is gone.
+ *
+ * Since: 50
+ **/
+void
+gs_utils_glob_matcher_unref (GsUtilsGlobMatcher *self)
+{
+	g_atomic_rc_box_release_full (self, (GDestroyNotify) gs_utils_glob_matcher_free);
+}
+
+/**
+ * gs_utils_glob_matcher_match:
+ * @self: a #GsUtilsGlobMatcher
+ * @str: A string
+ *
+ * Matches a string against the globs @self was built from.
+ *
+ * Returns: %TRUE if any of the globs matches
+ * Since: 50
+ **/
+gboolean
+gs_utils_glob_matcher_match (const GsUtilsGlobMatcher *self,
+			     const gchar              *str)
+{
+	GPtrArray *bucket;
+	gsize str_len;
+
+	if (g_hash_table_contains (self->exact, str))
+		return TRUE;
+
+	str_len = strlen (str);
+
+	for (guint i = 0; i < self->unprefixed->len; i++) {
+		if (gs_utils_glob_matches (g_ptr_array_index (self->unprefixed, i), str, str_len))
+			return TRUE;
+	}
+
+	bucket = self->buckets[(guchar) str[0]];
+	for (guint i = 0; bucket != NULL && i < bucket->len; i++) {
+		if (gs_utils_glob_matches (g_ptr_array_index (bucket, i), str, str_len))
+			return TRUE;
+	}
+
+	return FALSE;
+}
+
+/**
+ * gs_utils_glob_matcher_is_empty:
+ * @self: a #GsUtilsGlobMatcher
+ *
+ * Gets whether @self was built from no globs at all, so that it never
+ * matches anything.
+ *
+ * Returns: %TRUE if there are no globs
+ * Since: 50
+ **/
+gboolean
+gs_utils_glob_matcher_is_empty (const GsUtilsGlobMatcher *self)
+{
+	if (g_hash_table_size (self->exact) > 0 || self->unprefixed->len > 0)
+		return FALSE;
+	for (gsize i = 0; i < G_N_ELEMENTS (self->buckets); i++) {
+		if (self->buckets[i] != NULL)
+			return FALSE;
+	}
+	return TRUE;
+}
+
 /**
  * gs_utils_sort_key:
  * @str: A string to convert to a sort key
@@ -1690,7 +1882,12 @@ gs_utils_app_sort_name (GsApp    *app1,
                         GsApp    *app2,
                         gpointer  user_data)
 {
-	return gs_utils_sort_strcmp (gs_app_get_name (app1), gs_app_get_name (app2));
+	/* use the cached keys rather than gs_utils_sort_strcmp(), which
+	 * would compute two new keys on every comparison */
+	g_autofree gchar *key1 = gs_app_dup_name_sort_key (app1);
+	g_autofree gchar *key2 = gs_app_dup_name_sort_key (app2);
+
+	return g_strcmp0 (key1, key2);
 }
 
 /**
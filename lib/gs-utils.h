@@ -165,4 +165,22 @@ gint		 gs_utils_app_sort_kind		(GsApp			*app1,
 gint		 gs_utils_compare_versions	(const gchar		*ver1,
 						 const gchar		*ver2);
 
+/**
+ * GsUtilsGlobMatcher:
+ *
+ * A set of globs, pre-processed for matching strings against all of them.
+ *
+ * Since: 50
+ */
+typedef struct _GsUtilsGlobMatcher GsUtilsGlobMatcher;
+
+GsUtilsGlobMatcher *gs_utils_glob_matcher_new	(const gchar * const	*patterns);
+GsUtilsGlobMatcher *gs_utils_glob_matcher_ref	(GsUtilsGlobMatcher	*self);
+void		 gs_utils_glob_matcher_unref	(GsUtilsGlobMatcher	*self);
+gboolean	 gs_utils_glob_matcher_match	(const GsUtilsGlobMatcher *self,
+						 const gchar		*str);
+gboolean	 gs_utils_glob_matcher_is_empty	(const GsUtilsGlobMatcher *self);
+
+G_DEFINE_AUTOPTR_CLEANUP_FUNC (GsUtilsGlobMatcher, gs_utils_glob_matcher_unref)
+
 G_END_DECLS
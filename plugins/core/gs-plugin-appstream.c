@@ -746,6 +746,9 @@ gs_plugin_appstream_ref_silo (GsPluginAppstream  *self,
 
 	g_clear_object (&n);
 
+	/* build the silo indexes now, while the silo lock is held */
+	gs_appstream_ensure_silo_index (self->silo);
+
 	self->silo_installed_by_desktopid = g_hash_table_new_full (g_str_hash, g_str_equal, g_free, (GDestroyNotify) g_ptr_array_unref);
 	self->silo_installed_by_id = g_hash_table_new_full (g_str_hash, g_str_equal, g_free, NULL);
 
@@ -1541,7 +1544,8 @@ list_apps_thread_cb (GTask        *task,
 	}
 	if (released_since != NULL) {
 		g_autoptr(GDateTime) now = g_date_time_new_now_utc ();
-		age_secs = g_date_time_difference (now, released_since) / G_TIME_SPAN_SECOND;
+		/* a @released_since in the future includes nothing */
+		age_secs = MAX (g_date_time_difference (now, released_since), 0) / G_TIME_SPAN_SECOND;
 	}
 
 	/* Currently only support a subset of query properties, and only one set at once.
@@ -1638,6 +1642,50 @@ gs_plugin_appstream_list_apps_finish (GsPlugin      *plugin,
 	return g_task_propagate_pointer (G_TASK (result), error);
 }
 
+static gchar *
+gs_plugin_appstream_get_updates_stamp (GsPlugin *plugin)
+{
+	/* never lists updates, so they can’t change */
+	return g_strdup ("");
+}
+
+static gsize
+gs_plugin_appstream_release_memory (GsPlugin                   *plugin,
+                                    GMemoryMonitorWarningLevel  level)
+{
+	GsPluginAppstream *self = GS_PLUGIN_APPSTREAM (plugin);
+	g_autoptr(GBytes) bytes = NULL;
+	gsize n_bytes;
+
+	/* rebuilding the silo is expensive, so only drop it when things are
+	 * critical; it’s rebuilt from the on-disk cache on next use */
+	if (level < G_MEMORY_MONITOR_WARNING_LEVEL_CRITICAL)
+		return 0;
+
+	/* don’t block the main thread if the silo is being (re)built */
+	if (!g_mutex_trylock (&self->silo_lock))
+		return 0;
+
+	/* only drop the silo if nobody else is using it */
+	if (self->silo == NULL || G_OBJECT (self->silo)->ref_count != 1) {
+		g_mutex_unlock (&self->silo_lock);
+		return 0;
+	}
+
+	bytes = xb_silo_get_bytes (self->silo);
+	n_bytes = (bytes != NULL) ? g_bytes_get_size (bytes) : 0;
+	g_clear_pointer (&bytes, g_bytes_unref);
+
+	g_clear_object (&self->silo);
+	g_clear_pointer (&self->silo_filename, g_free);
+	g_clear_pointer (&self->silo_installed_by_desktopid, g_hash_table_unref);
+	g_clear_pointer (&self->silo_installed_by_id, g_hash_table_unref);
+
+	g_mutex_unlock (&self->silo_lock);
+
+	return n_bytes;
+}
+
 static void refresh_metadata_thread_cb (GTask        *task,
                                         gpointer      source_object,
                                         gpointer      task_data,
@@ -1711,6 +1759,8 @@ gs_plugin_appstream_class_init (GsPluginAppstreamClass *klass)
 	plugin_class->refine_finish = gs_plugin_appstream_refine_finish;
 	plugin_class->list_apps_async = gs_plugin_appstream_list_apps_async;
 	plugin_class->list_apps_finish = gs_plugin_appstream_list_apps_finish;
+	plugin_class->get_updates_stamp = gs_plugin_appstream_get_updates_stamp;
+	plugin_class->release_memory = gs_plugin_appstream_release_memory;
 	plugin_class->refresh_metadata_async = gs_plugin_appstream_refresh_metadata_async;
 	plugin_class->refresh_metadata_finish = gs_plugin_appstream_refresh_metadata_finish;
 	plugin_class->refine_categories_async = gs_plugin_appstream_refine_categories_async;
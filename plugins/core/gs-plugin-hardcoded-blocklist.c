@@ -8,7 +8,6 @@
 
 #include <config.h>
 
-#include <fnmatch.h>
 #include <gnome-software.h>
 
 #include "gs-plugin-hardcoded-blocklist.h"
@@ -23,6 +22,8 @@
 struct _GsPluginHardcodedBlocklist
 {
 	GsPlugin		 parent;
+
+	GsUtilsGlobMatcher	*app_globs;  /* (owned) */
 };
 
 G_DEFINE_TYPE (GsPluginHardcodedBlocklist, gs_plugin_hardcoded_blocklist, GS_TYPE_PLUGIN)
@@ -30,18 +31,6 @@ G_DEFINE_TYPE (GsPluginHardcodedBlocklist, gs_plugin_hardcoded_blocklist, GS_TYP
 static void
 gs_plugin_hardcoded_blocklist_init (GsPluginHardcodedBlocklist *self)
 {
-	/* need ID */
-	gs_plugin_add_rule (GS_PLUGIN (self), GS_PLUGIN_RULE_RUN_AFTER, "appstream");
-}
-
-static gboolean
-refine_app (GsPlugin                    *plugin,
-            GsApp                       *app,
-            GsPluginRefineRequireFlags   require_flags,
-            GCancellable                *cancellable,
-            GError                     **error)
-{
-	guint i;
 	const gchar *app_globs[] = {
 		"freeciv-server.desktop",
 		"links.desktop",
@@ -57,17 +46,36 @@ refine_app (GsPlugin                    *plugin,
 		"wine-*.desktop",
 		NULL };
 
+	self->app_globs = gs_utils_glob_matcher_new (app_globs);
+
+	/* need ID */
+	gs_plugin_add_rule (GS_PLUGIN (self), GS_PLUGIN_RULE_RUN_AFTER, "appstream");
+}
+
+static void
+gs_plugin_hardcoded_blocklist_dispose (GObject *object)
+{
+	GsPluginHardcodedBlocklist *self = GS_PLUGIN_HARDCODED_BLOCKLIST (object);
+
+	g_clear_pointer (&self->app_globs, gs_utils_glob_matcher_unref);
+
+	G_OBJECT_CLASS (gs_plugin_hardcoded_blocklist_parent_class)->dispose (object);
+}
+
+static gboolean
+refine_app (GsPluginHardcodedBlocklist  *self,
+            GsApp                       *app,
+            GsPluginRefineRequireFlags   require_flags,
+            GCancellable                *cancellable,
+            GError                     **error)
+{
 	/* not set yet */
 	if (gs_app_get_id (app) == NULL)
 		return TRUE;
 
 	/* search */
-	for (i = 0; app_globs[i] != NULL; i++) {
-		if (fnmatch (app_globs[i], gs_app_get_id (app), 0) == 0) {
-			gs_app_add_quirk (app, GS_APP_QUIRK_HIDE_EVERYWHERE);
-			break;
-		}
-	}
+	if (gs_utils_glob_matcher_match (self->app_globs, gs_app_get_id (app)))
+		gs_app_add_quirk (app, GS_APP_QUIRK_HIDE_EVERYWHERE);
 
 	return TRUE;
 }
@@ -83,6 +91,7 @@ gs_plugin_hardcoded_blocklist_refine_async (GsPlugin                   *plugin,
                                             GAsyncReadyCallback         callback,
                                             gpointer                    user_data)
 {
+	GsPluginHardcodedBlocklist *self = GS_PLUGIN_HARDCODED_BLOCKLIST (plugin);
 	g_autoptr(GTask) task = NULL;
 	g_autoptr(GError) local_error = NULL;
 
@@ -91,7 +100,7 @@ gs_plugin_hardcoded_blocklist_refine_async (GsPlugin                   *plugin,
 
 	for (guint i = 0; i < gs_app_list_length (list); i++) {
 		GsApp *app = gs_app_list_index (list, i);
-		if (!refine_app (plugin, app, require_flags, cancellable, &local_error)) {
+		if (!refine_app (self, app, require_flags, cancellable, &local_error)) {
 			g_task_return_error (task, g_steal_pointer (&local_error));
 			return;
 		}
@@ -111,8 +120,11 @@ gs_plugin_hardcoded_blocklist_refine_finish (GsPlugin      *plugin,
 static void
 gs_plugin_hardcoded_blocklist_class_init (GsPluginHardcodedBlocklistClass *klass)
 {
+	GObjectClass *object_class = G_OBJECT_CLASS (klass);
 	GsPluginClass *plugin_class = GS_PLUGIN_CLASS (klass);
 
+	object_class->dispose = gs_plugin_hardcoded_blocklist_dispose;
+
 	plugin_class->refine_async = gs_plugin_hardcoded_blocklist_refine_async;
 	plugin_class->refine_finish = gs_plugin_hardcoded_blocklist_refine_finish;
 }
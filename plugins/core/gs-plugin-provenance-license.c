@@ -26,23 +26,26 @@ struct _GsPluginProvenanceLicense {
 	GsPlugin		 parent;
 
 	GSettings		*settings;
-	gchar			**sources;
+	GsUtilsGlobMatcher	*sources;  /* (owned) */
 	gchar			*license_id;
 };
 
 G_DEFINE_TYPE (GsPluginProvenanceLicense, gs_plugin_provenance_license, GS_TYPE_PLUGIN)
 
-static gchar **
+static GsUtilsGlobMatcher *
 gs_plugin_provenance_license_get_sources (GsPluginProvenanceLicense *self)
 {
 	const gchar *tmp;
+	g_auto(GStrv) sources = NULL;
 
 	tmp = g_getenv ("GS_SELF_TEST_PROVENANCE_LICENSE_SOURCES");
 	if (tmp != NULL) {
 		g_debug ("using custom provenance_license sources of %s", tmp);
-		return g_strsplit (tmp, ",", -1);
+		sources = g_strsplit (tmp, ",", -1);
+	} else {
+		sources = g_settings_get_strv (self->settings, "free-repos");
 	}
-	return g_settings_get_strv (self->settings, "free-repos");
+	return gs_utils_glob_matcher_new ((const gchar * const *) sources);
 }
 
 static gchar *
@@ -71,7 +74,7 @@ gs_plugin_provenance_license_changed_cb (GSettings   *settings,
 	GsPluginProvenanceLicense *self = GS_PLUGIN_PROVENANCE_LICENSE (user_data);
 
 	if (g_strcmp0 (key, "free-repos") == 0) {
-		g_strfreev (self->sources);
+		gs_utils_glob_matcher_unref (self->sources);
 		self->sources = gs_plugin_provenance_license_get_sources (self);
 	}
 	if (g_strcmp0 (key, "free-repos-url") == 0) {
@@ -98,7 +101,7 @@ gs_plugin_provenance_license_dispose (GObject *object)
 {
 	GsPluginProvenanceLicense *self = GS_PLUGIN_PROVENANCE_LICENSE (object);
 
-	g_clear_pointer (&self->sources, g_strfreev);
+	g_clear_pointer (&self->sources, gs_utils_glob_matcher_unref);
 	g_clear_pointer (&self->license_id, g_free);
 	g_clear_object (&self->settings);
 
@@ -123,12 +126,12 @@ refine_app (GsPluginProvenanceLicense   *self,
 		return TRUE;
 
 	/* nothing to search */
-	if (self->sources == NULL || self->sources[0] == NULL)
+	if (gs_utils_glob_matcher_is_empty (self->sources))
 		return TRUE;
 
 	/* simple case */
 	origin = gs_app_get_origin (app);
-	if (origin != NULL && gs_utils_strv_fnmatch (self->sources, origin))
+	if (origin != NULL && gs_utils_glob_matcher_match (self->sources, origin))
 		gs_app_set_license (app, GS_APP_QUALITY_NORMAL, self->license_id);
 
 	return TRUE;
@@ -159,7 +162,7 @@ gs_plugin_provenance_license_refine_async (GsPlugin                   *plugin,
 	}
 
 	/* nothing to search */
-	if (self->sources == NULL || self->sources[0] == NULL) {
+	if (gs_utils_glob_matcher_is_empty (self->sources)) {
 		g_task_return_boolean (task, TRUE);
 		return;
 	}
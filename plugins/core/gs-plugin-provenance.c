@@ -26,8 +26,8 @@ struct _GsPluginProvenance {
 
 	GSettings		*settings;
 	GHashTable		*repos; /* gchar *name ~> guint flags */
-	GPtrArray		*provenance_wildcards; /* non-NULL, when have names with wildcards */
-	GPtrArray		*compulsory_wildcards; /* non-NULL, when have names with wildcards */
+	GsUtilsGlobMatcher	*provenance_wildcards; /* non-NULL, when have names with wildcards */
+	GsUtilsGlobMatcher	*compulsory_wildcards; /* non-NULL, when have names with wildcards */
 };
 
 G_DEFINE_TYPE (GsPluginProvenance, gs_plugin_provenance, GS_TYPE_PLUGIN)
@@ -82,7 +82,7 @@ gs_plugin_provenance_settings_changed_cb (GSettings *settings,
 {
 	GsPluginProvenance *self = GS_PLUGIN_PROVENANCE (user_data);
 	GsAppQuirk quirk = GS_APP_QUIRK_NONE;
-	GPtrArray **pwildcards = NULL;
+	GsUtilsGlobMatcher **pwildcards = NULL;
 
 	if (g_strcmp0 (key, "official-repos") == 0) {
 		quirk = GS_APP_QUIRK_PROVENANCE;
@@ -96,9 +96,9 @@ gs_plugin_provenance_settings_changed_cb (GSettings *settings,
 		/* The keys are stolen by the hash table, thus free only the array */
 		g_autofree gchar **repos = NULL;
 		g_autoptr(GHashTable) old_repos = self->repos;
-		g_autoptr(GPtrArray) old_wildcards = *pwildcards;
+		g_autoptr(GsUtilsGlobMatcher) old_wildcards = *pwildcards;
 		GHashTable *new_repos = gs_plugin_provenance_remove_by_flag (old_repos, quirk);
-		GPtrArray *new_wildcards = NULL;
+		g_autoptr(GPtrArray) new_wildcards = NULL;
 		repos = gs_plugin_provenance_get_sources (self, key);
 		for (guint ii = 0; repos && repos[ii]; ii++) {
 			gchar *repo = g_steal_pointer (&(repos[ii]));
@@ -114,10 +114,12 @@ gs_plugin_provenance_settings_changed_cb (GSettings *settings,
 					GPOINTER_TO_UINT (g_hash_table_lookup (new_repos, repo))));
 			}
 		}
-		if (new_wildcards != NULL)
-			g_ptr_array_add (new_wildcards, NULL);
 		self->repos = new_repos;
-		*pwildcards = new_wildcards;
+		*pwildcards = NULL;
+		if (new_wildcards != NULL) {
+			g_ptr_array_add (new_wildcards, NULL);
+			*pwildcards = gs_utils_glob_matcher_new ((const gchar * const *) new_wildcards->pdata);
+		}
 	}
 }
 
@@ -143,8 +145,8 @@ gs_plugin_provenance_dispose (GObject *object)
 	GsPluginProvenance *self = GS_PLUGIN_PROVENANCE (object);
 
 	g_clear_pointer (&self->repos, g_hash_table_unref);
-	g_clear_pointer (&self->provenance_wildcards, g_ptr_array_unref);
-	g_clear_pointer (&self->compulsory_wildcards, g_ptr_array_unref);
+	g_clear_pointer (&self->provenance_wildcards, gs_utils_glob_matcher_unref);
+	g_clear_pointer (&self->compulsory_wildcards, gs_utils_glob_matcher_unref);
 	g_clear_object (&self->settings);
 
 	G_OBJECT_CLASS (gs_plugin_provenance_parent_class)->dispose (object);
@@ -152,8 +154,8 @@ gs_plugin_provenance_dispose (GObject *object)
 
 static gboolean
 gs_plugin_provenance_find_repo_flags (GHashTable *repos,
-				      GPtrArray *provenance_wildcards,
-				      GPtrArray *compulsory_wildcards,
+				      GsUtilsGlobMatcher *provenance_wildcards,
+				      GsUtilsGlobMatcher *compulsory_wildcards,
 				      const gchar *repo,
 				      guint *out_flags)
 {
@@ -161,10 +163,10 @@ gs_plugin_provenance_find_repo_flags (GHashTable *repos,
 		return FALSE;
 	*out_flags = GPOINTER_TO_UINT (g_hash_table_lookup (repos, repo));
 	if (provenance_wildcards != NULL &&
-	    gs_utils_strv_fnmatch ((gchar **) provenance_wildcards->pdata, repo))
+	    gs_utils_glob_matcher_match (provenance_wildcards, repo))
 		*out_flags |= GS_APP_QUIRK_PROVENANCE;
 	if (compulsory_wildcards != NULL &&
-	    gs_utils_strv_fnmatch ((gchar **) compulsory_wildcards->pdata, repo))
+	    gs_utils_glob_matcher_match (compulsory_wildcards, repo))
 		*out_flags |= GS_APP_QUIRK_COMPULSORY;
 	return *out_flags != 0;
 }
@@ -174,8 +176,8 @@ refine_app (GsPlugin                    *plugin,
             GsApp                       *app,
             GsPluginRefineRequireFlags   require_flags,
             GHashTable                  *repos,
-            GPtrArray                   *provenance_wildcards,
-            GPtrArray                   *compulsory_wildcards,
+            GsUtilsGlobMatcher          *provenance_wildcards,
+            GsUtilsGlobMatcher          *compulsory_wildcards,
             GCancellable                *cancellable,
             GError                     **error)
 {
@@ -235,8 +237,8 @@ gs_plugin_provenance_refine_async (GsPlugin                   *plugin,
 	g_autoptr(GTask) task = NULL;
 	g_autoptr(GError) local_error = NULL;
 	g_autoptr(GHashTable) repos = NULL;
-	g_autoptr(GPtrArray) provenance_wildcards = NULL;
-	g_autoptr(GPtrArray) compulsory_wildcards = NULL;
+	g_autoptr(GsUtilsGlobMatcher) provenance_wildcards = NULL;
+	g_autoptr(GsUtilsGlobMatcher) compulsory_wildcards = NULL;
 
 	task = g_task_new (plugin, cancellable, callback, user_data);
 	g_task_set_source_tag (task, gs_plugin_provenance_refine_async);
@@ -248,8 +250,8 @@ gs_plugin_provenance_refine_async (GsPlugin                   *plugin,
 	}
 
 	repos = g_hash_table_ref (self->repos);
-	provenance_wildcards = self->provenance_wildcards != NULL ? g_ptr_array_ref (self->provenance_wildcards) : NULL;
-	compulsory_wildcards = self->compulsory_wildcards != NULL ? g_ptr_array_ref (self->compulsory_wildcards) : NULL;
+	provenance_wildcards = self->provenance_wildcards != NULL ? gs_utils_glob_matcher_ref (self->provenance_wildcards) : NULL;
+	compulsory_wildcards = self->compulsory_wildcards != NULL ? gs_utils_glob_matcher_ref (self->compulsory_wildcards) : NULL;
 
 	/* nothing to search */
 	if (g_hash_table_size (repos) == 0 && provenance_wildcards == NULL && compulsory_wildcards == NULL) {
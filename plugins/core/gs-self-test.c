@@ -66,6 +66,62 @@ gs_plugins_core_search_repo_name_func (GsPluginLoader *plugin_loader)
 	g_assert_cmpint (gs_app_get_kind (app), ==, AS_COMPONENT_KIND_DESKTOP_APP);
 }
 
+static void
+gs_plugins_core_version_history_func (GsPluginLoader *plugin_loader)
+{
+	GsApp *app;
+	GsAppList *list;
+	AsRelease *release;
+	gboolean ret;
+	g_autoptr(GError) error = NULL;
+	g_autoptr(GPtrArray) version_history = NULL;
+	g_autoptr(GsAppQuery) query = NULL;
+	g_autoptr(GsPluginJob) plugin_job = NULL;
+	g_autoptr(GsPluginJob) refine_job = NULL;
+	const gchar *keywords[2] = { "yellow", NULL };
+
+	/* drop all caches */
+	gs_utils_rmtree (g_getenv ("GS_SELF_TEST_CACHEDIR"), NULL);
+	gs_test_reinitialise_plugin_loader (plugin_loader, allowlist, NULL);
+
+	/* list views do not ask for the history */
+	query = gs_app_query_new ("keywords", keywords,
+				  "refine-require-flags", GS_PLUGIN_REFINE_REQUIRE_FLAGS_ICON,
+				  NULL);
+	plugin_job = gs_plugin_job_list_apps_new (query, GS_PLUGIN_LIST_APPS_FLAGS_NONE);
+	ret = gs_plugin_loader_job_process (plugin_loader, plugin_job, NULL, &error);
+	list = gs_plugin_job_list_apps_get_result_list (GS_PLUGIN_JOB_LIST_APPS (plugin_job));
+	gs_test_flush_main_context ();
+	g_assert_no_error (error);
+	g_assert_true (ret);
+	g_assert_cmpint (gs_app_list_length (list), >=, 1);
+	app = gs_app_list_index (list, 0);
+	g_assert_cmpstr (gs_app_get_id (app), ==, "arachne.desktop");
+
+	/* so the release notes are not formatted, but the date is known */
+	g_assert_null (gs_app_get_version_history (app));
+	g_assert_cmpuint (gs_app_get_release_date (app), ==, 1700000000);
+
+	/* the details page does */
+	refine_job = gs_plugin_job_refine_new_for_app (app,
+						       GS_PLUGIN_REFINE_FLAGS_NONE,
+						       GS_PLUGIN_REFINE_REQUIRE_FLAGS_HISTORY);
+	ret = gs_plugin_loader_job_process (plugin_loader, refine_job, NULL, &error);
+	gs_test_flush_main_context ();
+	g_assert_no_error (error);
+	g_assert_true (ret);
+
+	version_history = gs_app_get_version_history (app);
+	g_assert_nonnull (version_history);
+	g_assert_cmpuint (version_history->len, ==, 2);
+	release = g_ptr_array_index (version_history, 0);
+	g_assert_cmpstr (as_release_get_version (release), ==, "1.2");
+	g_assert_cmpstr (as_release_get_description (release), ==, "Fixed <i>all</i> the crashes.");
+	release = g_ptr_array_index (version_history, 1);
+	g_assert_cmpstr (as_release_get_version (release), ==, "1.1");
+	g_assert_null (as_release_get_description (release));
+}
+
 static void
 gs_plugins_core_os_release_func (GsPluginLoader *plugin_loader)
 {
@@ -195,6 +251,62 @@ gs_plugins_core_generic_updates_func (GsPluginLoader *plugin_loader)
 	}
 }
 
+static GsAppList *
+list_released_since (GsPluginLoader *plugin_loader,
+                     GDateTime      *released_since)
+{
+	gboolean ret;
+	g_autoptr(GError) error = NULL;
+	g_autoptr(GsAppQuery) query = NULL;
+	g_autoptr(GsPluginJob) plugin_job = NULL;
+	GsAppList *list;
+
+	query = gs_app_query_new ("released-since", released_since, NULL);
+	plugin_job = gs_plugin_job_list_apps_new (query, GS_PLUGIN_LIST_APPS_FLAGS_NONE);
+	ret = gs_plugin_loader_job_process (plugin_loader, plugin_job, NULL, &error);
+	gs_test_flush_main_context ();
+	g_assert_no_error (error);
+	g_assert_true (ret);
+
+	list = gs_plugin_job_list_apps_get_result_list (GS_PLUGIN_JOB_LIST_APPS (plugin_job));
+	g_assert_nonnull (list);
+
+	return g_object_ref (list);
+}
+
+static void
+gs_plugins_core_recent_func (GsPluginLoader *plugin_loader)
+{
+	g_autoptr(GDateTime) now = g_date_time_new_now_utc ();
+	g_autoptr(GDateTime) last_month = g_date_time_add_days (now, -30);
+	g_autoptr(GDateTime) tomorrow = g_date_time_add_days (now, 1);
+	g_autoptr(GDateTime) long_ago = g_date_time_new_utc (1, 1, 1, 0, 0, 0);
+	g_autoptr(GsAppList) list = NULL;
+
+	/* drop all caches */
+	gs_utils_rmtree (g_getenv ("GS_SELF_TEST_CACHEDIR"), NULL);
+	gs_test_reinitialise_plugin_loader (plugin_loader, allowlist, NULL);
+
+	/* answered from the index of the last year’s releases */
+	list = list_released_since (plugin_loader, last_month);
+	g_assert_cmpuint (gs_app_list_length (list), ==, 1);
+	g_assert_cmpstr (gs_app_get_id (gs_app_list_index (list, 0)), ==, "hermes.desktop");
+	g_assert_cmpuint (gs_app_get_release_date (gs_app_list_index (list, 0)), >, 0);
+	g_clear_object (&list);
+
+	/* older than the index, and from before the epoch, which must not
+	 * wrap around and exclude everything */
+	list = list_released_since (plugin_loader, long_ago);
+	g_assert_cmpuint (gs_app_list_length (list), ==, 2);
+	g_assert_nonnull (gs_app_list_lookup (list, "*/*/*/arachne.desktop/*"));
+	g_assert_nonnull (gs_app_list_lookup (list, "*/*/*/hermes.desktop/*"));
+	g_clear_object (&list);
+
+	/* nothing has been released since a time in the future */
+	list = list_released_since (plugin_loader, tomorrow);
+	g_assert_cmpuint (gs_app_list_length (list), ==, 0);
+}
+
 int
 main (int argc, char **argv)
 {
@@ -204,7 +316,7 @@ main (int argc, char **argv)
 	g_autofree gchar *os_release_filename = NULL;
 	g_autoptr(GError) error = NULL;
 	g_autoptr(GsPluginLoader) plugin_loader = NULL;
-	const gchar *xml;
+	g_autofree gchar *xml = NULL;
 
 	/* While we use %G_TEST_OPTION_ISOLATE_DIRS to create temporary directories
 	 * for each of the tests, we want to use the system MIME registry, assuming
@@ -227,8 +339,8 @@ main (int argc, char **argv)
 	g_assert_nonnull (os_release_filename);
 	g_setenv ("GS_SELF_TEST_OS_RELEASE_FILENAME", os_release_filename, TRUE);
 
-	/* fake some data */
-	xml = "<?xml version=\"1.0\"?>\n"
+	/* fake some data, with one app released recently */
+	xml = g_strdup_printf ("<?xml version=\"1.0\"?>\n"
 		"<components origin=\"yellow\" version=\"0.9\">\n"
 		"  <component type=\"desktop\">\n"
 		"    <id>arachne.desktop</id>\n"
@@ -236,6 +348,22 @@ main (int argc, char **argv)
 		"    <summary>Test</summary>\n"
 		"    <icon type=\"stock\">system-file-manager</icon>\n"
 		"    <pkgname>arachne</pkgname>\n"
+		"    <releases>\n"
+		"      <release version=\"1.2\" timestamp=\"1700000000\">\n"
+		"        <description><p>Fixed <em>all</em> the crashes.</p></description>\n"
+		"      </release>\n"
+		"      <release version=\"1.1\" timestamp=\"1600000000\"/>\n"
+		"    </releases>\n"
+		"  </component>\n"
+		"  <component type=\"desktop\">\n"
+		"    <id>hermes.desktop</id>\n"
+		"    <name>Hermes</name>\n"
+		"    <summary>Recently released</summary>\n"
+		"    <icon type=\"stock\">system-file-manager</icon>\n"
+		"    <pkgname>hermes</pkgname>\n"
+		"    <releases>\n"
+		"      <release version=\"2.0\" timestamp=\"%" G_GINT64_FORMAT "\"/>\n"
+		"    </releases>\n"
 		"  </component>\n"
 		"  <component type=\"os-upgrade\">\n"
 		"    <id>org.fedoraproject.fedora-25</id>\n"
@@ -246,7 +374,8 @@ main (int argc, char **argv)
 		"  <info>\n"
 		"    <scope>user</scope>\n"
 		"  </info>\n"
-		"</components>\n";
+		"</components>\n",
+		g_get_real_time () / G_USEC_PER_SEC - 24 * 60 * 60);
 	g_setenv ("GS_SELF_TEST_APPSTREAM_XML", xml, TRUE);
 
 	/* we can only load this once per process */
@@ -264,6 +393,12 @@ main (int argc, char **argv)
 	g_test_add_data_func ("/gnome-software/plugins/core/search-repo-name",
 			      plugin_loader,
 			      (GTestDataFunc) gs_plugins_core_search_repo_name_func);
+	g_test_add_data_func ("/gnome-software/plugins/core/version-history",
+			      plugin_loader,
+			      (GTestDataFunc) gs_plugins_core_version_history_func);
+	g_test_add_data_func ("/gnome-software/plugins/core/recent",
+			      plugin_loader,
+			      (GTestDataFunc) gs_plugins_core_recent_func);
 	g_test_add_data_func ("/gnome-software/plugins/core/os-release",
 			      plugin_loader,
 			      (GTestDataFunc) gs_plugins_core_os_release_func);
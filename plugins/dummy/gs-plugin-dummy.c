@@ -29,6 +29,8 @@ struct _GsPluginDummy {
 	GsApp			*cached_origin;
 	GHashTable		*installed_apps;	/* id:1 */
 	GHashTable		*available_apps;	/* id:1 */
+	guint			 update_stage_seq;
+	gint			 updates_serial;  /* (atomic) */
 };
 
 G_DEFINE_TYPE (GsPluginDummy, gs_plugin_dummy, GS_TYPE_PLUGIN)
@@ -64,6 +66,9 @@ gs_plugin_dummy_init (GsPluginDummy *self)
 	/* need help from appstream */
 	gs_plugin_add_rule (plugin, GS_PLUGIN_RULE_RUN_AFTER, "appstream");
 	gs_plugin_add_rule (plugin, GS_PLUGIN_RULE_RUN_AFTER, "os-release");
+
+	/* ‘pipeline-’ apps can be downloaded and applied separately */
+	gs_plugin_set_pipelined_updates (plugin, TRUE);
 }
 
 static void
@@ -494,6 +499,7 @@ uninstall_cb (GObject      *source_object,
 	g_hash_table_insert (self->available_apps,
 			     g_strdup (gs_app_get_id (app_data->app)),
 			     GUINT_TO_POINTER (1));
+	g_atomic_int_inc (&self->updates_serial);
 
 	/* Refine the app so it has the right post-uninstall state. */
 	gs_app_set_state (app_data->app, GS_APP_STATE_UNKNOWN);
@@ -689,6 +695,7 @@ install_cb (GObject      *source_object,
 			     g_strdup (gs_app_get_id (app_data->app)),
 			     GUINT_TO_POINTER (1));
 	g_hash_table_remove (self->available_apps, gs_app_get_id (app_data->app));
+	g_atomic_int_inc (&self->updates_serial);
 
 	finish_install_apps_op (task, NULL);
 }
@@ -1022,6 +1029,13 @@ gs_plugin_dummy_list_apps_async (GsPlugin              *plugin,
 			gs_plugin_dummy_timeout_async (self, 5000, cancellable,
 						       list_apps_timeout_cb, g_steal_pointer (&task));
 			return;
+		} else if (g_strcmp0 (keywords[0], "zeus") == 0) {
+			/* zeus comes from the appstream plugin; respond slowly
+			 * with nothing, so tests can see its results arrive
+			 * while this plugin is still searching */
+			gs_plugin_dummy_timeout_async (self, 500, cancellable,
+						       list_apps_timeout_cb, g_steal_pointer (&task));
+			return;
 		} else if (g_strcmp0 (keywords[0], "chiron") == 0) {
 			g_autoptr(GsApp) app = NULL;
 
@@ -1277,6 +1291,22 @@ gs_plugin_dummy_list_distro_upgrades_finish (GsPlugin      *plugin,
 static void update_apps_cb (GObject      *source_object,
                             GAsyncResult *result,
                             gpointer      user_data);
+static void update_pipeline_app_cb (GObject      *source_object,
+                                    GAsyncResult *result,
+                                    gpointer      user_data);
+
+/* Record when each stage of updating a ‘pipeline-’ app happens, so the order
+ * can be checked by the tests. */
+static void
+record_update_stage (GsPluginDummy *self,
+                     GsApp         *app,
+                     const gchar   *stage)
+{
+	g_autofree gchar *key = g_strdup_printf ("Dummy::%s", stage);
+	g_autofree gchar *value = g_strdup_printf ("%u", ++self->update_stage_seq);
+
+	gs_app_set_metadata (app, key, value);
+}
 
 static void
 gs_plugin_dummy_update_apps_async (GsPlugin                           *plugin,
@@ -1301,6 +1331,29 @@ gs_plugin_dummy_update_apps_async (GsPlugin                           *plugin,
 						    cancellable, callback, user_data);
 	g_task_set_source_tag (task, gs_plugin_dummy_update_apps_async);
 
+	/* A single stage of a pipelined update of a ‘pipeline-’ app. These are
+	 * quick, so the order of the stages can be tested. */
+	if (gs_app_list_length (apps) == 1 &&
+	    gs_app_get_id (gs_app_list_index (apps, 0)) != NULL &&
+	    g_str_has_prefix (gs_app_get_id (gs_app_list_index (apps, 0)), "pipeline-") &&
+	    (flags & GS_PLUGIN_UPDATE_APPS_FLAGS_PIPELINED) &&
+	    (flags & (GS_PLUGIN_UPDATE_APPS_FLAGS_NO_DOWNLOAD | GS_PLUGIN_UPDATE_APPS_FLAGS_NO_APPLY))) {
+		GsApp *app = gs_app_list_index (apps, 0);
+		gboolean download = (flags & GS_PLUGIN_UPDATE_APPS_FLAGS_NO_APPLY) != 0;
+
+		record_update_stage (GS_PLUGIN_DUMMY (plugin), app, download ? "download-start" : "apply-start");
+
+		if (download && g_str_has_suffix (gs_app_get_id (app), "-fail")) {
+			g_task_return_new_error (task, GS_PLUGIN_ERROR, GS_PLUGIN_ERROR_DOWNLOAD_FAILED,
+						 "no network connection is available");
+			return;
+		}
+
+		gs_plugin_dummy_delay_async (plugin, NULL, download ? 200 : 100, cancellable,
+					     update_pipeline_app_cb, g_steal_pointer (&task));
+		return;
+	}
+
 	if (!(flags & GS_PLUGIN_UPDATE_APPS_FLAGS_NO_DOWNLOAD))
 		gs_plugin_dummy_delay_async (plugin, NULL, 5100, cancellable, update_apps_cb, g_steal_pointer (&task));
 	else
@@ -1380,6 +1433,32 @@ update_apps_cb (GObject      *source_object,
 	}
 }
 
+static void
+update_pipeline_app_cb (GObject      *source_object,
+                        GAsyncResult *result,
+                        gpointer      user_data)
+{
+	GsPlugin *plugin = GS_PLUGIN (source_object);
+	g_autoptr(GTask) task = g_steal_pointer (&user_data);
+	GsPluginUpdateAppsData *data = g_task_get_task_data (task);
+	GsApp *app = gs_app_list_index (data->apps, 0);
+	g_autoptr(GError) local_error = NULL;
+
+	if (!gs_plugin_dummy_delay_finish (plugin, result, &local_error)) {
+		g_task_return_error (task, g_steal_pointer (&local_error));
+		return;
+	}
+
+	if (data->flags & GS_PLUGIN_UPDATE_APPS_FLAGS_NO_APPLY) {
+		record_update_stage (GS_PLUGIN_DUMMY (plugin), app, "download-end");
+	} else {
+		record_update_stage (GS_PLUGIN_DUMMY (plugin), app, "apply-end");
+		gs_app_set_state (app, GS_APP_STATE_INSTALLED);
+	}
+
+	g_task_return_boolean (task, TRUE);
+}
+
 static gboolean
 gs_plugin_dummy_update_apps_finish (GsPlugin      *plugin,
                                     GAsyncResult  *result,
@@ -1418,13 +1497,26 @@ refresh_metadata_cb (GObject      *source_object,
                      gpointer      user_data)
 {
 	GsPlugin *plugin = GS_PLUGIN (source_object);
+	GsPluginDummy *self = GS_PLUGIN_DUMMY (plugin);
 	g_autoptr(GTask) task = g_steal_pointer (&user_data);
 	g_autoptr(GError) local_error = NULL;
 
-	if (!gs_plugin_dummy_delay_finish (plugin, result, &local_error))
+	if (!gs_plugin_dummy_delay_finish (plugin, result, &local_error)) {
 		g_task_return_error (task, g_steal_pointer (&local_error));
-	else
+	} else {
+		g_atomic_int_inc (&self->updates_serial);
 		g_task_return_boolean (task, TRUE);
+	}
+}
+
+static gchar *
+gs_plugin_dummy_get_updates_stamp (GsPlugin *plugin)
+{
+	GsPluginDummy *self = GS_PLUGIN_DUMMY (plugin);
+
+	/* the updates only change when metadata is refreshed or an app is
+	 * installed or removed */
+	return g_strdup_printf ("%u", (guint) g_atomic_int_get (&self->updates_serial));
 }
 
 static gboolean
@@ -1560,6 +1652,7 @@ gs_plugin_dummy_class_init (GsPluginDummyClass *klass)
 	plugin_class->list_apps_finish = gs_plugin_dummy_list_apps_finish;
 	plugin_class->refresh_metadata_async = gs_plugin_dummy_refresh_metadata_async;
 	plugin_class->refresh_metadata_finish = gs_plugin_dummy_refresh_metadata_finish;
+	plugin_class->get_updates_stamp = gs_plugin_dummy_get_updates_stamp;
 	plugin_class->list_distro_upgrades_async = gs_plugin_dummy_list_distro_upgrades_async;
 	plugin_class->list_distro_upgrades_finish = gs_plugin_dummy_list_distro_upgrades_finish;
 	plugin_class->install_apps_async = gs_plugin_dummy_install_apps_async;
@@ -62,6 +62,220 @@ gs_plugins_dummy_install_func (GsPluginLoader *plugin_loader)
 	g_assert_cmpint (gs_app_get_state (app), ==, GS_APP_STATE_AVAILABLE);
 }
 
+static void
+gs_plugins_dummy_updates_stamp_func (GsPluginLoader *plugin_loader)
+{
+	gboolean ret;
+	g_autofree gchar *stamp1 = NULL;
+	g_autofree gchar *stamp2 = NULL;
+	g_autofree gchar *stamp3 = NULL;
+	g_autofree gchar *stamp4 = NULL;
+	g_autoptr(GsApp) app = NULL;
+	g_autoptr(GsAppList) app_list = NULL;
+	g_autoptr(GsPluginJob) plugin_job = NULL;
+	g_autoptr(GError) error = NULL;
+	GsPlugin *plugin;
+
+	/* all the plugins which list apps provide a stamp, and it’s stable
+	 * while nothing changes */
+	stamp1 = gs_plugin_loader_dup_updates_stamp (plugin_loader);
+	g_assert_nonnull (stamp1);
+	stamp2 = gs_plugin_loader_dup_updates_stamp (plugin_loader);
+	g_assert_cmpstr (stamp1, ==, stamp2);
+
+	/* installing an app changes it */
+	app = gs_app_new ("chiron.desktop");
+	plugin = gs_plugin_loader_find_plugin (plugin_loader, "dummy");
+	gs_app_set_management_plugin (app, plugin);
+	gs_app_set_state (app, GS_APP_STATE_AVAILABLE);
+	app_list = gs_app_list_new ();
+	gs_app_list_add (app_list, app);
+	plugin_job = gs_plugin_job_install_apps_new (app_list,
+						     GS_PLUGIN_INSTALL_APPS_FLAGS_NONE);
+	ret = gs_plugin_loader_job_process (plugin_loader, plugin_job, NULL, &error);
+	gs_test_flush_main_context ();
+	g_assert_no_error (error);
+	g_assert (ret);
+
+	stamp3 = gs_plugin_loader_dup_updates_stamp (plugin_loader);
+	g_assert_nonnull (stamp3);
+	g_assert_cmpstr (stamp3, !=, stamp1);
+
+	/* and so does removing it again */
+	g_object_unref (plugin_job);
+	plugin_job = gs_plugin_job_uninstall_apps_new (app_list,
+						       GS_PLUGIN_UNINSTALL_APPS_FLAGS_NONE);
+	ret = gs_plugin_loader_job_process (plugin_loader, plugin_job, NULL, &error);
+	gs_test_flush_main_context ();
+	g_assert_no_error (error);
+	g_assert (ret);
+
+	stamp4 = gs_plugin_loader_dup_updates_stamp (plugin_loader);
+	g_assert_nonnull (stamp4);
+	g_assert_cmpstr (stamp4, !=, stamp3);
+	g_assert_cmpstr (stamp4, !=, stamp1);
+}
+
+static void
+gs_plugins_dummy_refresh_metadata_func (GsPluginLoader *plugin_loader)
+{
+	gboolean ret;
+	guint64 duration_usec = 0;
+	guint64 bytes_downloaded = G_MAXUINT64;
+	g_autoptr(GsPluginJob) plugin_job = NULL;
+	g_autoptr(GError) error = NULL;
+
+	plugin_job = gs_plugin_job_refresh_metadata_new (0, GS_PLUGIN_REFRESH_METADATA_FLAGS_NONE);
+	ret = gs_plugin_loader_job_process (plugin_loader, plugin_job, NULL, &error);
+	gs_test_flush_main_context ();
+	g_assert_no_error (error);
+	g_assert_true (ret);
+
+	/* the dummy plugin takes 3.1s to refresh, and doesn’t report how much
+	 * it downloaded */
+	ret = gs_plugin_job_refresh_metadata_get_source_stats (GS_PLUGIN_JOB_REFRESH_METADATA (plugin_job),
+							       "dummy", &duration_usec, &bytes_downloaded);
+	g_assert_true (ret);
+	g_assert_cmpuint (duration_usec, >=, 3 * G_USEC_PER_SEC);
+	g_assert_cmpuint (bytes_downloaded, ==, 0);
+
+	/* nothing is recorded for sources which weren’t refreshed */
+	g_assert_false (gs_plugin_job_refresh_metadata_get_source_stats (GS_PLUGIN_JOB_REFRESH_METADATA (plugin_job),
+									 "not-a-plugin", NULL, NULL));
+}
+
+static gchar *
+get_install_queue_contents (void)
+{
+	g_autofree gchar *filename = NULL;
+	gchar *contents = NULL;
+
+	filename = g_build_filename (g_get_user_data_dir (), "gnome-software", "install-queue", NULL);
+	if (!g_file_get_contents (filename, &contents, NULL, NULL))
+		return NULL;
+
+	return contents;
+}
+
+static gboolean
+install_queue_contains (const gchar *contents,
+                        GsApp       *app)
+{
+	g_autoptr(GsAppList) list = gs_plugin_loader_replay_install_queue (contents, NULL);
+
+	for (guint i = 0; i < gs_app_list_length (list); i++) {
+		if (g_strcmp0 (gs_app_get_unique_id (gs_app_list_index (list, i)),
+			       gs_app_get_unique_id (app)) == 0)
+			return TRUE;
+	}
+
+	return FALSE;
+}
+
+/* The dummy plugin doesn’t install these apps, so installing them leaves
+ * them in the install queue, and uninstalling them takes them out again. */
+static void
+set_app_queued (GsPluginLoader *plugin_loader,
+                GsApp          *app,
+                gboolean        queued)
+{
+	g_autoptr(GsAppList) list = gs_app_list_new ();
+	g_autoptr(GsPluginJob) plugin_job = NULL;
+	g_autoptr(GError) error = NULL;
+	gboolean ret;
+
+	gs_app_list_add (list, app);
+	if (queued)
+		plugin_job = gs_plugin_job_install_apps_new (list, GS_PLUGIN_INSTALL_APPS_FLAGS_NONE);
+	else
+		plugin_job = gs_plugin_job_uninstall_apps_new (list, GS_PLUGIN_UNINSTALL_APPS_FLAGS_NONE);
+	ret = gs_plugin_loader_job_process (plugin_loader, plugin_job, NULL, &error);
+	gs_test_flush_main_context ();
+	g_assert_no_error (error);
+	g_assert_true (ret);
+	g_assert_cmpint (gs_app_get_state (app), ==,
+			 queued ? GS_APP_STATE_QUEUED_FOR_INSTALL : GS_APP_STATE_UNKNOWN);
+}
+
+static void
+count_signal_cb (GsPluginLoader *plugin_loader,
+                 gpointer        user_data)
+{
+	guint *cnt = user_data;
+
+	(*cnt)++;
+}
+
+static void
+gs_plugins_dummy_install_queue_func (GsPluginLoader *plugin_loader)
+{
+	GsPlugin *plugin = gs_plugin_loader_find_plugin (plugin_loader, "dummy");
+	g_autoptr(GsApp) app_a = gs_app_new ("queue-a.desktop");
+	g_autoptr(GsApp) app_b = gs_app_new ("queue-b.desktop");
+	g_autoptr(GsAppList) pending = NULL;
+	g_autofree gchar *contents = NULL;
+	g_autofree gchar *dequeued_line = NULL;
+	g_auto(GStrv) lines = NULL;
+	guint pending_apps_changed_cnt = 0;
+	gulong pending_apps_changed_id;
+
+	gs_app_set_management_plugin (app_a, plugin);
+	gs_app_set_kind (app_a, AS_COMPONENT_KIND_DESKTOP_APP);
+	gs_app_set_management_plugin (app_b, plugin);
+	gs_app_set_kind (app_b, AS_COMPONENT_KIND_DESKTOP_APP);
+
+	/* nothing is queued by the earlier tests */
+	pending = gs_plugin_loader_get_pending (plugin_loader);
+	g_assert_cmpuint (gs_app_list_length (pending), ==, 0);
+	g_clear_object (&pending);
+
+	/* queuing an app is recorded in the file */
+	set_app_queued (plugin_loader, app_a, TRUE);
+	contents = get_install_queue_contents ();
+	g_assert_nonnull (contents);
+	g_assert_true (install_queue_contains (contents, app_a));
+
+	/* dequeuing an app appends to the journal rather than rewriting it */
+	set_app_queued (plugin_loader, app_b, TRUE);
+	set_app_queued (plugin_loader, app_b, FALSE);
+	g_free (contents);
+	contents = get_install_queue_contents ();
+	g_assert_nonnull (contents);
+	dequeued_line = g_strdup_printf ("-%s\tdesktop-application\n", gs_app_get_unique_id (app_b));
+	g_assert_true (g_str_has_suffix (contents, dequeued_line));
+	g_assert_true (install_queue_contains (contents, app_a));
+	g_assert_false (install_queue_contains (contents, app_b));
+
+	/* the journal is compacted once it has grown enough */
+	for (guint i = 0; i < 50; i++) {
+		set_app_queued (plugin_loader, app_b, TRUE);
+		set_app_queued (plugin_loader, app_b, FALSE);
+	}
+	g_free (contents);
+	contents = get_install_queue_contents ();
+	g_assert_nonnull (contents);
+	lines = g_strsplit (contents, "\n", -1);
+	pending = gs_plugin_loader_get_pending (plugin_loader);
+	g_assert_cmpuint (g_strv_length (lines) - 1, <=, 2 * gs_app_list_length (pending) + 32);
+	g_assert_true (install_queue_contains (contents, app_a));
+	g_assert_false (install_queue_contains (contents, app_b));
+
+	/* the file is removed once the queue is empty; set_app_queued() runs
+	 * the main context until it’s idle, so the change has been signalled */
+	pending_apps_changed_id = g_signal_connect (plugin_loader, "pending-apps-changed",
+						    G_CALLBACK (count_signal_cb),
+						    &pending_apps_changed_cnt);
+	set_app_queued (plugin_loader, app_a, FALSE);
+	g_signal_handler_disconnect (plugin_loader, pending_apps_changed_id);
+	g_assert_cmpuint (pending_apps_changed_cnt, >, 0);
+	g_clear_object (&pending);
+	pending = gs_plugin_loader_get_pending (plugin_loader);
+	g_assert_cmpuint (gs_app_list_length (pending), ==, 0);
+	g_free (contents);
+	contents = get_install_queue_contents ();
+	g_assert_null (contents);
+}
+
 static void
 gs_plugins_dummy_error_func (GsPluginLoader *plugin_loader)
 {
@@ -188,6 +402,37 @@ gs_plugins_dummy_metadata_quirks (GsPluginLoader *plugin_loader)
 	g_assert (!gs_app_has_quirk(app, GS_APP_QUIRK_NOT_LAUNCHABLE));
 }
 
+static void
+gs_plugins_dummy_startup_timeline_func (GsPluginLoader *plugin_loader)
+{
+	g_autoptr(GVariant) timeline = NULL;
+	GVariantIter iter;
+	const gchar *kind, *name, *status;
+	gint64 offset_usec, duration_usec;
+	gboolean seen_dummy = FALSE;
+	gboolean seen_complete = FALSE;
+
+	timeline = g_variant_ref_sink (gs_plugin_loader_get_startup_timeline (plugin_loader));
+	g_assert_cmpuint (g_variant_n_children (timeline), >, 0);
+
+	g_variant_iter_init (&iter, timeline);
+	while (g_variant_iter_next (&iter, "(&s&s&sxx)", &kind, &name, &status, &offset_usec, &duration_usec)) {
+		g_assert_cmpint (offset_usec, >=, 0);
+
+		if (g_str_equal (kind, "plugin") && g_str_equal (name, "dummy")) {
+			g_assert_cmpstr (status, ==, "ok");
+			g_assert_cmpint (duration_usec, >=, 0);
+			seen_dummy = TRUE;
+		} else if (g_str_equal (kind, "stage") && g_str_equal (name, "setup-complete")) {
+			g_assert_cmpint (duration_usec, >=, 0);
+			seen_complete = TRUE;
+		}
+	}
+
+	g_assert_true (seen_dummy);
+	g_assert_true (seen_complete);
+}
+
 static void
 gs_plugins_dummy_key_colors_func (GsPluginLoader *plugin_loader)
 {
@@ -439,6 +684,74 @@ gs_plugins_dummy_search_func (GsPluginLoader *plugin_loader)
 	g_assert_cmpint (gs_app_get_kind (app), ==, AS_COMPONENT_KIND_DESKTOP_APP);
 }
 
+static void
+search_partial_results_cb (GsPluginJobListApps *list_apps_job,
+                           GsAppList           *list,
+                           gpointer             user_data)
+{
+	guint *n_partial_results = user_data;
+
+	/* partial results only ever have apps in, and come before the job has
+	 * finished */
+	g_assert_cmpint (gs_app_list_length (list), >, 0);
+	g_assert_null (gs_plugin_job_list_apps_get_result_list (list_apps_job));
+	(*n_partial_results)++;
+}
+
+static void
+gs_plugins_dummy_search_partial_func (GsPluginLoader *plugin_loader)
+{
+	g_autoptr(GError) error = NULL;
+	GsAppList *list;
+	GsAppList *streamed_list;
+	g_autoptr(GsPluginJob) plugin_job = NULL;
+	g_autoptr(GsPluginJob) streamed_job = NULL;
+	g_autoptr(GsAppQuery) query = NULL;
+	const gchar *keywords[2] = { NULL, };
+	guint n_partial_results = 0;
+
+	keywords[0] = "zeus";
+	query = gs_app_query_new ("keywords", keywords,
+				  "refine-require-flags", GS_PLUGIN_REFINE_REQUIRE_FLAGS_ICON,
+				  "dedupe-flags", GS_APP_QUERY_DEDUPE_FLAGS_DEFAULT,
+				  "sort-func", gs_utils_app_sort_match_value,
+				  NULL);
+
+	/* get the results all in one go */
+	plugin_job = gs_plugin_job_list_apps_new (query, GS_PLUGIN_LIST_APPS_FLAGS_NONE);
+	gs_plugin_loader_job_process (plugin_loader, plugin_job, NULL, &error);
+	list = gs_plugin_job_list_apps_get_result_list (GS_PLUGIN_JOB_LIST_APPS (plugin_job));
+	gs_test_flush_main_context ();
+	g_assert_no_error (error);
+	g_assert_nonnull (list);
+
+	/* and again, refining each plugin’s results as they arrive */
+	streamed_job = gs_plugin_job_list_apps_new (query, GS_PLUGIN_LIST_APPS_FLAGS_NONE);
+	g_signal_connect (streamed_job, "partial-results",
+			  G_CALLBACK (search_partial_results_cb), &n_partial_results);
+	gs_plugin_loader_job_process (plugin_loader, streamed_job, NULL, &error);
+	streamed_list = gs_plugin_job_list_apps_get_result_list (GS_PLUGIN_JOB_LIST_APPS (streamed_job));
+	gs_test_flush_main_context ();
+	g_assert_no_error (error);
+	g_assert_nonnull (streamed_list);
+
+	/* the final results must not depend on how they were refined */
+	g_assert_cmpuint (gs_app_list_length (streamed_list), >, 0);
+	g_assert_cmpuint (gs_app_list_length (streamed_list), ==, gs_app_list_length (list));
+	for (guint i = 0; i < gs_app_list_length (list); i++) {
+		GsApp *app = gs_app_list_index (list, i);
+
+		g_assert_nonnull (gs_app_list_lookup (streamed_list, gs_app_get_unique_id (app)));
+	}
+
+	/* the dummy plugin is slow to search for zeus, so the results from the
+	 * appstream plugin must have been emitted before it finished; the
+	 * partial results are never the last batch, so there can be at most
+	 * one fewer of them than there are plugins */
+	g_assert_cmpuint (n_partial_results, >, 0);
+	g_assert_cmpuint (n_partial_results, <, gs_plugin_loader_get_plugins (plugin_loader)->len);
+}
+
 static void
 gs_plugins_dummy_search_alternate_func (GsPluginLoader *plugin_loader)
 {
@@ -529,6 +842,50 @@ gs_plugins_dummy_plugin_cache_func (GsPluginLoader *plugin_loader)
 	g_assert (app1 == app2);
 }
 
+static GsApp *
+list_distro_upgrade (GsPluginLoader *plugin_loader)
+{
+	g_autoptr(GError) error = NULL;
+	g_autoptr(GsPluginJob) plugin_job = NULL;
+	GsAppList *list;
+
+	plugin_job = gs_plugin_job_list_distro_upgrades_new (GS_PLUGIN_LIST_DISTRO_UPGRADES_FLAGS_NONE,
+							     GS_PLUGIN_REFINE_REQUIRE_FLAGS_NONE);
+	gs_plugin_loader_job_process (plugin_loader, plugin_job, NULL, &error);
+	list = gs_plugin_job_list_distro_upgrades_get_result_list (GS_PLUGIN_JOB_LIST_DISTRO_UPGRADES (plugin_job));
+	gs_test_flush_main_context ();
+	g_assert_no_error (error);
+	g_assert_nonnull (list);
+	g_assert_cmpint (gs_app_list_length (list), ==, 1);
+
+	return g_object_ref (gs_app_list_index (list, 0));
+}
+
+static void
+gs_plugins_dummy_release_memory_func (GsPluginLoader *plugin_loader)
+{
+	g_autoptr(GsApp) app1 = NULL;
+	g_autoptr(GsApp) app2 = NULL;
+	GsApp *app_weak;
+
+	/* apps which are still in use must not be dropped from the cache */
+	app1 = list_distro_upgrade (plugin_loader);
+	gs_plugin_loader_release_memory (plugin_loader, G_MEMORY_MONITOR_WARNING_LEVEL_CRITICAL);
+	app2 = list_distro_upgrade (plugin_loader);
+	g_assert_true (app1 == app2);
+	g_clear_object (&app2);
+
+	/* unused ones are dropped, and rebuilt on next use */
+	app_weak = app1;
+	g_object_add_weak_pointer (G_OBJECT (app_weak), (gpointer *) &app_weak);
+	g_clear_object (&app1);
+	gs_plugin_loader_release_memory (plugin_loader, G_MEMORY_MONITOR_WARNING_LEVEL_CRITICAL);
+	g_assert_null (app_weak);
+
+	app2 = list_distro_upgrade (plugin_loader);
+	g_assert_cmpstr (gs_app_get_id (app2), ==, "org.fedoraproject.release-rawhide.upgrade");
+}
+
 static void
 gs_plugins_dummy_wildcard_func (GsPluginLoader *plugin_loader)
 {
@@ -690,6 +1047,143 @@ gs_plugins_dummy_limit_parallel_ops_func (GsPluginLoader *plugin_loader)
 	g_assert_cmpint (gs_app_get_state (app3), ==, GS_APP_STATE_INSTALLED);
 }
 
+/* Get the sequence number at which the dummy plugin recorded @stage for @app,
+ * or 0 if it never happened. */
+static guint
+get_update_stage_seq (GsApp       *app,
+                      const gchar *stage)
+{
+	g_autofree gchar *key = g_strdup_printf ("Dummy::%s", stage);
+	const gchar *value = gs_app_get_metadata_item (app, key);
+
+	return (value != NULL) ? (guint) g_ascii_strtoull (value, NULL, 10) : 0;
+}
+
+static GsAppList *
+create_pipeline_apps (GsPluginLoader      *plugin_loader,
+                      const gchar * const *ids)
+{
+	GsPlugin *plugin = gs_plugin_loader_find_plugin (plugin_loader, "dummy");
+	g_autoptr(GsAppList) list = gs_app_list_new ();
+
+	for (gsize i = 0; ids[i] != NULL; i++) {
+		g_autoptr(GsApp) app = gs_app_new (ids[i]);
+		gs_app_set_management_plugin (app, plugin);
+		gs_app_set_state (app, GS_APP_STATE_UPDATABLE_LIVE);
+		gs_app_list_add (list, app);
+	}
+
+	return g_steal_pointer (&list);
+}
+
+static void
+gs_plugins_dummy_update_pipelined_func (GsPluginLoader *plugin_loader)
+{
+	const gchar * const ids[] = { "pipeline-1", "pipeline-2", "pipeline-fail", "pipeline-3", NULL };
+	g_autoptr(GsAppList) list = NULL;
+	g_autoptr(GsPluginJob) plugin_job = NULL;
+	GsApp *app_fail;
+	gboolean ret;
+	g_autoptr(GError) local_error = NULL;
+
+	list = create_pipeline_apps (plugin_loader, ids);
+	app_fail = gs_app_list_index (list, 2);
+
+	plugin_job = gs_plugin_job_update_apps_new (list, GS_PLUGIN_UPDATE_APPS_FLAGS_PIPELINED);
+	ret = gs_plugin_loader_job_process (plugin_loader, plugin_job, NULL, &local_error);
+	gs_test_flush_main_context ();
+
+	/* A failed download doesn’t fail the whole update. */
+	g_assert_no_error (local_error);
+	g_assert_true (ret);
+
+	for (guint i = 0; i < gs_app_list_length (list); i++) {
+		GsApp *app = gs_app_list_index (list, i);
+
+		if (app == app_fail)
+			continue;
+
+		/* Each app is downloaded before it’s applied. */
+		g_assert_cmpuint (get_update_stage_seq (app, "download-start"), >, 0);
+		g_assert_cmpuint (get_update_stage_seq (app, "download-start"), <, get_update_stage_seq (app, "download-end"));
+		g_assert_cmpuint (get_update_stage_seq (app, "download-end"), <, get_update_stage_seq (app, "apply-start"));
+		g_assert_cmpuint (get_update_stage_seq (app, "apply-start"), <, get_update_stage_seq (app, "apply-end"));
+		g_assert_cmpint (gs_app_get_state (app), ==, GS_APP_STATE_INSTALLED);
+
+		/* Only one app is applied at once. */
+		for (guint j = 0; j < i; j++) {
+			GsApp *other = gs_app_list_index (list, j);
+
+			if (other == app_fail)
+				continue;
+
+			g_assert_true (get_update_stage_seq (app, "apply-start") > get_update_stage_seq (other, "apply-end") ||
+				       get_update_stage_seq (other, "apply-start") > get_update_stage_seq (app, "apply-end"));
+		}
+	}
+
+	/* Later downloads overlap with earlier applies. */
+	g_assert_cmpuint (get_update_stage_seq (gs_app_list_index (list, 3), "download-start"), <,
+			  get_update_stage_seq (gs_app_list_index (list, 0), "apply-end"));
+
+	/* The app which failed to download is not applied, and doesn’t stop
+	 * the apps after it being updated. */
+	g_assert_cmpuint (get_update_stage_seq (app_fail, "download-start"), >, 0);
+	g_assert_cmpuint (get_update_stage_seq (app_fail, "download-end"), ==, 0);
+	g_assert_cmpuint (get_update_stage_seq (app_fail, "apply-start"), ==, 0);
+	g_assert_cmpint (gs_app_get_state (app_fail), !=, GS_APP_STATE_INSTALLED);
+}
+
+static void
+gs_plugins_dummy_update_pipelined_cancel_func (GsPluginLoader *plugin_loader)
+{
+	const gchar * const ids[] = { "pipeline-cancel-1", "pipeline-cancel-2", "pipeline-cancel-3", "pipeline-cancel-4", NULL };
+	g_autoptr(GsAppList) list = NULL;
+	g_autoptr(GsPluginJob) plugin_job = NULL;
+	g_autoptr(GCancellable) cancellable = g_cancellable_new ();
+	g_autoptr(GMainContext) context = NULL;
+	g_autoptr(GAsyncResult) result = NULL;
+	gboolean ret;
+	g_autoptr(GError) local_error = NULL;
+
+	list = create_pipeline_apps (plugin_loader, ids);
+
+	context = g_main_context_new ();
+	g_main_context_push_thread_default (context);
+
+	plugin_job = gs_plugin_job_update_apps_new (list, GS_PLUGIN_UPDATE_APPS_FLAGS_PIPELINED);
+	gs_plugin_loader_job_process_async (plugin_loader, plugin_job, cancellable,
+					    async_result_cb, &result);
+
+	/* Cancel while the first apps are downloading. */
+	while (result == NULL && get_update_stage_seq (gs_app_list_index (list, 0), "download-start") == 0)
+		g_main_context_iteration (context, TRUE);
+	g_cancellable_cancel (cancellable);
+
+	while (result == NULL)
+		g_main_context_iteration (context, TRUE);
+
+	g_main_context_pop_thread_default (context);
+	gs_test_flush_main_context ();
+
+	ret = gs_plugin_loader_job_process_finish (plugin_loader, result, NULL, &local_error);
+	if (!g_error_matches (local_error, G_IO_ERROR, G_IO_ERROR_CANCELLED))
+		g_assert_error (local_error, GS_PLUGIN_ERROR, GS_PLUGIN_ERROR_CANCELLED);
+	g_assert_false (ret);
+
+	/* The queued downloads are never started, and nothing is applied. */
+	g_assert_cmpuint (get_update_stage_seq (gs_app_list_index (list, 0), "download-start"), >, 0);
+	g_assert_cmpuint (get_update_stage_seq (gs_app_list_index (list, 2), "download-start"), ==, 0);
+	g_assert_cmpuint (get_update_stage_seq (gs_app_list_index (list, 3), "download-start"), ==, 0);
+
+	for (guint i = 0; i < gs_app_list_length (list); i++) {
+		GsApp *app = gs_app_list_index (list, i);
+
+		g_assert_cmpuint (get_update_stage_seq (app, "apply-start"), ==, 0);
+		g_assert_cmpint (gs_app_get_state (app), !=, GS_APP_STATE_INSTALLED);
+	}
+}
+
 static void
 gs_plugins_dummy_app_size_calc_func (GsPluginLoader *loader)
 {
@@ -892,12 +1386,18 @@ main (int argc, char **argv)
 	g_test_add_data_func ("/gnome-software/plugins/dummy/plugin-cache",
 			      plugin_loader,
 			      (GTestDataFunc) gs_plugins_dummy_plugin_cache_func);
+	g_test_add_data_func ("/gnome-software/plugins/dummy/startup-timeline",
+			      plugin_loader,
+			      (GTestDataFunc) gs_plugins_dummy_startup_timeline_func);
 	g_test_add_data_func ("/gnome-software/plugins/dummy/key-colors",
 			      plugin_loader,
 			      (GTestDataFunc) gs_plugins_dummy_key_colors_func);
 	g_test_add_data_func ("/gnome-software/plugins/dummy/search",
 			      plugin_loader,
 			      (GTestDataFunc) gs_plugins_dummy_search_func);
+	g_test_add_data_func ("/gnome-software/plugins/dummy/search-partial",
+			      plugin_loader,
+			      (GTestDataFunc) gs_plugins_dummy_search_partial_func);
 	g_test_add_data_func ("/gnome-software/plugins/dummy/search-alternate",
 			      plugin_loader,
 			      (GTestDataFunc) gs_plugins_dummy_search_alternate_func);
@@ -907,6 +1407,15 @@ main (int argc, char **argv)
 	g_test_add_data_func ("/gnome-software/plugins/dummy/install",
 			      plugin_loader,
 			      (GTestDataFunc) gs_plugins_dummy_install_func);
+	g_test_add_data_func ("/gnome-software/plugins/dummy/updates-stamp",
+			      plugin_loader,
+			      (GTestDataFunc) gs_plugins_dummy_updates_stamp_func);
+	g_test_add_data_func ("/gnome-software/plugins/dummy/refresh-metadata",
+			      plugin_loader,
+			      (GTestDataFunc) gs_plugins_dummy_refresh_metadata_func);
+	g_test_add_data_func ("/gnome-software/plugins/dummy/install-queue",
+			      plugin_loader,
+			      (GTestDataFunc) gs_plugins_dummy_install_queue_func);
 	g_test_add_data_func ("/gnome-software/plugins/dummy/error",
 			      plugin_loader,
 			      (GTestDataFunc) gs_plugins_dummy_error_func);
@@ -922,12 +1431,21 @@ main (int argc, char **argv)
 	g_test_add_data_func ("/gnome-software/plugins/dummy/distro-upgrades",
 			      plugin_loader,
 			      (GTestDataFunc) gs_plugins_dummy_distro_upgrades_func);
+	g_test_add_data_func ("/gnome-software/plugins/dummy/release-memory",
+			      plugin_loader,
+			      (GTestDataFunc) gs_plugins_dummy_release_memory_func);
 	g_test_add_data_func ("/gnome-software/plugins/dummy/metadata-quirks",
 			      plugin_loader,
 			      (GTestDataFunc) gs_plugins_dummy_metadata_quirks);
 	g_test_add_data_func ("/gnome-software/plugins/dummy/limit-parallel-ops",
 			      plugin_loader,
 			      (GTestDataFunc) gs_plugins_dummy_limit_parallel_ops_func);
+	g_test_add_data_func ("/gnome-software/plugins/dummy/update-pipelined",
+			      plugin_loader,
+			      (GTestDataFunc) gs_plugins_dummy_update_pipelined_func);
+	g_test_add_data_func ("/gnome-software/plugins/dummy/update-pipelined-cancel",
+			      plugin_loader,
+			      (GTestDataFunc) gs_plugins_dummy_update_pipelined_cancel_func);
 	g_test_add_data_func ("/gnome-software/plugins/dummy/app-size-calc",
 			      plugin_loader,
 			      (GTestDataFunc) gs_plugins_dummy_app_size_calc_func);
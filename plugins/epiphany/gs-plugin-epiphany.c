@@ -836,6 +836,13 @@ gs_plugin_epiphany_list_apps_finish (GsPlugin      *plugin,
 	return g_task_propagate_pointer (G_TASK (result), error);
 }
 
+static gchar *
+gs_plugin_epiphany_get_updates_stamp (GsPlugin *plugin)
+{
+	/* never lists updates, so they can’t change */
+	return g_strdup ("");
+}
+
 static void
 gs_epiphany_refine_app (GsPluginEpiphany           *self,
                         GsApp                      *app,
@@ -1623,6 +1630,7 @@ gs_plugin_epiphany_class_init (GsPluginEpiphanyClass *klass)
 	plugin_class->refine_finish = gs_plugin_epiphany_refine_finish;
 	plugin_class->list_apps_async = gs_plugin_epiphany_list_apps_async;
 	plugin_class->list_apps_finish = gs_plugin_epiphany_list_apps_finish;
+	plugin_class->get_updates_stamp = gs_plugin_epiphany_get_updates_stamp;
 	plugin_class->install_apps_async = gs_plugin_epiphany_install_apps_async;
 	plugin_class->install_apps_finish = gs_plugin_epiphany_install_apps_finish;
 	plugin_class->uninstall_apps_async = gs_plugin_epiphany_uninstall_apps_async;
@@ -173,6 +173,13 @@ gs_plugin_fedora_langpacks_list_apps_finish (GsPlugin      *plugin,
 	return g_task_propagate_pointer (G_TASK (result), error);
 }
 
+static gchar *
+gs_plugin_fedora_langpacks_get_updates_stamp (GsPlugin *plugin)
+{
+	/* never lists updates, so they can’t change */
+	return g_strdup ("");
+}
+
 static void
 gs_plugin_fedora_langpacks_class_init (GsPluginFedoraLangpacksClass *klass)
 {
@@ -183,6 +190,7 @@ gs_plugin_fedora_langpacks_class_init (GsPluginFedoraLangpacksClass *klass)
 
 	plugin_class->list_apps_async = gs_plugin_fedora_langpacks_list_apps_async;
 	plugin_class->list_apps_finish = gs_plugin_fedora_langpacks_list_apps_finish;
+	plugin_class->get_updates_stamp = gs_plugin_fedora_langpacks_get_updates_stamp;
 }
 
 GType
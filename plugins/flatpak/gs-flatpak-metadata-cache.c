@@ -0,0 +1,302 @@
+/* -*- Mode: C; tab-width: 8; indent-tabs-mode: t; c-basic-offset: 8 -*-
+ * vi:set noexpandtab tabstop=8 shiftwidth=8:
+ *
+ * Copyright (C) 2026 GNOME Foundation, Inc.
+ *
+ * SPDX-License-Identifier: GPL-2.0-or-later
+ */
+
+/**
+ * SECTION:gs-flatpak-metadata-cache
+ * @short_description: Caches of parsed permissions and remote metadata
+ *
+ * #GsFlatpakMetadataCache holds two caches used when refining flatpak apps.
+ *
+ * The first maps the checksum of a ref’s metadata to the sealed
+ * #GsAppPermissions parsed from it, so that apps with byte-identical
+ * metadata share a single permissions object.
+ *
+ * The second holds the metadata fetched from a remote for a given origin and
+ * ref. What the remote returns for a ref follows the commit the ref points to
+ * on the remote, which only changes when the remote’s metadata is refreshed,
+ * so the entries for a remote must be dropped with
+ * gs_flatpak_metadata_cache_invalidate_remote() whenever that happens.
+ *
+ * Both caches should be cleared with gs_flatpak_metadata_cache_clear() when
+ * the installation changes, to keep them bounded.
+ *
+ * The cache is thread safe.
+ */
+
+#include "config.h"
+
+#include "gs-flatpak-metadata-cache.h"
+
+struct _GsFlatpakMetadataCache
+{
+	GObject		 parent_instance;
+
+	GMutex		 mutex;
+	GHashTable	*permissions;  /* (owned) (element-type utf8 GsAppPermissions); keyed by metadata checksum */
+	GHashTable	*remote_metadata;  /* (owned) (element-type utf8 GHashTable<utf8, GBytes>); keyed by origin, then ref */
+};
+
+G_DEFINE_TYPE (GsFlatpakMetadataCache, gs_flatpak_metadata_cache, G_TYPE_OBJECT)
+
+static void
+gs_flatpak_metadata_cache_finalize (GObject *object)
+{
+	GsFlatpakMetadataCache *self = GS_FLATPAK_METADATA_CACHE (object);
+
+	g_hash_table_unref (self->permissions);
+	g_hash_table_unref (self->remote_metadata);
+	g_mutex_clear (&self->mutex);
+
+	G_OBJECT_CLASS (gs_flatpak_metadata_cache_parent_class)->finalize (object);
+}
+
+static void
+gs_flatpak_metadata_cache_class_init (GsFlatpakMetadataCacheClass *klass)
+{
+	GObjectClass *object_class = G_OBJECT_CLASS (klass);
+
+	object_class->finalize = gs_flatpak_metadata_cache_finalize;
+}
+
+static void
+gs_flatpak_metadata_cache_init (GsFlatpakMetadataCache *self)
+{
+	g_mutex_init (&self->mutex);
+	self->permissions = g_hash_table_new_full (g_str_hash, g_str_equal, g_free, g_object_unref);
+	self->remote_metadata = g_hash_table_new_full (g_str_hash, g_str_equal, g_free, (GDestroyNotify) g_hash_table_unref);
+}
+
+/**
+ * gs_flatpak_metadata_cache_new:
+ *
+ * Create a new, empty #GsFlatpakMetadataCache.
+ *
+ * Returns: (transfer full): a new #GsFlatpakMetadataCache
+ * Since: 50
+ */
+GsFlatpakMetadataCache *
+gs_flatpak_metadata_cache_new (void)
+{
+	return g_object_new (GS_TYPE_FLATPAK_METADATA_CACHE, NULL);
+}
+
+static gchar *
+permissions_key (const gchar *data,
+                 gsize        length)
+{
+	return g_compute_checksum_for_data (G_CHECKSUM_SHA256, (const guchar *) data, length);
+}
+
+/**
+ * gs_flatpak_metadata_cache_lookup_permissions:
+ * @self: a #GsFlatpakMetadataCache
+ * @data: (array length=length): ref metadata
+ * @length: length of @data, in bytes
+ *
+ * Look up the permissions previously added for metadata with the same
+ * content as @data.
+ *
+ * Returns: (transfer full) (nullable): the sealed permissions, or %NULL if
+ *   none are cached
+ * Since: 50
+ */
+GsAppPermissions *
+gs_flatpak_metadata_cache_lookup_permissions (GsFlatpakMetadataCache *self,
+                                              const gchar            *data,
+                                              gsize                   length)
+{
+	GsAppPermissions *permissions;
+	g_autofree gchar *key = NULL;
+	g_autoptr(GMutexLocker) locker = NULL;
+
+	g_return_val_if_fail (GS_IS_FLATPAK_METADATA_CACHE (self), NULL);
+	g_return_val_if_fail (data != NULL || length == 0, NULL);
+
+	key = permissions_key (data, length);
+
+	locker = g_mutex_locker_new (&self->mutex);
+	permissions = g_hash_table_lookup (self->permissions, key);
+
+	return (permissions != NULL) ? g_object_ref (permissions) : NULL;
+}
+
+/**
+ * gs_flatpak_metadata_cache_add_permissions:
+ * @self: a #GsFlatpakMetadataCache
+ * @data: (array length=length): ref metadata
+ * @length: length of @data, in bytes
+ * @permissions: the sealed permissions parsed from @data
+ *
+ * Cache @permissions for all metadata with the same content as @data.
+ *
+ * Since: 50
+ */
+void
+gs_flatpak_metadata_cache_add_permissions (GsFlatpakMetadataCache *self,
+                                           const gchar            *data,
+                                           gsize                   length,
+                                           GsAppPermissions       *permissions)
+{
+	g_autoptr(GMutexLocker) locker = NULL;
+
+	g_return_if_fail (GS_IS_FLATPAK_METADATA_CACHE (self));
+	g_return_if_fail (data != NULL || length == 0);
+	g_return_if_fail (GS_IS_APP_PERMISSIONS (permissions));
+	g_return_if_fail (gs_app_permissions_is_sealed (permissions));
+
+	locker = g_mutex_locker_new (&self->mutex);
+	g_hash_table_replace (self->permissions,
+			      permissions_key (data, length),
+			      g_object_ref (permissions));
+}
+
+/**
+ * gs_flatpak_metadata_cache_lookup_remote_metadata:
+ * @self: a #GsFlatpakMetadataCache
+ * @origin: name of the remote
+ * @ref: the ref, as a string
+ *
+ * Look up the remote metadata previously added for @ref on @origin.
+ *
+ * Returns: (transfer full) (nullable): the metadata, or %NULL if none is
+ *   cached
+ * Since: 50
+ */
+GBytes *
+gs_flatpak_metadata_cache_lookup_remote_metadata (GsFlatpakMetadataCache *self,
+                                                  const gchar            *origin,
+                                                  const gchar            *ref)
+{
+	GHashTable *refs;
+	GBytes *metadata = NULL;
+	g_autoptr(GMutexLocker) locker = NULL;
+
+	g_return_val_if_fail (GS_IS_FLATPAK_METADATA_CACHE (self), NULL);
+	g_return_val_if_fail (origin != NULL, NULL);
+	g_return_val_if_fail (ref != NULL, NULL);
+
+	locker = g_mutex_locker_new (&self->mutex);
+	refs = g_hash_table_lookup (self->remote_metadata, origin);
+	if (refs != NULL)
+		metadata = g_hash_table_lookup (refs, ref);
+
+	return (metadata != NULL) ? g_bytes_ref (metadata) : NULL;
+}
+
+/**
+ * gs_flatpak_metadata_cache_add_remote_metadata:
+ * @self: a #GsFlatpakMetadataCache
+ * @origin: name of the remote
+ * @ref: the ref, as a string
+ * @metadata: the metadata fetched for @ref from @origin
+ *
+ * Cache @metadata for @ref on @origin, until the entries for @origin are
+ * invalidated.
+ *
+ * Since: 50
+ */
+void
+gs_flatpak_metadata_cache_add_remote_metadata (GsFlatpakMetadataCache *self,
+                                               const gchar            *origin,
+                                               const gchar            *ref,
+                                               GBytes                 *metadata)
+{
+	GHashTable *refs;
+	g_autoptr(GMutexLocker) locker = NULL;
+
+	g_return_if_fail (GS_IS_FLATPAK_METADATA_CACHE (self));
+	g_return_if_fail (origin != NULL);
+	g_return_if_fail (ref != NULL);
+	g_return_if_fail (metadata != NULL);
+
+	locker = g_mutex_locker_new (&self->mutex);
+	refs = g_hash_table_lookup (self->remote_metadata, origin);
+	if (refs == NULL) {
+		refs = g_hash_table_new_full (g_str_hash, g_str_equal, g_free, (GDestroyNotify) g_bytes_unref);
+		g_hash_table_insert (self->remote_metadata, g_strdup (origin), refs);
+	}
+	g_hash_table_replace (refs, g_strdup (ref), g_bytes_ref (metadata));
+}
+
+static gsize
+remote_metadata_size (GHashTable *refs)
+{
+	GHashTableIter iter;
+	gpointer value;
+	gsize n_bytes = 0;
+
+	g_hash_table_iter_init (&iter, refs);
+	while (g_hash_table_iter_next (&iter, NULL, &value))
+		n_bytes += g_bytes_get_size (value);
+
+	return n_bytes;
+}
+
+/**
+ * gs_flatpak_metadata_cache_invalidate_remote:
+ * @self: a #GsFlatpakMetadataCache
+ * @origin: name of the remote
+ *
+ * Drop the remote metadata cached for all refs on @origin. This must be
+ * called when the metadata for @origin is refreshed, as the refs on it may
+ * then point to different commits.
+ *
+ * Returns: an estimate of the number of bytes released
+ * Since: 50
+ */
+gsize
+gs_flatpak_metadata_cache_invalidate_remote (GsFlatpakMetadataCache *self,
+                                             const gchar            *origin)
+{
+	GHashTable *refs;
+	gsize n_bytes = 0;
+	g_autoptr(GMutexLocker) locker = NULL;
+
+	g_return_val_if_fail (GS_IS_FLATPAK_METADATA_CACHE (self), 0);
+	g_return_val_if_fail (origin != NULL, 0);
+
+	locker = g_mutex_locker_new (&self->mutex);
+	refs = g_hash_table_lookup (self->remote_metadata, origin);
+	if (refs != NULL) {
+		n_bytes = remote_metadata_size (refs);
+		g_hash_table_remove (self->remote_metadata, origin);
+	}
+
+	return n_bytes;
+}
+
+/**
+ * gs_flatpak_metadata_cache_clear:
+ * @self: a #GsFlatpakMetadataCache
+ *
+ * Drop everything from both caches.
+ *
+ * Returns: an estimate of the number of bytes released
+ * Since: 50
+ */
+gsize
+gs_flatpak_metadata_cache_clear (GsFlatpakMetadataCache *self)
+{
+	GHashTableIter iter;
+	gpointer value;
+	gsize n_bytes = 0;
+	g_autoptr(GMutexLocker) locker = NULL;
+
+	g_return_val_if_fail (GS_IS_FLATPAK_METADATA_CACHE (self), 0);
+
+	locker = g_mutex_locker_new (&self->mutex);
+
+	g_hash_table_iter_init (&iter, self->remote_metadata);
+	while (g_hash_table_iter_next (&iter, NULL, &value))
+		n_bytes += remote_metadata_size (value);
+
+	g_hash_table_remove_all (self->remote_metadata);
+	g_hash_table_remove_all (self->permissions);
+
+	return n_bytes;
+}
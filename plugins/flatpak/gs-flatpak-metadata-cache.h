@@ -0,0 +1,42 @@
+/* -*- Mode: C; tab-width: 8; indent-tabs-mode: t; c-basic-offset: 8 -*-
+ * vi:set noexpandtab tabstop=8 shiftwidth=8:
+ *
+ * Copyright (C) 2026 GNOME Foundation, Inc.
+ *
+ * SPDX-License-Identifier: GPL-2.0-or-later
+ */
+
+#pragma once
+
+#include <glib-object.h>
+#include <gnome-software.h>
+
+G_BEGIN_DECLS
+
+#define GS_TYPE_FLATPAK_METADATA_CACHE (gs_flatpak_metadata_cache_get_type ())
+
+G_DECLARE_FINAL_TYPE (GsFlatpakMetadataCache, gs_flatpak_metadata_cache, GS, FLATPAK_METADATA_CACHE, GObject)
+
+GsFlatpakMetadataCache	*gs_flatpak_metadata_cache_new			(void);
+
+GsAppPermissions	*gs_flatpak_metadata_cache_lookup_permissions	(GsFlatpakMetadataCache	*self,
+									 const gchar		*data,
+									 gsize			 length);
+void			 gs_flatpak_metadata_cache_add_permissions	(GsFlatpakMetadataCache	*self,
+									 const gchar		*data,
+									 gsize			 length,
+									 GsAppPermissions	*permissions);
+
+GBytes			*gs_flatpak_metadata_cache_lookup_remote_metadata (GsFlatpakMetadataCache	*self,
+									 const gchar		*origin,
+									 const gchar		*ref);
+void			 gs_flatpak_metadata_cache_add_remote_metadata	(GsFlatpakMetadataCache	*self,
+									 const gchar		*origin,
+									 const gchar		*ref,
+									 GBytes			*metadata);
+gsize			 gs_flatpak_metadata_cache_invalidate_remote	(GsFlatpakMetadataCache	*self,
+									 const gchar		*origin);
+
+gsize			 gs_flatpak_metadata_cache_clear		(GsFlatpakMetadataCache	*self);
+
+G_END_DECLS
@@ -654,17 +654,20 @@ _transaction_operation_done (FlatpakTransaction *transaction,
 		set_skipped_related_apps_to_installed (self, transaction, operation);
 		break;
 	case FLATPAK_TRANSACTION_OPERATION_UPDATE:
+		/* downloaded, but not yet installed, so keep the update
+		 * details for when it’s deployed */
+		if (flatpak_transaction_get_no_deploy (transaction)) {
+			gs_app_set_state (app, GS_APP_STATE_UPDATABLE_LIVE);
+			break;
+		}
+
 		gs_app_set_version (app, gs_app_get_update_version (app));
 		gs_app_set_update_details_markup (app, NULL);
 		gs_app_set_update_urgency (app, AS_URGENCY_KIND_UNKNOWN);
 		gs_app_set_update_version (app, NULL);
 		/* force getting the new runtime */
 		gs_app_remove_kudo (app, GS_APP_KUDO_SANDBOXED);
-                /* downloaded, but not yet installed */
-		if (flatpak_transaction_get_no_deploy (transaction))
-			gs_app_set_state (app, GS_APP_STATE_UPDATABLE_LIVE);
-		else
-			gs_app_set_state (app, GS_APP_STATE_INSTALLED);
+		gs_app_set_state (app, GS_APP_STATE_INSTALLED);
 
 		set_skipped_related_apps_to_installed (self, transaction, operation);
 		break;
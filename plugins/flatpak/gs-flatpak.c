@@ -34,6 +34,7 @@
 #include <config.h>
 
 #include <glib/gi18n.h>
+#include <glib/gstdio.h>
 #include <malloc.h>
 #include <xmlb.h>
 
@@ -41,6 +42,7 @@
 #include "gs-app-private.h"
 #include "gs-flatpak-app.h"
 #include "gs-flatpak.h"
+#include "gs-flatpak-metadata-cache.h"
 #include "gs-flatpak-transaction.h"
 #include "gs-flatpak-utils.h"
 #include "gs-profiler.h"
@@ -70,6 +72,7 @@ struct _GsFlatpak {
 	GMutex			 app_silos_mutex;
 	GHashTable		*remote_title; /* gchar *remote name ~> gchar *remote title */
 	GMutex			 remote_title_mutex;
+	GsFlatpakMetadataCache	*metadata_cache;  /* (owned) */
 	gboolean		 requires_full_rescan;
 	gint			 busy; /* (atomic) */
 	gboolean		 changed_while_busy;
@@ -560,6 +563,65 @@ perms_from_metadata (GKeyFile *keyfile)
 	return permissions;
 }
 
+/* Returns a (transfer full) sealed #GsAppPermissions for the metadata in
+ * @data. Permissions objects are immutable once sealed, so they are shared
+ * between all apps with byte-identical metadata. @keyfile may be passed if
+ * the caller has already parsed @data. */
+static GsAppPermissions *
+gs_flatpak_get_permissions_for_metadata (GsFlatpak   *self,
+                                         const gchar *data,
+                                         gsize        length,
+                                         GKeyFile    *keyfile)
+{
+	GsAppPermissions *permissions;
+	g_autoptr(GKeyFile) keyfile_local = NULL;
+
+	permissions = gs_flatpak_metadata_cache_lookup_permissions (self->metadata_cache, data, length);
+	if (permissions != NULL)
+		return permissions;
+
+	if (keyfile == NULL) {
+		keyfile_local = g_key_file_new ();
+		g_key_file_load_from_data (keyfile_local, data, length, 0, NULL);
+		keyfile = keyfile_local;
+	}
+	permissions = perms_from_metadata (keyfile);
+	gs_flatpak_metadata_cache_add_permissions (self->metadata_cache, data, length, permissions);
+
+	return permissions;
+}
+
+/* Like flatpak_installation_fetch_remote_metadata_sync(), but the result is
+ * cached. It’s the metadata for whichever commit @xref points to on @origin,
+ * so the cache for @origin is dropped whenever its metadata is refreshed (see
+ * gs_flatpak_refresh_appstream_remote()), and all of it is dropped when the
+ * installation changes. Errors are returned unconverted. */
+static GBytes *
+gs_flatpak_fetch_remote_metadata_cached (GsFlatpak     *self,
+                                         const gchar   *origin,
+                                         FlatpakRef    *xref,
+                                         gboolean       interactive,
+                                         GCancellable  *cancellable,
+                                         GError       **error)
+{
+	GBytes *bytes;
+	g_autofree gchar *ref_str = flatpak_ref_format_ref (xref);
+
+	bytes = gs_flatpak_metadata_cache_lookup_remote_metadata (self->metadata_cache, origin, ref_str);
+	if (bytes != NULL)
+		return bytes;
+
+	bytes = flatpak_installation_fetch_remote_metadata_sync (gs_flatpak_get_installation (self, interactive),
+								 origin,
+								 xref,
+								 cancellable,
+								 error);
+	if (bytes != NULL)
+		gs_flatpak_metadata_cache_add_remote_metadata (self->metadata_cache, origin, ref_str, bytes);
+
+	return bytes;
+}
+
 static void
 gs_flatpak_set_update_permissions (GsFlatpak           *self,
                                    GsApp               *app,
@@ -568,9 +630,7 @@ gs_flatpak_set_update_permissions (GsFlatpak           *self,
                                    GCancellable        *cancellable)
 {
 	g_autoptr(GBytes) old_bytes = NULL;
-	g_autoptr(GKeyFile) old_keyfile = NULL;
 	g_autoptr(GBytes) bytes = NULL;
-	g_autoptr(GKeyFile) keyfile = NULL;
 	g_autoptr(GsAppPermissions) additional_permissions = NULL;
 	g_autoptr(GError) error_local = NULL;
 
@@ -586,17 +646,12 @@ gs_flatpak_set_update_permissions (GsFlatpak           *self,
 		goto finish;
 	}
 
-	old_keyfile = g_key_file_new ();
-	g_key_file_load_from_data (old_keyfile,
-	                           g_bytes_get_data (old_bytes, NULL),
-	                           g_bytes_get_size (old_bytes),
-	                           0, NULL);
-
-	bytes = flatpak_installation_fetch_remote_metadata_sync (gs_flatpak_get_installation (self, interactive),
-	                                                         gs_app_get_origin (app),
-	                                                         FLATPAK_REF (xref),
-	                                                         cancellable,
-	                                                         &error_local);
+	bytes = gs_flatpak_fetch_remote_metadata_cached (self,
+	                                                 gs_app_get_origin (app),
+	                                                 FLATPAK_REF (xref),
+	                                                 interactive,
+	                                                 cancellable,
+	                                                 &error_local);
 	if (bytes == NULL) {
 		g_debug ("Failed to get metadata for remote ‘%s’: %s",
 			 gs_app_get_origin (app), error_local->message);
@@ -608,14 +663,14 @@ gs_flatpak_set_update_permissions (GsFlatpak           *self,
 		g_autoptr(GsAppPermissions) old_permissions = NULL;
 		g_autoptr(GsAppPermissions) new_permissions = NULL;
 
-		keyfile = g_key_file_new ();
-		g_key_file_load_from_data (keyfile,
-			                   g_bytes_get_data (bytes, NULL),
-			                   g_bytes_get_size (bytes),
-			                   0, NULL);
-
-		old_permissions = perms_from_metadata (old_keyfile);
-		new_permissions = perms_from_metadata (keyfile);
+		old_permissions = gs_flatpak_get_permissions_for_metadata (self,
+		                                                           g_bytes_get_data (old_bytes, NULL),
+		                                                           g_bytes_get_size (old_bytes),
+		                                                           NULL);
+		new_permissions = gs_flatpak_get_permissions_for_metadata (self,
+		                                                           g_bytes_get_data (bytes, NULL),
+		                                                           g_bytes_get_size (bytes),
+		                                                           NULL);
 		additional_permissions = gs_app_permissions_diff (old_permissions, new_permissions);
 	}
 
@@ -764,6 +819,10 @@ gs_flatpak_internal_data_changed (GsFlatpak *self)
 	g_hash_table_remove_all (self->remote_title);
 	g_clear_pointer (&locker, g_mutex_locker_free);
 
+	/* drop the metadata caches; the permissions cache is keyed by content
+	 * so never goes stale, but clearing it here keeps it bounded */
+	gs_flatpak_metadata_cache_clear (self->metadata_cache);
+
 	/* give all the repos a second chance */
 	locker = g_mutex_locker_new (&self->broken_remotes_mutex);
 	g_hash_table_remove_all (self->broken_remotes);
@@ -1313,6 +1372,9 @@ gs_flatpak_ref_silo (GsFlatpak *self,
 		g_autoptr(GPtrArray) installed = NULL;
 		g_autoptr(XbNode) info_filename = NULL;
 
+		/* build the silo indexes now, while the silo lock is held */
+		gs_appstream_ensure_silo_index (self->silo);
+
 		self->silo_installed_by_desktopid = g_hash_table_new_full (g_str_hash, g_str_equal, g_free, (GDestroyNotify) g_ptr_array_unref);
 
 		installed = xb_silo_query (self->silo, "/component[@type='desktop-application']/launchable[@type='desktop-id']", 0, NULL);
@@ -1472,6 +1534,10 @@ gs_flatpak_refresh_appstream_remote (GsFlatpak *self,
 		g_propagate_error (error, g_steal_pointer (&error_local));
 		return FALSE;
 	}
+
+	/* the refs on the remote may now point to different commits */
+	gs_flatpak_metadata_cache_invalidate_remote (self->metadata_cache, remote_name);
+
 	phelper = gs_flatpak_progress_helper_new (self->plugin, app_dl);
 	if (!flatpak_installation_update_appstream_full_sync (installation,
 							      remote_name,
@@ -2758,7 +2824,7 @@ gs_flatpak_set_app_metadata (GsFlatpak *self,
 			secure = FALSE;
 	}
 
-	permissions = perms_from_metadata (kf);
+	permissions = gs_flatpak_get_permissions_for_metadata (self, data, length, kf);
 	gs_app_set_permissions (app, permissions);
 	/* this is actually quite hard to achieve */
 	if (secure)
@@ -2802,11 +2868,12 @@ gs_flatpak_fetch_remote_metadata (GsFlatpak *self,
 	xref = gs_flatpak_create_fake_ref (app, error);
 	if (xref == NULL)
 		return NULL;
-	data = flatpak_installation_fetch_remote_metadata_sync (gs_flatpak_get_installation (self, interactive),
-								gs_app_get_origin (app),
-								xref,
-								cancellable,
-								&local_error);
+	data = gs_flatpak_fetch_remote_metadata_cached (self,
+							gs_app_get_origin (app),
+							xref,
+							interactive,
+							cancellable,
+							&local_error);
 	if (data == NULL) {
 		if (g_error_matches (local_error, FLATPAK_ERROR, FLATPAK_ERROR_REF_NOT_FOUND) &&
 		    !gs_plugin_get_network_available (self->plugin)) {
@@ -4778,6 +4845,84 @@ gs_flatpak_get_id (GsFlatpak *self)
 	return self->id;
 }
 
+/* Drops the parsed permissions and remote metadata caches, which are
+ * repopulated on demand. Returns an estimate of the bytes released. */
+gsize
+gs_flatpak_release_memory (GsFlatpak                  *self,
+                           GMemoryMonitorWarningLevel  level)
+{
+	if (level < G_MEMORY_MONITOR_WARNING_LEVEL_MEDIUM)
+		return 0;
+
+	return gs_flatpak_metadata_cache_clear (self->metadata_cache);
+}
+
+/* Updates @stamp with the modification time of @filename, and of everything
+ * below it down to @depth levels. Symlinks aren’t followed, so replacing one
+ * changes the stamp even if nothing else about the directory does. */
+static void
+updates_stamp_add_path (guint64     *stamp,
+                        const gchar *filename,
+                        guint        depth)
+{
+	GStatBuf buf;
+	g_autoptr(GDir) dir = NULL;
+	const gchar *name;
+
+	if (g_lstat (filename, &buf) != 0)
+		return;
+
+	*stamp = MAX (*stamp, (guint64) buf.st_mtim.tv_sec * G_USEC_PER_SEC +
+		      (guint64) buf.st_mtim.tv_nsec / 1000);
+
+	if (depth == 0 || !S_ISDIR (buf.st_mode))
+		return;
+
+	dir = g_dir_open (filename, 0, NULL);
+	while (dir != NULL && (name = g_dir_read_name (dir)) != NULL) {
+		g_autofree gchar *child = g_build_filename (filename, name, NULL);
+		updates_stamp_add_path (stamp, child, depth - 1);
+	}
+}
+
+/* Returns the latest modification time, in microseconds, of the files which
+ * determine the installation’s available updates. Returns 0 if none of them
+ * exist.
+ *
+ * The directories can’t be used on their own, as flatpak mostly changes
+ * things further down: the appstream data is updated by replacing the
+ * `appstream/$remote/$arch/active` symlink, and remote summaries are
+ * written to `repo/tmp/cache/summaries/`. */
+guint64
+gs_flatpak_get_updates_stamp (GsFlatpak *self)
+{
+	const struct {
+		const gchar *subpath;
+		guint depth;
+	} subpaths[] = {
+		{ ".changed", 0 },  /* touched when refs are (un)installed */
+		{ "repo/config", 0 },  /* remote configuration */
+		{ "repo/refs/remotes", 1 },  /* one directory per remote */
+		{ "repo/tmp/cache", 2 },  /* summaries/$remote.idx, summaries/$remote-$checksum.sub */
+		{ "appstream", 3 },  /* $remote/$arch/active */
+	};
+	g_autoptr(GFile) path = NULL;
+	g_autofree gchar *path_str = NULL;
+	guint64 stamp = 0;
+
+	path = flatpak_installation_get_path (self->installation_noninteractive);
+	path_str = g_file_get_path (path);
+	if (path_str == NULL)
+		return 0;
+
+	for (gsize i = 0; i < G_N_ELEMENTS (subpaths); i++) {
+		g_autofree gchar *filename = g_build_filename (path_str, subpaths[i].subpath, NULL);
+		updates_stamp_add_path (&stamp, filename, subpaths[i].depth);
+	}
+
+	return stamp;
+}
+
 AsComponentScope
 gs_flatpak_get_scope (GsFlatpak *self)
 {
@@ -4821,6 +4966,7 @@ gs_flatpak_finalize (GObject *object)
 	g_mutex_clear (&self->app_silos_mutex);
 	g_clear_pointer (&self->remote_title, g_hash_table_unref);
 	g_mutex_clear (&self->remote_title_mutex);
+	g_clear_object (&self->metadata_cache);
 
 	G_OBJECT_CLASS (gs_flatpak_parent_class)->finalize (object);
 }
@@ -4849,6 +4995,7 @@ gs_flatpak_init (GsFlatpak *self)
 	g_mutex_init (&self->app_silos_mutex);
 	self->remote_title = g_hash_table_new_full (g_str_hash, g_str_equal, g_free, g_free);
 	g_mutex_init (&self->remote_title_mutex);
+	self->metadata_cache = gs_flatpak_metadata_cache_new ();
 }
 
 GsFlatpak *
@@ -50,6 +50,9 @@ GsApp		*gs_flatpak_ref_to_app		(GsFlatpak		*self,
 
 AsComponentScope	gs_flatpak_get_scope		(GsFlatpak		*self);
 const gchar	*gs_flatpak_get_id		(GsFlatpak		*self);
+guint64		gs_flatpak_get_updates_stamp	(GsFlatpak		*self);
+gsize		gs_flatpak_release_memory	(GsFlatpak		*self,
+						 GMemoryMonitorWarningLevel level);
 gboolean	gs_flatpak_setup		(GsFlatpak		*self,
 						 GCancellable		*cancellable,
 						 GError			**error);
@@ -124,6 +124,9 @@ gs_plugin_flatpak_init (GsPluginFlatpak *self)
 	gs_plugin_add_rule (plugin, GS_PLUGIN_RULE_BETTER_THAN, "packagekit");
 	gs_plugin_add_rule (plugin, GS_PLUGIN_RULE_BETTER_THAN, "rpm-ostree");
 
+	/* updates can be pulled and deployed in separate transactions */
+	gs_plugin_set_pipelined_updates (plugin, TRUE);
+
 	/* used for self tests */
 	self->destdir_for_tests = g_getenv ("GS_SELF_TEST_FLATPAK_DATADIR");
 }
@@ -1207,6 +1210,9 @@ update_apps_thread_cb (GTask        *task,
 	GsPluginFlatpak *self = GS_PLUGIN_FLATPAK (source_object);
 	GsPluginUpdateAppsData *data = task_data;
 	gboolean interactive = (data->flags & GS_PLUGIN_UPDATE_APPS_FLAGS_INTERACTIVE);
+	gboolean pipelined = (data->flags & GS_PLUGIN_UPDATE_APPS_FLAGS_PIPELINED);
+	gboolean no_download = pipelined && (data->flags & GS_PLUGIN_UPDATE_APPS_FLAGS_NO_DOWNLOAD);
+	gboolean no_apply = pipelined && (data->flags & GS_PLUGIN_UPDATE_APPS_FLAGS_NO_APPLY);
 	g_autoptr(GHashTable) applist_by_flatpaks = NULL;
 	GHashTableIter iter;
 	gpointer key, value;
@@ -1246,7 +1252,7 @@ update_apps_thread_cb (GTask        *task,
 		g_assert (list_tmp != NULL);
 		g_assert (gs_app_list_length (list_tmp) > 0);
 
-		if (!interactive) {
+		if (!interactive && !no_download) {
 			if (!gs_metered_block_app_list_on_download_scheduler (list_tmp, &schedule_entry_handle, cancellable, &local_error)) {
 				g_warning ("Failed to block on download scheduler: %s",
 					   local_error->message);
@@ -1354,8 +1360,17 @@ update_apps_thread_cb (GTask        *task,
 			}
 		}
 
+		/* Only do one stage of a pipelined update. The apply stage
+		 * deploys what the download stage pulled, including any
+		 * runtime or related refs it shares with other apps. */
+		if (no_download)
+			flatpak_transaction_set_no_pull (transaction, TRUE);
+		if (no_apply)
+			flatpak_transaction_set_no_deploy (transaction, TRUE);
+
 		/* automatically clean up unused EOL runtimes when updating */
-		flatpak_transaction_set_include_unused_uninstall_ops (transaction, TRUE);
+		if (!no_apply)
+			flatpak_transaction_set_include_unused_uninstall_ops (transaction, TRUE);
 
 		/* FIXME: Link progress reporting from #FlatpakTransaction
 		 * up to `data->progress_callback`. */
@@ -1403,6 +1418,21 @@ update_apps_thread_cb (GTask        *task,
 		}
 
 		remove_schedule_entry (schedule_entry_handle);
+
+		/* Nothing is deployed yet, so the apps are still updatable. Any
+		 * which were already downloaded had no operation to update
+		 * their state. */
+		if (no_apply) {
+			for (guint i = 0; i < gs_app_list_length (list_tmp); i++) {
+				GsApp *app = gs_app_list_index (list_tmp, i);
+				if (gs_app_get_state (app) == GS_APP_STATE_INSTALLING)
+					gs_app_set_state_recover (app);
+			}
+
+			gs_flatpak_set_busy (flatpak, FALSE);
+			continue;
+		}
+
 		gs_plugin_updates_changed (GS_PLUGIN (self));
 
 		/* Get any new state. Ignore failure and fall through to
@@ -2792,6 +2822,47 @@ gs_plugin_flatpak_list_apps_finish (GsPlugin      *plugin,
 	return g_task_propagate_pointer (G_TASK (result), error);
 }
 
+static gchar *
+gs_plugin_flatpak_get_updates_stamp (GsPlugin *plugin)
+{
+	GsPluginFlatpak *self = GS_PLUGIN_FLATPAK (plugin);
+	g_autoptr(GString) stamp = g_string_new (NULL);
+
+	if (self->installations == NULL)
+		return NULL;
+
+	for (guint i = 0; i < self->installations->len; i++) {
+		GsFlatpak *flatpak = g_ptr_array_index (self->installations, i);
+		guint64 flatpak_stamp = gs_flatpak_get_updates_stamp (flatpak);
+
+		if (flatpak_stamp == 0)
+			return NULL;
+
+		g_string_append_printf (stamp, "%s=%" G_GUINT64_FORMAT ";",
+					gs_flatpak_get_id (flatpak), flatpak_stamp);
+	}
+
+	return g_string_free (g_steal_pointer (&stamp), FALSE);
+}
+
+static gsize
+gs_plugin_flatpak_release_memory (GsPlugin                   *plugin,
+                                  GMemoryMonitorWarningLevel  level)
+{
+	GsPluginFlatpak *self = GS_PLUGIN_FLATPAK (plugin);
+	gsize n_bytes = 0;
+
+	if (self->installations == NULL)
+		return 0;
+
+	for (guint i = 0; i < self->installations->len; i++) {
+		GsFlatpak *flatpak = g_ptr_array_index (self->installations, i);
+		n_bytes += gs_flatpak_release_memory (flatpak, level);
+	}
+
+	return n_bytes;
+}
+
 typedef struct {
 	gboolean interactive;
 	GsPluginEventCallback event_callback;
@@ -3277,6 +3348,8 @@ gs_plugin_flatpak_class_init (GsPluginFlatpakClass *klass)
 	plugin_class->refine_finish = gs_plugin_flatpak_refine_finish;
 	plugin_class->list_apps_async = gs_plugin_flatpak_list_apps_async;
 	plugin_class->list_apps_finish = gs_plugin_flatpak_list_apps_finish;
+	plugin_class->get_updates_stamp = gs_plugin_flatpak_get_updates_stamp;
+	plugin_class->release_memory = gs_plugin_flatpak_release_memory;
 	plugin_class->refresh_metadata_async = gs_plugin_flatpak_refresh_metadata_async;
 	plugin_class->refresh_metadata_finish = gs_plugin_flatpak_refresh_metadata_finish;
 	plugin_class->install_repository_async = gs_plugin_flatpak_install_repository_async;
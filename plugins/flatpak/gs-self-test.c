@@ -14,6 +14,7 @@
 #include "gnome-software-private.h"
 
 #include "gs-flatpak-app.h"
+#include "gs-flatpak-metadata-cache.h"
 
 #include "gs-test.h"
 
@@ -1401,8 +1402,10 @@ gs_plugins_flatpak_count_signal_cb (GsPluginLoader *plugin_loader, guint *cnt)
 		(*cnt)++;
 }
 
+/* Updates an app and its runtime to a new branch, using @update_flags. */
 static void
-gs_plugins_flatpak_app_update_func (GsPluginLoader *plugin_loader)
+gs_plugins_flatpak_app_update (GsPluginLoader          *plugin_loader,
+                               GsPluginUpdateAppsFlags  update_flags)
 {
 	GsApp *app;
 	GsApp *app_tmp;
@@ -1599,7 +1602,7 @@ gs_plugins_flatpak_app_update_func (GsPluginLoader *plugin_loader)
 	/* use a mainloop so we get the events in the default context */
 	update_apps_list = gs_app_list_new ();
 	gs_app_list_add (update_apps_list, app);
-	plugin_job_update_apps = gs_plugin_job_update_apps_new (update_apps_list, GS_PLUGIN_UPDATE_APPS_FLAGS_NO_DOWNLOAD);
+	plugin_job_update_apps = gs_plugin_job_update_apps_new (update_apps_list, update_flags);
 	gs_plugin_loader_job_process_async (plugin_loader, plugin_job_update_apps,
 					    NULL,
 					    update_app_action_finish_sync,
@@ -1669,6 +1672,19 @@ gs_plugins_flatpak_app_update_func (GsPluginLoader *plugin_loader)
 	unlink (repo_path);
 }
 
+static void
+gs_plugins_flatpak_app_update_func (GsPluginLoader *plugin_loader)
+{
+	gs_plugins_flatpak_app_update (plugin_loader, GS_PLUGIN_UPDATE_APPS_FLAGS_NO_DOWNLOAD);
+}
+
+static void
+gs_plugins_flatpak_app_update_pipelined_func (GsPluginLoader *plugin_loader)
+{
+	/* pulls the update in one transaction, then deploys it in another */
+	gs_plugins_flatpak_app_update (plugin_loader, GS_PLUGIN_UPDATE_APPS_FLAGS_PIPELINED);
+}
+
 static void
 gs_plugins_flatpak_runtime_extension_func (GsPluginLoader *plugin_loader)
 {
@@ -1945,6 +1961,55 @@ gs_plugins_flatpak_runtime_extension_func (GsPluginLoader *plugin_loader)
 	g_assert_false (gs_app_is_installed (extension));
 }
 
+static void
+gs_plugins_flatpak_metadata_cache_func (void)
+{
+	g_autoptr(GsFlatpakMetadataCache) cache = gs_flatpak_metadata_cache_new ();
+	g_autoptr(GsAppPermissions) permissions = gs_app_permissions_new ();
+	g_autoptr(GsAppPermissions) permissions_cached = NULL;
+	g_autoptr(GBytes) metadata = NULL;
+	g_autoptr(GBytes) metadata_cached = NULL;
+	const gchar *ref = "app/org.test.Chiron/x86_64/master";
+	const gchar *data = "[Application]\nname=org.test.Chiron\n\n[Context]\nshared=network;\n";
+	const gchar *data_other = "[Application]\nname=org.test.Chiron\n";
+
+	gs_app_permissions_set_flags (permissions, GS_APP_PERMISSIONS_FLAGS_NETWORK);
+	gs_app_permissions_seal (permissions);
+
+	/* permissions are shared between byte-identical metadata */
+	g_assert_null (gs_flatpak_metadata_cache_lookup_permissions (cache, data, strlen (data)));
+	gs_flatpak_metadata_cache_add_permissions (cache, data, strlen (data), permissions);
+	permissions_cached = gs_flatpak_metadata_cache_lookup_permissions (cache, data, strlen (data));
+	g_assert_true (permissions_cached == permissions);
+	g_clear_object (&permissions_cached);
+	g_assert_null (gs_flatpak_metadata_cache_lookup_permissions (cache, data_other, strlen (data_other)));
+
+	/* remote metadata is found again for the same remote and ref */
+	metadata = g_bytes_new_static (data, strlen (data));
+	gs_flatpak_metadata_cache_add_remote_metadata (cache, "test", ref, metadata);
+	metadata_cached = gs_flatpak_metadata_cache_lookup_remote_metadata (cache, "test", ref);
+	g_assert_true (metadata_cached == metadata);
+	g_clear_pointer (&metadata_cached, g_bytes_unref);
+	g_assert_null (gs_flatpak_metadata_cache_lookup_remote_metadata (cache, "test", "app/org.test.Other/x86_64/master"));
+	g_assert_null (gs_flatpak_metadata_cache_lookup_remote_metadata (cache, "other", ref));
+
+	/* refreshing a remote drops only its entries, as its refs may now
+	 * point to different commits */
+	gs_flatpak_metadata_cache_add_remote_metadata (cache, "other", ref, metadata);
+	g_assert_cmpuint (gs_flatpak_metadata_cache_invalidate_remote (cache, "test"), ==, strlen (data));
+	g_assert_null (gs_flatpak_metadata_cache_lookup_remote_metadata (cache, "test", ref));
+	metadata_cached = gs_flatpak_metadata_cache_lookup_remote_metadata (cache, "other", ref);
+	g_assert_true (metadata_cached == metadata);
+	g_clear_pointer (&metadata_cached, g_bytes_unref);
+	g_assert_cmpuint (gs_flatpak_metadata_cache_invalidate_remote (cache, "test"), ==, 0);
+
+	/* clearing, as when the installation changes, drops both caches */
+	g_assert_cmpuint (gs_flatpak_metadata_cache_clear (cache), ==, strlen (data));
+	g_assert_null (gs_flatpak_metadata_cache_lookup_permissions (cache, data, strlen (data)));
+	g_assert_null (gs_flatpak_metadata_cache_lookup_remote_metadata (cache, "other", ref));
+	g_assert_cmpuint (gs_flatpak_metadata_cache_clear (cache), ==, 0);
+}
+
 int
 main (int argc, char **argv)
 {
@@ -2029,12 +2094,17 @@ main (int argc, char **argv)
 	g_test_add_data_func ("/gnome-software/plugins/flatpak/app-update-runtime",
 			      plugin_loader,
 			      (GTestDataFunc) gs_plugins_flatpak_app_update_func);
+	g_test_add_data_func ("/gnome-software/plugins/flatpak/app-update-runtime{pipelined}",
+			      plugin_loader,
+			      (GTestDataFunc) gs_plugins_flatpak_app_update_pipelined_func);
 	g_test_add_data_func ("/gnome-software/plugins/flatpak/repo",
 			      plugin_loader,
 			      (GTestDataFunc) gs_plugins_flatpak_repo_func);
 	g_test_add_data_func ("/gnome-software/plugins/flatpak/repo{non-ascii}",
 			      plugin_loader,
 			      (GTestDataFunc) gs_plugins_flatpak_repo_non_ascii_func);
+	g_test_add_func ("/gnome-software/plugins/flatpak/metadata-cache",
+			 gs_plugins_flatpak_metadata_cache_func);
 	retval = g_test_run ();
 
 	/* Clean up. */
@@ -0,0 +1,361 @@
+/* -*- Mode: C; tab-width: 8; indent-tabs-mode: t; c-basic-offset: 8 -*-
+ * vi:set noexpandtab tabstop=8 shiftwidth=8:
+ *
+ * Copyright (C) 2026 GNOME Foundation, Inc.
+ *
+ * SPDX-License-Identifier: GPL-2.0-or-later
+ */
+
+/**
+ * SECTION:gs-fwupd-device-model
+ * @short_description: The fwupd devices and their available upgrades
+ *
+ * #GsFwupdDeviceModel holds the devices known to fwupd, and the upgrades
+ * available for each of them once they have been queried. It is populated
+ * by a full enumeration, then kept up to date from fwupd’s device signals, so
+ * that listing updates doesn’t have to re-enumerate everything over D-Bus
+ * each time.
+ *
+ * The model has a serial which changes whenever any device is added, changed
+ * or removed, or the whole model is invalidated. Each device’s entry records
+ * the serial it was added with, so upgrades queried for an older version of
+ * the device can be dropped with gs_fwupd_device_model_set_upgrades().
+ *
+ * The whole model should be invalidated when remote metadata changes, as any
+ * device’s available upgrades may have changed.
+ */
+
+#include "config.h"
+
+#include "gs-fwupd-device-model.h"
+
+typedef struct {
+	FwupdDevice	*device;  /* (owned) (not nullable) */
+	GPtrArray	*upgrades;  /* (owned) (nullable) (element-type FwupdRelease); NULL if there are none */
+	gboolean	 upgrades_valid;
+	guint		 serial;  /* of the model when the entry was added */
+} DeviceModelEntry;
+
+static void
+device_model_entry_free (DeviceModelEntry *entry)
+{
+	g_clear_object (&entry->device);
+	g_clear_pointer (&entry->upgrades, g_ptr_array_unref);
+	g_free (entry);
+}
+
+struct _GsFwupdDeviceModel
+{
+	GObject		 parent_instance;
+
+	GHashTable	*entries;  /* (owned) (element-type utf8 DeviceModelEntry); keyed by device ID */
+	gboolean	 valid;
+	gint64		 timestamp;  /* real time (µs) of the last full enumeration */
+	guint		 serial;
+};
+
+G_DEFINE_TYPE (GsFwupdDeviceModel, gs_fwupd_device_model, G_TYPE_OBJECT)
+
+static void
+gs_fwupd_device_model_finalize (GObject *object)
+{
+	GsFwupdDeviceModel *self = GS_FWUPD_DEVICE_MODEL (object);
+
+	g_hash_table_unref (self->entries);
+
+	G_OBJECT_CLASS (gs_fwupd_device_model_parent_class)->finalize (object);
+}
+
+static void
+gs_fwupd_device_model_class_init (GsFwupdDeviceModelClass *klass)
+{
+	GObjectClass *object_class = G_OBJECT_CLASS (klass);
+
+	object_class->finalize = gs_fwupd_device_model_finalize;
+}
+
+static void
+gs_fwupd_device_model_init (GsFwupdDeviceModel *self)
+{
+	self->entries = g_hash_table_new_full (g_str_hash, g_str_equal, g_free,
+					       (GDestroyNotify) device_model_entry_free);
+}
+
+/**
+ * gs_fwupd_device_model_new:
+ *
+ * Create a new, invalid, #GsFwupdDeviceModel.
+ *
+ * Returns: (transfer full): a new #GsFwupdDeviceModel
+ * Since: 50
+ */
+GsFwupdDeviceModel *
+gs_fwupd_device_model_new (void)
+{
+	return g_object_new (GS_TYPE_FWUPD_DEVICE_MODEL, NULL);
+}
+
+/**
+ * gs_fwupd_device_model_is_valid:
+ * @self: a #GsFwupdDeviceModel
+ *
+ * Get whether the model has been populated since it was last invalidated.
+ *
+ * Returns: %TRUE if the model is valid
+ * Since: 50
+ */
+gboolean
+gs_fwupd_device_model_is_valid (GsFwupdDeviceModel *self)
+{
+	g_return_val_if_fail (GS_IS_FWUPD_DEVICE_MODEL (self), FALSE);
+
+	return self->valid;
+}
+
+/**
+ * gs_fwupd_device_model_get_serial:
+ * @self: a #GsFwupdDeviceModel
+ *
+ * Get the serial of the model, which changes whenever a device is added,
+ * changed or removed, or the model is invalidated.
+ *
+ * Returns: the serial
+ * Since: 50
+ */
+guint
+gs_fwupd_device_model_get_serial (GsFwupdDeviceModel *self)
+{
+	g_return_val_if_fail (GS_IS_FWUPD_DEVICE_MODEL (self), 0);
+
+	return self->serial;
+}
+
+/**
+ * gs_fwupd_device_model_predates:
+ * @self: a #GsFwupdDeviceModel
+ * @timestamp_secs: a modification time, in seconds since the epoch
+ *
+ * Check whether the model may have been populated before @timestamp_secs,
+ * for example to tell whether remote metadata was modified after the model
+ * was populated.
+ *
+ * The timestamps are compared at the granularity of a second, and a
+ * @timestamp_secs in the same second as the model was populated counts as
+ * newer, so a change is never missed.
+ *
+ * Returns: %TRUE if the model is not newer than @timestamp_secs
+ * Since: 50
+ */
+gboolean
+gs_fwupd_device_model_predates (GsFwupdDeviceModel *self,
+				guint64             timestamp_secs)
+{
+	g_return_val_if_fail (GS_IS_FWUPD_DEVICE_MODEL (self), TRUE);
+
+	return timestamp_secs >= (guint64) (self->timestamp / G_USEC_PER_SEC);
+}
+
+static DeviceModelEntry *
+add_device (GsFwupdDeviceModel *self,
+	    FwupdDevice        *device)
+{
+	DeviceModelEntry *entry = g_new0 (DeviceModelEntry, 1);
+
+	entry->device = g_object_ref (device);
+	entry->serial = ++self->serial;
+	g_hash_table_replace (self->entries,
+			      g_strdup (fwupd_device_get_id (device)),
+			      entry);
+
+	return entry;
+}
+
+/**
+ * gs_fwupd_device_model_populate:
+ * @self: a #GsFwupdDeviceModel
+ * @devices: (element-type FwupdDevice): all the devices known to fwupd
+ *
+ * Replace the contents of the model with @devices, and mark it as valid. The
+ * upgrades of each device are not known until they’re set with
+ * gs_fwupd_device_model_set_upgrades().
+ *
+ * Since: 50
+ */
+void
+gs_fwupd_device_model_populate (GsFwupdDeviceModel *self,
+				GPtrArray          *devices)
+{
+	g_return_if_fail (GS_IS_FWUPD_DEVICE_MODEL (self));
+	g_return_if_fail (devices != NULL);
+
+	g_hash_table_remove_all (self->entries);
+	for (guint i = 0; i < devices->len; i++)
+		add_device (self, g_ptr_array_index (devices, i));
+
+	self->serial++;
+	self->valid = TRUE;
+	self->timestamp = g_get_real_time ();
+}
+
+/**
+ * gs_fwupd_device_model_invalidate:
+ * @self: a #GsFwupdDeviceModel
+ *
+ * Drop all the devices from the model and mark it as invalid, so it’s
+ * populated again the next time updates are listed.
+ *
+ * Since: 50
+ */
+void
+gs_fwupd_device_model_invalidate (GsFwupdDeviceModel *self)
+{
+	g_return_if_fail (GS_IS_FWUPD_DEVICE_MODEL (self));
+
+	g_hash_table_remove_all (self->entries);
+	self->valid = FALSE;
+	self->serial++;
+}
+
+/**
+ * gs_fwupd_device_model_update_device:
+ * @self: a #GsFwupdDeviceModel
+ * @device: a device which was added or changed
+ *
+ * Add or replace the entry for @device. Its upgrades will be queried again
+ * the next time updates are listed.
+ *
+ * This does nothing if the model is not valid, as the next full enumeration
+ * will pick @device up.
+ *
+ * Since: 50
+ */
+void
+gs_fwupd_device_model_update_device (GsFwupdDeviceModel *self,
+				     FwupdDevice        *device)
+{
+	g_return_if_fail (GS_IS_FWUPD_DEVICE_MODEL (self));
+	g_return_if_fail (FWUPD_IS_DEVICE (device));
+
+	if (self->valid)
+		add_device (self, device);
+}
+
+/**
+ * gs_fwupd_device_model_remove_device:
+ * @self: a #GsFwupdDeviceModel
+ * @device_id: ID of a device which was removed
+ *
+ * Remove the entry for @device_id, if there is one.
+ *
+ * Since: 50
+ */
+void
+gs_fwupd_device_model_remove_device (GsFwupdDeviceModel *self,
+				     const gchar        *device_id)
+{
+	g_return_if_fail (GS_IS_FWUPD_DEVICE_MODEL (self));
+	g_return_if_fail (device_id != NULL);
+
+	if (g_hash_table_remove (self->entries, device_id))
+		self->serial++;
+}
+
+/**
+ * gs_fwupd_device_model_dup_devices:
+ * @self: a #GsFwupdDeviceModel
+ *
+ * Get all the devices in the model.
+ *
+ * Returns: (transfer container) (element-type FwupdDevice): the devices
+ * Since: 50
+ */
+GPtrArray *
+gs_fwupd_device_model_dup_devices (GsFwupdDeviceModel *self)
+{
+	g_autoptr(GPtrArray) devices = NULL;
+	GHashTableIter iter;
+	gpointer value;
+
+	g_return_val_if_fail (GS_IS_FWUPD_DEVICE_MODEL (self), NULL);
+
+	devices = g_ptr_array_new_full (g_hash_table_size (self->entries), g_object_unref);
+	g_hash_table_iter_init (&iter, self->entries);
+	while (g_hash_table_iter_next (&iter, NULL, &value)) {
+		const DeviceModelEntry *entry = value;
+		g_ptr_array_add (devices, g_object_ref (entry->device));
+	}
+
+	return g_steal_pointer (&devices);
+}
+
+/**
+ * gs_fwupd_device_model_lookup_upgrades:
+ * @self: a #GsFwupdDeviceModel
+ * @device_id: ID of a device in the model
+ * @out_upgrades: (out) (optional) (nullable) (transfer none) (element-type FwupdRelease):
+ *   return location for the upgrades, which are %NULL if there are none
+ * @out_serial: (out) (optional): return location for the serial of the
+ *   device’s entry, to pass to gs_fwupd_device_model_set_upgrades(), or 0 if
+ *   the device is not in the model
+ *
+ * Look up the known upgrades for @device_id.
+ *
+ * Returns: %TRUE if the upgrades are known, %FALSE if they need to be queried
+ * Since: 50
+ */
+gboolean
+gs_fwupd_device_model_lookup_upgrades (GsFwupdDeviceModel  *self,
+				       const gchar         *device_id,
+				       GPtrArray          **out_upgrades,
+				       guint               *out_serial)
+{
+	const DeviceModelEntry *entry;
+
+	g_return_val_if_fail (GS_IS_FWUPD_DEVICE_MODEL (self), FALSE);
+	g_return_val_if_fail (device_id != NULL, FALSE);
+
+	entry = g_hash_table_lookup (self->entries, device_id);
+
+	if (out_upgrades != NULL)
+		*out_upgrades = (entry != NULL && entry->upgrades_valid) ? entry->upgrades : NULL;
+	if (out_serial != NULL)
+		*out_serial = (entry != NULL) ? entry->serial : 0;
+
+	return (entry != NULL && entry->upgrades_valid);
+}
+
+/**
+ * gs_fwupd_device_model_set_upgrades:
+ * @self: a #GsFwupdDeviceModel
+ * @device_id: ID of a device in the model
+ * @serial: the serial returned by gs_fwupd_device_model_lookup_upgrades()
+ *   before the upgrades were queried
+ * @upgrades: (nullable) (element-type FwupdRelease): the upgrades available
+ *   for the device, or %NULL if there are none
+ *
+ * Remember the upgrades available for @device_id.
+ *
+ * If the device has changed or been removed since @serial was returned, the
+ * upgrades are dropped, as they may be out of date.
+ *
+ * Since: 50
+ */
+void
+gs_fwupd_device_model_set_upgrades (GsFwupdDeviceModel *self,
+				    const gchar        *device_id,
+				    guint               serial,
+				    GPtrArray          *upgrades)
+{
+	DeviceModelEntry *entry;
+
+	g_return_if_fail (GS_IS_FWUPD_DEVICE_MODEL (self));
+	g_return_if_fail (device_id != NULL);
+
+	entry = g_hash_table_lookup (self->entries, device_id);
+	if (entry == NULL || entry->serial != serial)
+		return;
+
+	g_clear_pointer (&entry->upgrades, g_ptr_array_unref);
+	entry->upgrades = (upgrades != NULL) ? g_ptr_array_ref (upgrades) : NULL;
+	entry->upgrades_valid = TRUE;
+}
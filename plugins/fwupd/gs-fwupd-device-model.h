@@ -0,0 +1,45 @@
+/* -*- Mode: C; tab-width: 8; indent-tabs-mode: t; c-basic-offset: 8 -*-
+ * vi:set noexpandtab tabstop=8 shiftwidth=8:
+ *
+ * Copyright (C) 2026 GNOME Foundation, Inc.
+ *
+ * SPDX-License-Identifier: GPL-2.0-or-later
+ */
+
+#pragma once
+
+#include <glib-object.h>
+#include <fwupd.h>
+
+G_BEGIN_DECLS
+
+#define GS_TYPE_FWUPD_DEVICE_MODEL (gs_fwupd_device_model_get_type ())
+
+G_DECLARE_FINAL_TYPE (GsFwupdDeviceModel, gs_fwupd_device_model, GS, FWUPD_DEVICE_MODEL, GObject)
+
+GsFwupdDeviceModel	*gs_fwupd_device_model_new		(void);
+
+gboolean		 gs_fwupd_device_model_is_valid		(GsFwupdDeviceModel	*self);
+guint			 gs_fwupd_device_model_get_serial	(GsFwupdDeviceModel	*self);
+gboolean		 gs_fwupd_device_model_predates		(GsFwupdDeviceModel	*self,
+								 guint64		 timestamp_secs);
+
+void			 gs_fwupd_device_model_populate		(GsFwupdDeviceModel	*self,
+								 GPtrArray		*devices);
+void			 gs_fwupd_device_model_invalidate	(GsFwupdDeviceModel	*self);
+void			 gs_fwupd_device_model_update_device	(GsFwupdDeviceModel	*self,
+								 FwupdDevice		*device);
+void			 gs_fwupd_device_model_remove_device	(GsFwupdDeviceModel	*self,
+								 const gchar		*device_id);
+
+GPtrArray		*gs_fwupd_device_model_dup_devices	(GsFwupdDeviceModel	*self);
+gboolean		 gs_fwupd_device_model_lookup_upgrades	(GsFwupdDeviceModel	*self,
+								 const gchar		*device_id,
+								 GPtrArray		**out_upgrades,
+								 guint			*out_serial);
+void			 gs_fwupd_device_model_set_upgrades	(GsFwupdDeviceModel	*self,
+								 const gchar		*device_id,
+								 guint			 serial,
+								 GPtrArray		*upgrades);
+
+G_END_DECLS
@@ -19,6 +19,7 @@
 #include <gnome-software.h>
 
 #include "gs-fwupd-app.h"
+#include "gs-fwupd-device-model.h"
 #include "gs-metered.h"
 
 #include "gs-plugin-fwupd.h"
@@ -44,6 +45,13 @@ struct _GsPluginFwupd {
 	GsApp			*app_current;
 	GsApp			*cached_origin;
 	GHashTable		*cached_sources; /* (nullable) (owned) (element-type utf8 GsApp); sources by id, each value is weak reffed */
+
+	/* Devices and their available upgrades, kept up to date from the
+	 * device-added/-removed/-changed signals so that listing updates
+	 * doesn’t have to re-enumerate everything over D-Bus each time. The
+	 * whole model is only thrown away when remote metadata changes. */
+	GsFwupdDeviceModel	*device_model; /* (owned) */
+	GPtrArray		*remote_cache_filenames; /* (owned) (nullable) (element-type filename); metadata of enabled remotes */
 };
 
 G_DEFINE_TYPE (GsPluginFwupd, gs_plugin_fwupd, GS_TYPE_PLUGIN)
@@ -127,6 +135,11 @@ static void
 gs_plugin_fwupd_init (GsPluginFwupd *self)
 {
 	self->client = fwupd_client_new ();
+	self->device_model = gs_fwupd_device_model_new ();
+
+	/* firmware is only shown on the updates page, so don’t block startup
+	 * on connecting to fwupd */
+	gs_plugin_set_setup_deferrable (GS_PLUGIN (self), TRUE);
 }
 
 static void
@@ -136,6 +149,8 @@ gs_plugin_fwupd_dispose (GObject *object)
 
 	g_clear_object (&self->cached_origin);
 	g_clear_object (&self->client);
+	g_clear_object (&self->device_model);
+	g_clear_pointer (&self->remote_cache_filenames, g_ptr_array_unref);
 
 	if (self->cached_sources != NULL) {
 		GHashTableIter iter;
@@ -161,15 +176,44 @@ gs_plugin_fwupd_adopt_app (GsPlugin *plugin,
 		gs_app_set_management_plugin (app, plugin);
 }
 
+/* Remembers where the metadata of the enabled download remotes is cached,
+ * so that changes to it can be detected without a D-Bus round-trip. */
+static void
+gs_plugin_fwupd_set_remotes (GsPluginFwupd *self,
+			     GPtrArray     *remotes)
+{
+	g_autoptr(GPtrArray) filenames = g_ptr_array_new_with_free_func (g_free);
+
+	for (guint i = 0; i < remotes->len; i++) {
+		FwupdRemote *remote = g_ptr_array_index (remotes, i);
+		gboolean is_enabled;
+
+		#if FWUPD_CHECK_VERSION(1, 9, 4)
+		is_enabled = fwupd_remote_has_flag (remote, FWUPD_REMOTE_FLAG_ENABLED);
+		#else
+		is_enabled = fwupd_remote_get_enabled (remote);
+		#endif
+
+		if (!is_enabled ||
+		    fwupd_remote_get_kind (remote) != FWUPD_REMOTE_KIND_DOWNLOAD ||
+		    fwupd_remote_get_filename_cache (remote) == NULL)
+			continue;
+
+		g_ptr_array_add (filenames, g_strdup (fwupd_remote_get_filename_cache (remote)));
+	}
+
+	g_clear_pointer (&self->remote_cache_filenames, g_ptr_array_unref);
+	self->remote_cache_filenames = g_steal_pointer (&filenames);
+}
+
 static void
 gs_plugin_fwupd_changed_cb (FwupdClient *client, GsPlugin *plugin)
 {
 }
 
 static void
-gs_plugin_fwupd_device_changed_cb (FwupdClient *client,
-				   FwupdDevice *dev,
-				   GsPlugin *plugin)
+gs_plugin_fwupd_device_notify (GsPlugin    *plugin,
+			       FwupdDevice *dev)
 {
 	/* limit number of UI refreshes */
 	if (!fwupd_device_has_flag (dev, FWUPD_DEVICE_FLAG_SUPPORTED)) {
@@ -185,6 +229,30 @@ gs_plugin_fwupd_device_changed_cb (FwupdClient *client,
 	gs_plugin_updates_changed (plugin);
 }
 
+static void
+gs_plugin_fwupd_device_changed_cb (FwupdClient *client,
+				   FwupdDevice *dev,
+				   GsPlugin *plugin)
+{
+	GsPluginFwupd *self = GS_PLUGIN_FWUPD (plugin);
+
+	gs_fwupd_device_model_update_device (self->device_model, dev);
+
+	gs_plugin_fwupd_device_notify (plugin, dev);
+}
+
+static void
+gs_plugin_fwupd_device_removed_cb (FwupdClient *client,
+				   FwupdDevice *dev,
+				   GsPlugin *plugin)
+{
+	GsPluginFwupd *self = GS_PLUGIN_FWUPD (plugin);
+
+	gs_fwupd_device_model_remove_device (self->device_model, fwupd_device_get_id (dev));
+
+	gs_plugin_fwupd_device_notify (plugin, dev);
+}
+
 static void
 gs_plugin_fwupd_notify_percentage_cb (GObject    *object,
                                       GParamSpec *pspec,
@@ -345,7 +413,7 @@ setup_features_cb (GObject      *source_object,
 	g_signal_connect (self->client, "device-added",
 			  G_CALLBACK (gs_plugin_fwupd_device_changed_cb), plugin);
 	g_signal_connect (self->client, "device-removed",
-			  G_CALLBACK (gs_plugin_fwupd_device_changed_cb), plugin);
+			  G_CALLBACK (gs_plugin_fwupd_device_removed_cb), plugin);
 	g_signal_connect (self->client, "device-changed",
 			  G_CALLBACK (gs_plugin_fwupd_device_changed_cb), plugin);
 	g_signal_connect (self->client, "notify::percentage",
@@ -611,6 +679,7 @@ G_DEFINE_AUTOPTR_CLEANUP_FUNC (ListUpdatesData, list_updates_data_free)
 typedef struct {
 	GTask *task; /* (owned) */
 	FwupdDevice *device; /* (not nullable) (owned) */
+	guint serial; /* of the device model entry, or 0 if untracked */
 } ListUpdatesDevData;
 
 static void
@@ -688,50 +757,24 @@ gs_plugin_fwupd_list_historical_updates_got_dev_results_cb (GObject *source_obje
 	gs_plugin_fwupd_list_updates_finish_op (dev_data->task, app, success ? NULL : g_steal_pointer (&local_error));
 }
 
-static void
-gs_plugin_fwupd_list_updates_got_dev_upgrades_cb (GObject *source_object,
-						  GAsyncResult *result,
-						  gpointer user_data)
+/* @dev must already have the newest release in @rels added to it */
+static GsApp *
+gs_plugin_fwupd_new_app_for_upgrades (GsPlugin    *plugin,
+				      FwupdDevice *dev,
+				      GPtrArray   *rels)
 {
-	g_autoptr(ListUpdatesDevData) dev_data = g_steal_pointer (&user_data);
-	g_autoptr(GPtrArray) rels = NULL;
 	g_autoptr(GsApp) app = NULL;
 	g_autoptr(GError) local_error = NULL;
-	FwupdRelease *rel_newest;
-	gboolean success = TRUE;
-
-	rels = fwupd_client_get_upgrades_finish (FWUPD_CLIENT (source_object), result, &local_error);
-	if (rels == NULL) {
-		if (g_error_matches (local_error, FWUPD_ERROR, FWUPD_ERROR_NOTHING_TO_DO)) {
-			g_debug ("no updates for %s", fwupd_device_get_id (dev_data->device));
-		} else if (g_error_matches (local_error, FWUPD_ERROR, FWUPD_ERROR_NOT_SUPPORTED)) {
-			g_debug ("not supported for %s", fwupd_device_get_id (dev_data->device));
-		} else {
-			g_warning ("failed to get upgrades for %s: %s]",
-				   fwupd_device_get_id (dev_data->device),
-				   local_error->message);
-		}
-		success = FALSE;
-		/* ignore error for this device */
-		g_clear_error (&local_error);
-	}
 
-	if (success) {
-		GsPlugin *plugin = GS_PLUGIN (g_task_get_source_object (dev_data->task));
-		/* normal device update */
-		rel_newest = g_ptr_array_index (rels, 0);
-		fwupd_device_add_release (dev_data->device, rel_newest);
-		app = gs_plugin_fwupd_new_app (plugin, dev_data->device, &local_error);
-		if (app == NULL) {
-			g_debug ("Failed to create app for list for-update: %s", local_error->message);
-			success = FALSE;
-			/* ignore error for this device */
-			g_clear_error (&local_error);
-		}
+	/* normal device update */
+	app = gs_plugin_fwupd_new_app (plugin, dev, &local_error);
+	if (app == NULL) {
+		g_debug ("Failed to create app for list for-update: %s", local_error->message);
+		return NULL;
 	}
 
 	/* add update descriptions for all releases inbetween */
-	if (success && rels->len > 1) {
+	if (rels->len > 1) {
 		g_autoptr(GString) update_desc = g_string_new (NULL);
 		for (guint j = 0; j < rels->len; j++) {
 			FwupdRelease *rel = g_ptr_array_index (rels, j);
@@ -756,7 +799,112 @@ gs_plugin_fwupd_list_updates_got_dev_upgrades_cb (GObject *source_object,
 		}
 	}
 
-	gs_plugin_fwupd_list_updates_finish_op (dev_data->task, app, success ? NULL : g_steal_pointer (&local_error));
+	return g_steal_pointer (&app);
+}
+
+static void
+gs_plugin_fwupd_list_updates_got_dev_upgrades_cb (GObject *source_object,
+						  GAsyncResult *result,
+						  gpointer user_data)
+{
+	g_autoptr(ListUpdatesDevData) dev_data = g_steal_pointer (&user_data);
+	GsPluginFwupd *self = GS_PLUGIN_FWUPD (g_task_get_source_object (dev_data->task));
+	g_autoptr(GPtrArray) rels = NULL;
+	g_autoptr(GsApp) app = NULL;
+	g_autoptr(GError) local_error = NULL;
+
+	rels = fwupd_client_get_upgrades_finish (FWUPD_CLIENT (source_object), result, &local_error);
+	if (rels == NULL) {
+		if (g_error_matches (local_error, FWUPD_ERROR, FWUPD_ERROR_NOTHING_TO_DO)) {
+			g_debug ("no updates for %s", fwupd_device_get_id (dev_data->device));
+		} else if (g_error_matches (local_error, FWUPD_ERROR, FWUPD_ERROR_NOT_SUPPORTED)) {
+			g_debug ("not supported for %s", fwupd_device_get_id (dev_data->device));
+		} else if (g_error_matches (local_error, G_IO_ERROR, G_IO_ERROR_CANCELLED)) {
+			/* don’t record anything in the model */
+			gs_plugin_fwupd_list_updates_finish_op (dev_data->task, NULL, NULL);
+			return;
+		} else {
+			g_warning ("failed to get upgrades for %s: %s]",
+				   fwupd_device_get_id (dev_data->device),
+				   local_error->message);
+		}
+		/* ignore error for this device */
+		g_clear_error (&local_error);
+	} else {
+		fwupd_device_add_release (dev_data->device, g_ptr_array_index (rels, 0));
+	}
+
+	/* remember the result, unless the device changed while querying */
+	gs_fwupd_device_model_set_upgrades (self->device_model,
+					    fwupd_device_get_id (dev_data->device),
+					    dev_data->serial, rels);
+
+	if (rels != NULL)
+		app = gs_plugin_fwupd_new_app_for_upgrades (GS_PLUGIN (self), dev_data->device, rels);
+
+	gs_plugin_fwupd_list_updates_finish_op (dev_data->task, app, NULL);
+}
+
+/* Adds the updates for every device in the model to the task’s list,
+ * querying fwupd only for the devices whose upgrades aren’t known yet. */
+static void
+gs_plugin_fwupd_list_updates_from_model (GTask *task)
+{
+	GsPluginFwupd *self = GS_PLUGIN_FWUPD (g_task_get_source_object (task));
+	GsPlugin *plugin = GS_PLUGIN (self);
+	ListUpdatesData *list_updates_data = g_task_get_task_data (task);
+	GCancellable *cancellable = g_task_get_cancellable (task);
+	g_autoptr(GPtrArray) devices = gs_fwupd_device_model_dup_devices (self->device_model);
+	guint n_cached = 0;
+
+	for (guint i = 0; i < devices->len; i++) {
+		FwupdDevice *dev = g_ptr_array_index (devices, i);
+		g_autoptr(ListUpdatesDevData) dev_data = NULL;
+		g_autoptr(GsApp) app = NULL;
+		GPtrArray *upgrades;
+		guint serial;
+
+		/* not going to have results, so save a D-Bus round-trip */
+		if (!fwupd_device_has_flag (dev, FWUPD_DEVICE_FLAG_SUPPORTED))
+			continue;
+
+		/* locked device that needs unlocking */
+		if (fwupd_device_has_flag (dev, FWUPD_DEVICE_FLAG_LOCKED)) {
+			app = gs_plugin_fwupd_new_app_from_device_raw (plugin, dev);
+			gs_fwupd_app_set_is_locked (app, TRUE);
+			gs_app_list_add (list_updates_data->list, app);
+			continue;
+		}
+
+		/* already known */
+		if (gs_fwupd_device_model_lookup_upgrades (self->device_model, fwupd_device_get_id (dev),
+							   &upgrades, &serial)) {
+			n_cached++;
+			if (upgrades == NULL)
+				continue;
+			app = gs_plugin_fwupd_new_app_for_upgrades (plugin, dev, upgrades);
+			if (app != NULL)
+				gs_app_list_add (list_updates_data->list, app);
+			continue;
+		}
+
+		list_updates_data->n_pending_ops++;
+
+		dev_data = g_new0 (ListUpdatesDevData, 1);
+		dev_data->task = g_object_ref (task);
+		dev_data->device = g_object_ref (dev);
+		dev_data->serial = serial;
+
+		/* get the releases for this device and filter for validity */
+		fwupd_client_get_upgrades_async (self->client,
+						 fwupd_device_get_id (dev),
+						 cancellable,
+						 gs_plugin_fwupd_list_updates_got_dev_upgrades_cb,
+						 g_steal_pointer (&dev_data));
+	}
+
+	g_debug ("listing updates: %u of %u devices answered from the device model",
+		 n_cached, devices->len);
 }
 
 static void
@@ -769,7 +917,7 @@ gs_plugin_fwupd_list_updates_got_devices_cb (GObject *source_object,
 	g_autoptr(GError) local_error = NULL;
 	FwupdClient *client = FWUPD_CLIENT (source_object);
 	GCancellable *cancellable = g_task_get_cancellable (task);
-	GsPlugin *plugin = GS_PLUGIN (g_task_get_source_object (task));
+	GsPluginFwupd *self = GS_PLUGIN_FWUPD (g_task_get_source_object (task));
 	ListUpdatesData *list_updates_data = g_task_get_task_data (task);
 
 	/* this operation is decremented at the end of the function */
@@ -790,17 +938,17 @@ gs_plugin_fwupd_list_updates_got_devices_cb (GObject *source_object,
 		gs_plugin_fwupd_list_updates_finish_op (task, NULL, NULL);
 		return;
 	}
-	for (guint i = 0; i < devices->len; i++) {
-		FwupdDevice *dev = g_ptr_array_index (devices, i);
-		g_autoptr(ListUpdatesDevData) dev_data = NULL;
-		g_autoptr(GsApp) app = NULL;
 
-		/* not going to have results, so save a D-Bus round-trip */
-		if (!fwupd_device_has_flag (dev, FWUPD_DEVICE_FLAG_SUPPORTED))
-			continue;
+	/* We’re interested in historical updates rather than pending updates */
+	if (list_updates_data->get_historical_updates) {
+		for (guint i = 0; i < devices->len; i++) {
+			FwupdDevice *dev = g_ptr_array_index (devices, i);
+			g_autoptr(ListUpdatesDevData) dev_data = NULL;
+
+			/* not going to have results, so save a D-Bus round-trip */
+			if (!fwupd_device_has_flag (dev, FWUPD_DEVICE_FLAG_SUPPORTED))
+				continue;
 
-		/* We’re interested in historical updates rather than pending updates */
-		if (list_updates_data->get_historical_updates) {
 			list_updates_data->n_pending_ops++;
 
 			dev_data = g_new0 (ListUpdatesDevData, 1);
@@ -812,32 +960,74 @@ gs_plugin_fwupd_list_updates_got_devices_cb (GObject *source_object,
 							cancellable,
 							gs_plugin_fwupd_list_historical_updates_got_dev_results_cb,
 							g_steal_pointer (&dev_data));
-			continue;
 		}
 
-		/* locked device that needs unlocking */
-		if (fwupd_device_has_flag (dev, FWUPD_DEVICE_FLAG_LOCKED)) {
-			app = gs_plugin_fwupd_new_app_from_device_raw (plugin, dev);
-			gs_fwupd_app_set_is_locked (app, TRUE);
-			gs_app_list_add (list_updates_data->list, app);
-			continue;
-		}
+		gs_plugin_fwupd_list_updates_finish_op (task, NULL, NULL);
+		return;
+	}
 
-		list_updates_data->n_pending_ops++;
+	/* repopulate the device model; signals keep it current from now on */
+	gs_fwupd_device_model_populate (self->device_model, devices);
 
-		dev_data = g_new0 (ListUpdatesDevData, 1);
-		dev_data->task = g_object_ref (task);
-		dev_data->device = g_object_ref (dev);
+	gs_plugin_fwupd_list_updates_from_model (task);
+	gs_plugin_fwupd_list_updates_finish_op (task, NULL, NULL);
+}
 
-		/* get the releases for this device and filter for validity */
-		fwupd_client_get_upgrades_async (client,
-						 fwupd_device_get_id (dev),
-						 cancellable,
-						 gs_plugin_fwupd_list_updates_got_dev_upgrades_cb,
-						 g_steal_pointer (&dev_data));
+static void
+gs_plugin_fwupd_list_updates_got_remotes_cb (GObject *source_object,
+					     GAsyncResult *result,
+					     gpointer user_data)
+{
+	g_autoptr(GTask) task = g_steal_pointer (&user_data);
+	g_autoptr(GPtrArray) remotes = NULL;
+	g_autoptr(GError) local_error = NULL;
+	FwupdClient *client = FWUPD_CLIENT (source_object);
+	GsPluginFwupd *self = GS_PLUGIN_FWUPD (g_task_get_source_object (task));
+	ListUpdatesData *list_updates_data = g_task_get_task_data (task);
+
+	remotes = fwupd_client_get_remotes_finish (client, result, &local_error);
+	if (remotes == NULL) {
+		g_debug ("Failed to get remotes, re-querying devices: %s", local_error->message);
+		gs_fwupd_device_model_invalidate (self->device_model);
+	} else {
+		gs_plugin_fwupd_set_remotes (self, remotes);
 	}
 
-	gs_plugin_fwupd_list_updates_finish_op (task, NULL, NULL);
+	if (remotes != NULL && gs_fwupd_device_model_is_valid (self->device_model)) {
+		/* any remote whose metadata was modified after the model was
+		 * populated may have added or withdrawn releases */
+		for (guint i = 0; i < remotes->len; i++) {
+			FwupdRemote *remote = g_ptr_array_index (remotes, i);
+			gboolean is_enabled;
+
+			#if FWUPD_CHECK_VERSION(1, 9, 4)
+			is_enabled = fwupd_remote_has_flag (remote, FWUPD_REMOTE_FLAG_ENABLED);
+			#else
+			is_enabled = fwupd_remote_get_enabled (remote);
+			#endif
+
+			if (!is_enabled)
+				continue;
+			if (fwupd_remote_get_kind (remote) != FWUPD_REMOTE_KIND_DOWNLOAD)
+				continue;
+			if (gs_fwupd_device_model_predates (self->device_model, fwupd_remote_get_mtime (remote))) {
+				g_debug ("metadata for remote %s changed, re-querying devices",
+					 fwupd_remote_get_id (remote));
+				gs_fwupd_device_model_invalidate (self->device_model);
+				break;
+			}
+		}
+	}
+
+	if (gs_fwupd_device_model_is_valid (self->device_model)) {
+		gs_plugin_fwupd_list_updates_from_model (task);
+		gs_plugin_fwupd_list_updates_finish_op (task, NULL, NULL);
+		return;
+	}
+
+	g_assert (list_updates_data->n_pending_ops == 1);
+	fwupd_client_get_devices_async (client, g_task_get_cancellable (task),
+					gs_plugin_fwupd_list_updates_got_devices_cb, g_steal_pointer (&task));
 }
 
 static void
@@ -960,8 +1150,16 @@ gs_plugin_fwupd_list_apps_async (GsPlugin *plugin,
 		data->get_historical_updates = (is_historical_update == GS_APP_QUERY_TRISTATE_TRUE);
 		data->list = gs_app_list_new ();
 		g_task_set_task_data (task, g_steal_pointer (&data), (GDestroyNotify) list_updates_data_free);
-		fwupd_client_get_devices_async (self->client, cancellable,
-						gs_plugin_fwupd_list_updates_got_devices_cb, g_steal_pointer (&task));
+
+		/* pending updates come from the device model, which only needs
+		 * rebuilding if remote metadata changed since it was built */
+		if (is_for_update == GS_APP_QUERY_TRISTATE_TRUE &&
+		    gs_fwupd_device_model_is_valid (self->device_model))
+			fwupd_client_get_remotes_async (self->client, cancellable,
+							gs_plugin_fwupd_list_updates_got_remotes_cb, g_steal_pointer (&task));
+		else
+			fwupd_client_get_devices_async (self->client, cancellable,
+							gs_plugin_fwupd_list_updates_got_devices_cb, g_steal_pointer (&task));
 	} else if (gs_component_kind_array_contains (component_kinds, AS_COMPONENT_KIND_REPOSITORY)) {
 		fwupd_client_get_remotes_async (self->client, cancellable,
 						gs_plugin_fwupd_list_sources_got_remotes_cb, g_steal_pointer (&task));
@@ -978,6 +1176,33 @@ gs_plugin_fwupd_list_apps_finish (GsPlugin *plugin,
 	return g_task_propagate_pointer (G_TASK (result), error);
 }
 
+static gchar *
+gs_plugin_fwupd_get_updates_stamp (GsPlugin *plugin)
+{
+	GsPluginFwupd *self = GS_PLUGIN_FWUPD (plugin);
+	guint64 mtime = 0;
+
+	/* the model changes with every device change or re-enumeration; the
+	 * remote metadata may be refreshed by other fwupd clients */
+	if (!gs_fwupd_device_model_is_valid (self->device_model) ||
+	    self->remote_cache_filenames == NULL)
+		return NULL;
+
+	for (guint i = 0; i < self->remote_cache_filenames->len; i++) {
+		const gchar *filename = g_ptr_array_index (self->remote_cache_filenames, i);
+		GStatBuf buf;
+
+		if (g_stat (filename, &buf) != 0)
+			continue;
+
+		mtime = MAX (mtime, (guint64) buf.st_mtim.tv_sec * G_USEC_PER_SEC +
+			     (guint64) buf.st_mtim.tv_nsec / 1000);
+	}
+
+	return g_strdup_printf ("%u:%" G_GUINT64_FORMAT,
+				gs_fwupd_device_model_get_serial (self->device_model), mtime);
+}
+
 static gboolean
 remote_cache_is_expired (FwupdRemote *remote,
                          guint64      cache_age_secs)
@@ -1073,6 +1298,8 @@ get_remotes_cb (GObject      *source_object,
 		return;
 	}
 
+	gs_plugin_fwupd_set_remotes (GS_PLUGIN_FWUPD (g_task_get_source_object (task)), remotes);
+
 	/* Refresh each of the remotes in parallel. Keep the pending operation
 	 * count incremented until all operations have been started, so that
 	 * the overall operation doesn’t complete too early. */
@@ -1118,6 +1345,7 @@ refresh_remote_cb (GObject      *source_object,
 {
 	FwupdClient *client = FWUPD_CLIENT (source_object);
 	g_autoptr(GTask) task = g_steal_pointer (&user_data);
+	GsPluginFwupd *self = GS_PLUGIN_FWUPD (g_task_get_source_object (task));
 	RefreshMetadataData *data = g_task_get_task_data (task);
 	g_autoptr(GError) local_error = NULL;
 
@@ -1127,6 +1355,9 @@ refresh_remote_cb (GObject      *source_object,
 			data->error = g_steal_pointer (&local_error);
 		else
 			g_debug ("Another remote refresh error: %s", local_error->message);
+	} else {
+		/* new metadata may change the available releases of any device */
+		gs_fwupd_device_model_invalidate (self->device_model);
 	}
 
 	finish_refresh_metadata_op (task);
@@ -2313,6 +2544,7 @@ gs_plugin_fwupd_class_init (GsPluginFwupdClass *klass)
 	plugin_class->update_apps_finish = gs_plugin_fwupd_update_apps_finish;
 	plugin_class->list_apps_async = gs_plugin_fwupd_list_apps_async;
 	plugin_class->list_apps_finish = gs_plugin_fwupd_list_apps_finish;
+	plugin_class->get_updates_stamp = gs_plugin_fwupd_get_updates_stamp;
 	plugin_class->file_to_app_async = gs_plugin_fwupd_file_to_app_async;
 	plugin_class->file_to_app_finish = gs_plugin_fwupd_file_to_app_finish;
 }
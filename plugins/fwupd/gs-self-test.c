@@ -12,6 +12,7 @@
 
 #include "gnome-software-private.h"
 
+#include "gs-fwupd-device-model.h"
 #include "gs-test.h"
 
 static void
@@ -73,6 +74,121 @@ gs_plugins_fwupd_func (GsPluginLoader *plugin_loader)
 	g_assert_cmpint (gs_app_get_state (app), ==, GS_APP_STATE_UNKNOWN);
 }
 
+static FwupdDevice *
+device_new (const gchar *id)
+{
+	FwupdDevice *dev = fwupd_device_new ();
+	fwupd_device_set_id (dev, id);
+	return dev;
+}
+
+static void
+gs_plugins_fwupd_device_model_func (void)
+{
+	g_autoptr(GsFwupdDeviceModel) model = gs_fwupd_device_model_new ();
+	g_autoptr(FwupdDevice) dev_a = device_new ("a");
+	g_autoptr(FwupdDevice) dev_b = device_new ("b");
+	g_autoptr(FwupdDevice) dev_a2 = device_new ("a");
+	g_autoptr(GPtrArray) devices = g_ptr_array_new ();
+	g_autoptr(GPtrArray) devices_out = NULL;
+	g_autoptr(GPtrArray) upgrades = g_ptr_array_new_with_free_func (g_object_unref);
+	GPtrArray *upgrades_out = NULL;
+	guint64 now_secs = g_get_real_time () / G_USEC_PER_SEC;
+	guint64 populated_secs;
+	guint serial, serial_a, serial_a2;
+
+	g_ptr_array_add (upgrades, fwupd_release_new ());
+
+	/* devices aren’t tracked until the model is populated */
+	g_assert_false (gs_fwupd_device_model_is_valid (model));
+	serial = gs_fwupd_device_model_get_serial (model);
+	gs_fwupd_device_model_update_device (model, dev_a);
+	g_assert_cmpuint (gs_fwupd_device_model_get_serial (model), ==, serial);
+	devices_out = gs_fwupd_device_model_dup_devices (model);
+	g_assert_cmpuint (devices_out->len, ==, 0);
+	g_clear_pointer (&devices_out, g_ptr_array_unref);
+
+	g_ptr_array_add (devices, dev_a);
+	g_ptr_array_add (devices, dev_b);
+	gs_fwupd_device_model_populate (model, devices);
+	populated_secs = g_get_real_time () / G_USEC_PER_SEC;
+	g_assert_true (gs_fwupd_device_model_is_valid (model));
+	g_assert_cmpuint (gs_fwupd_device_model_get_serial (model), !=, serial);
+	devices_out = gs_fwupd_device_model_dup_devices (model);
+	g_assert_cmpuint (devices_out->len, ==, 2);
+	g_clear_pointer (&devices_out, g_ptr_array_unref);
+
+	/* upgrades are unknown until they’re set */
+	g_assert_false (gs_fwupd_device_model_lookup_upgrades (model, "a", NULL, &serial_a));
+	g_assert_cmpuint (serial_a, !=, 0);
+	gs_fwupd_device_model_set_upgrades (model, "a", serial_a, upgrades);
+	gs_fwupd_device_model_set_upgrades (model, "b", 0, NULL);
+	g_assert_true (gs_fwupd_device_model_lookup_upgrades (model, "a", &upgrades_out, NULL));
+	g_assert_true (upgrades_out == upgrades);
+	g_assert_false (gs_fwupd_device_model_lookup_upgrades (model, "b", NULL, NULL));
+
+	/* a device with no upgrades is known too */
+	g_assert_false (gs_fwupd_device_model_lookup_upgrades (model, "b", NULL, &serial));
+	gs_fwupd_device_model_set_upgrades (model, "b", serial, NULL);
+	g_assert_true (gs_fwupd_device_model_lookup_upgrades (model, "b", &upgrades_out, NULL));
+	g_assert_null (upgrades_out);
+
+	/* a changed device needs querying again, and upgrades queried for
+	 * the old version of it are dropped */
+	serial = gs_fwupd_device_model_get_serial (model);
+	gs_fwupd_device_model_update_device (model, dev_a2);
+	g_assert_cmpuint (gs_fwupd_device_model_get_serial (model), !=, serial);
+	g_assert_false (gs_fwupd_device_model_lookup_upgrades (model, "a", NULL, &serial_a2));
+	g_assert_cmpuint (serial_a2, !=, serial_a);
+	gs_fwupd_device_model_set_upgrades (model, "a", serial_a, upgrades);
+	g_assert_false (gs_fwupd_device_model_lookup_upgrades (model, "a", NULL, NULL));
+	gs_fwupd_device_model_set_upgrades (model, "a", serial_a2, upgrades);
+	g_assert_true (gs_fwupd_device_model_lookup_upgrades (model, "a", NULL, NULL));
+
+	/* removing a device changes the serial */
+	serial = gs_fwupd_device_model_get_serial (model);
+	gs_fwupd_device_model_remove_device (model, "b");
+	g_assert_cmpuint (gs_fwupd_device_model_get_serial (model), !=, serial);
+	devices_out = gs_fwupd_device_model_dup_devices (model);
+	g_assert_cmpuint (devices_out->len, ==, 1);
+	g_assert_true (g_ptr_array_index (devices_out, 0) == dev_a2);
+	g_clear_pointer (&devices_out, g_ptr_array_unref);
+
+	/* remote metadata modified in the same second as the model was
+	 * populated, or later, may not be reflected in it */
+	g_assert_false (gs_fwupd_device_model_predates (model, 0));
+	g_assert_false (gs_fwupd_device_model_predates (model, now_secs - 60));
+	g_assert_true (gs_fwupd_device_model_predates (model, populated_secs));
+	g_assert_true (gs_fwupd_device_model_predates (model, populated_secs + 60));
+
+	/* invalidation drops everything */
+	serial = gs_fwupd_device_model_get_serial (model);
+	gs_fwupd_device_model_invalidate (model);
+	g_assert_false (gs_fwupd_device_model_is_valid (model));
+	g_assert_cmpuint (gs_fwupd_device_model_get_serial (model), !=, serial);
+	g_assert_false (gs_fwupd_device_model_lookup_upgrades (model, "a", NULL, &serial));
+	g_assert_cmpuint (serial, ==, 0);
+	devices_out = gs_fwupd_device_model_dup_devices (model);
+	g_assert_cmpuint (devices_out->len, ==, 0);
+}
+
+/* fwupd has a deferred setup, so wait for it to finish before running tests */
+static gboolean
+fwupd_setup_is_running (GsPluginLoader *plugin_loader)
+{
+	g_autoptr(GVariant) timeline = g_variant_ref_sink (gs_plugin_loader_get_startup_timeline (plugin_loader));
+	GVariantIter iter;
+	const gchar *name, *status;
+
+	g_variant_iter_init (&iter, timeline);
+	while (g_variant_iter_next (&iter, "(&s&s&sxx)", NULL, &name, &status, NULL, NULL)) {
+		if (g_str_equal (name, "fwupd") && g_str_equal (status, "running"))
+			return TRUE;
+	}
+
+	return FALSE;
+}
+
 int
 main (int argc, char **argv)
 {
@@ -102,7 +218,11 @@ main (int argc, char **argv)
 	g_assert_no_error (error);
 	g_assert_true (ret);
 
+	while (fwupd_setup_is_running (plugin_loader))
+		g_main_context_iteration (NULL, TRUE);
+
 	/* plugin tests go here */
+	g_test_add_func ("/gnome-software/plugins/fwupd/device-model", gs_plugins_fwupd_device_model_func);
 	g_test_add_data_func ("/gnome-software/plugins/fwupd",
 			      plugin_loader,
 			      (GTestDataFunc) gs_plugins_fwupd_func);
@@ -9,6 +9,7 @@
 #include <config.h>
 
 #include <fnmatch.h>
+#include <string.h>
 #include <gudev/gudev.h>
 
 #include <gnome-software.h>
@@ -32,6 +33,7 @@ struct _GsPluginModalias {
 
 	GUdevClient		*client;
 	GPtrArray		*devices;
+	GHashTable		*matches;  /* (owned) (element-type utf8 gboolean), modalias glob ~> whether it matches any device */
 };
 
 G_DEFINE_TYPE (GsPluginModalias, gs_plugin_modalias, GS_TYPE_PLUGIN)
@@ -50,6 +52,7 @@ gs_plugin_modalias_uevent_cb (GUdevClient *client,
 			 g_udev_device_get_sysfs_path (device),
 			 action);
 		g_ptr_array_set_size (self->devices, 0);
+		g_hash_table_remove_all (self->matches);
 	}
 }
 
@@ -62,6 +65,7 @@ gs_plugin_modalias_init (GsPluginModalias *self)
 	gs_plugin_add_rule (plugin, GS_PLUGIN_RULE_RUN_BEFORE, "icons");
 
 	self->devices = g_ptr_array_new_with_free_func ((GDestroyNotify) g_object_unref);
+	self->matches = g_hash_table_new_full (g_str_hash, g_str_equal, g_free, NULL);
 	self->client = g_udev_client_new (NULL);
 	g_signal_connect (self->client, "uevent",
 			  G_CALLBACK (gs_plugin_modalias_uevent_cb), self);
@@ -74,6 +78,7 @@ gs_plugin_modalias_dispose (GObject *object)
 
 	g_clear_object (&self->client);
 	g_clear_pointer (&self->devices, g_ptr_array_unref);
+	g_clear_pointer (&self->matches, g_hash_table_unref);
 
 	G_OBJECT_CLASS (gs_plugin_modalias_parent_class)->dispose (object);
 }
@@ -104,6 +109,17 @@ static gboolean
 gs_plugin_modalias_matches (GsPluginModalias *self,
                             const gchar      *modalias)
 {
+	gpointer matched;
+	gsize prefix_len;
+
+	/* many drivers provide the same modaliases, and the devices only
+	 * change on a uevent, so remember the result for each glob */
+	if (g_hash_table_lookup_extended (self->matches, modalias, NULL, &matched))
+		return GPOINTER_TO_INT (matched);
+
+	/* the part before any wildcard has to match exactly */
+	prefix_len = strcspn (modalias, "*?[\\");
+
 	gs_plugin_modalias_ensure_devices (self);
 	for (guint i = 0; i < self->devices->len; i++) {
 		GUdevDevice *device = g_ptr_array_index (self->devices, i);
@@ -113,11 +129,16 @@ gs_plugin_modalias_matches (GsPluginModalias *self,
 		modalias_tmp = g_udev_device_get_sysfs_attr (device, "modalias");
 		if (modalias_tmp == NULL)
 			continue;
+		if (strncmp (modalias, modalias_tmp, prefix_len) != 0)
+			continue;
 		if (fnmatch (modalias, modalias_tmp, 0) == 0) {
 			g_debug ("matched %s against %s", modalias_tmp, modalias);
+			g_hash_table_insert (self->matches, g_strdup (modalias), GINT_TO_POINTER (TRUE));
 			return TRUE;
 		}
 	}
+
+	g_hash_table_insert (self->matches, g_strdup (modalias), GINT_TO_POINTER (FALSE));
 	return FALSE;
 }
 
@@ -33,6 +33,10 @@
  * been run against any conformance tests. The parsing is single pass, with
  * a simple enumerated interpretor mode and a single line back-memory.
  *
+ * Lines are scanned in place and each block is formatted straight into the
+ * output buffer, so the cost is linear in the size of the input. Parsing
+ * stops at the first block boundary after the line or length limit.
+ *
  ******************************************************************************/
 
 typedef enum {
@@ -84,12 +88,15 @@ struct _GsMarkdown {
 	GsMarkdownOutputKind	 output;
 	gint			 max_lines;
 	gint			 line_count;
+	gsize			 max_length;
 	gboolean		 smart_quoting;
 	gboolean		 escape;
 	gboolean		 autocode;
 	gboolean		 autolinkify;
 	GString			*pending;
 	GString			*processed;
+	GString			*section;
+	GString			*section_tmp;
 };
 
 G_DEFINE_TYPE (GsMarkdown, gs_markdown, G_TYPE_OBJECT)
@@ -104,22 +111,13 @@ G_DEFINE_TYPE (GsMarkdown, gs_markdown, G_TYPE_OBJECT)
 static gboolean
 gs_markdown_to_text_line_is_rule (const gchar *line)
 {
-	guint i;
-	guint len;
 	guint count = 0;
-	g_autofree gchar *copy = NULL;
-
-	len = (guint) strlen (line);
-	if (len == 0)
-		return FALSE;
 
-	/* replace non-rule chars with ~ */
-	copy = g_strdup (line);
-	g_strcanon (copy, "-*_ ", '~');
-	for (i = 0; i < len; i++) {
-		if (copy[i] == '~')
+	/* only rule chars are allowed */
+	for (const gchar *p = line; *p != '\0'; p++) {
+		if (*p != '-' && *p != '*' && *p != '_' && *p != ' ')
 			return FALSE;
-		if (copy[i] != ' ')
+		if (*p != ' ')
 			count++;
 	}
 
@@ -253,200 +251,243 @@ gs_markdown_to_text_line_is_blank (const gchar *line)
 	return TRUE;
 }
 
-static gchar *
-gs_markdown_replace (const gchar *haystack,
+static void
+gs_markdown_replace (GString *out,
+		     const gchar *haystack,
 		     const gchar *needle,
 		     const gchar *replace)
 {
-	g_auto(GStrv) split = NULL;
-	split = g_strsplit (haystack, needle, -1);
-	return g_strjoinv (replace, split);
+	const gchar *found;
+	gsize len = strlen (needle);
+
+	while ((found = strstr (haystack, needle)) != NULL) {
+		g_string_append_len (out, haystack, found - haystack);
+		g_string_append (out, replace);
+		haystack = found + len;
+	}
+	g_string_append (out, haystack);
 }
 
-static gchar *
-gs_markdown_strstr_spaces (const gchar *haystack, const gchar *needle)
+/*
+ * gs_markdown_strstr_spaces:
+ * @haystack: the string to search, starting at its first character
+ * @needle: the formatter to find
+ * @prev: the character logically before @haystack
+ * @is_start: whether a match at @haystack is always valid
+ *
+ * Finds @needle in @haystack, ignoring matches surrounded by spaces.
+ **/
+static const gchar *
+gs_markdown_strstr_spaces (const gchar *haystack,
+			   const gchar *needle,
+			   gchar prev,
+			   gboolean is_start)
 {
-	gchar *found;
-	const gchar *haystack_new = haystack;
-
-retry:
-	/* don't find if surrounded by spaces */
-	found = strstr (haystack_new, needle);
-	if (found == NULL)
-		return NULL;
-
-	/* start of the string, always valid */
-	if (found == haystack)
-		return found;
-
-	/* end of the string, always valid */
-	if (*(found-1) == ' ' && *(found+1) == ' ') {
-		haystack_new = found+1;
-		goto retry;
+	const gchar *found;
+
+	for (found = strstr (haystack, needle);
+	     found != NULL;
+	     found = strstr (found + 1, needle)) {
+		/* start of the string, always valid */
+		if (found == haystack && is_start)
+			return found;
+
+		/* don't find if surrounded by spaces */
+		if (found != haystack)
+			prev = *(found - 1);
+		if (prev != ' ' || *(found + 1) != ' ')
+			return found;
 	}
-	return found;
+	return NULL;
 }
 
-static gchar *
-gs_markdown_to_text_line_formatter (const gchar *line,
+/*
+ * gs_markdown_to_text_line_formatter:
+ *
+ * Replaces each pair of @formatter in @line with @left and @right, appending
+ * the result to the empty @out. The search continues after each replaced
+ * pair, which gives the same result as rescanning the whole line as the
+ * unmatched text before a pair cannot contain another valid formatter.
+ **/
+static void
+gs_markdown_to_text_line_formatter (GString *out,
+				    const gchar *line,
 				    const gchar *formatter,
 				    const gchar *left,
 				    const gchar *right)
 {
-	guint len;
-	gchar *str1;
-	gchar *str2;
-	gchar *start = NULL;
-	gchar *middle = NULL;
-	gchar *end = NULL;
-	g_autofree gchar *copy = NULL;
+	gsize len = strlen (formatter);
+	const gchar *str1;
+	const gchar *str2;
+
+	while (TRUE) {
+		/* find sections */
+		str1 = gs_markdown_strstr_spaces (line, formatter,
+						  out->len > 0 ? out->str[out->len - 1] : '\0',
+						  out->len == 0);
+		if (str1 == NULL)
+			break;
+		str2 = gs_markdown_strstr_spaces (str1 + len, formatter, '\0', TRUE);
+		if (str2 == NULL)
+			break;
 
-	/* needed to know for shifts */
-	len = (guint) strlen (formatter);
-	if (len == 0)
-		return NULL;
-
-	/* find sections */
-	copy = g_strdup (line);
-	str1 = gs_markdown_strstr_spaces (copy, formatter);
-	if (str1 != NULL) {
-		*str1 = '\0';
-		str2 = gs_markdown_strstr_spaces (str1+len, formatter);
-		if (str2 != NULL) {
-			*str2 = '\0';
-			middle = str1 + len;
-			start = copy;
-			end = str2 + len;
-		}
+		/* replace and keep looking for the same string */
+		g_string_append_len (out, line, str1 - line);
+		g_string_append (out, left);
+		g_string_append_len (out, str1 + len, str2 - str1 - len);
+		g_string_append (out, right);
+		line = str2 + len;
 	}
 
-	/* if we found, replace and keep looking for the same string */
-	if (start != NULL && middle != NULL && end != NULL) {
-		g_autofree gchar *temp = NULL;
-		temp = g_strdup_printf ("%s%s%s%s%s", start, left, middle, right, end);
-		/* recursive */
-		return gs_markdown_to_text_line_formatter (temp, formatter, left, right);
-	}
+	/* not found, keep the rest as-is */
+	g_string_append (out, line);
+}
+
+static void
+gs_markdown_swap_section (GsMarkdown *self)
+{
+	GString *tmp;
 
-	/* not found, keep return as-is */
-	return g_strdup (line);
+	/* the result of the last pass becomes the input of the next one */
+	tmp = self->section;
+	self->section = self->section_tmp;
+	self->section_tmp = tmp;
+	g_string_truncate (self->section_tmp, 0);
 }
 
-static gchar *
-gs_markdown_to_text_line_format_sections (GsMarkdown *self, const gchar *line)
+static void
+gs_markdown_to_text_line_format_pass (GsMarkdown *self,
+				      const gchar *formatter,
+				      const gchar *left,
+				      const gchar *right)
 {
-	gchar *data = g_strdup (line);
-	gchar *temp;
+	gs_markdown_to_text_line_formatter (self->section_tmp, self->section->str,
+					    formatter, left, right);
+	gs_markdown_swap_section (self);
+}
+
+static void
+gs_markdown_to_text_line_format_sections (GsMarkdown *self,
+					  GString *out,
+					  const gchar *line,
+					  gsize len)
+{
+	g_string_truncate (self->section, 0);
+	g_string_truncate (self->section_tmp, 0);
+	g_string_append_len (self->section, line, len);
 
 	/* bold1 */
-	temp = data;
-	data = gs_markdown_to_text_line_formatter (temp, "**",
-						   self->tags.strong_start,
-						   self->tags.strong_end);
-	g_free (temp);
+	gs_markdown_to_text_line_format_pass (self, "**",
+					      self->tags.strong_start,
+					      self->tags.strong_end);
 
 	/* bold2 */
-	temp = data;
-	data = gs_markdown_to_text_line_formatter (temp, "__",
-						   self->tags.strong_start,
-						   self->tags.strong_end);
-	g_free (temp);
+	gs_markdown_to_text_line_format_pass (self, "__",
+					      self->tags.strong_start,
+					      self->tags.strong_end);
 
 	/* italic1 */
-	temp = data;
-	data = gs_markdown_to_text_line_formatter (temp, "*",
-						   self->tags.em_start,
-						   self->tags.em_end);
-	g_free (temp);
+	gs_markdown_to_text_line_format_pass (self, "*",
+					      self->tags.em_start,
+					      self->tags.em_end);
 
 	/* italic2 */
-	temp = data;
-	data = gs_markdown_to_text_line_formatter (temp, "_",
-						   self->tags.em_start,
-						   self->tags.em_end);
-	g_free (temp);
+	gs_markdown_to_text_line_format_pass (self, "_",
+					      self->tags.em_start,
+					      self->tags.em_end);
 
 	/* em-dash */
-	temp = data;
-	data = gs_markdown_replace (temp, " -- ", " — ");
-	g_free (temp);
+	gs_markdown_replace (self->section_tmp, self->section->str, " -- ", " — ");
+	gs_markdown_swap_section (self);
 
 	/* smart quoting */
 	if (self->smart_quoting) {
-		temp = data;
-		data = gs_markdown_to_text_line_formatter (temp, "\"", "“", "”");
-		g_free (temp);
-
-		temp = data;
-		data = gs_markdown_to_text_line_formatter (temp, "'", "‘", "’");
-		g_free (temp);
+		gs_markdown_to_text_line_format_pass (self, "\"", "“", "”");
+		gs_markdown_to_text_line_format_pass (self, "'", "‘", "’");
 	}
 
-	return data;
+	g_string_append_len (out, self->section->str, self->section->len);
 }
 
-static gchar *
-gs_markdown_to_text_line_format (GsMarkdown *self, const gchar *line)
+static void
+gs_markdown_to_text_line_format (GsMarkdown *self, GString *out, const gchar *line)
 {
-	GString *string;
 	gboolean mode = FALSE;
-	gchar *text;
-	guint i;
-	g_auto(GStrv) codes = NULL;
-
-	/* optimise the trivial case where we don't have any code tags */
-	text = strstr (line, "`");
-	if (text == NULL)
-		return gs_markdown_to_text_line_format_sections (self, line);
+	const gchar *code;
 
 	/* we want to parse the code sections without formatting */
-	codes = g_strsplit (line, "`", -1);
-	string = g_string_new ("");
-	for (i = 0; codes[i] != NULL; i++) {
+	while (TRUE) {
+		code = strchr (line, '`');
 		if (!mode) {
-			text = gs_markdown_to_text_line_format_sections (self, codes[i]);
-			g_string_append (string, text);
-			g_free (text);
+			gs_markdown_to_text_line_format_sections (self, out, line,
+								  code != NULL ? (gsize) (code - line) : strlen (line));
 			mode = TRUE;
 		} else {
 			/* just append without formatting */
-			g_string_append (string, self->tags.code_start);
-			g_string_append (string, codes[i]);
-			g_string_append (string, self->tags.code_end);
+			g_string_append (out, self->tags.code_start);
+			if (code != NULL)
+				g_string_append_len (out, line, code - line);
+			else
+				g_string_append (out, line);
+			g_string_append (out, self->tags.code_end);
 			mode = FALSE;
 		}
+		if (code == NULL)
+			break;
+		line = code + 1;
 	}
-	return g_string_free (string, FALSE);
 }
 
 static gboolean
-gs_markdown_add_pending (GsMarkdown *self, const gchar *line)
+gs_markdown_is_strip_char (gchar c, gboolean is_header)
 {
-	g_autofree gchar *copy = NULL;
+	return g_ascii_isspace (c) || (is_header && c == '#');
+}
+
+static gboolean
+gs_markdown_add_pending_full (GsMarkdown *self, const gchar *line, gboolean is_header)
+{
+	const gchar *end;
+	gsize offset;
 
 	/* would put us over the limit */
 	if (self->max_lines > 0 && self->line_count >= self->max_lines)
 		return FALSE;
+	if (self->max_length > 0 &&
+	    self->processed->len + self->pending->len >= self->max_length)
+		return FALSE;
 
-	copy = g_strdup (line);
-
-	/* strip leading and trailing spaces */
-	g_strstrip (copy);
+	/* strip leading and trailing spaces, and any # around headers */
+	while (gs_markdown_is_strip_char (*line, is_header))
+		line++;
+	end = line + strlen (line);
+	while (end > line && gs_markdown_is_strip_char (*(end - 1), is_header))
+		end--;
 
 	/* append */
-	g_string_append_printf (self->pending, "%s ", copy);
+	offset = self->pending->len;
+	g_string_append_len (self->pending, line, end - line);
+	if (is_header) {
+		for (gsize i = offset; i < self->pending->len; i++) {
+			if (self->pending->str[i] == '#')
+				self->pending->str[i] = ' ';
+		}
+	}
+	g_string_append_c (self->pending, ' ');
 	return TRUE;
 }
 
 static gboolean
-gs_markdown_add_pending_header (GsMarkdown *self, const gchar *line)
+gs_markdown_add_pending (GsMarkdown *self, const gchar *line)
 {
-	g_autofree gchar *copy = NULL;
+	return gs_markdown_add_pending_full (self, line, FALSE);
+}
 
+static gboolean
+gs_markdown_add_pending_header (GsMarkdown *self, const gchar *line)
+{
 	/* strip trailing # */
-	copy = g_strdup (line);
-	g_strdelimit (copy, "#", ' ');
-	return gs_markdown_add_pending (self, copy);
+	return gs_markdown_add_pending_full (self, line, TRUE);
 }
 
 static guint
@@ -624,14 +665,16 @@ static void
 gs_markdown_flush_pending (GsMarkdown *self)
 {
 	g_autofree gchar *copy = NULL;
-	g_autofree gchar *temp = NULL;
+	gchar *temp;
+	const gchar *tag_start = NULL;
+	const gchar *tag_end = NULL;
 
 	/* no data yet */
 	if (self->mode == GS_MARKDOWN_MODE_UNKNOWN)
 		return;
 
 	/* remove trailing spaces */
-	while (g_str_has_suffix (self->pending->str, " "))
+	while (self->pending->len > 0 && self->pending->str[self->pending->len - 1] == ' ')
 		g_string_set_size (self->pending, self->pending->len - 1);
 
 	/* pango requires escaping */
@@ -676,48 +719,53 @@ gs_markdown_flush_pending (GsMarkdown *self)
 		copy = temp;
 	}
 
-	/* do formatting */
-	temp = gs_markdown_to_text_line_format (self, copy);
-	if (self->mode == GS_MARKDOWN_MODE_BULLETT) {
-		g_string_append_printf (self->processed, "%s%s%s\n",
-					self->tags.bullet_start,
-					temp,
-					self->tags.bullet_end);
+	/* get the block tags */
+	switch (self->mode) {
+	case GS_MARKDOWN_MODE_BULLETT:
+		tag_start = self->tags.bullet_start;
+		tag_end = self->tags.bullet_end;
 		self->line_count++;
-	} else if (self->mode == GS_MARKDOWN_MODE_H1) {
-		g_string_append_printf (self->processed, "%s%s%s\n",
-					self->tags.h1_start,
-					temp,
-					self->tags.h1_end);
-	} else if (self->mode == GS_MARKDOWN_MODE_H2) {
-		g_string_append_printf (self->processed, "%s%s%s\n",
-					self->tags.h2_start,
-					temp,
-					self->tags.h2_end);
-	} else if (self->mode == GS_MARKDOWN_MODE_H3) {
-		g_string_append_printf (self->processed, "%s%s%s\n",
-					self->tags.h3_start,
-					temp,
-					self->tags.h3_end);
-	} else if (self->mode == GS_MARKDOWN_MODE_H4) {
-		g_string_append_printf (self->processed, "%s%s%s\n",
-					self->tags.h4_start,
-					temp,
-					self->tags.h4_end);
-	} else if (self->mode == GS_MARKDOWN_MODE_H5) {
-		g_string_append_printf (self->processed, "%s%s%s\n",
-					self->tags.h5_start,
-					temp,
-					self->tags.h5_end);
-	} else if (self->mode == GS_MARKDOWN_MODE_H6) {
-		g_string_append_printf (self->processed, "%s%s%s\n",
-					self->tags.h6_start,
-					temp,
-					self->tags.h6_end);
-	} else if (self->mode == GS_MARKDOWN_MODE_PARA ||
-		   self->mode == GS_MARKDOWN_MODE_RULE) {
-		g_string_append_printf (self->processed, "%s\n", temp);
+		break;
+	case GS_MARKDOWN_MODE_H1:
+		tag_start = self->tags.h1_start;
+		tag_end = self->tags.h1_end;
+		break;
+	case GS_MARKDOWN_MODE_H2:
+		tag_start = self->tags.h2_start;
+		tag_end = self->tags.h2_end;
+		break;
+	case GS_MARKDOWN_MODE_H3:
+		tag_start = self->tags.h3_start;
+		tag_end = self->tags.h3_end;
+		break;
+	case GS_MARKDOWN_MODE_H4:
+		tag_start = self->tags.h4_start;
+		tag_end = self->tags.h4_end;
+		break;
+	case GS_MARKDOWN_MODE_H5:
+		tag_start = self->tags.h5_start;
+		tag_end = self->tags.h5_end;
+		break;
+	case GS_MARKDOWN_MODE_H6:
+		tag_start = self->tags.h6_start;
+		tag_end = self->tags.h6_end;
+		break;
+	case GS_MARKDOWN_MODE_PARA:
+	case GS_MARKDOWN_MODE_RULE:
+		tag_start = "";
+		tag_end = "";
 		self->line_count++;
+		break;
+	default:
+		break;
+	}
+
+	/* do formatting straight into the output */
+	if (tag_start != NULL) {
+		g_string_append (self->processed, tag_start);
+		gs_markdown_to_text_line_format (self, self->processed, copy);
+		g_string_append (self->processed, tag_end);
+		g_string_append_c (self->processed, '\n');
 	}
 
 	/* clear */
@@ -838,9 +886,13 @@ gs_markdown_to_text_line_process (GsMarkdown *self, const gchar *line)
 	/* add to pending */
 	ret = gs_markdown_add_pending (self, line);
 out:
-	/* if we failed to add, we don't know the mode */
-	if (!ret)
+	/* if we failed to add, keep what we have of a block cut off by the
+	 * length limit, then we don't know the mode */
+	if (!ret) {
+		if (self->pending->len > 0)
+			gs_markdown_flush_pending (self);
 		self->mode = GS_MARKDOWN_MODE_UNKNOWN;
+	}
 	return ret;
 }
 
@@ -951,6 +1003,24 @@ gs_markdown_set_max_lines (GsMarkdown *self, gint max_lines)
 	self->max_lines = max_lines;
 }
 
+/*
+ * gs_markdown_set_max_length:
+ * @self: a #GsMarkdown
+ * @max_length: maximum length of the output in bytes, or 0 for no limit
+ *
+ * Stops parsing once the output, together with the block still being
+ * collected, has grown to @max_length bytes, so very long input is not
+ * formatted only to be thrown away. A single long block is cut off between
+ * lines too. The output may be longer than @max_length by at most one line
+ * of input, plus the markup added when formatting the last block.
+ **/
+void
+gs_markdown_set_max_length (GsMarkdown *self, gsize max_length)
+{
+	g_return_if_fail (GS_IS_MARKDOWN (self));
+	self->max_length = max_length;
+}
+
 void
 gs_markdown_set_smart_quoting (GsMarkdown *self, gboolean smart_quoting)
 {
@@ -982,11 +1052,10 @@ gs_markdown_set_autolinkify (GsMarkdown *self, gboolean autolinkify)
 gchar *
 gs_markdown_parse (GsMarkdown *self, const gchar *markdown)
 {
-	gboolean ret;
 	gchar *temp;
-	guint i;
-	guint len;
-	g_auto(GStrv) lines = NULL;
+	gchar *line;
+	gchar *next;
+	g_autofree gchar *copy = NULL;
 	const gchar *output;
 
 	g_return_val_if_fail (GS_IS_MARKDOWN (self), NULL);
@@ -996,13 +1065,14 @@ gs_markdown_parse (GsMarkdown *self, const gchar *markdown)
 	self->line_count = 0;
 	g_string_truncate (self->pending, 0);
 	g_string_truncate (self->processed, 0);
-	lines = g_strsplit (markdown, "\n", -1);
-	len = g_strv_length (lines);
 
-	/* process each line */
-	for (i = 0; i < len; i++) {
-		ret = gs_markdown_to_text_line_process (self, lines[i]);
-		if (!ret)
+	/* process each line in place, stopping once over the limit */
+	copy = g_strdup (markdown);
+	for (line = copy; line != NULL; line = next) {
+		next = strchr (line, '\n');
+		if (next != NULL)
+			*next++ = '\0';
+		if (!gs_markdown_to_text_line_process (self, line))
 			break;
 	}
 	gs_markdown_flush_pending (self);
@@ -1034,6 +1104,8 @@ gs_markdown_finalize (GObject *object)
 
 	g_string_free (self->pending, TRUE);
 	g_string_free (self->processed, TRUE);
+	g_string_free (self->section, TRUE);
+	g_string_free (self->section_tmp, TRUE);
 
 	G_OBJECT_CLASS (gs_markdown_parent_class)->finalize (object);
 }
@@ -1051,7 +1123,10 @@ gs_markdown_init (GsMarkdown *self)
 	self->mode = GS_MARKDOWN_MODE_UNKNOWN;
 	self->pending = g_string_new ("");
 	self->processed = g_string_new ("");
+	self->section = g_string_new ("");
+	self->section_tmp = g_string_new ("");
 	self->max_lines = -1;
+	self->max_length = 0;
 	self->smart_quoting = FALSE;
 	self->escape = FALSE;
 	self->autocode = FALSE;
@@ -27,6 +27,8 @@ typedef enum {
 GsMarkdown	*gs_markdown_new			(GsMarkdownOutputKind	 output);
 void		 gs_markdown_set_max_lines		(GsMarkdown		*self,
 							 gint			 max_lines);
+void		 gs_markdown_set_max_length		(GsMarkdown		*self,
+							 gsize			 max_length);
 void		 gs_markdown_set_smart_quoting		(GsMarkdown		*self,
 							 gboolean		 smart_quoting);
 void		 gs_markdown_set_escape			(GsMarkdown		*self,
@@ -0,0 +1,590 @@
+/* -*- Mode: C; tab-width: 8; indent-tabs-mode: t; c-basic-offset: 8 -*-
+ * vi:set noexpandtab tabstop=8 shiftwidth=8:
+ *
+ * Copyright (C) 2026 GNOME Foundation, Inc.
+ *
+ * SPDX-License-Identifier: GPL-2.0-or-later
+ */
+
+/**
+ * SECTION:gs-packagekit-details-cache
+ * @short_description: Persistent cache of PackageKit package details
+ *
+ * #GsPackagekitDetailsCache stores the results of PackageKit `GetDetails` and
+ * `GetUpdateDetail` calls, keyed by package ID, so that refining large lists
+ * of packages doesn’t require a D-Bus round trip for every package each time
+ * gnome-software is started.
+ *
+ * The cache is stored on disk as a single #GVariant. It is tagged with a
+ * stamp derived from the modification times of the package database files
+ * passed to gs_packagekit_details_cache_new(), and is discarded whenever that
+ * stamp changes. It should also be explicitly invalidated with
+ * gs_packagekit_details_cache_invalidate() when PackageKit signals that the
+ * installed packages or available updates have changed.
+ *
+ * Every invalidation increments the cache’s serial. Callers should get the
+ * serial with gs_packagekit_details_cache_get_serial() before querying
+ * PackageKit, and pass it when adding the results, so that results which may
+ * predate an invalidation are dropped rather than cached.
+ *
+ * All methods are thread safe.
+ *
+ * Since: 50
+ */
+
+#include "config.h"
+
+#include <errno.h>
+#include <glib/gstdio.h>
+
+#include "gs-packagekit-details-cache.h"
+
+/* Bump this if the format of the serialised cache changes */
+#define CACHE_FORMAT_VERSION 1
+
+/* (version, stamp, {package ID: (license, description, url, summary, size,
+ * download size, group, with deps size)}, {package ID: update text}) */
+#define CACHE_VARIANT_TYPE "(uta{s(ssssttub)}a{ss})"
+
+typedef struct {
+	gchar *license;  /* (nullable) (owned) */
+	gchar *description;  /* (nullable) (owned) */
+	gchar *url;  /* (nullable) (owned) */
+	gchar *summary;  /* (nullable) (owned) */
+	guint64 size;
+	guint64 download_size;
+	PkGroupEnum group;
+	gboolean with_deps_size;
+} DetailsEntry;
+
+static void
+details_entry_free (DetailsEntry *entry)
+{
+	g_free (entry->license);
+	g_free (entry->description);
+	g_free (entry->url);
+	g_free (entry->summary);
+	g_free (entry);
+}
+
+struct _GsPackagekitDetailsCache
+{
+	GObject			 parent_instance;
+
+	gchar			*filename;  /* (owned) (not nullable) */
+	gchar			**stamp_paths;  /* (owned) (not nullable) */
+
+	GMutex			 mutex;
+	gboolean		 loaded;  /* (locked-by mutex) */
+	gboolean		 dirty;  /* (locked-by mutex) */
+	guint64			 stamp;  /* (locked-by mutex) */
+	guint			 serial;  /* (locked-by mutex); incremented on invalidation */
+	GHashTable		*details;  /* (locked-by mutex) (owned) (element-type utf8 DetailsEntry) */
+	GHashTable		*update_texts;  /* (locked-by mutex) (owned) (element-type utf8 utf8) */
+};
+
+G_DEFINE_TYPE (GsPackagekitDetailsCache, gs_packagekit_details_cache, G_TYPE_OBJECT)
+
+static void
+gs_packagekit_details_cache_finalize (GObject *object)
+{
+	GsPackagekitDetailsCache *self = GS_PACKAGEKIT_DETAILS_CACHE (object);
+
+	g_free (self->filename);
+	g_strfreev (self->stamp_paths);
+	g_clear_pointer (&self->details, g_hash_table_unref);
+	g_clear_pointer (&self->update_texts, g_hash_table_unref);
+	g_mutex_clear (&self->mutex);
+
+	G_OBJECT_CLASS (gs_packagekit_details_cache_parent_class)->finalize (object);
+}
+
+static void
+gs_packagekit_details_cache_class_init (GsPackagekitDetailsCacheClass *klass)
+{
+	GObjectClass *object_class = G_OBJECT_CLASS (klass);
+
+	object_class->finalize = gs_packagekit_details_cache_finalize;
+}
+
+static void
+gs_packagekit_details_cache_init (GsPackagekitDetailsCache *self)
+{
+	g_mutex_init (&self->mutex);
+	self->details = g_hash_table_new_full (g_str_hash, g_str_equal,
+					       g_free, (GDestroyNotify) details_entry_free);
+	self->update_texts = g_hash_table_new_full (g_str_hash, g_str_equal,
+						    g_free, g_free);
+}
+
+/**
+ * gs_packagekit_details_cache_new:
+ * @filename: path to store the cache in
+ * @stamp_paths: (array zero-terminated=1): paths of package database files or
+ *   directories whose modification times invalidate the cache
+ *
+ * Create a new #GsPackagekitDetailsCache. The cache is loaded from @filename
+ * lazily, the first time it’s queried.
+ *
+ * Returns: (transfer full): a new #GsPackagekitDetailsCache
+ * Since: 50
+ */
+GsPackagekitDetailsCache *
+gs_packagekit_details_cache_new (const gchar        *filename,
+                                 const gchar * const *stamp_paths)
+{
+	GsPackagekitDetailsCache *self;
+
+	g_return_val_if_fail (filename != NULL, NULL);
+	g_return_val_if_fail (stamp_paths != NULL, NULL);
+
+	self = g_object_new (GS_TYPE_PACKAGEKIT_DETAILS_CACHE, NULL);
+	self->filename = g_strdup (filename);
+	self->stamp_paths = g_strdupv ((gchar **) stamp_paths);
+
+	return self;
+}
+
+/* Returns the latest modification time of any of the stamp paths, in
+ * microseconds, or 0 if none of them exist. */
+static guint64
+get_current_stamp (GsPackagekitDetailsCache *self)
+{
+	guint64 stamp = 0;
+
+	for (gsize i = 0; self->stamp_paths[i] != NULL; i++) {
+		GStatBuf buf;
+		guint64 mtime_usec;
+
+		if (g_stat (self->stamp_paths[i], &buf) != 0)
+			continue;
+
+		mtime_usec = (guint64) buf.st_mtim.tv_sec * G_USEC_PER_SEC +
+			     (guint64) buf.st_mtim.tv_nsec / 1000;
+		stamp = MAX (stamp, mtime_usec);
+	}
+
+	return stamp;
+}
+
+static gchar *
+dup_nullable_string (const gchar *str)
+{
+	return (str != NULL && *str != '\0') ? g_strdup (str) : NULL;
+}
+
+static void
+clear_locked (GsPackagekitDetailsCache *self)
+{
+	g_hash_table_remove_all (self->details);
+	g_hash_table_remove_all (self->update_texts);
+	self->serial++;
+}
+
+static void
+ensure_loaded_locked (GsPackagekitDetailsCache *self)
+{
+	g_autoptr(GMappedFile) mapped_file = NULL;
+	g_autoptr(GBytes) bytes = NULL;
+	g_autoptr(GVariant) variant = NULL;
+	g_autoptr(GVariantIter) details_iter = NULL;
+	g_autoptr(GVariantIter) update_texts_iter = NULL;
+	g_autoptr(GError) local_error = NULL;
+	guint32 version;
+	guint64 stamp;
+	const gchar *package_id, *license, *description, *url, *summary, *update_text;
+	guint64 size, download_size;
+	guint32 group;
+	gboolean with_deps_size;
+
+	if (self->loaded)
+		return;
+
+	self->loaded = TRUE;
+	self->stamp = get_current_stamp (self);
+
+	mapped_file = g_mapped_file_new (self->filename, FALSE, &local_error);
+	if (mapped_file == NULL) {
+		if (!g_error_matches (local_error, G_FILE_ERROR, G_FILE_ERROR_NOENT))
+			g_debug ("Failed to load PackageKit details cache ‘%s’: %s",
+				 self->filename, local_error->message);
+		return;
+	}
+
+	bytes = g_mapped_file_get_bytes (mapped_file);
+	variant = g_variant_new_from_bytes (G_VARIANT_TYPE (CACHE_VARIANT_TYPE), bytes, FALSE);
+
+	g_variant_get (variant, "(uta{s(ssssttub)}a{ss})",
+		       &version, &stamp, &details_iter, &update_texts_iter);
+	if (version != CACHE_FORMAT_VERSION || stamp != self->stamp) {
+		g_debug ("Ignoring out of date PackageKit details cache ‘%s’", self->filename);
+		self->dirty = TRUE;
+		return;
+	}
+
+	while (g_variant_iter_next (details_iter, "{&s(&s&s&s&sttub)}",
+				    &package_id, &license, &description, &url, &summary,
+				    &size, &download_size, &group, &with_deps_size)) {
+		DetailsEntry *entry = g_new0 (DetailsEntry, 1);
+
+		entry->license = dup_nullable_string (license);
+		entry->description = dup_nullable_string (description);
+		entry->url = dup_nullable_string (url);
+		entry->summary = dup_nullable_string (summary);
+		entry->size = size;
+		entry->download_size = download_size;
+		entry->group = group;
+		entry->with_deps_size = with_deps_size;
+
+		g_hash_table_replace (self->details, g_strdup (package_id), entry);
+	}
+
+	while (g_variant_iter_next (update_texts_iter, "{&s&s}", &package_id, &update_text))
+		g_hash_table_replace (self->update_texts, g_strdup (package_id), g_strdup (update_text));
+
+	g_debug ("Loaded %u package details and %u update details from ‘%s’",
+		 g_hash_table_size (self->details),
+		 g_hash_table_size (self->update_texts),
+		 self->filename);
+}
+
+/**
+ * gs_packagekit_details_cache_check_stamp:
+ * @self: a #GsPackagekitDetailsCache
+ *
+ * Check whether any of the package database files have been modified since
+ * the cache was last populated, and invalidate it if so.
+ *
+ * This is cheap (a few `stat()` calls), so should be called before each batch
+ * of lookups.
+ *
+ * Since: 50
+ */
+void
+gs_packagekit_details_cache_check_stamp (GsPackagekitDetailsCache *self)
+{
+	g_autoptr(GMutexLocker) locker = NULL;
+	guint64 stamp;
+
+	g_return_if_fail (GS_IS_PACKAGEKIT_DETAILS_CACHE (self));
+
+	locker = g_mutex_locker_new (&self->mutex);
+
+	if (!self->loaded) {
+		ensure_loaded_locked (self);
+		return;
+	}
+
+	stamp = get_current_stamp (self);
+	if (stamp != self->stamp) {
+		g_debug ("Package database changed, invalidating PackageKit details cache");
+		clear_locked (self);
+		self->stamp = stamp;
+		self->dirty = TRUE;
+	}
+}
+
+/**
+ * gs_packagekit_details_cache_invalidate:
+ * @self: a #GsPackagekitDetailsCache
+ *
+ * Drop all cached details, for example because a PackageKit transaction has
+ * finished. The on-disk copy of the cache is removed as well.
+ *
+ * Since: 50
+ */
+void
+gs_packagekit_details_cache_invalidate (GsPackagekitDetailsCache *self)
+{
+	g_autoptr(GMutexLocker) locker = NULL;
+
+	g_return_if_fail (GS_IS_PACKAGEKIT_DETAILS_CACHE (self));
+
+	locker = g_mutex_locker_new (&self->mutex);
+
+	clear_locked (self);
+	self->loaded = TRUE;
+	self->dirty = FALSE;
+	self->stamp = get_current_stamp (self);
+
+	if (g_unlink (self->filename) != 0 && errno != ENOENT) {
+		int errsv = errno;
+		g_debug ("Failed to remove PackageKit details cache ‘%s’: %s",
+			 self->filename, g_strerror (errsv));
+	}
+}
+
+/**
+ * gs_packagekit_details_cache_get_serial:
+ * @self: a #GsPackagekitDetailsCache
+ *
+ * Get the current invalidation serial of the cache. This changes whenever the
+ * cache is invalidated, either explicitly or because the package database
+ * changed.
+ *
+ * Returns: the invalidation serial
+ * Since: 50
+ */
+guint
+gs_packagekit_details_cache_get_serial (GsPackagekitDetailsCache *self)
+{
+	g_autoptr(GMutexLocker) locker = NULL;
+
+	g_return_val_if_fail (GS_IS_PACKAGEKIT_DETAILS_CACHE (self), 0);
+
+	locker = g_mutex_locker_new (&self->mutex);
+
+	return self->serial;
+}
+
+/**
+ * gs_packagekit_details_cache_save:
+ * @self: a #GsPackagekitDetailsCache
+ * @error: return location for a #GError, or %NULL
+ *
+ * Write the cache to disk, if it has changed since it was loaded or last
+ * saved.
+ *
+ * Returns: %TRUE on success, %FALSE otherwise
+ * Since: 50
+ */
+gboolean
+gs_packagekit_details_cache_save (GsPackagekitDetailsCache  *self,
+                                  GError                   **error)
+{
+	g_autoptr(GMutexLocker) locker = NULL;
+	g_autoptr(GVariant) variant = NULL;
+	g_autoptr(GBytes) bytes = NULL;
+	g_autofree gchar *dirname = NULL;
+	GVariantBuilder details_builder;
+	GVariantBuilder update_texts_builder;
+	GHashTableIter iter;
+	gpointer key, value;
+
+	g_return_val_if_fail (GS_IS_PACKAGEKIT_DETAILS_CACHE (self), FALSE);
+	g_return_val_if_fail (error == NULL || *error == NULL, FALSE);
+
+	locker = g_mutex_locker_new (&self->mutex);
+
+	if (!self->dirty)
+		return TRUE;
+
+	g_variant_builder_init (&details_builder, G_VARIANT_TYPE ("a{s(ssssttub)}"));
+	g_hash_table_iter_init (&iter, self->details);
+	while (g_hash_table_iter_next (&iter, &key, &value)) {
+		const DetailsEntry *entry = value;
+
+		g_variant_builder_add (&details_builder, "{s(ssssttub)}",
+				       (const gchar *) key,
+				       (entry->license != NULL) ? entry->license : "",
+				       (entry->description != NULL) ? entry->description : "",
+				       (entry->url != NULL) ? entry->url : "",
+				       (entry->summary != NULL) ? entry->summary : "",
+				       entry->size,
+				       entry->download_size,
+				       (guint32) entry->group,
+				       entry->with_deps_size);
+	}
+
+	g_variant_builder_init (&update_texts_builder, G_VARIANT_TYPE ("a{ss}"));
+	g_hash_table_iter_init (&iter, self->update_texts);
+	while (g_hash_table_iter_next (&iter, &key, &value))
+		g_variant_builder_add (&update_texts_builder, "{ss}", (const gchar *) key, (const gchar *) value);
+
+	variant = g_variant_ref_sink (g_variant_new ("(ut@a{s(ssssttub)}@a{ss})",
+						     (guint32) CACHE_FORMAT_VERSION,
+						     self->stamp,
+						     g_variant_builder_end (&details_builder),
+						     g_variant_builder_end (&update_texts_builder)));
+	bytes = g_variant_get_data_as_bytes (variant);
+
+	dirname = g_path_get_dirname (self->filename);
+	if (g_mkdir_with_parents (dirname, 0755) != 0) {
+		int errsv = errno;
+		g_set_error (error, G_FILE_ERROR, g_file_error_from_errno (errsv),
+			     "Failed to create directory ‘%s’: %s", dirname, g_strerror (errsv));
+		return FALSE;
+	}
+
+	if (!g_file_set_contents (self->filename,
+				  g_bytes_get_data (bytes, NULL),
+				  (gssize) g_bytes_get_size (bytes),
+				  error))
+		return FALSE;
+
+	self->dirty = FALSE;
+
+	return TRUE;
+}
+
+/**
+ * gs_packagekit_details_cache_lookup_details:
+ * @self: a #GsPackagekitDetailsCache
+ * @package_id: a PackageKit package ID
+ * @with_deps_size: %TRUE if the sizes in the details must include the sizes of
+ *   the package’s dependencies
+ *
+ * Look up the cached details for @package_id.
+ *
+ * Returns: (transfer full) (nullable): the cached details, or %NULL if they’re
+ *   not cached
+ * Since: 50
+ */
+PkDetails *
+gs_packagekit_details_cache_lookup_details (GsPackagekitDetailsCache *self,
+                                            const gchar              *package_id,
+                                            gboolean                  with_deps_size)
+{
+	g_autoptr(GMutexLocker) locker = NULL;
+	const DetailsEntry *entry;
+
+	g_return_val_if_fail (GS_IS_PACKAGEKIT_DETAILS_CACHE (self), NULL);
+	g_return_val_if_fail (package_id != NULL, NULL);
+
+	locker = g_mutex_locker_new (&self->mutex);
+	ensure_loaded_locked (self);
+
+	entry = g_hash_table_lookup (self->details, package_id);
+	if (entry == NULL || (with_deps_size && !entry->with_deps_size))
+		return NULL;
+
+	return g_object_new (PK_TYPE_DETAILS,
+			     "package-id", package_id,
+			     "license", entry->license,
+			     "description", entry->description,
+			     "url", entry->url,
+			     "summary", entry->summary,
+			     "size", entry->size,
+			     "download-size", entry->download_size,
+			     "group", entry->group,
+			     NULL);
+}
+
+/**
+ * gs_packagekit_details_cache_add_details:
+ * @self: a #GsPackagekitDetailsCache
+ * @details: details returned by PackageKit
+ * @with_deps_size: %TRUE if the sizes in @details include the sizes of the
+ *   package’s dependencies
+ * @serial: the serial returned by gs_packagekit_details_cache_get_serial()
+ *   before @details were queried
+ *
+ * Add @details to the cache, replacing any existing details for the same
+ * package ID.
+ *
+ * If the cache has been invalidated since @serial was returned, @details are
+ * dropped, as they may be out of date.
+ *
+ * Since: 50
+ */
+void
+gs_packagekit_details_cache_add_details (GsPackagekitDetailsCache *self,
+                                         PkDetails                *details,
+                                         gboolean                  with_deps_size,
+                                         guint                     serial)
+{
+	g_autoptr(GMutexLocker) locker = NULL;
+	DetailsEntry *entry;
+
+	g_return_if_fail (GS_IS_PACKAGEKIT_DETAILS_CACHE (self));
+	g_return_if_fail (PK_IS_DETAILS (details));
+
+	if (pk_details_get_package_id (details) == NULL)
+		return;
+
+	entry = g_new0 (DetailsEntry, 1);
+	entry->license = g_strdup (pk_details_get_license (details));
+	entry->description = g_strdup (pk_details_get_description (details));
+	entry->url = g_strdup (pk_details_get_url (details));
+	entry->summary = g_strdup (pk_details_get_summary (details));
+	entry->size = pk_details_get_size (details);
+	entry->download_size = pk_details_get_download_size (details);
+	entry->group = pk_details_get_group (details);
+	entry->with_deps_size = with_deps_size;
+
+	locker = g_mutex_locker_new (&self->mutex);
+	ensure_loaded_locked (self);
+
+	if (serial != self->serial) {
+		details_entry_free (entry);
+		return;
+	}
+
+	g_hash_table_replace (self->details, g_strdup (pk_details_get_package_id (details)), entry);
+	self->dirty = TRUE;
+}
+
+/**
+ * gs_packagekit_details_cache_lookup_update_text:
+ * @self: a #GsPackagekitDetailsCache
+ * @package_id: a PackageKit package ID
+ * @out_update_text: (out) (optional) (transfer full): return location for the
+ *   update text, which may be empty if the update has no description
+ *
+ * Look up the cached update description for @package_id.
+ *
+ * Returns: %TRUE if the update description was cached, %FALSE otherwise
+ * Since: 50
+ */
+gboolean
+gs_packagekit_details_cache_lookup_update_text (GsPackagekitDetailsCache  *self,
+                                                const gchar               *package_id,
+                                                gchar                    **out_update_text)
+{
+	g_autoptr(GMutexLocker) locker = NULL;
+	const gchar *update_text;
+
+	g_return_val_if_fail (GS_IS_PACKAGEKIT_DETAILS_CACHE (self), FALSE);
+	g_return_val_if_fail (package_id != NULL, FALSE);
+
+	locker = g_mutex_locker_new (&self->mutex);
+	ensure_loaded_locked (self);
+
+	update_text = g_hash_table_lookup (self->update_texts, package_id);
+	if (update_text == NULL)
+		return FALSE;
+
+	if (out_update_text != NULL)
+		*out_update_text = g_strdup (update_text);
+
+	return TRUE;
+}
+
+/**
+ * gs_packagekit_details_cache_add_update_text:
+ * @self: a #GsPackagekitDetailsCache
+ * @package_id: a PackageKit package ID
+ * @update_text: (nullable): the update description returned by PackageKit
+ * @serial: the serial returned by gs_packagekit_details_cache_get_serial()
+ *   before @update_text was queried
+ *
+ * Add the update description for @package_id to the cache. A %NULL or empty
+ * @update_text is cached too, so that updates without a description aren’t
+ * queried repeatedly.
+ *
+ * If the cache has been invalidated since @serial was returned, @update_text
+ * is dropped, as it may be out of date.
+ *
+ * Since: 50
+ */
+void
+gs_packagekit_details_cache_add_update_text (GsPackagekitDetailsCache *self,
+                                             const gchar              *package_id,
+                                             const gchar              *update_text,
+                                             guint                     serial)
+{
+	g_autoptr(GMutexLocker) locker = NULL;
+
+	g_return_if_fail (GS_IS_PACKAGEKIT_DETAILS_CACHE (self));
+	g_return_if_fail (package_id != NULL);
+
+	locker = g_mutex_locker_new (&self->mutex);
+	ensure_loaded_locked (self);
+
+	if (serial != self->serial)
+		return;
+
+	g_hash_table_replace (self->update_texts, g_strdup (package_id),
+			      g_strdup ((update_text != NULL) ? update_text : ""));
+	self->dirty = TRUE;
+}
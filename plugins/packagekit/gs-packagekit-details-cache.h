@@ -0,0 +1,45 @@
+/* -*- Mode: C; tab-width: 8; indent-tabs-mode: t; c-basic-offset: 8 -*-
+ * vi:set noexpandtab tabstop=8 shiftwidth=8:
+ *
+ * Copyright (C) 2026 GNOME Foundation, Inc.
+ *
+ * SPDX-License-Identifier: GPL-2.0-or-later
+ */
+
+#pragma once
+
+#include <glib-object.h>
+#include <packagekit-glib2/packagekit.h>
+
+G_BEGIN_DECLS
+
+#define GS_TYPE_PACKAGEKIT_DETAILS_CACHE (gs_packagekit_details_cache_get_type ())
+
+G_DECLARE_FINAL_TYPE (GsPackagekitDetailsCache, gs_packagekit_details_cache, GS, PACKAGEKIT_DETAILS_CACHE, GObject)
+
+GsPackagekitDetailsCache *gs_packagekit_details_cache_new	(const gchar			 *filename,
+								 const gchar * const		 *stamp_paths);
+
+void		 gs_packagekit_details_cache_check_stamp	(GsPackagekitDetailsCache	 *self);
+void		 gs_packagekit_details_cache_invalidate		(GsPackagekitDetailsCache	 *self);
+guint		 gs_packagekit_details_cache_get_serial		(GsPackagekitDetailsCache	 *self);
+gboolean	 gs_packagekit_details_cache_save		(GsPackagekitDetailsCache	 *self,
+								 GError				**error);
+
+PkDetails	*gs_packagekit_details_cache_lookup_details	(GsPackagekitDetailsCache	 *self,
+								 const gchar			 *package_id,
+								 gboolean			  with_deps_size);
+void		 gs_packagekit_details_cache_add_details	(GsPackagekitDetailsCache	 *self,
+								 PkDetails			 *details,
+								 gboolean			  with_deps_size,
+								 guint				  serial);
+
+gboolean	 gs_packagekit_details_cache_lookup_update_text	(GsPackagekitDetailsCache	 *self,
+								 const gchar			 *package_id,
+								 gchar				**out_update_text);
+void		 gs_packagekit_details_cache_add_update_text	(GsPackagekitDetailsCache	 *self,
+								 const gchar			 *package_id,
+								 const gchar			 *update_text,
+								 guint				  serial);
+
+G_END_DECLS
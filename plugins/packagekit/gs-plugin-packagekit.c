@@ -13,6 +13,7 @@
 #include <config.h>
 
 #include <glib/gi18n-lib.h>
+#include <glib/gstdio.h>
 #include <gdesktop-enums.h>
 #include <gnome-software.h>
 #include <packagekit-glib2/packagekit.h>
@@ -20,6 +21,7 @@
 
 #include "packagekit-common.h"
 #include "gs-markdown.h"
+#include "gs-packagekit-details-cache.h"
 #include "gs-packagekit-helper.h"
 #include "gs-packagekit-task.h"
 #include "gs-plugin-private.h"
@@ -39,6 +41,10 @@
  *
  * Also supports converting repo filenames to package-ids.
  *
+ * Package details and update details are cached on disk between runs (see
+ * #GsPackagekitDetailsCache), so only packages which have not been seen since
+ * the last PackageKit transaction need to be queried when refining.
+ *
  * Also supports marking previously downloaded packages as zero size, and allows
  * scheduling an offline update. An offline update is when packages are
  * downloaded in advance, but are then deployed on reboot, when the system is in
@@ -67,6 +73,28 @@
 /* Timeout to trigger auto-prepare update after the prepared update had been invalidated */
 #define PREPARE_UPDATE_TIMEOUT_SECS 30
 
+/* Delay before writing newly cached package details to disk, so that the
+ * results of several refines are written together */
+#define DETAILS_CACHE_SAVE_TIMEOUT_SECS 5
+
+/* Package databases whose modification invalidates the details cache */
+static const gchar * const details_cache_stamp_paths[] = {
+	"/usr/lib/sysimage/rpm/rpmdb.sqlite",
+	"/var/lib/rpm/rpmdb.sqlite",
+	"/var/lib/rpm/Packages",
+	"/var/lib/dpkg/status",
+	"/var/lib/apt/lists",
+	NULL
+};
+
+/* Files written by PackageKit transactions, including cache refreshes, whose
+ * modification may change the list of available updates */
+static const gchar * const updates_stamp_paths[] = {
+	"/var/lib/PackageKit/transactions.db",
+	"/var/lib/PackageKit/prepared-update",
+	NULL
+};
+
 struct _GsPluginPackagekit {
 	GsPlugin		 parent;
 
@@ -90,6 +118,9 @@ struct _GsPluginPackagekit {
 	GCancellable		*proxy_settings_cancellable;  /* (nullable) (owned) */
 
 	GHashTable		*cached_sources; /* (nullable) (owned) (element-type utf8 GsApp); sources by id, each value is weak reffed */
+
+	GsPackagekitDetailsCache *details_cache;  /* (owned) (not nullable) */
+	guint			 details_cache_save_id;
 };
 
 G_DEFINE_TYPE (GsPluginPackagekit, gs_plugin_packagekit, GS_TYPE_PLUGIN)
@@ -166,6 +197,7 @@ static void
 gs_plugin_packagekit_init (GsPluginPackagekit *self)
 {
 	GsPlugin *plugin = GS_PLUGIN (self);
+	g_autofree gchar *details_cache_filename = NULL;
 
 	/* refine */
 	self->control_refine = pk_control_new ();
@@ -202,6 +234,15 @@ gs_plugin_packagekit_init (GsPluginPackagekit *self)
 	self->prepared_updates = g_hash_table_new_full (g_str_hash, g_str_equal,
 							g_free, NULL);
 
+	/* package details persisted between runs */
+	details_cache_filename = g_build_filename (g_get_user_cache_dir (),
+						   "gnome-software",
+						   "packagekit",
+						   "details.gvariant",
+						   NULL);
+	self->details_cache = gs_packagekit_details_cache_new (details_cache_filename,
+							       details_cache_stamp_paths);
+
 	/* need pkgname and ID */
 	gs_plugin_add_rule (plugin, GS_PLUGIN_RULE_RUN_AFTER, "appstream");
 
@@ -225,6 +266,9 @@ gs_plugin_packagekit_dispose (GObject *object)
 		self->prepare_update_timeout_id = 0;
 	}
 
+	g_clear_handle_id (&self->details_cache_save_id, g_source_remove);
+	g_clear_object (&self->details_cache);
+
 	g_cancellable_cancel (self->proxy_settings_cancellable);
 	g_clear_object (&self->proxy_settings_cancellable);
 
@@ -1725,6 +1769,33 @@ gs_plugin_packagekit_list_apps_finish (GsPlugin      *plugin,
 	return g_task_propagate_pointer (G_TASK (result), error);
 }
 
+static gchar *
+gs_plugin_packagekit_get_updates_stamp (GsPlugin *plugin)
+{
+	const gchar * const *path_lists[] = { details_cache_stamp_paths, updates_stamp_paths };
+	guint64 stamp = 0;
+	gboolean found = FALSE;
+
+	for (gsize i = 0; i < G_N_ELEMENTS (path_lists); i++) {
+		for (gsize j = 0; path_lists[i][j] != NULL; j++) {
+			GStatBuf buf;
+
+			if (g_stat (path_lists[i][j], &buf) != 0)
+				continue;
+
+			found = TRUE;
+			stamp = MAX (stamp, (guint64) buf.st_mtim.tv_sec * G_USEC_PER_SEC +
+				     (guint64) buf.st_mtim.tv_nsec / 1000);
+		}
+	}
+
+	/* nothing to go on, so always do a full check */
+	if (!found)
+		return NULL;
+
+	return g_strdup_printf ("%" G_GUINT64_FORMAT, stamp);
+}
+
 static gboolean
 plugin_packagekit_pick_rpm_desktop_file_cb (GsPlugin *plugin,
 					    GsApp *app,
@@ -1775,21 +1846,57 @@ gs_plugin_packagekit_invoke_reload (GsPlugin *plugin)
 	gs_plugin_reload (plugin);
 }
 
+static gboolean
+details_cache_save_cb (gpointer user_data)
+{
+	GsPluginPackagekit *self = GS_PLUGIN_PACKAGEKIT (user_data);
+	g_autoptr(GError) local_error = NULL;
+
+	self->details_cache_save_id = 0;
+
+	if (!gs_packagekit_details_cache_save (self->details_cache, &local_error))
+		g_debug ("Failed to save package details cache: %s", local_error->message);
+
+	return G_SOURCE_REMOVE;
+}
+
+static void
+details_cache_queue_save (GsPluginPackagekit *self)
+{
+	if (self->details_cache_save_id != 0)
+		return;
+
+	self->details_cache_save_id = g_timeout_add_seconds (DETAILS_CACHE_SAVE_TIMEOUT_SECS,
+							     details_cache_save_cb, self);
+}
+
+/* Called whenever a PackageKit transaction may have changed the installed
+ * packages or the available updates. */
+static void
+details_cache_invalidate (GsPluginPackagekit *self)
+{
+	g_clear_handle_id (&self->details_cache_save_id, g_source_remove);
+	gs_packagekit_details_cache_invalidate (self->details_cache);
+}
+
 static void
 gs_plugin_packagekit_installed_changed_cb (PkControl *control, GsPlugin *plugin)
 {
+	details_cache_invalidate (GS_PLUGIN_PACKAGEKIT (plugin));
 	gs_plugin_packagekit_invoke_reload (plugin);
 }
 
 static void
 gs_plugin_packagekit_updates_changed_cb (PkControl *control, GsPlugin *plugin)
 {
+	details_cache_invalidate (GS_PLUGIN_PACKAGEKIT (plugin));
 	gs_plugin_updates_changed (plugin);
 }
 
 static void
 gs_plugin_packagekit_repo_list_changed_cb (PkControl *control, GsPlugin *plugin)
 {
+	details_cache_invalidate (GS_PLUGIN_PACKAGEKIT (plugin));
 	gs_plugin_packagekit_invoke_reload (plugin);
 }
 
@@ -1962,9 +2069,57 @@ markdown_to_pango (const gchar *text)
 	gs_markdown_set_autocode (markdown, FALSE);
 	gs_markdown_set_autolinkify (markdown, FALSE);
 
+	/* some changelogs are hundreds of KB, more than anyone will read in
+	 * the update details */
+	gs_markdown_set_max_length (markdown, 64 * 1024);
+
 	return gs_markdown_parse (markdown, text);
 }
 
+/*
+ * Only Fedora and RHEL (PackageKit DNF backend) are known to
+ * provide update descriptions in markdown format. Other
+ * distros if any should be added below in future. For more
+ * details, refer:
+ *
+ * - https://gitlab.gnome.org/GNOME/gnome-software/-/issues/2621
+ * - https://github.com/PackageKit/PackageKit/issues/828
+ *
+ */
+static gboolean
+update_text_is_markdown (GsPlugin *plugin)
+{
+	return (gs_plugin_check_distro_id (plugin, "fedora") ||
+		gs_plugin_check_distro_id (plugin, "rhel"));
+}
+
+static void
+refine_app_update_text_with_format (GsApp       *app,
+                                    const gchar *update_text,
+                                    gboolean     is_markdown_desc)
+{
+	g_autofree gchar *pango_desc = NULL;
+
+	if (update_text == NULL || *update_text == '\0')
+		return;
+
+	if (is_markdown_desc)
+		pango_desc = markdown_to_pango (update_text);
+
+	if (pango_desc != NULL && *pango_desc != '\0')
+		gs_app_set_update_details_markup (app, pango_desc);
+	else
+		gs_app_set_update_details_text (app, update_text);
+}
+
+static void
+refine_app_update_text (GsPlugin    *plugin,
+                        GsApp       *app,
+                        const gchar *update_text)
+{
+	refine_app_update_text_with_format (app, update_text, update_text_is_markdown (plugin));
+}
+
 static gboolean
 gs_plugin_refine_app_needs_details (GsPluginRefineRequireFlags  flags,
                                     GsApp                      *app)
@@ -2107,6 +2262,8 @@ typedef struct {
 	GsApp *app_operating_system;  /* (nullable) (owned) */
 	GsAppList *update_details_list;  /* (nullable) (owned) */
 	GsAppList *details_list;  /* (nullable) (owned) */
+	gboolean details_with_deps_size;
+	guint details_cache_serial;  /* when the details were queried */
 } RefineData;
 
 static void
@@ -2607,6 +2764,83 @@ gs_plugin_packagekit_refine_async (GsPlugin                   *plugin,
 		}
 	}
 
+	/* answer as much as possible from the persistent details cache, so
+	 * only the misses need to be queried from PackageKit */
+	if (gs_app_list_length (update_details_list) > 0 ||
+	    gs_app_list_length (details_list) > 0) {
+		gs_packagekit_details_cache_check_stamp (self->details_cache);
+		data_unowned->details_cache_serial = gs_packagekit_details_cache_get_serial (self->details_cache);
+	}
+
+	if (gs_app_list_length (update_details_list) > 0) {
+		g_autoptr(GsAppList) uncached_list = gs_app_list_new ();
+
+		for (guint i = 0; i < gs_app_list_length (update_details_list); i++) {
+			GsApp *app = gs_app_list_index (update_details_list, i);
+			g_autofree gchar *update_text = NULL;
+
+			if (gs_packagekit_details_cache_lookup_update_text (self->details_cache,
+									    gs_app_get_default_source_id (app),
+									    &update_text))
+				refine_app_update_text (plugin, app, update_text);
+			else
+				gs_app_list_add (uncached_list, app);
+		}
+
+		g_set_object (&update_details_list, uncached_list);
+	}
+
+	if (gs_app_list_length (details_list) > 0) {
+#if PK_CHECK_VERSION (1, 2, 7)
+		gboolean with_deps_size = (require_flags & GS_PLUGIN_REFINE_REQUIRE_FLAGS_SIZE) != 0;
+#else
+		gboolean with_deps_size = FALSE;
+#endif
+		g_autoptr(GsAppList) uncached_list = gs_app_list_new ();
+		g_autoptr(GPtrArray) cached_details = g_ptr_array_new_with_free_func (g_object_unref);
+		g_autoptr(GHashTable) details_collection = NULL;
+		g_autoptr(GsAppList) cached_list = gs_app_list_new ();
+
+		for (guint i = 0; i < gs_app_list_length (details_list); i++) {
+			GsApp *app = gs_app_list_index (details_list, i);
+			GPtrArray *source_ids = gs_app_get_source_ids (app);
+			guint n_cached_before = cached_details->len;
+			/* how the sizes are applied depends on the app state,
+			 * so wait for the resolve if that’s not yet known */
+			gboolean all_cached = (gs_app_get_state (app) != GS_APP_STATE_UNKNOWN);
+
+			for (guint j = 0; all_cached && j < source_ids->len; j++) {
+				PkDetails *details = gs_packagekit_details_cache_lookup_details (self->details_cache,
+												 g_ptr_array_index (source_ids, j),
+												 with_deps_size);
+				if (details == NULL) {
+					all_cached = FALSE;
+					break;
+				}
+				g_ptr_array_add (cached_details, details);
+			}
+
+			if (all_cached) {
+				gs_app_list_add (cached_list, app);
+			} else {
+				g_ptr_array_set_size (cached_details, n_cached_before);
+				gs_app_list_add (uncached_list, app);
+			}
+		}
+
+		if (gs_app_list_length (cached_list) > 0) {
+			details_collection = gs_plugin_packagekit_details_array_to_hash (cached_details);
+			for (guint i = 0; i < gs_app_list_length (cached_list); i++) {
+				GsApp *app = gs_app_list_index (cached_list, i);
+				gs_plugin_packagekit_refine_details_app (plugin, details_collection, self->prepared_updates, app);
+			}
+		}
+
+		g_debug ("%u of %u package details found in cache",
+			 gs_app_list_length (cached_list), gs_app_list_length (details_list));
+		g_set_object (&details_list, uncached_list);
+	}
+
 	/* any update details missing? */
 	if (gs_app_list_length (update_details_list) > 0) {
 		GsApp *app;
@@ -2651,8 +2885,10 @@ gs_plugin_packagekit_refine_async (GsPlugin                   *plugin,
 			g_ptr_array_add (package_ids, NULL);
 
 			#if PK_CHECK_VERSION (1, 2, 7)
-			if ((require_flags & GS_PLUGIN_REFINE_REQUIRE_FLAGS_SIZE) != 0)
+			if ((require_flags & GS_PLUGIN_REFINE_REQUIRE_FLAGS_SIZE) != 0) {
 				pk_client_set_details_with_deps_size (data_unowned->client_refine, TRUE);
+				data_unowned->details_with_deps_size = TRUE;
+			}
 			#endif
 
 			/* get any details */
@@ -2956,6 +3192,7 @@ get_update_detail_cb (GObject      *source_object,
 	PkClient *client = PK_CLIENT (source_object);
 	g_autoptr(GTask) refine_task = g_steal_pointer (&user_data);
 	GsPlugin *plugin = GS_PLUGIN (g_task_get_source_object (refine_task));
+	GsPluginPackagekit *self = GS_PLUGIN_PACKAGEKIT (plugin);
 	RefineData *data = g_task_get_task_data (refine_task);
 	g_autoptr(PkResults) results = NULL;
 	g_autoptr(GPtrArray) array = NULL;
@@ -2969,45 +3206,36 @@ get_update_detail_cb (GObject      *source_object,
 		return;
 	}
 
-	/*
-	 * Only Fedora and RHEL (PackageKit DNF backend) are known to
-	 * provide update descriptions in markdown format. Other
-	 * distros if any should be added below in future. For more
-	 * details, refer:
-	 *
-	 * - https://gitlab.gnome.org/GNOME/gnome-software/-/issues/2621
-	 * - https://github.com/PackageKit/PackageKit/issues/828
-	 *
-	 */
-	is_markdown_desc = (gs_plugin_check_distro_id (plugin, "fedora") ||
-			    gs_plugin_check_distro_id (plugin, "rhel"));
+	is_markdown_desc = update_text_is_markdown (plugin);
 
 	/* set the update details for the update */
 	array = pk_results_get_update_detail_array (results);
+	for (guint i = 0; i < array->len; i++) {
+		PkUpdateDetail *update_detail = g_ptr_array_index (array, i);
+
+		if (pk_update_detail_get_package_id (update_detail) != NULL)
+			gs_packagekit_details_cache_add_update_text (self->details_cache,
+								     pk_update_detail_get_package_id (update_detail),
+								     pk_update_detail_get_update_text (update_detail),
+								     data->details_cache_serial);
+	}
+	if (array->len > 0)
+		details_cache_queue_save (self);
+
 	for (guint j = 0; j < gs_app_list_length (data->update_details_list); j++) {
 		GsApp *app = gs_app_list_index (data->update_details_list, j);
 		const gchar *package_id = gs_app_get_default_source_id (app);
 
 		for (guint i = 0; i < array->len; i++) {
-			const gchar *tmp;
 			PkUpdateDetail *update_detail;
-			g_autofree gchar *pango_desc = NULL;
 
 			/* right package? */
 			update_detail = g_ptr_array_index (array, i);
 			if (g_strcmp0 (package_id, pk_update_detail_get_package_id (update_detail)) != 0)
 				continue;
-			tmp = pk_update_detail_get_update_text (update_detail);
-			if (tmp == NULL || *tmp == '\0')
-				break;
 
-			if (is_markdown_desc)
-				pango_desc = markdown_to_pango (tmp);
-
-			if (pango_desc != NULL && *pango_desc != '\0')
-				gs_app_set_update_details_markup (app, pango_desc);
-			else
-				gs_app_set_update_details_text (app, tmp);
+			refine_app_update_text_with_format (app, pk_update_detail_get_update_text (update_detail), is_markdown_desc);
+			break;
 		}
 	}
 
@@ -3050,6 +3278,14 @@ get_details_cb (GObject      *source_object,
 	array = pk_results_get_details_array (results);
 	details_collection = gs_plugin_packagekit_details_array_to_hash (array);
 
+	for (guint i = 0; i < array->len; i++)
+		gs_packagekit_details_cache_add_details (self->details_cache,
+							 g_ptr_array_index (array, i),
+							 data->details_with_deps_size,
+							 data->details_cache_serial);
+	if (array->len > 0)
+		details_cache_queue_save (self);
+
 	/* set the update details for the update */
 	prepared_updates = g_hash_table_ref (self->prepared_updates);
 
@@ -3564,6 +3800,12 @@ gs_plugin_packagekit_shutdown_async (GsPlugin            *plugin,
 	/* Cancel any ongoing proxy settings loading operation. */
 	g_cancellable_cancel (self->proxy_settings_cancellable);
 
+	/* Write out any pending package details */
+	if (self->details_cache_save_id != 0) {
+		g_clear_handle_id (&self->details_cache_save_id, g_source_remove);
+		details_cache_save_cb (self);
+	}
+
 	g_task_return_boolean (task, TRUE);
 }
 
@@ -5571,6 +5813,7 @@ gs_plugin_packagekit_class_init (GsPluginPackagekitClass *klass)
 	plugin_class->refresh_metadata_finish = gs_plugin_packagekit_refresh_metadata_finish;
 	plugin_class->list_apps_async = gs_plugin_packagekit_list_apps_async;
 	plugin_class->list_apps_finish = gs_plugin_packagekit_list_apps_finish;
+	plugin_class->get_updates_stamp = gs_plugin_packagekit_get_updates_stamp;
 	plugin_class->enable_repository_async = gs_plugin_packagekit_enable_repository_async;
 	plugin_class->enable_repository_finish = gs_plugin_packagekit_enable_repository_finish;
 	plugin_class->disable_repository_async = gs_plugin_packagekit_disable_repository_async;
@@ -8,9 +8,12 @@
 
 #include "config.h"
 
+#include <string.h>
+
 #include "gnome-software-private.h"
 
 #include "gs-markdown.h"
+#include "gs-packagekit-details-cache.h"
 #include "gs-test.h"
 
 static void
@@ -209,6 +212,163 @@ gs_markdown_func (void)
 	text = gs_markdown_parse (md, markdown);
 	g_assert_cmpstr (text, ==, markdown_expected);
 	g_free (text);
+
+	/* markdown (formatters surrounded by spaces) */
+	gs_markdown_set_autocode (md, FALSE);
+	text = gs_markdown_parse (md, "2 * 3 * 4 = *24*");
+	g_assert_cmpstr (text, ==, "2 * 3 * 4 = <i>24</i>");
+	g_free (text);
+
+	/* markdown (all inline formatters) */
+	text = gs_markdown_parse (md, "**bold** and *em* and __strong__ -- done");
+	g_assert_cmpstr (text, ==, "<b>bold</b> and <i>em</i> and <b>strong</b> — done");
+	g_free (text);
+
+	/* markdown (underscores) */
+	text = gs_markdown_parse (md, "CONFIG_FOO_BAR and _x_");
+	g_assert_cmpstr (text, ==, "CONFIG<i>FOO</i>BAR and <i>x</i>");
+	g_free (text);
+}
+
+static void
+gs_markdown_large_func (void)
+{
+	g_autoptr(GsMarkdown) md = NULL;
+	g_autoptr(GString) markdown = g_string_new (NULL);
+	g_autoptr(GString) markdown_expected = g_string_new (NULL);
+	g_autoptr(GTimer) timer = NULL;
+	g_autofree gchar *text = NULL;
+	g_autofree gchar *text_limited = NULL;
+	g_autofree gchar *para_text = NULL;
+	g_autofree gchar *para_text_limited = NULL;
+	g_autoptr(GString) para = g_string_new (NULL);
+	gsize len;
+
+	/* a changelog of a few MB, like the ones of the kernel or LibreOffice */
+	for (guint i = 0; i < 50000; i++) {
+		if (i % 100 == 0) {
+			g_string_append_printf (markdown, "\n## Release %u ##\n\n", i / 100);
+			g_string_append_printf (markdown_expected, "\n<b>Release %u</b>\n\n", i / 100);
+		}
+		g_string_append_printf (markdown,
+					"- Fix *issue* %u in `module_%u` -- thanks to **someone**\n"
+					"  for the report.\n", i, i);
+		g_string_append_printf (markdown_expected,
+					"• Fix <i>issue</i> %u in <tt>module_%u</tt> — thanks to <b>someone</b> "
+					"for the report.\n", i, i);
+	}
+
+	/* the expected output has no leading or trailing newlines */
+	g_string_erase (markdown_expected, 0, 1);
+	g_string_truncate (markdown_expected, markdown_expected->len - 1);
+
+	md = gs_markdown_new (GS_MARKDOWN_OUTPUT_PANGO);
+	gs_markdown_set_autocode (md, FALSE);
+	gs_markdown_set_autolinkify (md, FALSE);
+
+	/* this scales linearly with the size of the input */
+	timer = g_timer_new ();
+	text = gs_markdown_parse (md, markdown->str);
+	g_print ("%.2fms for %" G_GSIZE_FORMAT " bytes ",
+		 g_timer_elapsed (timer, NULL) * 1000, markdown->len);
+	g_assert_cmpstr (text, ==, markdown_expected->str);
+
+	/* stop at the first line after the length limit */
+	gs_markdown_set_max_length (md, 4096);
+	g_timer_reset (timer);
+	text_limited = gs_markdown_parse (md, markdown->str);
+	g_print ("%.2fms with a limit ", g_timer_elapsed (timer, NULL) * 1000);
+	len = strlen (text_limited);
+	g_assert_cmpuint (len, >, 4000);
+	g_assert_cmpuint (len, <, 4096 + 256);
+	g_assert_true (g_str_has_prefix (text, text_limited));
+
+	/* a single paragraph is cut off between lines too */
+	for (guint i = 0; i < 100000; i++)
+		g_string_append_printf (para, "Line %u of a changelog with no blank lines in it\n", i);
+	gs_markdown_set_max_length (md, 0);
+	para_text = gs_markdown_parse (md, para->str);
+	gs_markdown_set_max_length (md, 4096);
+	para_text_limited = gs_markdown_parse (md, para->str);
+	len = strlen (para_text_limited);
+	g_assert_cmpuint (len, >, 4000);
+	g_assert_cmpuint (len, <, 4096 + 256);
+	g_assert_true (g_str_has_prefix (para_text, para_text_limited));
+	g_assert_true (g_str_has_suffix (para_text_limited, "in it"));
+}
+
+static void
+gs_markdown_golden_func (void)
+{
+	const gchar *doc =
+		"# Title #\n"
+		"\n"
+		"Some *em* and **strong** text & <tags>\n"
+		"wrapped onto a second line.\n"
+		"\n"
+		"* one\n"
+		"* two -- with `code_here`\n"
+		"\n"
+		"---\n"
+		"\n"
+		"See [the docs](https://example.com/docs) or http://example.com/\n";
+	const struct {
+		GsMarkdownOutputKind output;
+		gboolean autocode;
+		gboolean smart_quoting;
+		gint max_lines;
+		const gchar *markdown;
+		const gchar *expected;
+	} vectors[] = {
+		{ GS_MARKDOWN_OUTPUT_PANGO, FALSE, FALSE, -1, doc,
+		  "<big>Title</big>\n"
+		  "\n"
+		  "Some <i>em</i> and <b>strong</b> text &amp; &lt;tags&gt; wrapped onto a second line.\n"
+		  "• one\n"
+		  "• two — with <tt>code_here</tt>\n"
+		  "See <a href=\"https://example.com/docs\">the docs</a> or "
+		  "<a href=\"http://example.com/\">http://example.com/</a>" },
+		{ GS_MARKDOWN_OUTPUT_HTML, FALSE, FALSE, -1, doc,
+		  "<h1>Title</h1>\n"
+		  "Some <em>em<em> and <strong>strong</strong> text &amp; &lt;tags&gt; wrapped onto a second line.\n"
+		  "<li>one</li>\n"
+		  "<li>two — with <code>code_here</code></li>\n"
+		  "See <a href=\"https://example.com/docs\">the docs</a> or http://example.com/" },
+		{ GS_MARKDOWN_OUTPUT_TEXT, FALSE, FALSE, -1, doc,
+		  "[Title]\n"
+		  "Some em and strong text & <tags> wrapped onto a second line.\n"
+		  "* one\n"
+		  "* two — with code_here\n"
+		  "See [the docs](https://example.com/docs) or http://example.com/" },
+		{ GS_MARKDOWN_OUTPUT_PANGO, FALSE, FALSE, -1,
+		  "***bold italic*** and *unclosed and __mixed_ markers__ end_\n",
+		  "<b><i>bold italic</b></i> and *unclosed and <b>mixed<i> markers</b> end</i>" },
+		{ GS_MARKDOWN_OUTPUT_PANGO, TRUE, FALSE, -1,
+		  "Fixed crash in foo_bar_baz() see /usr/lib/x.so and #12345 via fix.patch, mail me@example.com\n",
+		  "Fixed crash in <tt>foo_bar_baz()</tt> see <tt>/usr/lib/x.so</tt> and <tt>#12345</tt> "
+		  "via <tt>fix.patch,</tt> mail <tt>me@example.com</tt>" },
+		{ GS_MARKDOWN_OUTPUT_TEXT, FALSE, TRUE, -1,
+		  "He said \"hello\" and 'bye'\n",
+		  "He said “hello” and ‘bye’" },
+		{ GS_MARKDOWN_OUTPUT_PANGO, FALSE, FALSE, -1,
+		  "Title\n=====\nSub\n---\n### Three\n#### Four ####\n##### Five\n###### Six\nText\n",
+		  "<big>Title Sub</big>\n\n\n<b>Three</b>\n\n\n<b>Four</b>\n\n\n<b>Five</b>\n\n\n<b>Six Text</b>" },
+		{ GS_MARKDOWN_OUTPUT_PANGO, FALSE, FALSE, 2,
+		  "* a\n* b\n* c\n",
+		  "• a\n• b" },
+	};
+
+	/* the output of the previous, recursive, implementation */
+	for (gsize i = 0; i < G_N_ELEMENTS (vectors); i++) {
+		g_autoptr(GsMarkdown) md = gs_markdown_new (vectors[i].output);
+		g_autofree gchar *text = NULL;
+
+		gs_markdown_set_autocode (md, vectors[i].autocode);
+		gs_markdown_set_smart_quoting (md, vectors[i].smart_quoting);
+		gs_markdown_set_max_lines (md, vectors[i].max_lines);
+		text = gs_markdown_parse (md, vectors[i].markdown);
+		g_assert_cmpstr (text, ==, vectors[i].expected);
+	}
 }
 
 static void
@@ -254,6 +414,121 @@ gs_plugins_packagekit_local_func (GsPluginLoader *plugin_loader)
 			 "package spec file.\n\nThis is the second paragraph.");
 }
 
+static PkDetails *
+details_new (const gchar *package_id,
+             const gchar *license)
+{
+	return g_object_new (PK_TYPE_DETAILS,
+			     "package-id", package_id,
+			     "license", license,
+			     "summary", "Single line synopsis",
+			     "size", (guint64) 1024,
+			     "download-size", (guint64) 512,
+			     NULL);
+}
+
+static void
+gs_packagekit_details_cache_func (void)
+{
+	const gchar *package_id = "chiron;1.1-1.fc24;x86_64;fedora";
+	g_autofree gchar *filename = g_build_filename (g_get_user_cache_dir (), "details-cache", NULL);
+	g_autofree gchar *stamp_filename = g_build_filename (g_get_user_cache_dir (), "packages.db", NULL);
+	const gchar *stamp_paths[] = { stamp_filename, NULL };
+	g_autoptr(GsPackagekitDetailsCache) cache = NULL;
+	g_autoptr(GsPackagekitDetailsCache) cache2 = NULL;
+	g_autoptr(PkDetails) details = NULL;
+	g_autoptr(PkDetails) details2 = NULL;
+	g_autoptr(PkDetails) cached = NULL;
+	g_autoptr(GError) error = NULL;
+	g_autofree gchar *update_text = NULL;
+	g_autoptr(GFile) stamp_file = NULL;
+	g_autoptr(GFileInfo) info = NULL;
+	guint serial;
+	gboolean ret;
+
+	ret = g_file_set_contents (stamp_filename, "", -1, &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+
+	cache = gs_packagekit_details_cache_new (filename, stamp_paths);
+	g_assert_null (gs_packagekit_details_cache_lookup_details (cache, package_id, FALSE));
+	g_assert_false (gs_packagekit_details_cache_lookup_update_text (cache, package_id, NULL));
+
+	/* add and look up */
+	serial = gs_packagekit_details_cache_get_serial (cache);
+	details = details_new (package_id, "GPL-2.0-or-later");
+	gs_packagekit_details_cache_add_details (cache, details, FALSE, serial);
+	gs_packagekit_details_cache_add_update_text (cache, package_id, NULL, serial);
+
+	cached = gs_packagekit_details_cache_lookup_details (cache, package_id, FALSE);
+	g_assert_nonnull (cached);
+	g_assert_cmpstr (pk_details_get_license (cached), ==, "GPL-2.0-or-later");
+	g_assert_cmpstr (pk_details_get_summary (cached), ==, "Single line synopsis");
+	g_assert_cmpuint (pk_details_get_size (cached), ==, 1024);
+	g_assert_cmpuint (pk_details_get_download_size (cached), ==, 512);
+	g_clear_object (&cached);
+
+	/* the sizes don’t include the dependencies */
+	g_assert_null (gs_packagekit_details_cache_lookup_details (cache, package_id, TRUE));
+
+	/* a missing update text is cached as empty */
+	g_assert_true (gs_packagekit_details_cache_lookup_update_text (cache, package_id, &update_text));
+	g_assert_cmpstr (update_text, ==, "");
+	g_clear_pointer (&update_text, g_free);
+
+	/* saved and loaded again */
+	ret = gs_packagekit_details_cache_save (cache, &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+	g_assert_true (g_file_test (filename, G_FILE_TEST_EXISTS));
+
+	cache2 = gs_packagekit_details_cache_new (filename, stamp_paths);
+	cached = gs_packagekit_details_cache_lookup_details (cache2, package_id, FALSE);
+	g_assert_nonnull (cached);
+	g_assert_cmpstr (pk_details_get_license (cached), ==, "GPL-2.0-or-later");
+	g_clear_object (&cached);
+	g_assert_true (gs_packagekit_details_cache_lookup_update_text (cache2, package_id, NULL));
+	g_clear_object (&cache2);
+
+	/* results from a query which was in flight during an invalidation
+	 * are dropped */
+	serial = gs_packagekit_details_cache_get_serial (cache);
+	gs_packagekit_details_cache_invalidate (cache);
+	g_assert_false (g_file_test (filename, G_FILE_TEST_EXISTS));
+	g_assert_null (gs_packagekit_details_cache_lookup_details (cache, package_id, FALSE));
+
+	details2 = details_new (package_id, "LGPL-2.1-or-later");
+	gs_packagekit_details_cache_add_details (cache, details2, FALSE, serial);
+	gs_packagekit_details_cache_add_update_text (cache, package_id, "Fixed things", serial);
+	g_assert_null (gs_packagekit_details_cache_lookup_details (cache, package_id, FALSE));
+	g_assert_false (gs_packagekit_details_cache_lookup_update_text (cache, package_id, NULL));
+
+	/* and ones queried afterwards are kept */
+	g_assert_cmpuint (gs_packagekit_details_cache_get_serial (cache), !=, serial);
+	serial = gs_packagekit_details_cache_get_serial (cache);
+	gs_packagekit_details_cache_add_details (cache, details2, FALSE, serial);
+	cached = gs_packagekit_details_cache_lookup_details (cache, package_id, FALSE);
+	g_assert_nonnull (cached);
+	g_assert_cmpstr (pk_details_get_license (cached), ==, "LGPL-2.1-or-later");
+	g_clear_object (&cached);
+
+	/* a change to the package database invalidates the cache too */
+	stamp_file = g_file_new_for_path (stamp_filename);
+	info = g_file_query_info (stamp_file, G_FILE_ATTRIBUTE_TIME_MODIFIED,
+				  G_FILE_QUERY_INFO_NONE, NULL, &error);
+	g_assert_no_error (error);
+	ret = g_file_set_attribute_uint64 (stamp_file, G_FILE_ATTRIBUTE_TIME_MODIFIED,
+					   g_file_info_get_attribute_uint64 (info, G_FILE_ATTRIBUTE_TIME_MODIFIED) + 10,
+					   G_FILE_QUERY_INFO_NONE, NULL, &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+
+	gs_packagekit_details_cache_check_stamp (cache);
+	g_assert_null (gs_packagekit_details_cache_lookup_details (cache, package_id, FALSE));
+	gs_packagekit_details_cache_add_details (cache, details, FALSE, serial);
+	g_assert_null (gs_packagekit_details_cache_lookup_details (cache, package_id, FALSE));
+}
+
 int
 main (int argc, char **argv)
 {
@@ -273,6 +548,9 @@ main (int argc, char **argv)
 
 	/* generic tests go here */
 	g_test_add_func ("/gnome-software/markdown", gs_markdown_func);
+	g_test_add_func ("/gnome-software/markdown{large}", gs_markdown_large_func);
+	g_test_add_func ("/gnome-software/markdown{golden}", gs_markdown_golden_func);
+	g_test_add_func ("/gnome-software/plugins/packagekit/details-cache", gs_packagekit_details_cache_func);
 
 	/* we can only load this once per process */
 	plugin_loader = gs_plugin_loader_new (NULL, NULL);
@@ -25,8 +25,25 @@
  * the real work is done in the snapd daemon. This means the plugin can execute
  * entirely in the main thread, making asynchronous calls. It doesn’t need to do
  * any locking.
+ *
+ * Snaps and section listings returned by the Snap Store are cached in memory,
+ * bounded by an LRU policy and a TTL, and persisted between sessions. Identical
+ * concurrent queries to snapd share a single in-flight request.
  */
 
+/* Maximum number of store snaps to keep in the cache */
+#define STORE_CACHE_MAX_SNAPS 500
+
+/* How long information from the Snap Store is considered fresh */
+#define STORE_CACHE_TTL_SECS (6 * 60 * 60)
+
+/* Delay before writing a changed cache to disk, so that the results of
+ * several queries are written together */
+#define STORE_CACHE_SAVE_TIMEOUT_SECS 10
+
+/* Bump this if the format of the serialised cache changes */
+#define STORE_CACHE_FORMAT_VERSION 2
+
 struct _GsPluginSnap {
 	GsPlugin		 parent;
 
@@ -34,30 +51,54 @@ struct _GsPluginSnap {
 	gchar			*store_hostname;
 	SnapdSystemConfinement	 system_confinement;
 
-	GHashTable		*store_snaps;
+	GHashTable		*store_snaps;  /* (owned) (element-type utf8 CacheEntry) */
+	GQueue			 store_snaps_lru;  /* (element-type CacheEntry) (not owned); most recently used first */
+	GHashTable		*store_sections;  /* (owned) (element-type utf8 SectionCacheEntry) */
+	GHashTable		*pending_finds;  /* (owned) (element-type utf8 GPtrArray<GTask>) */
+	gchar			*store_cache_filename;  /* (owned) (nullable) */
+	guint			 store_cache_save_id;
 };
 
 G_DEFINE_TYPE (GsPluginSnap, gs_plugin_snap, GS_TYPE_PLUGIN)
 
 typedef struct {
-	SnapdSnap *snap;
+	gchar *name;  /* (owned) (not nullable) */
+	SnapdSnap *snap;  /* (owned) (not nullable) */
 	gboolean full_details;
+	gint64 expiry_time;  /* wall clock, in microseconds */
+	GList lru_link;  /* link in GsPluginSnap.store_snaps_lru; data points to this entry */
 } CacheEntry;
 
 static CacheEntry *
-cache_entry_new (SnapdSnap *snap, gboolean full_details)
+cache_entry_new (SnapdSnap *snap, gboolean full_details, gint64 expiry_time)
 {
-	CacheEntry *entry = g_slice_new (CacheEntry);
+	CacheEntry *entry = g_new0 (CacheEntry, 1);
+	entry->name = g_strdup (snapd_snap_get_name (snap));
 	entry->snap = g_object_ref (snap);
 	entry->full_details = full_details;
+	entry->expiry_time = expiry_time;
+	entry->lru_link.data = entry;
 	return entry;
 }
 
 static void
 cache_entry_free (CacheEntry *entry)
 {
+	g_free (entry->name);
 	g_object_unref (entry->snap);
-	g_slice_free (CacheEntry, entry);
+	g_free (entry);
+}
+
+typedef struct {
+	GStrv names;  /* (owned) (not nullable); names of the snaps in the section, in order */
+	gint64 expiry_time;  /* wall clock, in microseconds */
+} SectionCacheEntry;
+
+static void
+section_cache_entry_free (SectionCacheEntry *entry)
+{
+	g_strfreev (entry->names);
+	g_free (entry);
 }
 
 static SnapdAuthData *
@@ -141,7 +182,11 @@ gs_plugin_snap_init (GsPluginSnap *self)
 	}
 
 	self->store_snaps = g_hash_table_new_full (g_str_hash, g_str_equal,
-						   g_free, (GDestroyNotify) cache_entry_free);
+						   NULL, (GDestroyNotify) cache_entry_free);
+	self->store_sections = g_hash_table_new_full (g_str_hash, g_str_equal,
+						      g_free, (GDestroyNotify) section_cache_entry_free);
+	self->pending_finds = g_hash_table_new_full (g_str_hash, g_str_equal,
+						     g_free, (GDestroyNotify) g_ptr_array_unref);
 
 	gs_plugin_add_rule (GS_PLUGIN (self), GS_PLUGIN_RULE_BETTER_THAN, "packagekit");
 	gs_plugin_add_rule (GS_PLUGIN (self), GS_PLUGIN_RULE_RUN_BEFORE, "icons");
@@ -247,6 +292,8 @@ static void add_channels (GsPluginSnap *self,
                           SnapdSnap    *snap,
                           GsAppList    *list);
 
+static void store_cache_load (GsPluginSnap *self);
+
 static void
 gs_plugin_snap_setup_async (GsPlugin            *plugin,
                             GCancellable        *cancellable,
@@ -302,6 +349,16 @@ get_system_information_cb (GObject      *source_object,
 		snapd_system_information_get_os_id (system_information),
 		snapd_system_information_get_os_version (system_information));
 
+	/* load the store cache from the previous session */
+	self->store_cache_filename = gs_utils_get_cache_filename ("snap", "store-cache.gvariant",
+								  GS_UTILS_CACHE_FLAG_WRITEABLE |
+								  GS_UTILS_CACHE_FLAG_CREATE_DIRECTORY,
+								  &local_error);
+	if (self->store_cache_filename == NULL)
+		g_debug ("Not persisting the store cache: %s", local_error->message);
+	else
+		store_cache_load (self);
+
 	/* success */
 	g_task_return_boolean (task, TRUE);
 }
@@ -314,6 +371,17 @@ gs_plugin_snap_setup_finish (GsPlugin      *plugin,
 	return g_task_propagate_boolean (G_TASK (result), error);
 }
 
+static void
+store_cache_queue_save (GsPluginSnap *self);
+
+static void
+store_snap_cache_remove (GsPluginSnap *self,
+                         CacheEntry   *entry)
+{
+	g_queue_unlink (&self->store_snaps_lru, &entry->lru_link);
+	g_hash_table_remove (self->store_snaps, entry->name);
+}
+
 static SnapdSnap *
 store_snap_cache_lookup (GsPluginSnap *self,
                          const gchar  *name,
@@ -325,18 +393,52 @@ store_snap_cache_lookup (GsPluginSnap *self,
 	if (entry == NULL)
 		return NULL;
 
+	if (entry->expiry_time <= g_get_real_time ()) {
+		store_snap_cache_remove (self, entry);
+		return NULL;
+	}
+
 	if (need_details && !entry->full_details)
 		return NULL;
 
+	/* mark as most recently used */
+	g_queue_unlink (&self->store_snaps_lru, &entry->lru_link);
+	g_queue_push_head_link (&self->store_snaps_lru, &entry->lru_link);
+
 	return g_object_ref (entry->snap);
 }
 
+static void
+store_snap_cache_insert (GsPluginSnap *self,
+                         SnapdSnap    *snap,
+                         gboolean      full_details,
+                         gint64        expiry_time)
+{
+	CacheEntry *entry, *old_entry;
+
+	if (snapd_snap_get_name (snap) == NULL)
+		return;
+
+	old_entry = g_hash_table_lookup (self->store_snaps, snapd_snap_get_name (snap));
+	if (old_entry != NULL)
+		store_snap_cache_remove (self, old_entry);
+
+	entry = cache_entry_new (snap, full_details, expiry_time);
+	g_hash_table_insert (self->store_snaps, entry->name, entry);
+	g_queue_push_head_link (&self->store_snaps_lru, &entry->lru_link);
+
+	/* evict the least recently used snaps */
+	while (g_hash_table_size (self->store_snaps) > STORE_CACHE_MAX_SNAPS)
+		store_snap_cache_remove (self, g_queue_peek_tail_link (&self->store_snaps_lru)->data);
+}
+
 static void
 store_snap_cache_update (GsPluginSnap *self,
                          GPtrArray    *snaps,
                          gboolean      full_details)
 {
 	guint i;
+	gint64 expiry_time = g_get_real_time () + STORE_CACHE_TTL_SECS * G_USEC_PER_SEC;
 
 	for (i = 0; i < snaps->len; i++) {
 		SnapdSnap *snap = snaps->pdata[i];
@@ -345,32 +447,516 @@ store_snap_cache_update (GsPluginSnap *self,
 			snapd_snap_get_publisher_display_name (snap),
 			snapd_snap_get_version (snap),
 			snapd_snap_get_revision (snap));
-		g_hash_table_insert (self->store_snaps, g_strdup (snapd_snap_get_name (snap)), cache_entry_new (snap, full_details));
+		store_snap_cache_insert (self, snap, full_details, expiry_time);
 	}
+
+	if (snaps->len > 0)
+		store_cache_queue_save (self);
 }
 
+/* Returns the snaps last listed in @section, or %NULL if that listing has
+ * expired or any of its snaps have since been evicted from the cache. */
 static GPtrArray *
-find_snaps (GsPluginSnap    *self,
-            SnapdClient     *client,
-            SnapdFindFlags   flags,
-            const gchar     *category,
-            const gchar     *query,
-            GCancellable    *cancellable,
-            GError         **error)
+store_section_cache_lookup (GsPluginSnap *self,
+                            const gchar  *section)
 {
+	SectionCacheEntry *entry;
 	g_autoptr(GPtrArray) snaps = NULL;
 
-	snaps = snapd_client_find_category_sync (client, flags, category, query, NULL, cancellable, error);
-	if (snaps == NULL) {
-		snapd_error_convert (error);
+	entry = g_hash_table_lookup (self->store_sections, section);
+	if (entry == NULL)
+		return NULL;
+
+	if (entry->expiry_time <= g_get_real_time ()) {
+		g_hash_table_remove (self->store_sections, section);
 		return NULL;
 	}
 
-	store_snap_cache_update (self, snaps, flags & SNAPD_FIND_FLAGS_MATCH_NAME);
+	snaps = g_ptr_array_new_with_free_func (g_object_unref);
+	for (gsize i = 0; entry->names[i] != NULL; i++) {
+		SnapdSnap *snap = store_snap_cache_lookup (self, entry->names[i], FALSE);
+		if (snap == NULL)
+			return NULL;
+		g_ptr_array_add (snaps, snap);
+	}
 
 	return g_steal_pointer (&snaps);
 }
 
+static void
+store_section_cache_update (GsPluginSnap *self,
+                            const gchar  *section,
+                            GPtrArray    *snaps)
+{
+	SectionCacheEntry *entry = g_new0 (SectionCacheEntry, 1);
+
+	entry->names = g_new0 (gchar *, snaps->len + 1);
+	for (guint i = 0; i < snaps->len; i++)
+		entry->names[i] = g_strdup (snapd_snap_get_name (g_ptr_array_index (snaps, i)));
+	entry->expiry_time = g_get_real_time () + STORE_CACHE_TTL_SECS * G_USEC_PER_SEC;
+
+	g_hash_table_replace (self->store_sections, g_strdup (section), entry);
+	store_cache_queue_save (self);
+}
+
+/* The store cache is persisted by serialising the fields of each #SnapdSnap
+ * which this plugin reads from store snaps. Only those fields are restored;
+ * anything unknown or of the wrong type in the cache file is ignored. */
+static void
+variant_builder_add_string (GVariantBuilder *builder,
+                            const gchar     *key,
+                            const gchar     *value)
+{
+	if (value != NULL)
+		g_variant_builder_add (builder, "{sv}", key, g_variant_new_string (value));
+}
+
+static void
+variant_builder_add_strv (GVariantBuilder     *builder,
+                          const gchar         *key,
+                          const gchar * const *value)
+{
+	if (value != NULL)
+		g_variant_builder_add (builder, "{sv}", key, g_variant_new_strv (value, -1));
+}
+
+static const gchar *
+variant_lookup_string (GVariant    *dict,
+                       const gchar *key)
+{
+	const gchar *value;
+
+	if (!g_variant_lookup (dict, key, "&s", &value))
+		return NULL;
+	return value;
+}
+
+static gint
+variant_lookup_enum (GVariant    *dict,
+                     const gchar *key,
+                     GType        enum_type,
+                     gint         default_value)
+{
+	GEnumClass *enum_class;
+	gint32 value;
+	gboolean valid;
+
+	if (!g_variant_lookup (dict, key, "i", &value))
+		return default_value;
+
+	enum_class = g_type_class_ref (enum_type);
+	valid = (g_enum_get_value (enum_class, value) != NULL);
+	g_type_class_unref (enum_class);
+
+	return valid ? value : default_value;
+}
+
+static GVariant *
+channel_to_variant (SnapdChannel *channel)
+{
+	GVariantBuilder builder;
+	GDateTime *released_at = snapd_channel_get_released_at (channel);
+
+	g_variant_builder_init (&builder, G_VARIANT_TYPE_VARDICT);
+	variant_builder_add_string (&builder, "name", snapd_channel_get_name (channel));
+	variant_builder_add_string (&builder, "track", snapd_channel_get_track (channel));
+	variant_builder_add_string (&builder, "risk", snapd_channel_get_risk (channel));
+	variant_builder_add_string (&builder, "branch", snapd_channel_get_branch (channel));
+	variant_builder_add_string (&builder, "version", snapd_channel_get_version (channel));
+	g_variant_builder_add (&builder, "{sv}", "confinement", g_variant_new_int32 (snapd_channel_get_confinement (channel)));
+	if (released_at != NULL)
+		g_variant_builder_add (&builder, "{sv}", "released-at", g_variant_new_int64 (g_date_time_to_unix (released_at)));
+
+	return g_variant_builder_end (&builder);
+}
+
+static SnapdChannel *
+channel_from_variant (GVariant *dict)
+{
+	const gchar *name = variant_lookup_string (dict, "name");
+	const gchar *track = variant_lookup_string (dict, "track");
+	const gchar *risk = variant_lookup_string (dict, "risk");
+	gint64 released_at_secs;
+	g_autoptr(GDateTime) released_at = NULL;
+
+	/* compare_channel() needs all of these */
+	if (name == NULL || track == NULL || risk == NULL)
+		return NULL;
+
+	if (g_variant_lookup (dict, "released-at", "x", &released_at_secs))
+		released_at = g_date_time_new_from_unix_utc (released_at_secs);
+
+	return g_object_new (SNAPD_TYPE_CHANNEL,
+			     "name", name,
+			     "track", track,
+			     "risk", risk,
+			     "branch", variant_lookup_string (dict, "branch"),
+			     "version", variant_lookup_string (dict, "version"),
+			     "confinement", variant_lookup_enum (dict, "confinement", SNAPD_TYPE_CONFINEMENT, SNAPD_CONFINEMENT_UNKNOWN),
+			     "released-at", released_at,
+			     NULL);
+}
+
+static GVariant *
+snap_to_variant (SnapdSnap *snap)
+{
+	GVariantBuilder builder, media_builder, channels_builder;
+	GPtrArray *media = snapd_snap_get_media (snap);
+	GPtrArray *channels = snapd_snap_get_channels (snap);
+
+	g_variant_builder_init (&builder, G_VARIANT_TYPE_VARDICT);
+	variant_builder_add_string (&builder, "name", snapd_snap_get_name (snap));
+	variant_builder_add_string (&builder, "id", snapd_snap_get_id (snap));
+	variant_builder_add_string (&builder, "title", snapd_snap_get_title (snap));
+	variant_builder_add_string (&builder, "summary", snapd_snap_get_summary (snap));
+	variant_builder_add_string (&builder, "description", snapd_snap_get_description (snap));
+	variant_builder_add_string (&builder, "version", snapd_snap_get_version (snap));
+	variant_builder_add_string (&builder, "revision", snapd_snap_get_revision (snap));
+	variant_builder_add_string (&builder, "channel", snapd_snap_get_channel (snap));
+	variant_builder_add_string (&builder, "contact", snapd_snap_get_contact (snap));
+	variant_builder_add_string (&builder, "website", snapd_snap_get_website (snap));
+	variant_builder_add_string (&builder, "license", snapd_snap_get_license (snap));
+	variant_builder_add_string (&builder, "publisher-display-name", snapd_snap_get_publisher_display_name (snap));
+	variant_builder_add_string (&builder, "publisher-username", snapd_snap_get_publisher_username (snap));
+	variant_builder_add_strv (&builder, "common-ids", (const gchar * const *) snapd_snap_get_common_ids (snap));
+	variant_builder_add_strv (&builder, "tracks", (const gchar * const *) snapd_snap_get_tracks (snap));
+	g_variant_builder_add (&builder, "{sv}", "snap-type", g_variant_new_int32 (snapd_snap_get_snap_type (snap)));
+	g_variant_builder_add (&builder, "{sv}", "confinement", g_variant_new_int32 (snapd_snap_get_confinement (snap)));
+	g_variant_builder_add (&builder, "{sv}", "publisher-validation", g_variant_new_int32 (snapd_snap_get_publisher_validation (snap)));
+	g_variant_builder_add (&builder, "{sv}", "download-size", g_variant_new_int64 (snapd_snap_get_download_size (snap)));
+
+	g_variant_builder_init (&media_builder, G_VARIANT_TYPE ("a(ssuu)"));
+	for (guint i = 0; media != NULL && i < media->len; i++) {
+		SnapdMedia *m = g_ptr_array_index (media, i);
+
+		if (snapd_media_get_media_type (m) == NULL || snapd_media_get_url (m) == NULL)
+			continue;
+		g_variant_builder_add (&media_builder, "(ssuu)",
+				       snapd_media_get_media_type (m), snapd_media_get_url (m),
+				       snapd_media_get_width (m), snapd_media_get_height (m));
+	}
+	g_variant_builder_add (&builder, "{sv}", "media", g_variant_builder_end (&media_builder));
+
+	g_variant_builder_init (&channels_builder, G_VARIANT_TYPE ("aa{sv}"));
+	for (guint i = 0; channels != NULL && i < channels->len; i++)
+		g_variant_builder_add_value (&channels_builder, channel_to_variant (g_ptr_array_index (channels, i)));
+	g_variant_builder_add (&builder, "{sv}", "channels", g_variant_builder_end (&channels_builder));
+
+	return g_variant_builder_end (&builder);
+}
+
+static SnapdSnap *
+snap_from_variant (GVariant *dict)
+{
+	const gchar *name = variant_lookup_string (dict, "name");
+	g_auto(GStrv) common_ids = NULL;
+	g_auto(GStrv) tracks = NULL;
+	gint64 download_size = 0;
+	g_autoptr(GPtrArray) media = g_ptr_array_new_with_free_func (g_object_unref);
+	g_autoptr(GPtrArray) channels = g_ptr_array_new_with_free_func (g_object_unref);
+	g_autoptr(GVariantIter) iter = NULL;
+
+	if (name == NULL)
+		return NULL;
+
+	g_variant_lookup (dict, "common-ids", "^as", &common_ids);
+	g_variant_lookup (dict, "tracks", "^as", &tracks);
+	g_variant_lookup (dict, "download-size", "x", &download_size);
+
+	if (g_variant_lookup (dict, "media", "a(ssuu)", &iter)) {
+		const gchar *type, *url;
+		guint32 width, height;
+
+		while (g_variant_iter_next (iter, "(&s&suu)", &type, &url, &width, &height)) {
+			g_ptr_array_add (media, g_object_new (SNAPD_TYPE_MEDIA,
+							      "type", type,
+							      "url", url,
+							      "width", width,
+							      "height", height,
+							      NULL));
+		}
+		g_clear_pointer (&iter, g_variant_iter_free);
+	}
+
+	if (g_variant_lookup (dict, "channels", "aa{sv}", &iter)) {
+		GVariant *channel_dict;
+
+		while (g_variant_iter_next (iter, "@a{sv}", &channel_dict)) {
+			SnapdChannel *channel = channel_from_variant (channel_dict);
+			if (channel != NULL)
+				g_ptr_array_add (channels, channel);
+			g_variant_unref (channel_dict);
+		}
+	}
+
+	return g_object_new (SNAPD_TYPE_SNAP,
+			     "name", name,
+			     "id", variant_lookup_string (dict, "id"),
+			     "title", variant_lookup_string (dict, "title"),
+			     "summary", variant_lookup_string (dict, "summary"),
+			     "description", variant_lookup_string (dict, "description"),
+			     "version", variant_lookup_string (dict, "version"),
+			     "revision", variant_lookup_string (dict, "revision"),
+			     "channel", variant_lookup_string (dict, "channel"),
+			     "contact", variant_lookup_string (dict, "contact"),
+			     "website", variant_lookup_string (dict, "website"),
+			     "license", variant_lookup_string (dict, "license"),
+			     "publisher-display-name", variant_lookup_string (dict, "publisher-display-name"),
+			     "publisher-username", variant_lookup_string (dict, "publisher-username"),
+			     "common-ids", common_ids,
+			     "tracks", tracks,
+			     "snap-type", variant_lookup_enum (dict, "snap-type", SNAPD_TYPE_SNAP_TYPE, SNAPD_SNAP_TYPE_UNKNOWN),
+			     "confinement", variant_lookup_enum (dict, "confinement", SNAPD_TYPE_CONFINEMENT, SNAPD_CONFINEMENT_UNKNOWN),
+			     "publisher-validation", variant_lookup_enum (dict, "publisher-validation", SNAPD_TYPE_PUBLISHER_VALIDATION, SNAPD_PUBLISHER_VALIDATION_UNKNOWN),
+			     "download-size", download_size,
+			     "media", media,
+			     "channels", channels,
+			     NULL);
+}
+
+#define STORE_CACHE_VARIANT_TYPE "(usa{s(bxa{sv})}a{s(xas)})"
+
+static void
+store_cache_load (GsPluginSnap *self)
+{
+	g_autoptr(GMappedFile) mapped_file = NULL;
+	g_autoptr(GBytes) bytes = NULL;
+	g_autoptr(GVariant) variant = NULL;
+	g_autoptr(GVariantIter) snaps_iter = NULL;
+	g_autoptr(GVariantIter) sections_iter = NULL;
+	g_autoptr(GError) local_error = NULL;
+	guint32 version;
+	const gchar *store_name, *name;
+	gboolean full_details;
+	gint64 expiry_time;
+	GVariant *snap_variant;
+	gchar **names;
+	gint64 now = g_get_real_time ();
+
+	mapped_file = g_mapped_file_new (self->store_cache_filename, FALSE, &local_error);
+	if (mapped_file == NULL) {
+		if (!g_error_matches (local_error, G_FILE_ERROR, G_FILE_ERROR_NOENT))
+			g_debug ("Failed to load store cache: %s", local_error->message);
+		return;
+	}
+
+	bytes = g_mapped_file_get_bytes (mapped_file);
+	variant = g_variant_ref_sink (g_variant_new_from_bytes (G_VARIANT_TYPE (STORE_CACHE_VARIANT_TYPE), bytes, FALSE));
+	g_variant_get (variant, "(u&sa{s(bxa{sv})}a{s(xas)})",
+		       &version, &store_name, &snaps_iter, &sections_iter);
+
+	/* the cache may be from a different store */
+	if (version != STORE_CACHE_FORMAT_VERSION ||
+	    g_strcmp0 (store_name, self->store_name) != 0) {
+		g_debug ("Ignoring out of date store cache");
+		return;
+	}
+
+	/* entries are stored least recently used first */
+	while (g_variant_iter_next (snaps_iter, "{&s(bx@a{sv})}",
+				    &name, &full_details, &expiry_time, &snap_variant)) {
+		g_autoptr(SnapdSnap) snap = NULL;
+
+		if (expiry_time > now)
+			snap = snap_from_variant (snap_variant);
+		if (snap != NULL)
+			store_snap_cache_insert (self, snap, full_details, expiry_time);
+
+		g_variant_unref (snap_variant);
+	}
+
+	while (g_variant_iter_next (sections_iter, "{&s(x^as)}", &name, &expiry_time, &names)) {
+		SectionCacheEntry *entry;
+
+		if (expiry_time <= now) {
+			g_strfreev (names);
+			continue;
+		}
+
+		entry = g_new0 (SectionCacheEntry, 1);
+		entry->names = names;
+		entry->expiry_time = expiry_time;
+		g_hash_table_replace (self->store_sections, g_strdup (name), entry);
+	}
+
+	g_debug ("Loaded %u snaps and %u sections from store cache",
+		 g_hash_table_size (self->store_snaps),
+		 g_hash_table_size (self->store_sections));
+}
+
+static gboolean
+store_cache_save_cb (gpointer user_data)
+{
+	GsPluginSnap *self = GS_PLUGIN_SNAP (user_data);
+	GVariantBuilder snaps_builder;
+	GVariantBuilder sections_builder;
+	GHashTableIter iter;
+	gpointer key, value;
+	g_autoptr(GVariant) variant = NULL;
+	g_autoptr(GBytes) bytes = NULL;
+	g_autoptr(GError) local_error = NULL;
+
+	self->store_cache_save_id = 0;
+
+	g_variant_builder_init (&snaps_builder, G_VARIANT_TYPE ("a{s(bxa{sv})}"));
+	for (GList *l = self->store_snaps_lru.tail; l != NULL; l = l->prev) {
+		CacheEntry *entry = l->data;
+		g_variant_builder_add (&snaps_builder, "{s(bx@a{sv})}",
+				       entry->name, entry->full_details, entry->expiry_time,
+				       snap_to_variant (entry->snap));
+	}
+
+	g_variant_builder_init (&sections_builder, G_VARIANT_TYPE ("a{s(xas)}"));
+	g_hash_table_iter_init (&iter, self->store_sections);
+	while (g_hash_table_iter_next (&iter, &key, &value)) {
+		SectionCacheEntry *entry = value;
+		g_variant_builder_add (&sections_builder, "{s(x^as)}",
+				       (const gchar *) key, entry->expiry_time, entry->names);
+	}
+
+	variant = g_variant_ref_sink (g_variant_new ("(usa{s(bxa{sv})}a{s(xas)})",
+						     (guint32) STORE_CACHE_FORMAT_VERSION,
+						     (self->store_name != NULL) ? self->store_name : "",
+						     &snaps_builder, &sections_builder));
+	bytes = g_variant_get_data_as_bytes (variant);
+
+	if (!g_file_set_contents (self->store_cache_filename,
+				  g_bytes_get_data (bytes, NULL),
+				  (gssize) g_bytes_get_size (bytes),
+				  &local_error))
+		g_debug ("Failed to save store cache: %s", local_error->message);
+
+	return G_SOURCE_REMOVE;
+}
+
+static void
+store_cache_queue_save (GsPluginSnap *self)
+{
+	if (self->store_cache_filename == NULL || self->store_cache_save_id != 0)
+		return;
+
+	self->store_cache_save_id = g_timeout_add_seconds (STORE_CACHE_SAVE_TIMEOUT_SECS,
+							   store_cache_save_cb, self);
+}
+
+typedef struct {
+	GsPluginSnap *self;  /* (owned) */
+	gchar *key;  /* (owned) */
+	gchar *section;  /* (owned) (nullable) */
+	gboolean full_details;
+} FindData;
+
+static void
+find_data_free (FindData *data)
+{
+	g_object_unref (data->self);
+	g_free (data->key);
+	g_free (data->section);
+	g_free (data);
+}
+
+static void find_category_shared_cb (GObject      *source_object,
+                                     GAsyncResult *result,
+                                     gpointer      user_data);
+
+/* Wrapper around snapd_client_find_category_async() which shares one snapd
+ * request between all concurrent callers making the same query, and caches
+ * the results. */
+static void
+find_category_shared_async (GsPluginSnap        *self,
+                            SnapdClient         *client,
+                            SnapdFindFlags       flags,
+                            const gchar         *section,
+                            const gchar         *query,
+                            GCancellable        *cancellable,
+                            GAsyncReadyCallback  callback,
+                            gpointer             user_data)
+{
+	g_autoptr(GTask) task = NULL;
+	g_autofree gchar *key = NULL;
+	GPtrArray *waiters;
+	FindData *data;
+
+	task = g_task_new (self, cancellable, callback, user_data);
+	g_task_set_source_tag (task, find_category_shared_async);
+
+	key = g_strdup_printf ("%u\n%s\n%s", (guint) flags,
+			       (section != NULL) ? section : "",
+			       (query != NULL) ? query : "");
+	waiters = g_hash_table_lookup (self->pending_finds, key);
+	if (waiters != NULL) {
+		g_debug ("Sharing in-flight snapd query for section ‘%s’, query ‘%s’",
+			 (section != NULL) ? section : "", (query != NULL) ? query : "");
+		g_ptr_array_add (waiters, g_steal_pointer (&task));
+		return;
+	}
+
+	waiters = g_ptr_array_new_with_free_func (g_object_unref);
+	g_ptr_array_add (waiters, g_steal_pointer (&task));
+	g_hash_table_insert (self->pending_finds, g_strdup (key), waiters);
+
+	data = g_new0 (FindData, 1);
+	data->self = g_object_ref (self);
+	data->key = g_steal_pointer (&key);
+	data->section = g_strdup ((query == NULL) ? section : NULL);
+	data->full_details = (flags & SNAPD_FIND_FLAGS_MATCH_NAME) != 0;
+
+	/* The request isn’t cancellable as other callers may be waiting on it;
+	 * each caller’s task is checked for cancellation when it returns. */
+	snapd_client_find_category_async (client, flags, section, query,
+					 NULL, find_category_shared_cb, data);
+}
+
+static void
+find_category_shared_cb (GObject      *source_object,
+                         GAsyncResult *result,
+                         gpointer      user_data)
+{
+	SnapdClient *client = SNAPD_CLIENT (source_object);
+	FindData *data = user_data;
+	GsPluginSnap *self = data->self;
+	g_autoptr(GPtrArray) snaps = NULL;
+	g_autoptr(GPtrArray) waiters = NULL;
+	g_autofree gchar *key = NULL;
+	g_autoptr(GError) local_error = NULL;
+
+	snaps = snapd_client_find_category_finish (client, result, NULL, &local_error);
+
+	if (snaps != NULL) {
+		store_snap_cache_update (self, snaps, data->full_details);
+		if (data->section != NULL)
+			store_section_cache_update (self, data->section, snaps);
+	} else {
+		snapd_error_convert (&local_error);
+	}
+
+	if (!g_hash_table_steal_extended (self->pending_finds, data->key,
+					  (gpointer *) &key, (gpointer *) &waiters))
+		g_assert_not_reached ();
+
+	for (guint i = 0; i < waiters->len; i++) {
+		GTask *task = g_ptr_array_index (waiters, i);
+
+		if (snaps != NULL)
+			g_task_return_pointer (task, g_ptr_array_ref (snaps), (GDestroyNotify) g_ptr_array_unref);
+		else
+			g_task_return_error (task, g_error_copy (local_error));
+	}
+
+	find_data_free (data);
+}
+
+static GPtrArray *
+find_category_shared_finish (GsPluginSnap  *self,
+                             GAsyncResult  *result,
+                             GError       **error)
+{
+	g_return_val_if_fail (g_task_is_valid (result, self), NULL);
+	g_return_val_if_fail (g_async_result_is_tagged (result, find_category_shared_async), NULL);
+
+	return g_task_propagate_pointer (G_TASK (result), error);
+}
+
 static gchar *
 get_appstream_id (SnapdSnap *snap)
 {
@@ -566,6 +1152,17 @@ gs_plugin_snap_dispose (GObject *object)
 
 	g_clear_pointer (&self->store_name, g_free);
 	g_clear_pointer (&self->store_hostname, g_free);
+	/* write out any pending changes to the store cache */
+	if (self->store_cache_save_id != 0) {
+		g_clear_handle_id (&self->store_cache_save_id, g_source_remove);
+		store_cache_save_cb (self);
+	}
+
+	g_clear_pointer (&self->store_cache_filename, g_free);
+	g_clear_pointer (&self->pending_finds, g_hash_table_unref);
+	g_clear_pointer (&self->store_sections, g_hash_table_unref);
+	/* the links are embedded in the cache entries, so are freed with them */
+	g_queue_init (&self->store_snaps_lru);
 	g_clear_pointer (&self->store_snaps, g_hash_table_unref);
 
 	G_OBJECT_CLASS (gs_plugin_snap_parent_class)->dispose (object);
@@ -651,6 +1248,20 @@ static void list_apps_for_update_cb (GObject      *source_object,
 static void finish_list_apps_op (GTask  *task,
                                  GError *error);
 
+static void
+list_apps_add_snaps (GsPluginSnap *self,
+                     GsAppList    *list,
+                     GPtrArray    *snaps)
+{
+	for (guint i = 0; i < snaps->len; i++) {
+		SnapdSnap *snap = g_ptr_array_index (snaps, i);
+		g_autoptr(GsApp) app = NULL;
+
+		app = snap_to_app (self, snap, NULL);
+		gs_app_list_add (list, app);
+	}
+}
+
 static void
 gs_plugin_snap_list_apps_async (GsPlugin              *plugin,
                                 GsAppQuery            *query,
@@ -766,8 +1377,8 @@ gs_plugin_snap_list_apps_async (GsPlugin              *plugin,
 
 		query_str = g_strjoinv (" ", (gchar **) keywords);
 		data->n_pending_ops++;
-		snapd_client_find_category_async (client, SNAPD_FIND_FLAGS_SCOPE_WIDE, NULL, query_str,
-						 cancellable, list_apps_cb, g_steal_pointer (&task));
+		find_category_shared_async (self, client, SNAPD_FIND_FLAGS_SCOPE_WIDE, NULL, query_str,
+					    cancellable, list_apps_cb, g_steal_pointer (&task));
 		return;
 	}
 
@@ -815,9 +1426,16 @@ gs_plugin_snap_list_apps_async (GsPlugin              *plugin,
 	data->n_pending_ops = 1;
 
 	for (gsize i = 0; sections != NULL && sections[i] != NULL; i++) {
+		g_autoptr(GPtrArray) cached_snaps = store_section_cache_lookup (self, sections[i]);
+
+		if (cached_snaps != NULL) {
+			list_apps_add_snaps (self, data->results_list, cached_snaps);
+			continue;
+		}
+
 		data->n_pending_ops++;
-		snapd_client_find_category_async (client, SNAPD_FIND_FLAGS_SCOPE_WIDE, sections[i], NULL,
-						 cancellable, list_apps_cb, g_object_ref (task));
+		find_category_shared_async (self, client, SNAPD_FIND_FLAGS_SCOPE_WIDE, sections[i], NULL,
+					    cancellable, list_apps_cb, g_object_ref (task));
 	}
 
 	finish_list_apps_op (task, NULL);
@@ -929,28 +1547,16 @@ list_apps_cb (GObject      *source_object,
               GAsyncResult *result,
               gpointer      user_data)
 {
-	SnapdClient *client = SNAPD_CLIENT (source_object);
+	GsPluginSnap *self = GS_PLUGIN_SNAP (source_object);
 	g_autoptr(GTask) task = G_TASK (user_data);
-	GsPluginSnap *self = g_task_get_source_object (task);
 	ListAppsData *data = g_task_get_task_data (task);
 	g_autoptr(GPtrArray) snaps = NULL;
 	g_autoptr(GError) local_error = NULL;
 
-	snaps = snapd_client_find_category_finish (client, result, NULL, &local_error);
+	snaps = find_category_shared_finish (self, result, &local_error);
 
-	if (snaps != NULL) {
-		store_snap_cache_update (self, snaps, FALSE);
-
-		for (guint i = 0; i < snaps->len; i++) {
-			SnapdSnap *snap = g_ptr_array_index (snaps, i);
-			g_autoptr(GsApp) app = NULL;
-
-			app = snap_to_app (self, snap, NULL);
-			gs_app_list_add (data->results_list, app);
-		}
-	} else {
-		snapd_error_convert (&local_error);
-	}
+	if (snaps != NULL)
+		list_apps_add_snaps (self, data->results_list, snaps);
 
 	finish_list_apps_op (task, g_steal_pointer (&local_error));
 }
@@ -1028,31 +1634,6 @@ gs_plugin_snap_list_apps_finish (GsPlugin      *plugin,
 	return g_task_propagate_pointer (G_TASK (result), error);
 }
 
-static SnapdSnap *
-get_store_snap (GsPluginSnap  *self,
-                SnapdClient   *client,
-                const gchar   *name,
-                gboolean       need_details,
-                GCancellable  *cancellable,
-                GError       **error)
-{
-	SnapdSnap *snap = NULL;
-	g_autoptr(GPtrArray) snaps = NULL;
-
-	/* use cached version if available */
-	snap = store_snap_cache_lookup (self, name, need_details);
-	if (snap != NULL)
-		return g_object_ref (snap);
-
-	snaps = find_snaps (self, client,
-			    SNAPD_FIND_FLAGS_SCOPE_WIDE | SNAPD_FIND_FLAGS_MATCH_NAME,
-			    NULL, name, cancellable, error);
-	if (snaps == NULL || snaps->len < 1)
-		return NULL;
-
-	return g_object_ref (g_ptr_array_index (snaps, 0));
-}
-
 static void get_store_snap_cb (GObject      *source_object,
                                GAsyncResult *result,
                                gpointer      user_data);
@@ -1075,15 +1656,15 @@ get_store_snap_async (GsPluginSnap        *self,
 	/* use cached version if available */
 	snap = store_snap_cache_lookup (self, name, need_details);
 	if (snap != NULL) {
-		g_task_return_pointer (task, g_object_ref (snap), (GDestroyNotify) g_object_unref);
+		g_task_return_pointer (task, snap, (GDestroyNotify) g_object_unref);
 		return;
 	}
 
-	snapd_client_find_category_async (client,
-					 SNAPD_FIND_FLAGS_SCOPE_WIDE | SNAPD_FIND_FLAGS_MATCH_NAME,
-					 NULL, name,
-					 cancellable,
-					 get_store_snap_cb, g_steal_pointer (&task));
+	find_category_shared_async (self, client,
+				    SNAPD_FIND_FLAGS_SCOPE_WIDE | SNAPD_FIND_FLAGS_MATCH_NAME,
+				    NULL, name,
+				    cancellable,
+				    get_store_snap_cb, g_steal_pointer (&task));
 }
 
 static void
@@ -1091,19 +1672,19 @@ get_store_snap_cb (GObject      *source_object,
                    GAsyncResult *result,
                    gpointer      user_data)
 {
-	SnapdClient *client = SNAPD_CLIENT (source_object);
+	GsPluginSnap *self = GS_PLUGIN_SNAP (source_object);
 	g_autoptr(GTask) task = g_steal_pointer (&user_data);
-	GsPluginSnap *self = g_task_get_source_object (task);
 	g_autoptr(GPtrArray) snaps = NULL;
 	g_autoptr(GError) local_error = NULL;
 
-	snaps = snapd_client_find_category_finish (client, result, NULL, &local_error);
+	snaps = find_category_shared_finish (self, result, &local_error);
 
-	if (snaps == NULL || snaps->len < 1) {
-		snapd_error_convert (&local_error);
+	if (snaps == NULL) {
 		g_task_return_error (task, g_steal_pointer (&local_error));
+	} else if (snaps->len < 1) {
+		g_task_return_new_error (task, GS_PLUGIN_ERROR, GS_PLUGIN_ERROR_NOT_SUPPORTED,
+					 "No snap found");
 	} else {
-		store_snap_cache_update (self, snaps, TRUE);
 		g_task_return_pointer (task, g_object_ref (g_ptr_array_index (snaps, 0)), (GDestroyNotify) g_object_unref);
 	}
 }
@@ -1509,6 +2090,61 @@ static void get_icon_cb (GObject      *object,
                          GAsyncResult *result,
                          gpointer      user_data);
 
+/* State for refining a list of apps once the local snaps are known. Store
+ * snaps which need fetching with full details are all requested at once, so
+ * that they share in-flight requests with other queries. */
+typedef struct {
+	GTask *task;  /* (owned) */
+	SnapdClient *client;  /* (owned) */
+	GPtrArray *local_snaps;  /* (owned) (element-type SnapdSnap) */
+	GHashTable *store_snaps;  /* (owned) (element-type utf8 SnapdSnap) (nullable values); snaps fetched with full details */
+	guint n_pending_ops;
+} RefineSnapsData;
+
+static void
+store_snap_unref_nullable (gpointer snap)
+{
+	if (snap != NULL)
+		g_object_unref (snap);
+}
+
+static void
+refine_snaps_data_free (RefineSnapsData *rdata)
+{
+	g_clear_object (&rdata->task);
+	g_clear_object (&rdata->client);
+	g_clear_pointer (&rdata->local_snaps, g_ptr_array_unref);
+	g_clear_pointer (&rdata->store_snaps, g_hash_table_unref);
+	g_free (rdata);
+}
+
+static gboolean
+refine_needs_store_details (GsPluginSnap               *self,
+                            GsApp                      *app,
+                            const gchar                *snap_name,
+                            GsPluginRefineRequireFlags  require_flags)
+{
+	g_autoptr(SnapdSnap) store_snap = NULL;
+	g_autofree gchar *store_channel = NULL;
+	const gchar *channel = gs_app_get_branch (app);
+
+	if ((require_flags & GS_PLUGIN_REFINE_REQUIRE_FLAGS_SCREENSHOTS) != 0)
+		return TRUE;
+
+	/* information we already have may be for a different channel */
+	store_snap = store_snap_cache_lookup (self, snap_name, FALSE);
+	if (store_snap != NULL)
+		store_channel = expand_channel_name (snapd_snap_get_channel (store_snap));
+
+	return (channel != NULL && g_strcmp0 (store_channel, channel) != 0);
+}
+
+static void refine_get_store_snap_cb (GObject      *source_object,
+                                      GAsyncResult *result,
+                                      gpointer      user_data);
+static void finish_refine_snaps_op (RefineSnapsData *rdata);
+static void refine_apps_with_snaps (RefineSnapsData *rdata);
+
 static void
 get_snaps_cb (GObject      *object,
               GAsyncResult *result,
@@ -1519,9 +2155,7 @@ get_snaps_cb (GObject      *object,
 	GsPluginSnap *self = g_task_get_source_object (task);
 	GCancellable *cancellable = g_task_get_cancellable (task);
 	GsPluginRefineData *data = g_task_get_task_data (task);
-	GsAppList *list = data->list;
-	GsPluginRefineRequireFlags require_flags = data->require_flags;
-	g_autoptr(GsAppList) get_icons_list = NULL;
+	RefineSnapsData *rdata;
 	g_autoptr(GPtrArray) local_snaps = NULL;
 	g_autoptr(GError) local_error = NULL;
 
@@ -1531,13 +2165,83 @@ get_snaps_cb (GObject      *object,
 		return;
 	}
 
+	rdata = g_new0 (RefineSnapsData, 1);
+	rdata->task = g_steal_pointer (&task);
+	rdata->client = g_object_ref (client);
+	rdata->local_snaps = g_steal_pointer (&local_snaps);
+	rdata->store_snaps = g_hash_table_new_full (g_str_hash, g_str_equal, g_free, store_snap_unref_nullable);
+	rdata->n_pending_ops = 1;
+
+	/* fetch the store snaps which need more details than are cached */
+	for (guint i = 0; i < gs_app_list_length (data->list); i++) {
+		GsApp *app = gs_app_list_index (data->list, i);
+		const gchar *snap_name = gs_app_get_metadata_item (app, "snap::name");
+
+		if (snap_name == NULL ||
+		    g_hash_table_contains (rdata->store_snaps, snap_name) ||
+		    !refine_needs_store_details (self, app, snap_name, data->require_flags))
+			continue;
+
+		g_hash_table_insert (rdata->store_snaps, g_strdup (snap_name), NULL);
+		rdata->n_pending_ops++;
+		get_store_snap_async (self, client, snap_name, TRUE, cancellable,
+				      refine_get_store_snap_cb, rdata);
+	}
+
+	finish_refine_snaps_op (rdata);
+}
+
+static void
+refine_get_store_snap_cb (GObject      *source_object,
+                          GAsyncResult *result,
+                          gpointer      user_data)
+{
+	GsPluginSnap *self = GS_PLUGIN_SNAP (source_object);
+	RefineSnapsData *rdata = user_data;
+	g_autoptr(SnapdSnap) store_snap = NULL;
+	g_autoptr(GError) local_error = NULL;
+
+	/* errors are ignored; the app is refined with what is known */
+	store_snap = get_store_snap_finish (self, result, &local_error);
+	if (store_snap != NULL)
+		g_hash_table_replace (rdata->store_snaps, g_strdup (snapd_snap_get_name (store_snap)), g_steal_pointer (&store_snap));
+	else
+		g_debug ("Failed to get store snap: %s", local_error->message);
+
+	finish_refine_snaps_op (rdata);
+}
+
+static void
+finish_refine_snaps_op (RefineSnapsData *rdata)
+{
+	g_assert (rdata->n_pending_ops > 0);
+	rdata->n_pending_ops--;
+
+	if (rdata->n_pending_ops > 0)
+		return;
+
+	refine_apps_with_snaps (rdata);
+	refine_snaps_data_free (rdata);
+}
+
+static void
+refine_apps_with_snaps (RefineSnapsData *rdata)
+{
+	SnapdClient *client = rdata->client;
+	g_autoptr(GTask) task = g_steal_pointer (&rdata->task);
+	GsPluginSnap *self = g_task_get_source_object (task);
+	GCancellable *cancellable = g_task_get_cancellable (task);
+	GsPluginRefineData *data = g_task_get_task_data (task);
+	GsAppList *list = data->list;
+	GsPluginRefineRequireFlags require_flags = data->require_flags;
+	g_autoptr(GsAppList) get_icons_list = NULL;
+
 	for (guint i = 0; i < gs_app_list_length (list); i++) {
 		GsApp *app = gs_app_list_index (list, i);
 		const gchar *snap_name, *name, *website, *contact, *version;
 		g_autofree gchar *channel = NULL;
-		g_autofree gchar *store_channel = NULL;
 		g_autofree gchar *tracking_channel = NULL;
-		gboolean need_details = FALSE;
+		gpointer fetched_snap;
 		SnapdConfinement confinement = SNAPD_CONFINEMENT_UNKNOWN;
 		SnapdSnap *local_snap, *snap;
 		g_autoptr(SnapdSnap) store_snap = NULL;
@@ -1548,22 +2252,14 @@ get_snaps_cb (GObject      *object,
 		snap_name = gs_app_get_metadata_item (app, "snap::name");
 		channel = g_strdup (gs_app_get_branch (app));
 
-		/* get information from locally installed snaps and information we already have */
-		local_snap = find_snap_in_array (local_snaps, snap_name);
-		store_snap = store_snap_cache_lookup (self, snap_name, FALSE);
-		if (store_snap != NULL)
-			store_channel = expand_channel_name (snapd_snap_get_channel (store_snap));
-
-		/* check if requested information requires us to go to the Snap Store */
-		if ((require_flags & GS_PLUGIN_REFINE_REQUIRE_FLAGS_SCREENSHOTS) != 0)
-			need_details = TRUE;
-		if (channel != NULL && g_strcmp0 (store_channel, channel) != 0)
-			need_details = TRUE;
-		if (need_details) {
-			g_clear_object (&store_snap);
-			store_snap = get_store_snap (self, client, snap_name, need_details,
-						     cancellable, NULL);
-		}
+		/* get information from locally installed snaps, and from the
+		 * Snap Store if it was fetched above or is already known */
+		local_snap = find_snap_in_array (rdata->local_snaps, snap_name);
+		if (snap_name != NULL &&
+		    g_hash_table_lookup_extended (rdata->store_snaps, snap_name, NULL, &fetched_snap))
+			store_snap = (fetched_snap != NULL) ? g_object_ref (fetched_snap) : NULL;
+		else if (snap_name != NULL)
+			store_snap = store_snap_cache_lookup (self, snap_name, FALSE);
 
 		/* we don't know anything about this snap */
 		if (local_snap == NULL && store_snap == NULL)
@@ -15,6 +15,7 @@
 #include "gs-test.h"
 
 static gboolean snap_installed = FALSE;
+static guint n_find_category_calls = 0;
 
 SnapdAuthData *
 snapd_login_sync (const gchar *username, const gchar *password, const gchar *otp,
@@ -69,6 +70,20 @@ snapd_client_get_system_information_sync (SnapdClient *client, GCancellable *can
 			     NULL);
 }
 
+void
+snapd_client_get_system_information_async (SnapdClient *client, GCancellable *cancellable,
+					   GAsyncReadyCallback callback, gpointer user_data)
+{
+	g_autoptr(GTask) task = g_task_new (client, cancellable, callback, user_data);
+	g_task_return_pointer (task, snapd_client_get_system_information_sync (client, cancellable, NULL), g_object_unref);
+}
+
+SnapdSystemInformation *
+snapd_client_get_system_information_finish (SnapdClient *client, GAsyncResult *result, GError **error)
+{
+	return g_task_propagate_pointer (G_TASK (result), error);
+}
+
 static SnapdSnap *
 make_snap (const gchar *name, SnapdSnapStatus status)
 {
@@ -130,6 +145,23 @@ snapd_client_get_snaps_sync (SnapdClient *client,
 	return snaps;
 }
 
+void
+snapd_client_get_snaps_async (SnapdClient *client,
+			      SnapdGetSnapsFlags flags, gchar **names,
+			      GCancellable *cancellable,
+			      GAsyncReadyCallback callback, gpointer user_data)
+{
+	g_autoptr(GTask) task = g_task_new (client, cancellable, callback, user_data);
+	g_task_return_pointer (task, snapd_client_get_snaps_sync (client, flags, names, cancellable, NULL),
+			       (GDestroyNotify) g_ptr_array_unref);
+}
+
+GPtrArray *
+snapd_client_get_snaps_finish (SnapdClient *client, GAsyncResult *result, GError **error)
+{
+	return g_task_propagate_pointer (G_TASK (result), error);
+}
+
 SnapdSnap *
 snapd_client_get_snap_sync (SnapdClient *client,
 			    const gchar *name,
@@ -195,6 +227,45 @@ snapd_client_find_section_sync (SnapdClient *client,
 	return snaps;
 }
 
+static gboolean
+find_category_timeout_cb (gpointer user_data)
+{
+	GTask *task = G_TASK (user_data);
+
+	g_task_return_pointer (task, g_ptr_array_ref (g_task_get_task_data (task)),
+			       (GDestroyNotify) g_ptr_array_unref);
+	return G_SOURCE_REMOVE;
+}
+
+void
+snapd_client_find_category_async (SnapdClient *client,
+				  SnapdFindFlags flags,
+				  const gchar *category, const gchar *query,
+				  GCancellable *cancellable,
+				  GAsyncReadyCallback callback, gpointer user_data)
+{
+	g_autoptr(GTask) task = g_task_new (client, cancellable, callback, user_data);
+	g_autoptr(GSource) source = NULL;
+	GPtrArray *snaps;
+
+	n_find_category_calls++;
+
+	snaps = g_ptr_array_new_with_free_func (g_object_unref);
+	g_ptr_array_add (snaps, make_snap ((query != NULL) ? query : "snap", SNAPD_SNAP_STATUS_AVAILABLE));
+	g_task_set_task_data (task, snaps, (GDestroyNotify) g_ptr_array_unref);
+
+	/* stay in flight for a while, like a real request to the store */
+	source = g_timeout_source_new (50);
+	g_task_attach_source (task, source, find_category_timeout_cb);
+}
+
+GPtrArray *
+snapd_client_find_category_finish (SnapdClient *client, GAsyncResult *result,
+				   gchar **suggested_currency, GError **error)
+{
+	return g_task_propagate_pointer (G_TASK (result), error);
+}
+
 gboolean
 snapd_client_install2_sync (SnapdClient *client,
 			    SnapdInstallFlags flags,
@@ -357,6 +428,211 @@ gs_plugins_snap_test_func (GsPluginLoader *plugin_loader)
 	g_assert (ret);
 }
 
+static GsApp *
+make_store_app (GsPluginLoader *plugin_loader,
+                const gchar    *snap_name)
+{
+	g_autofree gchar *id = g_strdup_printf ("io.snapcraft.%s-%s", snap_name, snap_name);
+	GsApp *app = gs_app_new (id);
+
+	gs_app_set_management_plugin (app, gs_plugin_loader_find_plugin (plugin_loader, "snap"));
+	gs_app_set_bundle_kind (app, AS_BUNDLE_KIND_SNAP);
+	gs_app_set_metadata (app, "snap::name", snap_name);
+
+	return app;
+}
+
+static void
+refine_store_app (GsPluginLoader *plugin_loader,
+                  GsApp          *app)
+{
+	g_autoptr(GsPluginJob) plugin_job = NULL;
+	g_autoptr(GError) error = NULL;
+	gboolean ret;
+
+	plugin_job = gs_plugin_job_refine_new_for_app (app, GS_PLUGIN_REFINE_FLAGS_NONE,
+						       GS_PLUGIN_REFINE_REQUIRE_FLAGS_SCREENSHOTS);
+	ret = gs_plugin_loader_job_process (plugin_loader, plugin_job, NULL, &error);
+	gs_test_flush_main_context ();
+	g_assert_no_error (error);
+	g_assert_true (ret);
+}
+
+/* The store cache from a previous session, written before the plugin is set
+ * up. Only the fields the plugin uses are read back, and entries which can’t
+ * be read are dropped. */
+static void
+write_store_cache (void)
+{
+	g_autofree gchar *filename = NULL;
+	GVariantBuilder snaps_builder, snap_builder, channel_builder, channels_builder, media_builder;
+	gint64 expiry_time = g_get_real_time () + G_USEC_PER_SEC * 60 * 60;
+	g_autoptr(GVariant) variant = NULL;
+	g_autoptr(GError) error = NULL;
+	gboolean ret;
+
+	filename = gs_utils_get_cache_filename ("snap", "store-cache.gvariant",
+						GS_UTILS_CACHE_FLAG_WRITEABLE |
+						GS_UTILS_CACHE_FLAG_CREATE_DIRECTORY,
+						&error);
+	g_assert_no_error (error);
+
+	g_variant_builder_init (&channel_builder, G_VARIANT_TYPE_VARDICT);
+	g_variant_builder_add (&channel_builder, "{sv}", "name", g_variant_new_string ("stable"));
+	g_variant_builder_add (&channel_builder, "{sv}", "track", g_variant_new_string ("latest"));
+	g_variant_builder_add (&channel_builder, "{sv}", "risk", g_variant_new_string ("stable"));
+	g_variant_builder_add (&channel_builder, "{sv}", "version", g_variant_new_string ("1.0"));
+	g_variant_builder_add (&channel_builder, "{sv}", "released-at", g_variant_new_int64 (1500000000));
+	g_variant_builder_init (&channels_builder, G_VARIANT_TYPE ("aa{sv}"));
+	g_variant_builder_add_value (&channels_builder, g_variant_builder_end (&channel_builder));
+
+	g_variant_builder_init (&media_builder, G_VARIANT_TYPE ("a(ssuu)"));
+	g_variant_builder_add (&media_builder, "(ssuu)", "screenshot", "http://example.com/cached.jpg", 800, 600);
+
+	g_variant_builder_init (&snap_builder, G_VARIANT_TYPE_VARDICT);
+	g_variant_builder_add (&snap_builder, "{sv}", "name", g_variant_new_string ("cached"));
+	g_variant_builder_add (&snap_builder, "{sv}", "title", g_variant_new_string ("Cached Title"));
+	g_variant_builder_add (&snap_builder, "{sv}", "summary", g_variant_new_string ("CACHED SUMMARY"));
+	g_variant_builder_add (&snap_builder, "{sv}", "channel", g_variant_new_string ("stable"));
+	g_variant_builder_add (&snap_builder, "{sv}", "publisher-display-name", g_variant_new_string ("Publisher"));
+	g_variant_builder_add (&snap_builder, "{sv}", "snap-type", g_variant_new_int32 (SNAPD_SNAP_TYPE_APP));
+	g_variant_builder_add (&snap_builder, "{sv}", "download-size", g_variant_new_int64 (1234));
+	g_variant_builder_add (&snap_builder, "{sv}", "channels", g_variant_builder_end (&channels_builder));
+	g_variant_builder_add (&snap_builder, "{sv}", "media", g_variant_builder_end (&media_builder));
+	/* wrongly typed and unknown fields are ignored */
+	g_variant_builder_add (&snap_builder, "{sv}", "version", g_variant_new_int32 (3));
+	g_variant_builder_add (&snap_builder, "{sv}", "SnapdUnknownType", g_variant_new_string ("ignored"));
+
+	g_variant_builder_init (&snaps_builder, G_VARIANT_TYPE ("a{s(bxa{sv})}"));
+	g_variant_builder_add (&snaps_builder, "{s(bx@a{sv})}", "cached", TRUE, expiry_time,
+			       g_variant_builder_end (&snap_builder));
+
+	/* no name, so it can’t be used */
+	g_variant_builder_init (&snap_builder, G_VARIANT_TYPE_VARDICT);
+	g_variant_builder_add (&snap_builder, "{sv}", "title", g_variant_new_string ("Broken"));
+	g_variant_builder_add (&snaps_builder, "{s(bx@a{sv})}", "broken", TRUE, expiry_time,
+			       g_variant_builder_end (&snap_builder));
+
+	variant = g_variant_ref_sink (g_variant_new ("(usa{s(bxa{sv})}a{s(xas)})",
+						     (guint32) 2, "Snap Store", &snaps_builder, NULL));
+	ret = g_file_set_contents (filename, g_variant_get_data (variant), g_variant_get_size (variant), &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+}
+
+static void
+gs_plugins_snap_store_cache_func (GsPluginLoader *plugin_loader)
+{
+	g_autoptr(GsApp) cached_app = NULL;
+	g_autoptr(GsApp) broken_app = NULL;
+	GPtrArray *screenshots;
+	GsSizeType size_download_type;
+	guint64 size_download_bytes;
+	guint n_calls;
+
+	/* no snap, abort */
+	if (!gs_plugin_loader_get_enabled (plugin_loader, "snap")) {
+		g_test_skip ("not enabled");
+		return;
+	}
+
+	/* answered from the cache, without asking snapd */
+	n_calls = n_find_category_calls;
+	cached_app = make_store_app (plugin_loader, "cached");
+	refine_store_app (plugin_loader, cached_app);
+	g_assert_cmpuint (n_find_category_calls, ==, n_calls);
+
+	g_assert_cmpstr (gs_app_get_name (cached_app), ==, "Cached Title");
+	g_assert_cmpstr (gs_app_get_summary (cached_app), ==, "CACHED SUMMARY");
+	g_assert_cmpstr (gs_app_get_developer_name (cached_app), ==, "Publisher");
+	g_assert_cmpstr (gs_app_get_branch (cached_app), ==, "latest/stable");
+	g_assert_cmpstr (gs_app_get_version (cached_app), ==, "1.0");
+	g_assert_cmpuint (gs_app_get_release_date (cached_app), ==, 1500000000);
+	size_download_type = gs_app_get_size_download (cached_app, &size_download_bytes);
+	g_assert_cmpint (size_download_type, ==, GS_SIZE_TYPE_VALID);
+	g_assert_cmpuint (size_download_bytes, ==, 1234);
+	screenshots = gs_app_get_screenshots (cached_app);
+	g_assert_cmpuint (screenshots->len, ==, 1);
+
+	/* the unreadable entry was dropped, so snapd is asked */
+	n_calls = n_find_category_calls;
+	broken_app = make_store_app (plugin_loader, "broken");
+	refine_store_app (plugin_loader, broken_app);
+	g_assert_cmpuint (n_find_category_calls, ==, n_calls + 1);
+	g_assert_cmpstr (gs_app_get_name (broken_app), ==, "broken");
+}
+
+static void
+async_result_cb (GObject      *source_object,
+                 GAsyncResult *result,
+                 gpointer      user_data)
+{
+	GAsyncResult **result_out = user_data;
+
+	g_assert (result_out != NULL && *result_out == NULL);
+	*result_out = g_object_ref (result);
+	g_main_context_wakeup (g_main_context_get_thread_default ());
+}
+
+static void
+gs_plugins_snap_shared_queries_func (GsPluginLoader *plugin_loader)
+{
+	g_autoptr(GsApp) app1 = NULL;
+	g_autoptr(GsApp) app2 = NULL;
+	g_autoptr(GsPluginJob) plugin_job1 = NULL;
+	g_autoptr(GsPluginJob) plugin_job2 = NULL;
+	g_autoptr(GMainContext) context = NULL;
+	g_autoptr(GAsyncResult) result1 = NULL;
+	g_autoptr(GAsyncResult) result2 = NULL;
+	g_autoptr(GError) error = NULL;
+	gboolean ret;
+	guint n_calls;
+
+	/* no snap, abort */
+	if (!gs_plugin_loader_get_enabled (plugin_loader, "snap")) {
+		g_test_skip ("not enabled");
+		return;
+	}
+
+	/* refining two apps for the same snap at once needs one request */
+	n_calls = n_find_category_calls;
+	app1 = make_store_app (plugin_loader, "shared");
+	app2 = make_store_app (plugin_loader, "shared");
+
+	context = g_main_context_new ();
+	g_main_context_push_thread_default (context);
+
+	plugin_job1 = gs_plugin_job_refine_new_for_app (app1, GS_PLUGIN_REFINE_FLAGS_NONE,
+							GS_PLUGIN_REFINE_REQUIRE_FLAGS_SCREENSHOTS);
+	gs_plugin_loader_job_process_async (plugin_loader, plugin_job1, NULL, async_result_cb, &result1);
+	plugin_job2 = gs_plugin_job_refine_new_for_app (app2, GS_PLUGIN_REFINE_FLAGS_NONE,
+							GS_PLUGIN_REFINE_REQUIRE_FLAGS_SCREENSHOTS);
+	gs_plugin_loader_job_process_async (plugin_loader, plugin_job2, NULL, async_result_cb, &result2);
+
+	while (result1 == NULL || result2 == NULL)
+		g_main_context_iteration (context, TRUE);
+
+	g_main_context_pop_thread_default (context);
+	gs_test_flush_main_context ();
+
+	ret = gs_plugin_loader_job_process_finish (plugin_loader, result1, NULL, &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+	ret = gs_plugin_loader_job_process_finish (plugin_loader, result2, NULL, &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+
+	g_assert_cmpuint (n_find_category_calls, ==, n_calls + 1);
+	g_assert_cmpstr (gs_app_get_summary (app1), ==, "SUMMARY");
+	g_assert_cmpstr (gs_app_get_summary (app2), ==, "SUMMARY");
+	g_assert_cmpuint (gs_app_get_screenshots (app1)->len, ==, 2);
+	g_assert_cmpuint (gs_app_get_screenshots (app2)->len, ==, 2);
+
+	/* and later refines are answered from the cache */
+	refine_store_app (plugin_loader, app1);
+	g_assert_cmpuint (n_find_category_calls, ==, n_calls + 1);
+}
+
 int
 main (int argc, char **argv)
 {
@@ -370,6 +646,8 @@ main (int argc, char **argv)
 
 	gs_test_init (&argc, &argv);
 
+	write_store_cache ();
+
 	/* we can only load this once per process */
 	plugin_loader = gs_plugin_loader_new (NULL, NULL);
 	gs_plugin_loader_add_location (plugin_loader, LOCALPLUGINDIR);
@@ -386,5 +664,11 @@ main (int argc, char **argv)
 	g_test_add_data_func ("/gnome-software/plugins/snap/test",
 			      plugin_loader,
 			      (GTestDataFunc) gs_plugins_snap_test_func);
+	g_test_add_data_func ("/gnome-software/plugins/snap/store-cache",
+			      plugin_loader,
+			      (GTestDataFunc) gs_plugins_snap_store_cache_func);
+	g_test_add_data_func ("/gnome-software/plugins/snap/shared-queries",
+			      plugin_loader,
+			      (GTestDataFunc) gs_plugins_snap_shared_queries_func);
 	return g_test_run ();
 }
@@ -2139,6 +2139,7 @@ gs_plugin_systemd_sysupdate_target_refresh_metadata_get_app_stream_cb (GObject
 	gs_external_appstream_refresh_async (cache_kind,
 	                                     appstream_urls,
 	                                     self->cache_age_secs,
+	                                     (data->flags & GS_PLUGIN_REFRESH_METADATA_FLAGS_INTERACTIVE) != 0,
 	                                     NULL,
 	                                     NULL,
 	                                     cancellable,
@@ -0,0 +1,849 @@
+/* -*- Mode: C; tab-width: 8; indent-tabs-mode: t; c-basic-offset: 8 -*-
+ * vi:set noexpandtab tabstop=8 shiftwidth=8:
+ *
+ * Copyright (C) 2026 GNOME Foundation, Inc.
+ *
+ * SPDX-License-Identifier: GPL-2.0-or-later
+ */
+
+/**
+ * SECTION:gs-app-list-view
+ * @title: GsAppListView
+ * @stability: Unstable
+ * @short_description: A recycling list of #GsAppRows
+ *
+ * #GsAppListView shows a list of apps using a #GtkListView, so only the rows
+ * which are visible have widgets. Rows are #GsAppRows which get rebound to
+ * other apps as the list is scrolled.
+ *
+ * The apps are held in a #GListStore, and filtering, sorting and sectioning
+ * is done by list models on top of it, so changing the state of one app only
+ * moves that app rather than sorting all the rows again.
+ *
+ * #GsAppListView implements #GtkScrollable, so it should be put in a
+ * #GtkScrolledWindow (optionally through an #AdwClampScrollable) for the
+ * recycling to have any effect.
+ *
+ * ## CSS nodes
+ *
+ * ```
+ * app-list-view
+ * ╰── listview.app-list
+ *     ├── [header]
+ *     ╰── row
+ *         ╰── row.app
+ * ```
+ *
+ * Since: 50
+ */
+
+#include "config.h"
+
+#include "gs-app-list-view.h"
+
+typedef struct
+{
+	GtkListView		*list_view;
+	GListStore		*store;  /* (element-type GsApp) (owned) */
+	GtkFilterListModel	*filter_model;  /* (owned) */
+	GtkSortListModel	*sort_model;  /* (owned) */
+	GtkNoSelection		*selection;  /* (owned) */
+
+	/* Apps in @store, for quick lookups */
+	GHashTable		*apps;  /* (element-type GsApp) (owned) */
+	/* Rows currently bound to an app */
+	GHashTable		*rows;  /* (element-type GsApp GsAppRow) (owned) */
+	/* Apps which are being unrevealed, and will be removed afterwards */
+	GHashTable		*unrevealing;  /* (element-type GsApp) (owned) */
+	GPtrArray		*pending_removals;  /* (element-type GsApp) (owned) */
+	guint			 pending_removals_id;
+
+	GsAppListViewRowFunc	 setup_func;
+	GsAppListViewRowFunc	 bind_func;
+	gpointer		 row_func_data;
+	GsAppListSortFunc	 sort_func;
+	gpointer		 sort_func_data;
+	GsAppListFilterFunc	 filter_func;
+	gpointer		 filter_func_data;
+	GsAppListViewSectionFunc section_func;
+	gpointer		 section_func_data;
+	gchar			**section_titles;
+} GsAppListViewPrivate;
+
+G_DEFINE_TYPE_WITH_CODE (GsAppListView, gs_app_list_view, GTK_TYPE_WIDGET,
+			 G_ADD_PRIVATE (GsAppListView)
+			 G_IMPLEMENT_INTERFACE (GTK_TYPE_SCROLLABLE, NULL))
+
+typedef enum {
+	PROP_HADJUSTMENT = 1,
+	PROP_VADJUSTMENT,
+	PROP_HSCROLL_POLICY,
+	PROP_VSCROLL_POLICY,
+} GsAppListViewProperty;
+
+enum {
+	SIGNAL_APP_ACTIVATED,
+	SIGNAL_APP_UNREVEALED,
+	SIGNAL_LAST
+};
+
+static guint signals [SIGNAL_LAST] = { 0 };
+
+static gboolean
+gs_app_list_view_filter_cb (gpointer item,
+			    gpointer user_data)
+{
+	GsAppListView *self = GS_APP_LIST_VIEW (user_data);
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+
+	if (priv->filter_func == NULL)
+		return TRUE;
+
+	return priv->filter_func (GS_APP (item), priv->filter_func_data);
+}
+
+static gint
+gs_app_list_view_sort_cb (gconstpointer a,
+			  gconstpointer b,
+			  gpointer user_data)
+{
+	GsAppListView *self = GS_APP_LIST_VIEW (user_data);
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+
+	if (priv->sort_func == NULL)
+		return 0;
+
+	return priv->sort_func (GS_APP ((gpointer) a), GS_APP ((gpointer) b), priv->sort_func_data);
+}
+
+static gint
+gs_app_list_view_section_sort_cb (gconstpointer a,
+				  gconstpointer b,
+				  gpointer user_data)
+{
+	GsAppListView *self = GS_APP_LIST_VIEW (user_data);
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+	guint section_a, section_b;
+
+	if (priv->section_func == NULL)
+		return 0;
+
+	section_a = priv->section_func (GS_APP ((gpointer) a), priv->section_func_data);
+	section_b = priv->section_func (GS_APP ((gpointer) b), priv->section_func_data);
+
+	return (section_a > section_b) - (section_a < section_b);
+}
+
+static void
+gs_app_list_view_remove_pending (GsAppListView *self)
+{
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+
+	g_clear_handle_id (&priv->pending_removals_id, g_source_remove);
+	g_ptr_array_set_size (priv->pending_removals, 0);
+	g_hash_table_remove_all (priv->unrevealing);
+}
+
+static gboolean
+gs_app_list_view_pending_removals_cb (gpointer user_data)
+{
+	GsAppListView *self = GS_APP_LIST_VIEW (user_data);
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+	g_autoptr(GPtrArray) pending = NULL;
+
+	priv->pending_removals_id = 0;
+
+	pending = g_steal_pointer (&priv->pending_removals);
+	priv->pending_removals = g_ptr_array_new_with_free_func (g_object_unref);
+
+	for (guint i = 0; i < pending->len; i++) {
+		GsApp *app = g_ptr_array_index (pending, i);
+
+		/* removed or re-added in the meantime */
+		if (!g_hash_table_contains (priv->unrevealing, app))
+			continue;
+
+		gs_app_list_view_remove_app (self, app);
+		g_signal_emit (self, signals[SIGNAL_APP_UNREVEALED], 0, app);
+	}
+
+	return G_SOURCE_REMOVE;
+}
+
+static void
+gs_app_list_view_queue_removal (GsAppListView *self,
+				GsApp *app)
+{
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+
+	/* the model can’t be changed while a row is being bound or unbound, so
+	 * always remove unrevealed apps from an idle callback */
+	g_ptr_array_add (priv->pending_removals, g_object_ref (app));
+	if (priv->pending_removals_id == 0)
+		priv->pending_removals_id = g_idle_add_full (G_PRIORITY_HIGH, gs_app_list_view_pending_removals_cb, self, NULL);
+}
+
+static void
+gs_app_list_view_row_unrevealed_cb (GsAppRow *app_row,
+				    gpointer user_data)
+{
+	GsAppListView *self = GS_APP_LIST_VIEW (user_data);
+	GsApp *app = gs_app_row_get_app (app_row);
+
+	g_signal_handlers_disconnect_by_func (app_row, gs_app_list_view_row_unrevealed_cb, self);
+
+	if (app != NULL)
+		gs_app_list_view_queue_removal (self, app);
+}
+
+static void
+gs_app_list_view_setup_cb (GtkSignalListItemFactory *factory,
+			   GtkListItem *list_item,
+			   gpointer user_data)
+{
+	GsAppListView *self = GS_APP_LIST_VIEW (user_data);
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+	GtkWidget *app_row;
+
+	app_row = g_object_new (GS_TYPE_APP_ROW, NULL);
+
+	/* keyboard focus and activation are handled by the list item */
+	gtk_widget_set_focusable (app_row, FALSE);
+	gtk_list_box_row_set_activatable (GTK_LIST_BOX_ROW (app_row), FALSE);
+
+	gtk_list_item_set_child (list_item, app_row);
+
+	if (priv->setup_func != NULL)
+		priv->setup_func (self, GS_APP_ROW (app_row), priv->row_func_data);
+}
+
+static void
+gs_app_list_view_bind_cb (GtkSignalListItemFactory *factory,
+			  GtkListItem *list_item,
+			  gpointer user_data)
+{
+	GsAppListView *self = GS_APP_LIST_VIEW (user_data);
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+	GsAppRow *app_row = GS_APP_ROW (gtk_list_item_get_child (list_item));
+	GsApp *app = GS_APP (gtk_list_item_get_item (list_item));
+
+	gs_app_row_set_app (app_row, app);
+	g_hash_table_insert (priv->rows, app, app_row);
+
+	if (priv->bind_func != NULL)
+		priv->bind_func (self, app_row, priv->row_func_data);
+}
+
+static void
+gs_app_list_view_unbind_cb (GtkSignalListItemFactory *factory,
+			    GtkListItem *list_item,
+			    gpointer user_data)
+{
+	GsAppListView *self = GS_APP_LIST_VIEW (user_data);
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+	GsAppRow *app_row = GS_APP_ROW (gtk_list_item_get_child (list_item));
+	GsApp *app = gs_app_row_get_app (app_row);
+
+	g_signal_handlers_disconnect_by_func (app_row, gs_app_list_view_row_unrevealed_cb, self);
+
+	if (app != NULL && g_hash_table_lookup (priv->rows, app) == app_row)
+		g_hash_table_remove (priv->rows, app);
+
+	/* the row was scrolled away part way through unrevealing its app */
+	if (app != NULL && g_hash_table_contains (priv->unrevealing, app))
+		gs_app_list_view_queue_removal (self, app);
+
+	gs_app_row_set_app (app_row, NULL);
+}
+
+static void
+gs_app_list_view_header_setup_cb (GtkSignalListItemFactory *factory,
+				  GtkListHeader *list_header,
+				  gpointer user_data)
+{
+	GtkWidget *label;
+
+	label = gtk_label_new (NULL);
+	gtk_label_set_xalign (GTK_LABEL (label), 0.0);
+	gtk_widget_add_css_class (label, "heading");
+	gtk_list_header_set_child (list_header, label);
+}
+
+static void
+gs_app_list_view_header_bind_cb (GtkSignalListItemFactory *factory,
+				 GtkListHeader *list_header,
+				 gpointer user_data)
+{
+	GsAppListView *self = GS_APP_LIST_VIEW (user_data);
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+	GtkLabel *label = GTK_LABEL (gtk_list_header_get_child (list_header));
+	GsApp *app = GS_APP (gtk_list_header_get_item (list_header));
+	const gchar *title = NULL;
+	guint section;
+
+	section = priv->section_func (app, priv->section_func_data);
+	if (priv->section_titles != NULL &&
+	    section < g_strv_length (priv->section_titles))
+		title = priv->section_titles[section];
+
+	gtk_label_set_label (label, title);
+	gtk_widget_set_visible (GTK_WIDGET (label), title != NULL && *title != '\0');
+}
+
+static void
+gs_app_list_view_activate_cb (GtkListView *list_view,
+			      guint position,
+			      gpointer user_data)
+{
+	GsAppListView *self = GS_APP_LIST_VIEW (user_data);
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+	g_autoptr(GsApp) app = g_list_model_get_item (G_LIST_MODEL (priv->selection), position);
+
+	if (app != NULL)
+		g_signal_emit (self, signals[SIGNAL_APP_ACTIVATED], 0, app);
+}
+
+static gboolean
+gs_app_list_view_keynav_failed_cb (GtkWidget *list_view,
+				   GtkDirectionType direction,
+				   gpointer user_data)
+{
+	GtkRoot *root = gtk_widget_get_root (list_view);
+
+	if (!root)
+		return FALSE;
+
+	if (direction != GTK_DIR_UP && direction != GTK_DIR_DOWN)
+		return FALSE;
+
+	return gtk_widget_child_focus (GTK_WIDGET (root), direction == GTK_DIR_UP ? GTK_DIR_TAB_BACKWARD : GTK_DIR_TAB_FORWARD);
+}
+
+static void
+gs_app_list_view_get_property (GObject *object, guint prop_id, GValue *value, GParamSpec *pspec)
+{
+	GsAppListView *self = GS_APP_LIST_VIEW (object);
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+
+	switch ((GsAppListViewProperty) prop_id) {
+	case PROP_HADJUSTMENT:
+	case PROP_VADJUSTMENT:
+	case PROP_HSCROLL_POLICY:
+	case PROP_VSCROLL_POLICY:
+		/* forward the #GtkScrollable properties to the list view */
+		g_object_get_property (G_OBJECT (priv->list_view), pspec->name, value);
+		break;
+	default:
+		G_OBJECT_WARN_INVALID_PROPERTY_ID (object, prop_id, pspec);
+		break;
+	}
+}
+
+static void
+gs_app_list_view_set_property (GObject *object, guint prop_id, const GValue *value, GParamSpec *pspec)
+{
+	GsAppListView *self = GS_APP_LIST_VIEW (object);
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+
+	switch ((GsAppListViewProperty) prop_id) {
+	case PROP_HADJUSTMENT:
+	case PROP_VADJUSTMENT:
+	case PROP_HSCROLL_POLICY:
+	case PROP_VSCROLL_POLICY:
+		g_object_set_property (G_OBJECT (priv->list_view), pspec->name, value);
+		g_object_notify_by_pspec (object, pspec);
+		break;
+	default:
+		G_OBJECT_WARN_INVALID_PROPERTY_ID (object, prop_id, pspec);
+		break;
+	}
+}
+
+static void
+gs_app_list_view_dispose (GObject *object)
+{
+	GsAppListView *self = GS_APP_LIST_VIEW (object);
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+
+	/* so unbinding the rows doesn’t queue any more removals */
+	gs_app_list_view_remove_pending (self);
+
+	if (priv->list_view != NULL) {
+		gtk_widget_unparent (GTK_WIDGET (priv->list_view));
+		priv->list_view = NULL;
+	}
+
+	g_clear_object (&priv->selection);
+	g_clear_object (&priv->sort_model);
+	g_clear_object (&priv->filter_model);
+	g_clear_object (&priv->store);
+
+	G_OBJECT_CLASS (gs_app_list_view_parent_class)->dispose (object);
+}
+
+static void
+gs_app_list_view_finalize (GObject *object)
+{
+	GsAppListView *self = GS_APP_LIST_VIEW (object);
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+
+	g_hash_table_unref (priv->apps);
+	g_hash_table_unref (priv->rows);
+	g_hash_table_unref (priv->unrevealing);
+	g_ptr_array_unref (priv->pending_removals);
+	g_strfreev (priv->section_titles);
+
+	G_OBJECT_CLASS (gs_app_list_view_parent_class)->finalize (object);
+}
+
+static void
+gs_app_list_view_class_init (GsAppListViewClass *klass)
+{
+	GObjectClass *object_class = G_OBJECT_CLASS (klass);
+	GtkWidgetClass *widget_class = GTK_WIDGET_CLASS (klass);
+
+	object_class->get_property = gs_app_list_view_get_property;
+	object_class->set_property = gs_app_list_view_set_property;
+	object_class->dispose = gs_app_list_view_dispose;
+	object_class->finalize = gs_app_list_view_finalize;
+
+	g_object_class_override_property (object_class, PROP_HADJUSTMENT, "hadjustment");
+	g_object_class_override_property (object_class, PROP_VADJUSTMENT, "vadjustment");
+	g_object_class_override_property (object_class, PROP_HSCROLL_POLICY, "hscroll-policy");
+	g_object_class_override_property (object_class, PROP_VSCROLL_POLICY, "vscroll-policy");
+
+	/**
+	 * GsAppListView::app-activated:
+	 * @app: the #GsApp whose row was activated
+	 *
+	 * Emitted when a row is activated.
+	 *
+	 * Since: 50
+	 */
+	signals [SIGNAL_APP_ACTIVATED] =
+		g_signal_new ("app-activated",
+			      G_TYPE_FROM_CLASS (object_class), G_SIGNAL_RUN_LAST,
+			      0, NULL, NULL, g_cclosure_marshal_VOID__OBJECT,
+			      G_TYPE_NONE, 1, GS_TYPE_APP);
+
+	/**
+	 * GsAppListView::app-unrevealed:
+	 * @app: the #GsApp which was unrevealed
+	 *
+	 * Emitted once an app passed to gs_app_list_view_unreveal_app() has
+	 * been hidden and removed from the view.
+	 *
+	 * Since: 50
+	 */
+	signals [SIGNAL_APP_UNREVEALED] =
+		g_signal_new ("app-unrevealed",
+			      G_TYPE_FROM_CLASS (object_class), G_SIGNAL_RUN_LAST,
+			      0, NULL, NULL, g_cclosure_marshal_VOID__OBJECT,
+			      G_TYPE_NONE, 1, GS_TYPE_APP);
+
+	gtk_widget_class_set_layout_manager_type (widget_class, GTK_TYPE_BIN_LAYOUT);
+	gtk_widget_class_set_css_name (widget_class, "app-list-view");
+}
+
+static void
+gs_app_list_view_init (GsAppListView *self)
+{
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+	g_autoptr(GtkListItemFactory) factory = NULL;
+
+	priv->apps = g_hash_table_new_full (g_direct_hash, g_direct_equal, g_object_unref, NULL);
+	priv->rows = g_hash_table_new (g_direct_hash, g_direct_equal);
+	priv->unrevealing = g_hash_table_new_full (g_direct_hash, g_direct_equal, g_object_unref, NULL);
+	priv->pending_removals = g_ptr_array_new_with_free_func (g_object_unref);
+
+	priv->store = g_list_store_new (GS_TYPE_APP);
+	priv->filter_model = gtk_filter_list_model_new (G_LIST_MODEL (g_object_ref (priv->store)),
+							GTK_FILTER (gtk_custom_filter_new (gs_app_list_view_filter_cb, self, NULL)));
+	priv->sort_model = gtk_sort_list_model_new (G_LIST_MODEL (g_object_ref (priv->filter_model)),
+						    GTK_SORTER (gtk_custom_sorter_new (gs_app_list_view_sort_cb, self, NULL)));
+	priv->selection = gtk_no_selection_new (G_LIST_MODEL (g_object_ref (priv->sort_model)));
+
+	factory = gtk_signal_list_item_factory_new ();
+	g_signal_connect (factory, "setup", G_CALLBACK (gs_app_list_view_setup_cb), self);
+	g_signal_connect (factory, "bind", G_CALLBACK (gs_app_list_view_bind_cb), self);
+	g_signal_connect (factory, "unbind", G_CALLBACK (gs_app_list_view_unbind_cb), self);
+
+	priv->list_view = GTK_LIST_VIEW (gtk_list_view_new (GTK_SELECTION_MODEL (g_object_ref (priv->selection)),
+							    g_object_ref (factory)));
+	gtk_list_view_set_single_click_activate (priv->list_view, TRUE);
+	gtk_widget_add_css_class (GTK_WIDGET (priv->list_view), "app-list");
+	gtk_widget_set_parent (GTK_WIDGET (priv->list_view), GTK_WIDGET (self));
+
+	g_signal_connect (priv->list_view, "activate",
+			  G_CALLBACK (gs_app_list_view_activate_cb), self);
+	g_signal_connect (priv->list_view, "keynav-failed",
+			  G_CALLBACK (gs_app_list_view_keynav_failed_cb), self);
+}
+
+/**
+ * gs_app_list_view_new:
+ *
+ * Create a new #GsAppListView.
+ *
+ * Returns: (transfer full): a new #GsAppListView
+ * Since: 50
+ */
+GtkWidget *
+gs_app_list_view_new (void)
+{
+	return g_object_new (GS_TYPE_APP_LIST_VIEW, NULL);
+}
+
+/**
+ * gs_app_list_view_set_row_funcs:
+ * @self: a #GsAppListView
+ * @setup_func: (nullable): function called once for each new row
+ * @bind_func: (nullable): function called each time a row is bound to an app
+ * @user_data: user data for @setup_func and @bind_func
+ *
+ * Set functions to configure the rows. Rows are recycled, so @setup_func
+ * should set things which are the same for every app, such as size groups
+ * and signal handlers, and @bind_func things which depend on the app.
+ *
+ * This must be called before any rows are created.
+ *
+ * Since: 50
+ */
+void
+gs_app_list_view_set_row_funcs (GsAppListView *self,
+				GsAppListViewRowFunc setup_func,
+				GsAppListViewRowFunc bind_func,
+				gpointer user_data)
+{
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+
+	g_return_if_fail (GS_IS_APP_LIST_VIEW (self));
+
+	priv->setup_func = setup_func;
+	priv->bind_func = bind_func;
+	priv->row_func_data = user_data;
+}
+
+/**
+ * gs_app_list_view_set_sort_func:
+ * @self: a #GsAppListView
+ * @func: (nullable): a #GsAppListSortFunc, or %NULL to not sort
+ * @user_data: user data for @func
+ *
+ * Set the function used to sort the apps within each section.
+ *
+ * Since: 50
+ */
+void
+gs_app_list_view_set_sort_func (GsAppListView *self,
+				GsAppListSortFunc func,
+				gpointer user_data)
+{
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+
+	g_return_if_fail (GS_IS_APP_LIST_VIEW (self));
+
+	priv->sort_func = func;
+	priv->sort_func_data = user_data;
+
+	gtk_sorter_changed (gtk_sort_list_model_get_sorter (priv->sort_model), GTK_SORTER_CHANGE_DIFFERENT);
+}
+
+/**
+ * gs_app_list_view_set_filter_func:
+ * @self: a #GsAppListView
+ * @func: (nullable): a #GsAppListFilterFunc, or %NULL to show all apps
+ * @user_data: user data for @func
+ *
+ * Set the function deciding which of the apps are shown. Apps which are
+ * filtered out are still part of the view, and are shown if
+ * gs_app_list_view_app_changed() is called once @func returns %TRUE for them.
+ *
+ * Since: 50
+ */
+void
+gs_app_list_view_set_filter_func (GsAppListView *self,
+				  GsAppListFilterFunc func,
+				  gpointer user_data)
+{
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+
+	g_return_if_fail (GS_IS_APP_LIST_VIEW (self));
+
+	priv->filter_func = func;
+	priv->filter_func_data = user_data;
+
+	gtk_filter_changed (gtk_filter_list_model_get_filter (priv->filter_model), GTK_FILTER_CHANGE_DIFFERENT);
+}
+
+/**
+ * gs_app_list_view_set_section_func:
+ * @self: a #GsAppListView
+ * @func: (nullable): a #GsAppListViewSectionFunc, or %NULL for no sections
+ * @titles: (array zero-terminated=1) (nullable): titles of the sections
+ * @user_data: user data for @func
+ *
+ * Split the apps into sections, each of them sorted separately and shown
+ * below a header with its title from @titles. Empty sections are not shown.
+ *
+ * Since: 50
+ */
+void
+gs_app_list_view_set_section_func (GsAppListView *self,
+				   GsAppListViewSectionFunc func,
+				   const gchar * const *titles,
+				   gpointer user_data)
+{
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+
+	g_return_if_fail (GS_IS_APP_LIST_VIEW (self));
+
+	priv->section_func = func;
+	priv->section_func_data = user_data;
+	g_strfreev (priv->section_titles);
+	priv->section_titles = g_strdupv ((gchar **) titles);
+
+	if (func != NULL) {
+		g_autoptr(GtkListItemFactory) factory = gtk_signal_list_item_factory_new ();
+
+		g_signal_connect (factory, "setup", G_CALLBACK (gs_app_list_view_header_setup_cb), self);
+		g_signal_connect (factory, "bind", G_CALLBACK (gs_app_list_view_header_bind_cb), self);
+
+		gtk_sort_list_model_set_section_sorter (priv->sort_model,
+							GTK_SORTER (gtk_custom_sorter_new (gs_app_list_view_section_sort_cb, self, NULL)));
+		gtk_list_view_set_header_factory (priv->list_view, factory);
+	} else {
+		gtk_list_view_set_header_factory (priv->list_view, NULL);
+		gtk_sort_list_model_set_section_sorter (priv->sort_model, NULL);
+	}
+}
+
+/**
+ * gs_app_list_view_add_app:
+ * @self: a #GsAppListView
+ * @app: a #GsApp
+ *
+ * Add @app to the view, unless it’s already there.
+ *
+ * Since: 50
+ */
+void
+gs_app_list_view_add_app (GsAppListView *self,
+			  GsApp *app)
+{
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+
+	g_return_if_fail (GS_IS_APP_LIST_VIEW (self));
+	g_return_if_fail (GS_IS_APP (app));
+
+	if (!g_hash_table_add (priv->apps, g_object_ref (app)))
+		return;
+
+	g_list_store_append (priv->store, app);
+}
+
+/**
+ * gs_app_list_view_add_apps:
+ * @self: a #GsAppListView
+ * @list: a #GsAppList
+ *
+ * Add all the apps from @list which are not already in the view. This is a
+ * lot cheaper than adding the apps one by one, as the models only have to
+ * filter and sort them once.
+ *
+ * Since: 50
+ */
+void
+gs_app_list_view_add_apps (GsAppListView *self,
+			   GsAppList *list)
+{
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+	g_autoptr(GPtrArray) apps = NULL;
+
+	g_return_if_fail (GS_IS_APP_LIST_VIEW (self));
+	g_return_if_fail (GS_IS_APP_LIST (list));
+
+	apps = g_ptr_array_sized_new (gs_app_list_length (list));
+	for (guint i = 0; i < gs_app_list_length (list); i++) {
+		GsApp *app = gs_app_list_index (list, i);
+		if (g_hash_table_add (priv->apps, g_object_ref (app)))
+			g_ptr_array_add (apps, app);
+	}
+
+	g_list_store_splice (priv->store,
+			     g_list_model_get_n_items (G_LIST_MODEL (priv->store)),
+			     0, apps->pdata, apps->len);
+}
+
+/**
+ * gs_app_list_view_remove_app:
+ * @self: a #GsAppListView
+ * @app: a #GsApp
+ *
+ * Remove @app from the view straight away.
+ *
+ * Since: 50
+ */
+void
+gs_app_list_view_remove_app (GsAppListView *self,
+			     GsApp *app)
+{
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+	guint position;
+
+	g_return_if_fail (GS_IS_APP_LIST_VIEW (self));
+	g_return_if_fail (GS_IS_APP (app));
+
+	if (!g_list_store_find (priv->store, app, &position))
+		return;
+
+	g_hash_table_remove (priv->unrevealing, app);
+	g_list_store_remove (priv->store, position);
+	g_hash_table_remove (priv->apps, app);
+}
+
+/**
+ * gs_app_list_view_remove_all:
+ * @self: a #GsAppListView
+ *
+ * Remove all the apps from the view.
+ *
+ * Since: 50
+ */
+void
+gs_app_list_view_remove_all (GsAppListView *self)
+{
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+
+	g_return_if_fail (GS_IS_APP_LIST_VIEW (self));
+
+	gs_app_list_view_remove_pending (self);
+	g_list_store_remove_all (priv->store);
+	g_hash_table_remove_all (priv->apps);
+}
+
+/**
+ * gs_app_list_view_has_app:
+ * @self: a #GsAppListView
+ * @app: a #GsApp
+ *
+ * Check whether @app is in the view, whether or not it’s filtered out.
+ *
+ * Returns: %TRUE if @app is in the view
+ * Since: 50
+ */
+gboolean
+gs_app_list_view_has_app (GsAppListView *self,
+			  GsApp *app)
+{
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+
+	g_return_val_if_fail (GS_IS_APP_LIST_VIEW (self), FALSE);
+
+	return g_hash_table_contains (priv->apps, app);
+}
+
+/**
+ * gs_app_list_view_get_n_apps:
+ * @self: a #GsAppListView
+ *
+ * Get the number of apps in the view, including filtered out ones.
+ *
+ * Returns: number of apps
+ * Since: 50
+ */
+guint
+gs_app_list_view_get_n_apps (GsAppListView *self)
+{
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+
+	g_return_val_if_fail (GS_IS_APP_LIST_VIEW (self), 0);
+
+	return g_hash_table_size (priv->apps);
+}
+
+/**
+ * gs_app_list_view_get_n_shown:
+ * @self: a #GsAppListView
+ *
+ * Get the number of apps which pass the filter.
+ *
+ * Returns: number of apps shown
+ * Since: 50
+ */
+guint
+gs_app_list_view_get_n_shown (GsAppListView *self)
+{
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+
+	g_return_val_if_fail (GS_IS_APP_LIST_VIEW (self), 0);
+
+	return g_list_model_get_n_items (G_LIST_MODEL (priv->filter_model));
+}
+
+/**
+ * gs_app_list_view_app_changed:
+ * @self: a #GsAppListView
+ * @app: a #GsApp
+ *
+ * Filter, sort and section @app again, after something they depend on
+ * changed. This only moves @app; the other apps are not sorted again.
+ *
+ * Since: 50
+ */
+void
+gs_app_list_view_app_changed (GsAppListView *self,
+			      GsApp *app)
+{
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+	guint position;
+
+	g_return_if_fail (GS_IS_APP_LIST_VIEW (self));
+	g_return_if_fail (GS_IS_APP (app));
+
+	/* it’s on its way out, don’t rebind the row mid-animation */
+	if (g_hash_table_contains (priv->unrevealing, app))
+		return;
+
+	if (!g_list_store_find (priv->store, app, &position))
+		return;
+
+	g_list_store_splice (priv->store, position, 1, (gpointer *) &app, 1);
+}
+
+/**
+ * gs_app_list_view_unreveal_app:
+ * @self: a #GsAppListView
+ * @app: a #GsApp
+ *
+ * Hide the row of @app with an animation, and remove @app from the view
+ * afterwards. #GsAppListView::app-unrevealed is emitted once it’s removed,
+ * which is always done from an idle callback, even when @app has no row.
+ *
+ * Calling the function multiple times has no effect.
+ *
+ * Since: 50
+ */
+void
+gs_app_list_view_unreveal_app (GsAppListView *self,
+			       GsApp *app)
+{
+	GsAppListViewPrivate *priv = gs_app_list_view_get_instance_private (self);
+	GsAppRow *app_row;
+
+	g_return_if_fail (GS_IS_APP_LIST_VIEW (self));
+	g_return_if_fail (GS_IS_APP (app));
+
+	if (!g_hash_table_contains (priv->apps, app) ||
+	    !g_hash_table_add (priv->unrevealing, g_object_ref (app)))
+		return;
+
+	app_row = g_hash_table_lookup (priv->rows, app);
+	if (app_row != NULL) {
+		g_signal_connect (app_row, "unrevealed",
+				  G_CALLBACK (gs_app_list_view_row_unrevealed_cb), self);
+		gs_app_row_unreveal (app_row);
+	} else {
+		gs_app_list_view_queue_removal (self, app);
+	}
+}
@@ -0,0 +1,88 @@
+/* -*- Mode: C; tab-width: 8; indent-tabs-mode: t; c-basic-offset: 8 -*-
+ * vi:set noexpandtab tabstop=8 shiftwidth=8:
+ *
+ * Copyright (C) 2026 GNOME Foundation, Inc.
+ *
+ * SPDX-License-Identifier: GPL-2.0-or-later
+ */
+
+#pragma once
+
+#include <gtk/gtk.h>
+
+#include "gnome-software-private.h"
+#include "gs-app-row.h"
+
+G_BEGIN_DECLS
+
+#define GS_TYPE_APP_LIST_VIEW (gs_app_list_view_get_type ())
+
+G_DECLARE_DERIVABLE_TYPE (GsAppListView, gs_app_list_view, GS, APP_LIST_VIEW, GtkWidget)
+
+struct _GsAppListViewClass
+{
+	GtkWidgetClass		 parent_class;
+};
+
+/**
+ * GsAppListViewRowFunc:
+ * @self: a #GsAppListView
+ * @app_row: the #GsAppRow being set up or bound
+ * @user_data: user data passed to gs_app_list_view_set_row_funcs()
+ *
+ * Called when a recycled row is created, or when it is bound to a new app.
+ *
+ * Since: 50
+ */
+typedef void	 (*GsAppListViewRowFunc)	(GsAppListView	*self,
+						 GsAppRow	*app_row,
+						 gpointer	 user_data);
+
+/**
+ * GsAppListViewSectionFunc:
+ * @app: a #GsApp
+ * @user_data: user data passed to gs_app_list_view_set_section_func()
+ *
+ * Returns the index of the section @app is shown in. Sections are shown
+ * in increasing index order.
+ *
+ * Returns: a section index into the titles passed to
+ *     gs_app_list_view_set_section_func()
+ * Since: 50
+ */
+typedef guint	 (*GsAppListViewSectionFunc)	(GsApp		*app,
+						 gpointer	 user_data);
+
+GtkWidget	*gs_app_list_view_new			(void);
+void		 gs_app_list_view_set_row_funcs		(GsAppListView		 *self,
+							 GsAppListViewRowFunc	  setup_func,
+							 GsAppListViewRowFunc	  bind_func,
+							 gpointer		  user_data);
+void		 gs_app_list_view_set_sort_func		(GsAppListView		 *self,
+							 GsAppListSortFunc	  func,
+							 gpointer		  user_data);
+void		 gs_app_list_view_set_filter_func	(GsAppListView		 *self,
+							 GsAppListFilterFunc	  func,
+							 gpointer		  user_data);
+void		 gs_app_list_view_set_section_func	(GsAppListView		 *self,
+							 GsAppListViewSectionFunc func,
+							 const gchar * const	 *titles,
+							 gpointer		  user_data);
+
+void		 gs_app_list_view_add_app		(GsAppListView		 *self,
+							 GsApp			 *app);
+void		 gs_app_list_view_add_apps		(GsAppListView		 *self,
+							 GsAppList		 *list);
+void		 gs_app_list_view_remove_app		(GsAppListView		 *self,
+							 GsApp			 *app);
+void		 gs_app_list_view_remove_all		(GsAppListView		 *self);
+gboolean	 gs_app_list_view_has_app		(GsAppListView		 *self,
+							 GsApp			 *app);
+guint		 gs_app_list_view_get_n_apps		(GsAppListView		 *self);
+guint		 gs_app_list_view_get_n_shown		(GsAppListView		 *self);
+void		 gs_app_list_view_app_changed		(GsAppListView		 *self,
+							 GsApp			 *app);
+void		 gs_app_list_view_unreveal_app		(GsAppListView		 *self,
+							 GsApp			 *app);
+
+G_END_DECLS
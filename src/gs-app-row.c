@@ -784,27 +784,70 @@ gs_app_row_notify_props_changed_cb (GsApp *app,
 	gs_app_row_schedule_refresh (app_row);
 }
 
-static void
+/**
+ * gs_app_row_set_app:
+ * @app_row: a #GsAppRow
+ * @app: (nullable): a #GsApp, or %NULL to unset it
+ *
+ * Set the #GsApp shown in the row. This allows a row to be recycled for
+ * another app, as is done by #GsAppListView, and undoes any earlier
+ * gs_app_row_unreveal().
+ *
+ * Since: 50
+ */
+void
 gs_app_row_set_app (GsAppRow *app_row, GsApp *app)
 {
 	GsAppRowPrivate *priv = gs_app_row_get_instance_private (app_row);
+	GtkWidget *child;
 
-	priv->app = g_object_ref (app);
-
-	g_signal_connect_object (priv->app, "notify::state",
-				 G_CALLBACK (gs_app_row_notify_props_changed_cb),
-				 app_row, 0);
-	g_signal_connect_object (priv->app, "notify::rating",
-				 G_CALLBACK (gs_app_row_notify_props_changed_cb),
-				 app_row, 0);
-	g_signal_connect_object (priv->app, "notify::progress",
-				 G_CALLBACK (gs_app_row_notify_props_changed_cb),
-				 app_row, 0);
-	g_signal_connect_object (priv->app, "notify::allow-cancel",
-				 G_CALLBACK (gs_app_row_notify_props_changed_cb),
-				 app_row, 0);
+	g_return_if_fail (GS_IS_APP_ROW (app_row));
+	g_return_if_fail (app == NULL || GS_IS_APP (app));
+
+	if (priv->app == app)
+		return;
+
+	if (priv->app != NULL)
+		g_signal_handlers_disconnect_by_func (priv->app, gs_app_row_notify_props_changed_cb, app_row);
+
+	/* undo gs_app_row_unreveal() for the previous app */
+	g_clear_handle_id (&priv->unreveal_in_idle_id, g_source_remove);
+	child = gtk_list_box_row_get_child (GTK_LIST_BOX_ROW (app_row));
+	if (GTK_IS_REVEALER (child)) {
+		GtkWidget *revealer = child;
+
+		g_signal_handlers_disconnect_by_func (revealer, child_unrevealed, app_row);
+		child = g_object_ref (gtk_revealer_get_child (GTK_REVEALER (revealer)));
+		gtk_revealer_set_child (GTK_REVEALER (revealer), NULL);
+		gtk_list_box_row_set_child (GTK_LIST_BOX_ROW (app_row), child);
+		g_object_unref (child);
+	}
+	if (child != NULL)
+		gtk_widget_set_sensitive (child, TRUE);
+	gtk_widget_set_visible (GTK_WIDGET (app_row), TRUE);
+
+	g_set_object (&priv->app, app);
+
+	if (priv->app != NULL) {
+		g_signal_connect_object (priv->app, "notify::state",
+					 G_CALLBACK (gs_app_row_notify_props_changed_cb),
+					 app_row, 0);
+		g_signal_connect_object (priv->app, "notify::rating",
+					 G_CALLBACK (gs_app_row_notify_props_changed_cb),
+					 app_row, 0);
+		g_signal_connect_object (priv->app, "notify::progress",
+					 G_CALLBACK (gs_app_row_notify_props_changed_cb),
+					 app_row, 0);
+		g_signal_connect_object (priv->app, "notify::allow-cancel",
+					 G_CALLBACK (gs_app_row_notify_props_changed_cb),
+					 app_row, 0);
+
+		/* refresh straight away, so a recycled row doesn’t show the
+		 * previous app for a frame */
+		g_clear_handle_id (&priv->pending_refresh_id, g_source_remove);
+		gs_app_row_actually_refresh (app_row);
+	}
 
-	gs_app_row_schedule_refresh (app_row);
 	g_object_notify_by_pspec (G_OBJECT (app_row), obj_props[PROP_APP]);
 }
 
@@ -929,7 +972,7 @@ gs_app_row_class_init (GsAppRowClass *klass)
 	obj_props[PROP_APP] =
 		g_param_spec_object ("app", NULL, NULL,
 				     GS_TYPE_APP,
-				     G_PARAM_CONSTRUCT_ONLY | G_PARAM_READWRITE | G_PARAM_STATIC_STRINGS);
+				     G_PARAM_READWRITE | G_PARAM_STATIC_STRINGS | G_PARAM_EXPLICIT_NOTIFY);
 
 	/**
 	 * GsAppRow:colorful:
@@ -44,6 +44,8 @@ void		 gs_app_row_set_show_update		(GsAppRow	*app_row,
 void		 gs_app_row_set_show_installed		(GsAppRow	*app_row,
 							 gboolean	 show_installed);
 GsApp		*gs_app_row_get_app			(GsAppRow	*app_row);
+void		 gs_app_row_set_app			(GsAppRow	*app_row,
+							 GsApp		*app);
 void		 gs_app_row_set_size_groups		(GsAppRow	*app_row,
 							 GtkSizeGroup	*name,
 							 GtkSizeGroup	*button_label,
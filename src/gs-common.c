@@ -768,10 +768,8 @@ gs_utils_list_has_component_fuzzy (GsAppList *list, GsApp *app)
 			continue;
 
 		/* ignore with the same source */
-		if (g_strcmp0 (gs_app_get_origin_hostname (tmp),
-			       gs_app_get_origin_hostname (app)) == 0) {
+		if (gs_app_get_origin_hostname (tmp) == gs_app_get_origin_hostname (app))
 			continue;
-		}
 
 		/* same D-Bus ID */
 		if (g_strcmp0 (gs_app_get_id (tmp),
@@ -677,8 +677,8 @@ app_origin_equal (GsApp *a,
 	       g_file_equal (a_local_file, b_local_file))))
 		return FALSE;
 
-	if (g_strcmp0 (gs_app_get_origin_hostname (a),
-		       gs_app_get_origin_hostname (b)) != 0)
+	/* interned, so can be compared by pointer */
+	if (gs_app_get_origin_hostname (a) != gs_app_get_origin_hostname (b))
 		return FALSE;
 
 	if (gs_app_get_bundle_kind (a) != gs_app_get_bundle_kind (b))
@@ -687,7 +687,7 @@ app_origin_equal (GsApp *a,
 	if (gs_app_get_scope (a) != gs_app_get_scope (b))
 		return FALSE;
 
-	if (g_strcmp0 (gs_app_get_branch (a), gs_app_get_branch (b)) != 0)
+	if (gs_app_get_branch (a) != gs_app_get_branch (b))
 		return FALSE;
 
 	if (g_strcmp0 (gs_app_get_version (a), gs_app_get_version (b)) != 0)
@@ -908,8 +908,8 @@ gs_details_page_get_alternates_cb (GObject *source_object,
 		    gs_app_get_bundle_kind (app) == gs_app_get_bundle_kind (self->app)) &&
 		    (gs_app_get_scope (app) == AS_COMPONENT_SCOPE_UNKNOWN ||
 		    gs_app_get_scope (app) == gs_app_get_scope (self->app)) &&
-		    g_strcmp0 (gs_app_get_origin (app), gs_app_get_origin (self->app)) == 0 &&
-		    g_strcmp0 (gs_app_get_branch (app), gs_app_get_branch (self->app)) == 0 &&
+		    gs_app_get_origin (app) == gs_app_get_origin (self->app) &&
+		    gs_app_get_branch (app) == gs_app_get_branch (self->app) &&
 		    g_strcmp0 (gs_app_get_version (app), gs_app_get_version (self->app)) == 0 &&
 		    (self->app_local_file == NULL || self->app != self->app_local_file))) {
 			/* This can happen on reload of the page */
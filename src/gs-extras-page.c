@@ -807,7 +807,6 @@ gs_extras_page_load (GsExtrasPage *self, GPtrArray *array_search_data)
 
 		require_flags = GS_PLUGIN_REFINE_REQUIRE_FLAGS_ICON |
 		                GS_PLUGIN_REFINE_REQUIRE_FLAGS_VERSION |
-		                GS_PLUGIN_REFINE_REQUIRE_FLAGS_HISTORY |
 		                GS_PLUGIN_REFINE_REQUIRE_FLAGS_ORIGIN_HOSTNAME |
 		                GS_PLUGIN_REFINE_REQUIRE_FLAGS_SETUP_ACTION |
 		                GS_PLUGIN_REFINE_REQUIRE_FLAGS_DESCRIPTION |
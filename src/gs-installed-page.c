@@ -16,6 +16,7 @@
 #include "gs-shell.h"
 #include "gs-installed-page.h"
 #include "gs-common.h"
+#include "gs-app-list-view.h"
 #include "gs-app-row.h"
 #include "gs-utils.h"
 
@@ -34,18 +35,9 @@ struct _GsInstalledPage
 	GSettings		*settings;
 	guint			 pending_apps_counter;
 	gboolean		 is_narrow;
+	GsAppList		*list;  /* (owned), the apps in list_view, to watch their state */
 
-	GtkWidget		*group_install_in_progress;
-	GtkWidget		*group_install_apps;
-	GtkWidget		*group_install_system_apps;
-	GtkWidget		*group_install_addons;
-	GtkWidget		*group_install_web_apps;
-
-	GtkWidget		*list_box_install_in_progress;
-	GtkWidget		*list_box_install_apps;
-	GtkWidget		*list_box_install_system_apps;
-	GtkWidget		*list_box_install_addons;
-	GtkWidget		*list_box_install_web_apps;
+	GtkWidget		*list_view;
 	GtkWidget		*scrolledwindow_install;
 	GtkWidget		*stack_install;
 };
@@ -65,23 +57,21 @@ static void gs_installed_page_pending_apps_refined_cb (GObject *source,
 						       GAsyncResult *res,
 						       gpointer user_data);
 static GsPluginRefineRequireFlags gs_installed_page_get_refine_require_flags (GsInstalledPage *self);
-static void gs_installed_page_notify_state_changed_cb (GsApp *app,
-						       GParamSpec *pspec,
-						       GsInstalledPage *self);
 
+/* In the order the sections are shown in. */
 typedef enum {
 	GS_UPDATE_LIST_SECTION_INSTALLING_AND_REMOVING,
 	GS_UPDATE_LIST_SECTION_REMOVABLE_APPS,
+	GS_UPDATE_LIST_SECTION_WEB_APPS,
 	GS_UPDATE_LIST_SECTION_SYSTEM_APPS,
 	GS_UPDATE_LIST_SECTION_ADDONS,
-	GS_UPDATE_LIST_SECTION_WEB_APPS,
 	GS_UPDATE_LIST_SECTION_LAST
 } GsInstalledPageSection;
 
 /* This must mostly mirror gs_installed_page_get_app_sort_key() otherwise apps
  * will end up sorted into a section they don’t belong in. */
-static GsInstalledPageSection
-gs_installed_page_get_app_section (GsApp *app)
+static guint
+gs_installed_page_get_app_section (GsApp *app, gpointer user_data)
 {
 	GsAppState state = gs_app_get_state (app);
 	AsComponentKind kind = gs_app_get_kind (app);
@@ -106,47 +96,6 @@ gs_installed_page_get_app_section (GsApp *app)
 	return GS_UPDATE_LIST_SECTION_ADDONS;
 }
 
-static void
-update_groups (GsInstalledPage *self)
-{
-	gtk_widget_set_visible (self->group_install_in_progress,
-				gtk_widget_get_first_child (self->list_box_install_in_progress) != NULL);
-	gtk_widget_set_visible (self->group_install_apps,
-				gtk_widget_get_first_child (self->list_box_install_apps) != NULL);
-	gtk_widget_set_visible (self->group_install_system_apps,
-				gtk_widget_get_first_child (self->list_box_install_system_apps) != NULL);
-	gtk_widget_set_visible (self->group_install_addons,
-				gtk_widget_get_first_child (self->list_box_install_addons) != NULL);
-	gtk_widget_set_visible (self->group_install_web_apps,
-				gtk_widget_get_first_child (self->list_box_install_web_apps) != NULL);
-}
-
-static GsInstalledPageSection
-gs_installed_page_get_row_section (GsInstalledPage *self,
-				   GsAppRow *app_row)
-{
-	GtkWidget *parent;
-
-	g_return_val_if_fail (GS_IS_INSTALLED_PAGE (self), GS_UPDATE_LIST_SECTION_LAST);
-	g_return_val_if_fail (GS_IS_APP_ROW (app_row), GS_UPDATE_LIST_SECTION_LAST);
-
-	parent = gtk_widget_get_parent (GTK_WIDGET (app_row));
-	if (parent == self->list_box_install_in_progress)
-		return GS_UPDATE_LIST_SECTION_INSTALLING_AND_REMOVING;
-	if (parent == self->list_box_install_apps)
-		return GS_UPDATE_LIST_SECTION_REMOVABLE_APPS;
-	if (parent == self->list_box_install_system_apps)
-		return GS_UPDATE_LIST_SECTION_SYSTEM_APPS;
-	if (parent == self->list_box_install_addons)
-		return GS_UPDATE_LIST_SECTION_ADDONS;
-	if (parent == self->list_box_install_web_apps)
-		return GS_UPDATE_LIST_SECTION_WEB_APPS;
-
-	g_warn_if_reached ();
-
-	return GS_UPDATE_LIST_SECTION_LAST;
-}
-
 static void
 gs_installed_page_invalidate (GsInstalledPage *self)
 {
@@ -154,78 +103,26 @@ gs_installed_page_invalidate (GsInstalledPage *self)
 }
 
 static void
-gs_installed_page_app_row_activated_cb (GtkListBox *list_box,
-                                        GtkListBoxRow *row,
-                                        GsInstalledPage *self)
+gs_installed_page_app_activated_cb (GsAppListView *list_view,
+                                    GsApp *app,
+                                    GsInstalledPage *self)
 {
-	GsApp *app;
-	app = gs_app_row_get_app (GS_APP_ROW (row));
 	gs_shell_show_app (self->shell, app);
 }
 
 static void
-row_unrevealed (GObject *row, GParamSpec *pspec, gpointer data)
+gs_installed_page_app_unrevealed_cb (GsAppListView *list_view,
+                                     GsApp *app,
+                                     GsInstalledPage *self)
 {
-	GsInstalledPage *self = GS_INSTALLED_PAGE (gtk_widget_get_ancestor (GTK_WIDGET (row),
-									    GS_TYPE_INSTALLED_PAGE));
-	GtkWidget *list;
-
-	list = gtk_widget_get_parent (GTK_WIDGET (row));
-	if (list == NULL)
-		return;
-	gtk_list_box_remove (GTK_LIST_BOX (list), GTK_WIDGET (row));
-	update_groups (self);
+	gs_app_list_remove (self->list, app);
 }
 
-static void
-gs_installed_page_unreveal_row (GsAppRow *app_row)
-{
-	GsApp *app = gs_app_row_get_app (app_row);
-	if (app != NULL) {
-		g_signal_handlers_disconnect_matched (app, G_SIGNAL_MATCH_FUNC, 0, 0, NULL,
-						      G_CALLBACK (gs_installed_page_notify_state_changed_cb), NULL);
-	}
-
-	g_signal_connect (app_row, "unrevealed",
-			  G_CALLBACK (row_unrevealed), NULL);
-	gs_app_row_unreveal (app_row);
-}
-
-static GsAppRow *  /* (transfer none) */
-gs_installed_page_find_app_row (GsInstalledPage *self,
-				GsApp *app)
-{
-	GtkWidget *lists[] = {
-		self->list_box_install_in_progress,
-		self->list_box_install_apps,
-		self->list_box_install_system_apps,
-		self->list_box_install_addons,
-		self->list_box_install_web_apps,
-		NULL
-	};
-
-	for (gsize i = 0; lists[i]; i++) {
-		for (GtkWidget *child = gtk_widget_get_first_child (lists[i]);
-		     child != NULL;
-		     child = gtk_widget_get_next_sibling (child)) {
-			GsAppRow *app_row = GS_APP_ROW (child);
-			if (gs_app_row_get_app (app_row) == app) {
-				return app_row;
-			}
-		}
-	}
-
-	return NULL;
-}
-
-
 static void
 gs_installed_page_app_removed (GsPage *page, GsApp *app)
 {
 	GsInstalledPage *self = GS_INSTALLED_PAGE (page);
-	GsAppRow *app_row = gs_installed_page_find_app_row (self, app);
-	if (app_row != NULL)
-		gs_installed_page_unreveal_row (app_row);
+	gs_app_list_view_unreveal_app (GS_APP_LIST_VIEW (self->list_view), app);
 }
 
 static void
@@ -239,61 +136,11 @@ gs_installed_page_app_remove_cb (GsAppRow *app_row,
 }
 
 static void
-gs_installed_page_maybe_move_app_row (GsInstalledPage *self,
-				      GsAppRow *app_row)
-{
-	GsInstalledPageSection current_section, expected_section;
-
-	current_section = gs_installed_page_get_row_section (self, app_row);
-	g_return_if_fail (current_section != GS_UPDATE_LIST_SECTION_LAST);
-
-	expected_section = gs_installed_page_get_app_section (gs_app_row_get_app (app_row));
-	if (expected_section != current_section) {
-		GtkWidget *widget = GTK_WIDGET (app_row);
-
-		g_object_ref (app_row);
-		gtk_list_box_remove (GTK_LIST_BOX (gtk_widget_get_parent (widget)), widget);
-		switch (expected_section) {
-		case GS_UPDATE_LIST_SECTION_INSTALLING_AND_REMOVING:
-			widget = self->list_box_install_in_progress;
-			break;
-		case GS_UPDATE_LIST_SECTION_REMOVABLE_APPS:
-			widget = self->list_box_install_apps;
-			break;
-		case GS_UPDATE_LIST_SECTION_SYSTEM_APPS:
-			widget = self->list_box_install_system_apps;
-			break;
-		case GS_UPDATE_LIST_SECTION_ADDONS:
-			widget = self->list_box_install_addons;
-			break;
-		case GS_UPDATE_LIST_SECTION_WEB_APPS:
-			widget = self->list_box_install_web_apps;
-			break;
-		default:
-			g_warn_if_reached ();
-			widget = NULL;
-			break;
-		}
-
-		if (widget != NULL)
-			gtk_list_box_append (GTK_LIST_BOX (widget), GTK_WIDGET (app_row));
-
-		g_object_unref (app_row);
-		update_groups (self);
-	}
-}
-
-static void
-gs_installed_page_notify_state_changed_cb (GsApp *app,
-                                           GParamSpec *pspec,
-                                           GsInstalledPage *self)
+gs_installed_page_app_state_changed_cb (GsAppList *list,
+                                        GsApp *app,
+                                        GsInstalledPage *self)
 {
 	GsAppState state = gs_app_get_state (app);
-	GsAppRow *app_row = gs_installed_page_find_app_row (self, app);
-
-	g_assert (app_row != NULL);
-
-	gtk_list_box_row_changed (GTK_LIST_BOX_ROW (app_row));
 
 	/* Filter which apps can be shown in the installed page */
 	if (state != GS_APP_STATE_INSTALLING &&
@@ -304,9 +151,9 @@ gs_installed_page_notify_state_changed_cb (GsApp *app,
 	    state != GS_APP_STATE_UPDATABLE_LIVE &&
 	    state != GS_APP_STATE_PENDING_INSTALL &&
 	    state != GS_APP_STATE_PENDING_REMOVE)
-		gs_installed_page_unreveal_row (app_row);
+		gs_app_list_view_unreveal_app (GS_APP_LIST_VIEW (self->list_view), app);
 	else
-		gs_installed_page_maybe_move_app_row (self, app_row);
+		gs_app_list_view_app_changed (GS_APP_LIST_VIEW (self->list_view), app);
 }
 
 static gboolean
@@ -317,7 +164,7 @@ should_show_installed_size (GsInstalledPage *self)
 }
 
 static gboolean
-gs_installed_page_is_actual_app (GsApp *app)
+gs_installed_page_is_actual_app (GsApp *app, gpointer user_data)
 {
 	if (gs_app_get_description (app) != NULL)
 		return TRUE;
@@ -335,57 +182,40 @@ gs_installed_page_is_actual_app (GsApp *app)
 }
 
 static void
-gs_installed_page_add_app (GsInstalledPage *self, GsAppList *list, GsApp *app)
-{
-	GtkWidget *app_row;
-
-	/* only show if is an actual app */
-	if (!gs_installed_page_is_actual_app (app))
-		return;
-
-	app_row = g_object_new (GS_TYPE_APP_ROW,
-				"app", app,
-				"show-buttons", TRUE,
-				"show-origin", gs_utils_list_has_component_fuzzy (list, app),
-				"show-installed-size", !gs_app_has_quirk (app, GS_APP_QUIRK_COMPULSORY) && should_show_installed_size (self),
-				NULL);
+gs_installed_page_setup_row_cb (GsAppListView *list_view,
+                                GsAppRow *app_row,
+                                GsInstalledPage *self)
+{
+	gs_app_row_set_show_buttons (app_row, TRUE);
+	gs_app_row_set_show_description (app_row, FALSE);
+	gs_app_row_set_show_origin (app_row, FALSE);
+	gs_app_row_set_size_groups (app_row,
+				    self->sizegroup_name,
+				    self->sizegroup_button_label,
+				    self->sizegroup_button_image);
 
 	g_signal_connect (app_row, "button-clicked",
 			  G_CALLBACK (gs_installed_page_app_remove_cb), self);
-	g_signal_connect_object (app, "notify::state",
-				 G_CALLBACK (gs_installed_page_notify_state_changed_cb),
-				 self, 0);
-
-	switch (gs_installed_page_get_app_section (app)) {
-	case GS_UPDATE_LIST_SECTION_INSTALLING_AND_REMOVING:
-		gtk_list_box_append (GTK_LIST_BOX (self->list_box_install_in_progress), app_row);
-		break;
-	case GS_UPDATE_LIST_SECTION_REMOVABLE_APPS:
-		gtk_list_box_append (GTK_LIST_BOX (self->list_box_install_apps), app_row);
-		break;
-	case GS_UPDATE_LIST_SECTION_SYSTEM_APPS:
-		gtk_list_box_append (GTK_LIST_BOX (self->list_box_install_system_apps), app_row);
-		break;
-	case GS_UPDATE_LIST_SECTION_ADDONS:
-		gtk_list_box_append (GTK_LIST_BOX (self->list_box_install_addons), app_row);
-		break;
-	case GS_UPDATE_LIST_SECTION_WEB_APPS:
-		gtk_list_box_append (GTK_LIST_BOX (self->list_box_install_web_apps), app_row);
-		break;
-	default:
-		g_assert_not_reached ();
-	}
+	g_object_bind_property (self, "is-narrow", app_row, "is-narrow", G_BINDING_SYNC_CREATE);
+}
 
-	update_groups (self);
+static void
+gs_installed_page_bind_row_cb (GsAppListView *list_view,
+                               GsAppRow *app_row,
+                               GsInstalledPage *self)
+{
+	GsApp *app = gs_app_row_get_app (app_row);
 
-	gs_app_row_set_size_groups (GS_APP_ROW (app_row),
-				    self->sizegroup_name,
-				    self->sizegroup_button_label,
-				    self->sizegroup_button_image);
+	gs_app_row_set_show_installed_size (app_row,
+					    !gs_app_has_quirk (app, GS_APP_QUIRK_COMPULSORY) &&
+					    should_show_installed_size (self));
+}
 
-	gs_app_row_set_show_description (GS_APP_ROW (app_row), FALSE);
-	gs_app_row_set_show_origin (GS_APP_ROW (app_row), FALSE);
-	g_object_bind_property (self, "is-narrow", app_row, "is-narrow", G_BINDING_SYNC_CREATE);
+static void
+gs_installed_page_add_app (GsInstalledPage *self, GsApp *app)
+{
+	gs_app_list_add (self->list, app);
+	gs_app_list_view_add_app (GS_APP_LIST_VIEW (self->list_view), app);
 }
 
 static void
@@ -393,8 +223,6 @@ gs_installed_page_get_installed_cb (GObject *source_object,
                                     GAsyncResult *res,
                                     gpointer user_data)
 {
-	guint i;
-	GsApp *app;
 	GsInstalledPage *self = GS_INSTALLED_PAGE (user_data);
 	GsPluginLoader *plugin_loader = GS_PLUGIN_LOADER (source_object);
 	g_autoptr(GError) error = NULL;
@@ -417,10 +245,9 @@ gs_installed_page_get_installed_cb (GObject *source_object,
 
 	list = gs_plugin_job_list_apps_get_result_list (list_apps_job);
 
-	for (i = 0; i < gs_app_list_length (list); i++) {
-		app = gs_app_list_index (list, i);
-		gs_installed_page_add_app (self, list, app);
-	}
+	/* add them all at once, so they’re only sorted once */
+	gs_app_list_add_list (self->list, list);
+	gs_app_list_view_add_apps (GS_APP_LIST_VIEW (self->list_view), list);
 out:
 	if (gs_app_list_length (pending) > 0) {
 		plugin_job = gs_plugin_job_refine_new (pending,
@@ -434,23 +261,6 @@ out:
 	}
 }
 
-static void
-gs_installed_page_remove_all_cb (GtkWidget *container,
-				 GtkWidget *child)
-{
-	if (GS_IS_APP_ROW (child)) {
-		GsApp *app = gs_app_row_get_app (GS_APP_ROW (child));
-		if (app != NULL) {
-			g_signal_handlers_disconnect_matched (app, G_SIGNAL_MATCH_FUNC, 0, 0, NULL,
-							      G_CALLBACK (gs_installed_page_notify_state_changed_cb), NULL);
-		}
-	} else {
-		g_warn_if_reached ();
-	}
-
-	gtk_list_box_remove (GTK_LIST_BOX (container), child);
-}
-
 static gboolean
 filter_app_kinds_cb (GsApp    *app,
                      gpointer  user_data)
@@ -478,7 +288,6 @@ gs_installed_page_get_refine_require_flags (GsInstalledPage *self)
 	GsPluginRefineRequireFlags flags;
 
 	flags = GS_PLUGIN_REFINE_REQUIRE_FLAGS_ICON |
-		GS_PLUGIN_REFINE_REQUIRE_FLAGS_HISTORY |
 		GS_PLUGIN_REFINE_REQUIRE_FLAGS_SETUP_ACTION |
 		GS_PLUGIN_REFINE_REQUIRE_FLAGS_VERSION |
 		GS_PLUGIN_REFINE_REQUIRE_FLAGS_PERMISSIONS |
@@ -506,12 +315,8 @@ gs_installed_page_load (GsInstalledPage *self)
 	self->waiting = TRUE;
 
 	/* remove old entries */
-	gs_widget_remove_all (self->list_box_install_in_progress, gs_installed_page_remove_all_cb);
-	gs_widget_remove_all (self->list_box_install_apps, gs_installed_page_remove_all_cb);
-	gs_widget_remove_all (self->list_box_install_system_apps, gs_installed_page_remove_all_cb);
-	gs_widget_remove_all (self->list_box_install_addons, gs_installed_page_remove_all_cb);
-	gs_widget_remove_all (self->list_box_install_web_apps, gs_installed_page_remove_all_cb);
-	update_groups (self);
+	gs_app_list_view_remove_all (GS_APP_LIST_VIEW (self->list_view));
+	gs_app_list_remove_all (self->list);
 
 	/* get installed apps */
 	query = gs_app_query_new ("is-installed", GS_APP_QUERY_TRISTATE_TRUE,
@@ -575,7 +380,6 @@ static gchar *
 gs_installed_page_get_app_sort_key (GsApp *app)
 {
 	GString *key;
-	g_autofree gchar *sort_name = NULL;
 
 	key = g_string_sized_new (64);
 
@@ -637,24 +441,22 @@ gs_installed_page_get_app_sort_key (GsApp *app)
 
 	/* finally, sort by short name */
 	if (gs_app_get_name (app) != NULL) {
-		sort_name = gs_utils_sort_key (gs_app_get_name (app));
-		g_string_append (key, sort_name);
+		g_autofree gchar *name_sort_key = gs_app_dup_name_sort_key (app);
+		if (name_sort_key != NULL)
+			g_string_append (key, name_sort_key);
 	}
 
 	return g_string_free (key, FALSE);
 }
 
 static gint
-gs_installed_page_sort_func (GtkListBoxRow *a,
-                             GtkListBoxRow *b,
+gs_installed_page_sort_func (GsApp *a1,
+                             GsApp *a2,
                              gpointer user_data)
 {
-	GsApp *a1, *a2;
 	g_autofree gchar *key1 = NULL;
 	g_autofree gchar *key2 = NULL;
 
-	a1 = gs_app_row_get_app (GS_APP_ROW (a));
-	a2 = gs_app_row_get_app (GS_APP_ROW (b));
 	key1 = gs_installed_page_get_app_sort_key (a1);
 	key2 = gs_installed_page_get_app_sort_key (a2);
 
@@ -662,32 +464,6 @@ gs_installed_page_sort_func (GtkListBoxRow *a,
 	return g_strcmp0 (key1, key2);
 }
 
-static gboolean
-gs_installed_page_has_app (GsInstalledPage *self,
-                           GsApp *app)
-{
-	GtkWidget *lists[] = {
-		self->list_box_install_in_progress,
-		self->list_box_install_apps,
-		self->list_box_install_system_apps,
-		self->list_box_install_addons,
-		self->list_box_install_web_apps,
-		NULL
-	};
-
-	for (gsize i = 0; lists[i]; i++) {
-		for (GtkWidget *child = gtk_widget_get_first_child (lists[i]);
-		     child != NULL;
-		     child = gtk_widget_get_next_sibling (child)) {
-			GsAppRow *app_row = GS_APP_ROW (child);
-			if (gs_app_row_get_app (app_row) == app)
-				return TRUE;
-		}
-	}
-
-	return FALSE;
-}
-
 static void
 gs_installed_page_add_pending_apps (GsInstalledPage *self,
 				    GsAppList *list,
@@ -719,8 +495,8 @@ gs_installed_page_add_pending_apps (GsInstalledPage *self,
 					     gs_app_get_cancellable (app));
 
 		++pending_apps_count;
-		if (!gs_installed_page_has_app (self, app))
-			gs_installed_page_add_app (self, list, app);
+		if (!gs_app_list_view_has_app (GS_APP_LIST_VIEW (self->list_view), app))
+			gs_installed_page_add_app (self, app);
 	}
 
 	/* update the number of on-going operations */
@@ -782,22 +558,6 @@ gs_installed_page_setup (GsPage *page,
 
 	self->cancellable = g_object_ref (cancellable);
 
-	/* setup installed */
-	gtk_list_box_set_sort_func (GTK_LIST_BOX (self->list_box_install_in_progress),
-				    gs_installed_page_sort_func,
-				    self, NULL);
-	gtk_list_box_set_sort_func (GTK_LIST_BOX (self->list_box_install_apps),
-				    gs_installed_page_sort_func,
-				    self, NULL);
-	gtk_list_box_set_sort_func (GTK_LIST_BOX (self->list_box_install_system_apps),
-				    gs_installed_page_sort_func,
-				    self, NULL);
-	gtk_list_box_set_sort_func (GTK_LIST_BOX (self->list_box_install_addons),
-				    gs_installed_page_sort_func,
-				    self, NULL);
-	gtk_list_box_set_sort_func (GTK_LIST_BOX (self->list_box_install_web_apps),
-				    gs_installed_page_sort_func,
-				    self, NULL);
 	return TRUE;
 }
 
@@ -861,6 +621,7 @@ gs_installed_page_dispose (GObject *object)
 	g_clear_object (&self->plugin_loader);
 	g_clear_object (&self->cancellable);
 	g_clear_object (&self->settings);
+	g_clear_object (&self->list);
 
 	G_OBJECT_CLASS (gs_installed_page_parent_class)->dispose (object);
 }
@@ -904,25 +665,28 @@ gs_installed_page_class_init (GsInstalledPageClass *klass)
 
 	gtk_widget_class_set_template_from_resource (widget_class, "/org/gnome/Software/gs-installed-page.ui");
 
-	gtk_widget_class_bind_template_child (widget_class, GsInstalledPage, group_install_in_progress);
-	gtk_widget_class_bind_template_child (widget_class, GsInstalledPage, group_install_apps);
-	gtk_widget_class_bind_template_child (widget_class, GsInstalledPage, group_install_system_apps);
-	gtk_widget_class_bind_template_child (widget_class, GsInstalledPage, group_install_addons);
-	gtk_widget_class_bind_template_child (widget_class, GsInstalledPage, group_install_web_apps);
-	gtk_widget_class_bind_template_child (widget_class, GsInstalledPage, list_box_install_in_progress);
-	gtk_widget_class_bind_template_child (widget_class, GsInstalledPage, list_box_install_apps);
-	gtk_widget_class_bind_template_child (widget_class, GsInstalledPage, list_box_install_system_apps);
-	gtk_widget_class_bind_template_child (widget_class, GsInstalledPage, list_box_install_addons);
-	gtk_widget_class_bind_template_child (widget_class, GsInstalledPage, list_box_install_web_apps);
+	gtk_widget_class_bind_template_child (widget_class, GsInstalledPage, list_view);
 	gtk_widget_class_bind_template_child (widget_class, GsInstalledPage, scrolledwindow_install);
 	gtk_widget_class_bind_template_child (widget_class, GsInstalledPage, stack_install);
 
-	gtk_widget_class_bind_template_callback (widget_class, gs_installed_page_app_row_activated_cb);
+	gtk_widget_class_bind_template_callback (widget_class, gs_installed_page_app_activated_cb);
+	gtk_widget_class_bind_template_callback (widget_class, gs_installed_page_app_unrevealed_cb);
 }
 
 static void
 gs_installed_page_init (GsInstalledPage *self)
 {
+	const gchar *section_titles[GS_UPDATE_LIST_SECTION_LAST + 1] = {
+		[GS_UPDATE_LIST_SECTION_INSTALLING_AND_REMOVING] = _("In Progress"),
+		[GS_UPDATE_LIST_SECTION_REMOVABLE_APPS] = _("Apps"),
+		[GS_UPDATE_LIST_SECTION_WEB_APPS] = _("Web Apps"),
+		[GS_UPDATE_LIST_SECTION_SYSTEM_APPS] = _("System Apps"),
+		[GS_UPDATE_LIST_SECTION_ADDONS] = _("Add-ons"),
+		[GS_UPDATE_LIST_SECTION_LAST] = NULL,
+	};
+
+	g_type_ensure (GS_TYPE_APP_LIST_VIEW);
+
 	gtk_widget_init_template (GTK_WIDGET (self));
 
 	self->sizegroup_name = gtk_size_group_new (GTK_SIZE_GROUP_HORIZONTAL);
@@ -930,6 +694,24 @@ gs_installed_page_init (GsInstalledPage *self)
 	self->sizegroup_button_image = gtk_size_group_new (GTK_SIZE_GROUP_HORIZONTAL);
 
 	self->settings = g_settings_new ("org.gnome.software");
+
+	self->list = gs_app_list_new ();
+	gs_app_list_add_flag (self->list, GS_APP_LIST_FLAG_WATCH_APPS);
+	g_signal_connect_object (self->list, "app-state-changed",
+				 G_CALLBACK (gs_installed_page_app_state_changed_cb),
+				 self, 0);
+
+	gs_app_list_view_set_row_funcs (GS_APP_LIST_VIEW (self->list_view),
+					(GsAppListViewRowFunc) gs_installed_page_setup_row_cb,
+					(GsAppListViewRowFunc) gs_installed_page_bind_row_cb,
+					self);
+	gs_app_list_view_set_filter_func (GS_APP_LIST_VIEW (self->list_view),
+					  gs_installed_page_is_actual_app, self);
+	gs_app_list_view_set_sort_func (GS_APP_LIST_VIEW (self->list_view),
+					gs_installed_page_sort_func, self);
+	gs_app_list_view_set_section_func (GS_APP_LIST_VIEW (self->list_view),
+					   gs_installed_page_get_app_section,
+					   section_titles, self);
 }
 
 /**
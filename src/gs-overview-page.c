@@ -19,6 +19,7 @@
 #include "gs-featured-carousel.h"
 #include "gs-category-tile.h"
 #include "gs-common.h"
+#include "gs-overview-snapshot.h"
 #include "gs-summary-tile.h"
 
 /* Chosen as it has 2 and 3 as factors, so will form an even 2-column and
@@ -51,6 +52,10 @@ struct _GsOverviewPage
 	GsFedoraThirdParty	*third_party;
 	gboolean		 third_party_needs_question;
 	gchar		       **deployment_featured;
+	GsOverviewSnapshot	*pending_snapshot;  /* (owned) (nullable) */
+	gboolean		 snapshot_checked;
+	guint			 snapshot_sections;  /* bitfield of (1 << GsOverviewSnapshotSection) */
+	gboolean		 snapshot_categories;
 
 	AdwDialog		*dialog_third_party;
 	GtkWidget		*featured_carousel;
@@ -94,10 +99,36 @@ gs_overview_page_invalidate (GsOverviewPage *self)
 	self->cache_valid = FALSE;
 }
 
+/* Whether @section is still showing placeholders from the snapshot, rather
+ * than live data. Placeholder apps aren’t backed by any plugin, so they can’t
+ * be opened. */
+static gboolean
+gs_overview_page_snapshot_section_is_shown (GsOverviewPage            *self,
+                                            GsOverviewSnapshotSection  section)
+{
+	return (self->snapshot_sections & (1u << section)) != 0;
+}
+
+static void
+gs_overview_page_snapshot_section_replaced (GsOverviewPage            *self,
+                                            GsOverviewSnapshotSection  section)
+{
+	self->snapshot_sections &= ~(1u << section);
+}
+
 static void
 app_activated_cb (GsOverviewPage *self, GsAppTile *tile)
 {
 	GsApp *app;
+	GtkWidget *box = gtk_widget_get_parent (GTK_WIDGET (tile));
+
+	if ((box == self->box_curated &&
+	     gs_overview_page_snapshot_section_is_shown (self, GS_OVERVIEW_SNAPSHOT_SECTION_CURATED)) ||
+	    (box == self->box_recent &&
+	     gs_overview_page_snapshot_section_is_shown (self, GS_OVERVIEW_SNAPSHOT_SECTION_RECENT)) ||
+	    (box == self->box_deployment_featured &&
+	     gs_overview_page_snapshot_section_is_shown (self, GS_OVERVIEW_SNAPSHOT_SECTION_DEPLOYMENT_FEATURED)))
+		return;
 
 	app = gs_app_tile_get_app (tile);
 
@@ -114,9 +145,98 @@ featured_carousel_app_clicked_cb (GsFeaturedCarousel *carousel,
 {
 	GsOverviewPage *self = GS_OVERVIEW_PAGE (user_data);
 
+	if (gs_overview_page_snapshot_section_is_shown (self, GS_OVERVIEW_SNAPSHOT_SECTION_FEATURED))
+		return;
+
 	gs_shell_show_app (self->shell, app);
 }
 
+static gchar *
+gs_overview_page_dup_snapshot_filename (GError **error)
+{
+	return gs_utils_get_cache_filename ("overview",
+					    "snapshot.gvariant",
+					    GS_UTILS_CACHE_FLAG_WRITEABLE |
+					    GS_UTILS_CACHE_FLAG_CREATE_DIRECTORY,
+					    error);
+}
+
+/* The snapshot is only valid for the same locale and filters as were used
+ * when it was saved, as those change the content of the page. */
+static gchar *
+gs_overview_page_dup_snapshot_context (GsOverviewPage *self)
+{
+	return g_strdup_printf ("%s;%u;%u",
+				g_get_language_names ()[0],
+				(guint) gs_page_get_query_license_type (GS_PAGE (self)),
+				(guint) gs_page_get_query_developer_verified_type (GS_PAGE (self)));
+}
+
+static void
+gs_overview_page_save_snapshot (GsOverviewPage *self)
+{
+	g_autoptr(GsOverviewSnapshot) snapshot = g_steal_pointer (&self->pending_snapshot);
+	g_autofree gchar *filename = NULL;
+	g_autoptr(GError) error = NULL;
+
+	if (snapshot == NULL || g_cancellable_is_cancelled (self->cancellable))
+		return;
+
+	filename = gs_overview_page_dup_snapshot_filename (&error);
+	if (filename == NULL ||
+	    !gs_overview_snapshot_save (snapshot, filename, &error))
+		g_debug ("Failed to save overview snapshot: %s", error->message);
+}
+
+static void
+gs_overview_page_plugin_loader_reload_cb (GsOverviewPage *self)
+{
+	g_autofree gchar *filename = NULL;
+	g_autoptr(GError) error = NULL;
+
+	/* The apps or categories may have changed, so stop the snapshot being
+	 * shown until the page has been reloaded with the new data */
+	g_clear_object (&self->pending_snapshot);
+
+	filename = gs_overview_page_dup_snapshot_filename (&error);
+	if (filename == NULL ||
+	    !gs_overview_snapshot_invalidate (filename, &error))
+		g_debug ("Failed to invalidate overview snapshot: %s", error->message);
+}
+
+static guint update_categories_sections (GsOverviewPage *self,
+                                         GPtrArray      *list);
+
+/* Hide whatever is still showing from the snapshot once all the jobs have
+ * finished, for example because a job failed or returned too few apps. */
+static void
+gs_overview_page_drop_snapshot (GsOverviewPage *self)
+{
+	if (gs_overview_page_snapshot_section_is_shown (self, GS_OVERVIEW_SNAPSHOT_SECTION_FEATURED)) {
+		gs_featured_carousel_set_apps (GS_FEATURED_CAROUSEL (self->featured_carousel), NULL);
+		gtk_widget_set_visible (self->featured_carousel, FALSE);
+	}
+	if (gs_overview_page_snapshot_section_is_shown (self, GS_OVERVIEW_SNAPSHOT_SECTION_CURATED)) {
+		gs_widget_remove_all (self->box_curated, (GsRemoveFunc) gtk_flow_box_remove);
+		gtk_widget_set_visible (self->box_curated, FALSE);
+		gtk_widget_set_visible (self->curated_heading, FALSE);
+	}
+	if (gs_overview_page_snapshot_section_is_shown (self, GS_OVERVIEW_SNAPSHOT_SECTION_RECENT)) {
+		gs_widget_remove_all (self->box_recent, (GsRemoveFunc) gtk_flow_box_remove);
+		gtk_widget_set_visible (self->box_recent, FALSE);
+		gtk_widget_set_visible (self->recent_heading, FALSE);
+	}
+	if (gs_overview_page_snapshot_section_is_shown (self, GS_OVERVIEW_SNAPSHOT_SECTION_DEPLOYMENT_FEATURED)) {
+		gs_widget_remove_all (self->box_deployment_featured, (GsRemoveFunc) gtk_flow_box_remove);
+		gtk_widget_set_visible (self->box_deployment_featured, FALSE);
+		gtk_widget_set_visible (self->deployment_featured_heading, FALSE);
+	}
+	self->snapshot_sections = 0;
+
+	if (self->snapshot_categories)
+		update_categories_sections (self, NULL);
+}
+
 static void
 gs_overview_page_decrement_action_cnt (GsOverviewPage *self)
 {
@@ -129,6 +249,8 @@ gs_overview_page_decrement_action_cnt (GsOverviewPage *self)
 		return;
 
 	/* all done */
+	gs_overview_page_drop_snapshot (self);
+	gs_overview_page_save_snapshot (self);
 	self->cache_valid = TRUE;
 	g_signal_emit (self, signals[SIGNAL_REFRESHED], 0);
 	self->loading_categories = FALSE;
@@ -157,6 +279,7 @@ gs_overview_page_get_curated_cb (GObject *source_object,
 		if (!g_error_matches (error, GS_PLUGIN_ERROR, GS_PLUGIN_ERROR_CANCELLED) &&
 		    !g_error_matches (error, G_IO_ERROR, G_IO_ERROR_CANCELLED))
 			g_warning ("failed to get curated apps: %s", error->message);
+		g_clear_object (&self->pending_snapshot);
 		goto out;
 	}
 
@@ -182,6 +305,9 @@ gs_overview_page_get_curated_cb (GObject *source_object,
 		gs_app_list_remove (list, gs_app_list_index (list, gs_app_list_length (list) - 1));
 	}
 
+	if (self->pending_snapshot != NULL)
+		gs_overview_snapshot_set_apps (self->pending_snapshot, GS_OVERVIEW_SNAPSHOT_SECTION_CURATED, list);
+
 	gs_widget_remove_all (self->box_curated, (GsRemoveFunc) gtk_flow_box_remove);
 
 	for (i = 0; i < gs_app_list_length (list); i++) {
@@ -189,6 +315,7 @@ gs_overview_page_get_curated_cb (GObject *source_object,
 		tile = gs_summary_tile_new (app);
 		gtk_flow_box_insert (GTK_FLOW_BOX (self->box_curated), tile, -1);
 	}
+	gs_overview_page_snapshot_section_replaced (self, GS_OVERVIEW_SNAPSHOT_SECTION_CURATED);
 	gtk_widget_set_visible (self->box_curated, TRUE);
 	gtk_widget_set_visible (self->curated_heading, TRUE);
 
@@ -235,6 +362,7 @@ gs_overview_page_get_recent_cb (GObject *source_object, GAsyncResult *res, gpoin
 		if (!g_error_matches (error, GS_PLUGIN_ERROR, GS_PLUGIN_ERROR_CANCELLED) &&
 		    !g_error_matches (error, G_IO_ERROR, G_IO_ERROR_CANCELLED))
 			g_warning ("failed to get recent apps: %s", error->message);
+		g_clear_object (&self->pending_snapshot);
 		goto out;
 	}
 
@@ -251,6 +379,9 @@ gs_overview_page_get_recent_cb (GObject *source_object, GAsyncResult *res, gpoin
 
 	g_assert (gs_app_list_length (list) <= N_TILES);
 
+	if (self->pending_snapshot != NULL)
+		gs_overview_snapshot_set_apps (self->pending_snapshot, GS_OVERVIEW_SNAPSHOT_SECTION_RECENT, list);
+
 	gs_widget_remove_all (self->box_recent, (GsRemoveFunc) gtk_flow_box_remove);
 
 	for (i = 0; i < gs_app_list_length (list); i++) {
@@ -268,6 +399,7 @@ gs_overview_page_get_recent_cb (GObject *source_object, GAsyncResult *res, gpoin
 
 		gtk_flow_box_insert (GTK_FLOW_BOX (self->box_recent), tile, -1);
 	}
+	gs_overview_page_snapshot_section_replaced (self, GS_OVERVIEW_SNAPSHOT_SECTION_RECENT);
 	gtk_widget_set_visible (self->box_recent, TRUE);
 	gtk_widget_set_visible (self->recent_heading, TRUE);
 
@@ -306,8 +438,10 @@ gs_overview_page_get_featured_cb (GObject *source_object,
 
 	gs_plugin_loader_job_process_finish (plugin_loader, res, (GsPluginJob **) &list_apps_job, &error);
 	if (g_error_matches (error, GS_PLUGIN_ERROR, GS_PLUGIN_ERROR_CANCELLED) ||
-	    g_error_matches (error, G_IO_ERROR, G_IO_ERROR_CANCELLED))
+	    g_error_matches (error, G_IO_ERROR, G_IO_ERROR_CANCELLED)) {
+		g_clear_object (&self->pending_snapshot);
 		goto out;
+	}
 
 	if (self->featured_overwritten) {
 		g_debug ("Skipping set of featured apps, because being overwritten");
@@ -325,6 +459,10 @@ gs_overview_page_get_featured_cb (GObject *source_object,
 
 	gtk_widget_set_visible (self->featured_carousel, gs_app_list_length (list) > 0);
 	gs_featured_carousel_set_apps (GS_FEATURED_CAROUSEL (self->featured_carousel), list);
+	gs_overview_page_snapshot_section_replaced (self, GS_OVERVIEW_SNAPSHOT_SECTION_FEATURED);
+
+	if (self->pending_snapshot != NULL)
+		gs_overview_snapshot_set_apps (self->pending_snapshot, GS_OVERVIEW_SNAPSHOT_SECTION_FEATURED, list);
 
 	self->empty = self->empty && (gs_app_list_length (list) == 0);
 
@@ -350,6 +488,7 @@ gs_overview_page_get_deployment_featured_cb (GObject *source_object,
 	if (!gs_plugin_loader_job_process_finish (plugin_loader, res, (GsPluginJob **) &list_apps_job, &error)) {
 		if (!g_error_matches (error, GS_PLUGIN_ERROR, GS_PLUGIN_ERROR_CANCELLED))
 			g_warning ("failed to get deployment-featured apps: %s", error->message);
+		g_clear_object (&self->pending_snapshot);
 		goto out;
 	}
 
@@ -367,11 +506,15 @@ gs_overview_page_get_deployment_featured_cb (GObject *source_object,
 	g_assert (gs_app_list_length (list) == N_TILES);
 	gs_widget_remove_all (self->box_deployment_featured, (GsRemoveFunc) gtk_flow_box_remove);
 
+	if (self->pending_snapshot != NULL)
+		gs_overview_snapshot_set_apps (self->pending_snapshot, GS_OVERVIEW_SNAPSHOT_SECTION_DEPLOYMENT_FEATURED, list);
+
 	for (i = 0; i < gs_app_list_length (list); i++) {
 		app = gs_app_list_index (list, i);
 		tile = gs_summary_tile_new (app);
 		gtk_flow_box_insert (GTK_FLOW_BOX (self->box_deployment_featured), tile, -1);
 	}
+	gs_overview_page_snapshot_section_replaced (self, GS_OVERVIEW_SNAPSHOT_SECTION_DEPLOYMENT_FEATURED);
 	gtk_widget_set_visible (self->box_deployment_featured, TRUE);
 	gtk_widget_set_visible (self->deployment_featured_heading, TRUE);
 
@@ -445,6 +588,10 @@ category_activated_cb (GsOverviewPage *self, GsCategoryTile *tile)
 {
 	GsCategory *category;
 
+	/* the snapshot’s categories are only placeholders */
+	if (self->snapshot_categories)
+		return;
+
 	category = gs_category_tile_get_category (tile);
 	gs_shell_show_category (self->shell, category);
 }
@@ -477,6 +624,8 @@ update_categories_sections (GsOverviewPage *self,
 	if (g_cancellable_is_cancelled (self->cancellable))
 		return found_apps_cnt;
 
+	self->snapshot_categories = FALSE;
+
 	gs_widget_remove_all (self->flowbox_categories, (GsRemoveFunc) gtk_flow_box_remove);
 	gs_widget_remove_all (self->flowbox_iconless_categories, (GsRemoveFunc) gtk_flow_box_remove);
 
@@ -545,6 +694,9 @@ finish_verify_category_op (GetCategoriesData *op_data)
 	list = gs_plugin_job_list_categories_get_result_list (data->job);
 	found_apps_cnt = update_categories_sections (self, list);
 
+	if (self->pending_snapshot != NULL)
+		gs_overview_snapshot_set_categories (self->pending_snapshot, list);
+
 	g_debug ("overview page found %u category apps", found_apps_cnt);
 	if (found_apps_cnt < MIN_CATEGORIES_APPS && found_apps_cnt > 0) {
 		GsPluginListAppsFlags flags = GS_PLUGIN_LIST_APPS_FLAGS_INTERACTIVE;
@@ -662,6 +814,7 @@ gs_overview_page_get_categories_list_cb (GObject *source_object,
 		if (!g_error_matches (error, GS_PLUGIN_ERROR, GS_PLUGIN_ERROR_CANCELLED) &&
 		    !g_error_matches (error, G_IO_ERROR, G_IO_ERROR_CANCELLED))
 			g_warning ("failed to get categories: %s", error->message);
+		g_clear_object (&self->pending_snapshot);
 	} else {
 		g_autoptr(GPtrArray) verify_categories = NULL; /* (element-type GsCategory) */
 		GPtrArray *list = NULL; /* (element-type GsCategory) */
@@ -972,11 +1125,141 @@ gs_overview_page_read_deployment_featured_keys (gchar **out_label,
 	return TRUE;
 }
 
+static void
+gs_overview_page_show_snapshot_apps (GsOverviewPage *self,
+				     GsOverviewSnapshotSection section,
+				     GtkWidget *box,
+				     GtkWidget *heading,
+				     GsAppList *list,
+				     gboolean show_release_date)
+{
+	if (list == NULL)
+		return;
+
+	gs_widget_remove_all (box, (GsRemoveFunc) gtk_flow_box_remove);
+
+	for (guint i = 0; i < gs_app_list_length (list); i++) {
+		GsApp *app = gs_app_list_index (list, i);
+		GtkWidget *tile = gs_summary_tile_new (app);
+
+		if (show_release_date) {
+			g_autofree gchar *release_date_tooltip = NULL;
+
+			release_date_tooltip = gs_utils_time_to_datestring (gs_app_get_release_date (app));
+			gtk_widget_set_tooltip_text (tile, release_date_tooltip);
+		}
+
+		gtk_flow_box_insert (GTK_FLOW_BOX (box), tile, -1);
+	}
+	gtk_widget_set_visible (box, TRUE);
+	gtk_widget_set_visible (heading, TRUE);
+
+	self->snapshot_sections |= (1u << section);
+}
+
+/* Show the overview as it was when it was last loaded, so there is something
+ * to look at while the plugins set up and the live data is loaded. Everything
+ * shown here is replaced as each of the jobs in gs_overview_page_load()
+ * finishes. */
+static gboolean
+gs_overview_page_show_snapshot (GsOverviewPage *self)
+{
+	g_autofree gchar *filename = NULL;
+	g_autofree gchar *context = NULL;
+	g_autoptr(GsOverviewSnapshot) snapshot = NULL;
+	g_autoptr(GsAppList) featured = NULL;
+	g_autoptr(GsAppList) curated = NULL;
+	g_autoptr(GsAppList) recent = NULL;
+	g_autoptr(GsAppList) deployment_featured = NULL;
+	g_autoptr(GPtrArray) categories = NULL;
+	const GsDesktopData *desktop_data;
+	g_autoptr(GError) error = NULL;
+
+	filename = gs_overview_page_dup_snapshot_filename (&error);
+	if (filename == NULL) {
+		g_debug ("Failed to get overview snapshot filename: %s", error->message);
+		return FALSE;
+	}
+
+	context = gs_overview_page_dup_snapshot_context (self);
+	snapshot = gs_overview_snapshot_load (filename, context, &error);
+	if (snapshot == NULL) {
+		g_debug ("Not showing overview snapshot: %s", error->message);
+		return FALSE;
+	}
+
+	if (!gs_overview_snapshot_has_content (snapshot))
+		return FALSE;
+
+	featured = gs_overview_snapshot_dup_apps (snapshot, GS_OVERVIEW_SNAPSHOT_SECTION_FEATURED);
+	if (featured != NULL) {
+		gs_featured_carousel_set_apps (GS_FEATURED_CAROUSEL (self->featured_carousel), featured);
+		gtk_widget_set_visible (self->featured_carousel, TRUE);
+		self->snapshot_sections |= (1u << GS_OVERVIEW_SNAPSHOT_SECTION_FEATURED);
+	}
+
+	curated = gs_overview_snapshot_dup_apps (snapshot, GS_OVERVIEW_SNAPSHOT_SECTION_CURATED);
+	gs_overview_page_show_snapshot_apps (self, GS_OVERVIEW_SNAPSHOT_SECTION_CURATED,
+					     self->box_curated, self->curated_heading, curated, FALSE);
+
+	recent = gs_overview_snapshot_dup_apps (snapshot, GS_OVERVIEW_SNAPSHOT_SECTION_RECENT);
+	gs_overview_page_show_snapshot_apps (self, GS_OVERVIEW_SNAPSHOT_SECTION_RECENT,
+					     self->box_recent, self->recent_heading, recent, TRUE);
+
+	if (self->deployment_featured != NULL) {
+		deployment_featured = gs_overview_snapshot_dup_apps (snapshot, GS_OVERVIEW_SNAPSHOT_SECTION_DEPLOYMENT_FEATURED);
+		gs_overview_page_show_snapshot_apps (self, GS_OVERVIEW_SNAPSHOT_SECTION_DEPLOYMENT_FEATURED,
+						     self->box_deployment_featured,
+						     self->deployment_featured_heading,
+						     deployment_featured, FALSE);
+	}
+
+	/* Use new categories, rather than the ones from the category manager,
+	 * so the sizes from the snapshot are never seen by anything else */
+	desktop_data = gs_desktop_get_data ();
+	categories = g_ptr_array_new_full (GS_DESKTOP_DATA_N_ENTRIES, g_object_unref);
+	for (gsize i = 0; desktop_data[i].id != NULL; i++) {
+		g_autoptr(GsCategory) category = NULL;
+		guint size;
+
+		if (!gs_overview_snapshot_lookup_category_size (snapshot, desktop_data[i].id, &size))
+			continue;
+
+		category = gs_category_new_for_desktop_data (&desktop_data[i]);
+		gs_category_set_size (category, size);
+		g_ptr_array_add (categories, g_steal_pointer (&category));
+	}
+	update_categories_sections (self, categories);
+	self->snapshot_categories = (categories->len > 0);
+
+	g_debug ("Showing overview snapshot from ‘%s’", filename);
+
+	return TRUE;
+}
+
 static void
 gs_overview_page_load (GsOverviewPage *self)
 {
+	gboolean showing_snapshot = FALSE;
+
 	self->empty = TRUE;
 
+	/* Only try the snapshot for the first load; after that the page
+	 * already contains data which is at least as fresh. */
+	if (!self->snapshot_checked) {
+		self->snapshot_checked = TRUE;
+		showing_snapshot = gs_overview_page_show_snapshot (self);
+	}
+
+	/* Collect the results of this round of jobs so they can be shown at
+	 * the next startup. */
+	if (self->action_cnt == 0) {
+		g_autofree gchar *context = gs_overview_page_dup_snapshot_context (self);
+
+		g_clear_object (&self->pending_snapshot);
+		self->pending_snapshot = gs_overview_snapshot_new (context);
+	}
+
 	if (!self->loading_featured) {
 		g_autoptr(GsPluginJob) plugin_job = NULL;
 		g_autoptr(GsAppQuery) query = NULL;
@@ -1111,6 +1394,14 @@ gs_overview_page_load (GsOverviewPage *self)
 		self->action_cnt++;
 	}
 
+	/* Let the shell stop showing the loading page straight away. The page
+	 * is not marked as valid, and whether it is empty is decided by the
+	 * live results when the jobs finish. */
+	if (showing_snapshot && self->action_cnt > 0)
+		g_signal_emit (self, signals[SIGNAL_REFRESHED], 0);
+	else if (showing_snapshot)
+		gs_overview_page_drop_snapshot (self);
+
 	reload_third_party_repo (self);
 }
 
@@ -1200,6 +1491,11 @@ gs_overview_page_setup (GsPage *page,
 	self->category_hash = g_hash_table_new_full (g_str_hash, g_str_equal,
 						     g_free, (GDestroyNotify) g_object_unref);
 
+	/* invalidate the snapshot whenever the plugins’ data changes */
+	g_signal_connect_object (plugin_loader, "reload",
+				 G_CALLBACK (gs_overview_page_plugin_loader_reload_cb),
+				 self, G_CONNECT_SWAPPED);
+
 	/* create message dialog if not already dismissed in initial-setup */
 	g_signal_connect (self, "map",
 			  G_CALLBACK (refresh_third_party_repo), NULL);
@@ -1224,9 +1520,12 @@ gs_overview_page_setup (GsPage *page,
 static void
 refreshed_cb (GsOverviewPage *self, gpointer user_data)
 {
-	g_debug ("Overview refresh finished: setting UI to %s", self->empty ? "empty" : "show results");
+	gboolean showing_snapshot = (self->snapshot_sections != 0 || self->snapshot_categories);
+
+	g_debug ("Overview refresh finished: setting UI to %s",
+		 showing_snapshot ? "show snapshot" : self->empty ? "empty" : "show results");
 
-	if (self->empty) {
+	if (self->empty && !showing_snapshot) {
 		gtk_stack_set_visible_child_name (GTK_STACK (self->stack_overview), "no-results");
 	} else {
 		gtk_stack_set_visible_child_name (GTK_STACK (self->stack_overview), "overview");
@@ -1300,6 +1599,7 @@ gs_overview_page_dispose (GObject *object)
 	g_clear_object (&self->third_party);
 	g_clear_pointer (&self->category_hash, g_hash_table_unref);
 	g_clear_pointer (&self->deployment_featured, g_strfreev);
+	g_clear_object (&self->pending_snapshot);
 	if (self->dialog_third_party)
 		adw_dialog_force_close (self->dialog_third_party);
 
@@ -1367,6 +1667,7 @@ gs_overview_page_override_featured (GsOverviewPage	*self,
 	g_return_if_fail (GS_IS_APP (app));
 
 	self->featured_overwritten = TRUE;
+	gs_overview_page_snapshot_section_replaced (self, GS_OVERVIEW_SNAPSHOT_SECTION_FEATURED);
 
 	list = gs_app_list_new ();
 	gs_app_list_add (list, app);
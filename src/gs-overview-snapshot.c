@@ -0,0 +1,557 @@
+/* -*- Mode: C; tab-width: 8; indent-tabs-mode: t; c-basic-offset: 8 -*-
+ * vi:set noexpandtab tabstop=8 shiftwidth=8:
+ *
+ * Copyright (C) 2026 GNOME Foundation, Inc.
+ *
+ * SPDX-License-Identifier: GPL-2.0-or-later
+ */
+
+/**
+ * SECTION:gs-overview-snapshot
+ * @short_description: A persisted copy of the last rendered overview page
+ *
+ * #GsOverviewSnapshot stores the apps shown in each section of the overview
+ * page, along with the category sizes, so that they can be written to disk
+ * once the overview has been loaded and shown again straight away on the next
+ * startup, before the plugins have finished setting up.
+ *
+ * Only the details needed to render the tiles are stored: the app IDs, names,
+ * summaries, release dates and the icons which are available locally. Apps
+ * created from a snapshot are placeholders, and are replaced with the live
+ * data as soon as the overview page has finished loading it.
+ *
+ * A snapshot is tied to a context string (typically the locale and the
+ * overview filters), and is rejected on load if the context does not match or
+ * if it is too old.
+ */
+
+#include "config.h"
+
+#include <gio/gio.h>
+
+#include "gs-overview-snapshot.h"
+
+/* Bump this whenever the serialisation format changes */
+#define SNAPSHOT_FORMAT_VERSION 1
+#define SNAPSHOT_FORMAT "(usxaaa{sv}a{su})"
+
+/* Snapshots older than this are not shown, as they are likely to be out of
+ * date with the appstream data which will eventually be loaded */
+#define SNAPSHOT_MAX_AGE_USEC (7 * G_TIME_SPAN_DAY)
+
+struct _GsOverviewSnapshot
+{
+	GObject			 parent_instance;
+
+	gchar			*context;  /* (owned) (not nullable) */
+	GPtrArray		*sections[GS_OVERVIEW_SNAPSHOT_SECTION_LAST];  /* (element-type GVariant) (owned) (nullable) */
+	GHashTable		*category_sizes;  /* (element-type utf8 guint) (owned) */
+};
+
+G_DEFINE_TYPE (GsOverviewSnapshot, gs_overview_snapshot, G_TYPE_OBJECT)
+
+static GVariant *
+app_to_variant (GsApp *app)
+{
+	GVariantBuilder builder;
+	GVariantBuilder icons_builder;
+	g_autoptr(GPtrArray) icons = NULL;
+	const gchar *tmp;
+
+	g_variant_builder_init (&builder, G_VARIANT_TYPE_VARDICT);
+
+	tmp = gs_app_get_unique_id (app);
+	if (tmp != NULL)
+		g_variant_builder_add (&builder, "{sv}", "unique-id", g_variant_new_string (tmp));
+	tmp = gs_app_get_id (app);
+	if (tmp != NULL)
+		g_variant_builder_add (&builder, "{sv}", "id", g_variant_new_string (tmp));
+	tmp = gs_app_get_name (app);
+	if (tmp != NULL)
+		g_variant_builder_add (&builder, "{sv}", "name", g_variant_new_string (tmp));
+	tmp = gs_app_get_summary (app);
+	if (tmp != NULL)
+		g_variant_builder_add (&builder, "{sv}", "summary", g_variant_new_string (tmp));
+	g_variant_builder_add (&builder, "{sv}", "kind",
+			       g_variant_new_uint32 (gs_app_get_kind (app)));
+	g_variant_builder_add (&builder, "{sv}", "state",
+			       g_variant_new_uint32 (gs_app_get_state (app)));
+	g_variant_builder_add (&builder, "{sv}", "release-date",
+			       g_variant_new_uint64 (gs_app_get_release_date (app)));
+
+	/* Only icons which can be loaded without the network are stored;
+	 * remote icons are stored using their local cache file. */
+	g_variant_builder_init (&icons_builder, G_VARIANT_TYPE ("a(suuu)"));
+	icons = gs_app_dup_icons (app);
+	for (guint i = 0; icons != NULL && i < icons->len; i++) {
+		GIcon *icon = g_ptr_array_index (icons, i);
+		g_autofree gchar *icon_str = NULL;
+
+		if (G_IS_FILE_ICON (icon)) {
+			GFile *file = g_file_icon_get_file (G_FILE_ICON (icon));
+			if (g_file_peek_path (file) == NULL)
+				continue;
+			icon_str = g_file_get_path (file);
+		} else if (G_IS_THEMED_ICON (icon)) {
+			icon_str = g_icon_to_string (icon);
+		}
+
+		if (icon_str == NULL)
+			continue;
+
+		g_variant_builder_add (&icons_builder, "(suuu)",
+				       icon_str,
+				       gs_icon_get_width (icon),
+				       gs_icon_get_height (icon),
+				       gs_icon_get_scale (icon));
+	}
+	g_variant_builder_add (&builder, "{sv}", "icons",
+			       g_variant_builder_end (&icons_builder));
+
+	return g_variant_ref_sink (g_variant_builder_end (&builder));
+}
+
+static GsApp *
+app_from_variant (GVariant *variant)
+{
+	g_autoptr(GVariantDict) dict = g_variant_dict_new (variant);
+	g_autoptr(GsApp) app = NULL;
+	g_autoptr(GVariantIter) icons_iter = NULL;
+	const gchar *unique_id = NULL;
+	const gchar *id = NULL;
+	const gchar *tmp;
+	guint32 kind = AS_COMPONENT_KIND_UNKNOWN;
+	guint32 state = GS_APP_STATE_UNKNOWN;
+	guint64 release_date = 0;
+	const gchar *icon_str;
+	guint32 width, height, scale;
+
+	if (!g_variant_dict_lookup (dict, "id", "&s", &id))
+		return NULL;
+
+	app = gs_app_new (id);
+	if (g_variant_dict_lookup (dict, "kind", "u", &kind))
+		gs_app_set_kind (app, kind);
+	if (g_variant_dict_lookup (dict, "unique-id", "&s", &unique_id))
+		gs_app_set_from_unique_id (app, unique_id, kind);
+	if (g_variant_dict_lookup (dict, "name", "&s", &tmp))
+		gs_app_set_name (app, GS_APP_QUALITY_NORMAL, tmp);
+	if (g_variant_dict_lookup (dict, "summary", "&s", &tmp))
+		gs_app_set_summary (app, GS_APP_QUALITY_NORMAL, tmp);
+	if (g_variant_dict_lookup (dict, "release-date", "t", &release_date))
+		gs_app_set_release_date (app, release_date);
+	if (g_variant_dict_lookup (dict, "state", "u", &state) &&
+	    state < GS_APP_STATE_LAST)
+		gs_app_set_state (app, state);
+
+	if (g_variant_dict_lookup (dict, "icons", "a(suuu)", &icons_iter)) {
+		while (g_variant_iter_loop (icons_iter, "(&suuu)", &icon_str, &width, &height, &scale)) {
+			g_autoptr(GIcon) icon = NULL;
+
+			if (g_path_is_absolute (icon_str)) {
+				g_autoptr(GFile) file = g_file_new_for_path (icon_str);
+				icon = g_file_icon_new (file);
+			} else {
+				icon = g_icon_new_for_string (icon_str, NULL);
+			}
+
+			if (icon == NULL)
+				continue;
+
+			gs_icon_set_width (icon, width);
+			gs_icon_set_height (icon, height);
+			gs_icon_set_scale (icon, MAX (scale, 1));
+			gs_app_add_icon (app, icon);
+		}
+	}
+
+	gs_app_set_icons_state (app, GS_APP_ICONS_STATE_AVAILABLE);
+
+	return g_steal_pointer (&app);
+}
+
+/**
+ * gs_overview_snapshot_set_apps:
+ * @self: a #GsOverviewSnapshot
+ * @section: the section the apps are shown in
+ * @list: (nullable): the apps shown in @section, or %NULL if it is hidden
+ *
+ * Store the apps shown in @section of the overview page, replacing any which
+ * were stored previously.
+ *
+ * Since: 50
+ */
+void
+gs_overview_snapshot_set_apps (GsOverviewSnapshot        *self,
+			       GsOverviewSnapshotSection  section,
+			       GsAppList                 *list)
+{
+	g_return_if_fail (GS_IS_OVERVIEW_SNAPSHOT (self));
+	g_return_if_fail (section < GS_OVERVIEW_SNAPSHOT_SECTION_LAST);
+	g_return_if_fail (list == NULL || GS_IS_APP_LIST (list));
+
+	g_clear_pointer (&self->sections[section], g_ptr_array_unref);
+
+	if (list == NULL || gs_app_list_length (list) == 0)
+		return;
+
+	self->sections[section] = g_ptr_array_new_full (gs_app_list_length (list),
+							(GDestroyNotify) g_variant_unref);
+	for (guint i = 0; i < gs_app_list_length (list); i++) {
+		GsApp *app = gs_app_list_index (list, i);
+
+		if (gs_app_get_id (app) == NULL)
+			continue;
+		g_ptr_array_add (self->sections[section], app_to_variant (app));
+	}
+}
+
+/**
+ * gs_overview_snapshot_dup_apps:
+ * @self: a #GsOverviewSnapshot
+ * @section: the section to get the apps for
+ *
+ * Create placeholder apps for the apps stored for @section.
+ *
+ * The apps have their ID, name, summary, release date and locally available
+ * icons set, and are suitable for rendering tiles until the live data is
+ * available.
+ *
+ * Returns: (transfer full) (nullable): a new list of apps, or %NULL if no apps
+ *   are stored for @section
+ * Since: 50
+ */
+GsAppList *
+gs_overview_snapshot_dup_apps (GsOverviewSnapshot        *self,
+			       GsOverviewSnapshotSection  section)
+{
+	g_autoptr(GsAppList) list = NULL;
+
+	g_return_val_if_fail (GS_IS_OVERVIEW_SNAPSHOT (self), NULL);
+	g_return_val_if_fail (section < GS_OVERVIEW_SNAPSHOT_SECTION_LAST, NULL);
+
+	if (self->sections[section] == NULL)
+		return NULL;
+
+	list = gs_app_list_new ();
+	for (guint i = 0; i < self->sections[section]->len; i++) {
+		g_autoptr(GsApp) app = app_from_variant (g_ptr_array_index (self->sections[section], i));
+		if (app != NULL)
+			gs_app_list_add (list, app);
+	}
+
+	if (gs_app_list_length (list) == 0)
+		return NULL;
+
+	return g_steal_pointer (&list);
+}
+
+/**
+ * gs_overview_snapshot_set_categories:
+ * @self: a #GsOverviewSnapshot
+ * @categories: (element-type GsCategory) (nullable): top level categories
+ *
+ * Store the sizes of the non-empty categories in @categories, replacing any
+ * which were stored previously.
+ *
+ * Since: 50
+ */
+void
+gs_overview_snapshot_set_categories (GsOverviewSnapshot *self,
+				     GPtrArray          *categories)
+{
+	g_return_if_fail (GS_IS_OVERVIEW_SNAPSHOT (self));
+
+	g_hash_table_remove_all (self->category_sizes);
+
+	for (guint i = 0; categories != NULL && i < categories->len; i++) {
+		GsCategory *category = g_ptr_array_index (categories, i);
+		guint size = gs_category_get_size (category);
+
+		if (size == 0)
+			continue;
+		g_hash_table_insert (self->category_sizes,
+				     g_strdup (gs_category_get_id (category)),
+				     GUINT_TO_POINTER (size));
+	}
+}
+
+/**
+ * gs_overview_snapshot_lookup_category_size:
+ * @self: a #GsOverviewSnapshot
+ * @category_id: ID of a top level category
+ * @out_size: (out caller-allocates) (optional): return location for the size
+ *
+ * Look up the stored size of the category with ID @category_id.
+ *
+ * Returns: %TRUE if a size was stored for the category, %FALSE otherwise
+ * Since: 50
+ */
+gboolean
+gs_overview_snapshot_lookup_category_size (GsOverviewSnapshot *self,
+					   const gchar        *category_id,
+					   guint              *out_size)
+{
+	gpointer value;
+
+	g_return_val_if_fail (GS_IS_OVERVIEW_SNAPSHOT (self), FALSE);
+	g_return_val_if_fail (category_id != NULL, FALSE);
+
+	if (!g_hash_table_lookup_extended (self->category_sizes, category_id, NULL, &value))
+		return FALSE;
+
+	if (out_size != NULL)
+		*out_size = GPOINTER_TO_UINT (value);
+
+	return TRUE;
+}
+
+/**
+ * gs_overview_snapshot_has_content:
+ * @self: a #GsOverviewSnapshot
+ *
+ * Get whether the snapshot contains anything worth showing.
+ *
+ * Returns: %TRUE if any apps or categories are stored, %FALSE otherwise
+ * Since: 50
+ */
+gboolean
+gs_overview_snapshot_has_content (GsOverviewSnapshot *self)
+{
+	g_return_val_if_fail (GS_IS_OVERVIEW_SNAPSHOT (self), FALSE);
+
+	for (guint i = 0; i < GS_OVERVIEW_SNAPSHOT_SECTION_LAST; i++) {
+		if (self->sections[i] != NULL && self->sections[i]->len > 0)
+			return TRUE;
+	}
+
+	return g_hash_table_size (self->category_sizes) > 0;
+}
+
+/**
+ * gs_overview_snapshot_save:
+ * @self: a #GsOverviewSnapshot
+ * @filename: file to write the snapshot to
+ * @error: return location for a #GError, or %NULL
+ *
+ * Serialise the snapshot and atomically write it to @filename.
+ *
+ * Returns: %TRUE on success, %FALSE otherwise
+ * Since: 50
+ */
+gboolean
+gs_overview_snapshot_save (GsOverviewSnapshot  *self,
+			   const gchar         *filename,
+			   GError             **error)
+{
+	GVariantBuilder sections_builder;
+	GVariantBuilder categories_builder;
+	GHashTableIter iter;
+	gpointer key, value;
+	g_autoptr(GVariant) variant = NULL;
+
+	g_return_val_if_fail (GS_IS_OVERVIEW_SNAPSHOT (self), FALSE);
+	g_return_val_if_fail (filename != NULL, FALSE);
+	g_return_val_if_fail (error == NULL || *error == NULL, FALSE);
+
+	g_variant_builder_init (&sections_builder, G_VARIANT_TYPE ("aaa{sv}"));
+	for (guint i = 0; i < GS_OVERVIEW_SNAPSHOT_SECTION_LAST; i++) {
+		g_variant_builder_open (&sections_builder, G_VARIANT_TYPE ("aa{sv}"));
+		for (guint j = 0; self->sections[i] != NULL && j < self->sections[i]->len; j++)
+			g_variant_builder_add_value (&sections_builder, g_ptr_array_index (self->sections[i], j));
+		g_variant_builder_close (&sections_builder);
+	}
+
+	g_variant_builder_init (&categories_builder, G_VARIANT_TYPE ("a{su}"));
+	g_hash_table_iter_init (&iter, self->category_sizes);
+	while (g_hash_table_iter_next (&iter, &key, &value))
+		g_variant_builder_add (&categories_builder, "{su}", key, GPOINTER_TO_UINT (value));
+
+	variant = g_variant_ref_sink (g_variant_new (SNAPSHOT_FORMAT,
+						     (guint32) SNAPSHOT_FORMAT_VERSION,
+						     self->context,
+						     (gint64) g_get_real_time (),
+						     &sections_builder,
+						     &categories_builder));
+
+	return g_file_set_contents (filename,
+				    g_variant_get_data (variant),
+				    g_variant_get_size (variant),
+				    error);
+}
+
+/**
+ * gs_overview_snapshot_load:
+ * @filename: file to read the snapshot from
+ * @context: context string the snapshot must have been saved with
+ * @error: return location for a #GError, or %NULL
+ *
+ * Load a snapshot previously written with gs_overview_snapshot_save().
+ *
+ * If the snapshot was saved in a different @context, was saved by a different
+ * version of the format, or is too old, %G_IO_ERROR_INVALID_DATA is returned.
+ *
+ * Returns: (transfer full): the loaded snapshot, or %NULL on error
+ * Since: 50
+ */
+GsOverviewSnapshot *
+gs_overview_snapshot_load (const gchar  *filename,
+			   const gchar  *context,
+			   GError      **error)
+{
+	gchar *contents = NULL;
+	gsize length = 0;
+	g_autoptr(GBytes) bytes = NULL;
+	g_autoptr(GVariant) variant = NULL;
+	g_autoptr(GVariant) sections = NULL;
+	g_autoptr(GVariantIter) categories_iter = NULL;
+	g_autoptr(GsOverviewSnapshot) self = NULL;
+	guint32 version;
+	const gchar *saved_context;
+	gint64 created_usec;
+	gint64 now_usec;
+	const gchar *category_id;
+	guint32 category_size;
+
+	g_return_val_if_fail (filename != NULL, NULL);
+	g_return_val_if_fail (context != NULL, NULL);
+	g_return_val_if_fail (error == NULL || *error == NULL, NULL);
+
+	if (!g_file_get_contents (filename, &contents, &length, error))
+		return NULL;
+
+	bytes = g_bytes_new_take (contents, length);
+	variant = g_variant_ref_sink (g_variant_new_from_bytes (G_VARIANT_TYPE (SNAPSHOT_FORMAT), bytes, FALSE));
+
+	/* The file may have been truncated or corrupted, so make sure it’s
+	 * safe to access before using it */
+	if (!g_variant_is_normal_form (variant)) {
+		g_set_error (error, G_IO_ERROR, G_IO_ERROR_INVALID_DATA,
+			     "Overview snapshot ‘%s’ is corrupt", filename);
+		return NULL;
+	}
+
+	g_variant_get (variant, "(u&sx@aaa{sv}a{su})",
+		       &version, &saved_context, &created_usec, &sections, &categories_iter);
+
+	if (version != SNAPSHOT_FORMAT_VERSION) {
+		g_set_error (error, G_IO_ERROR, G_IO_ERROR_INVALID_DATA,
+			     "Overview snapshot has version %u, expected %u",
+			     version, (guint) SNAPSHOT_FORMAT_VERSION);
+		return NULL;
+	}
+
+	if (g_strcmp0 (saved_context, context) != 0) {
+		g_set_error (error, G_IO_ERROR, G_IO_ERROR_INVALID_DATA,
+			     "Overview snapshot was saved for ‘%s’, expected ‘%s’",
+			     saved_context, context);
+		return NULL;
+	}
+
+	now_usec = g_get_real_time ();
+	if (created_usec > now_usec || now_usec - created_usec > SNAPSHOT_MAX_AGE_USEC) {
+		g_set_error_literal (error, G_IO_ERROR, G_IO_ERROR_INVALID_DATA,
+				     "Overview snapshot is out of date");
+		return NULL;
+	}
+
+	self = gs_overview_snapshot_new (context);
+
+	for (gsize i = 0; i < MIN (g_variant_n_children (sections), GS_OVERVIEW_SNAPSHOT_SECTION_LAST); i++) {
+		g_autoptr(GVariant) section = g_variant_get_child_value (sections, i);
+		gsize n_apps = g_variant_n_children (section);
+
+		if (n_apps == 0)
+			continue;
+
+		self->sections[i] = g_ptr_array_new_full (n_apps, (GDestroyNotify) g_variant_unref);
+		for (gsize j = 0; j < n_apps; j++)
+			g_ptr_array_add (self->sections[i], g_variant_get_child_value (section, j));
+	}
+
+	while (g_variant_iter_loop (categories_iter, "{&su}", &category_id, &category_size))
+		g_hash_table_insert (self->category_sizes, g_strdup (category_id), GUINT_TO_POINTER (category_size));
+
+	return g_steal_pointer (&self);
+}
+
+/**
+ * gs_overview_snapshot_invalidate:
+ * @filename: file a snapshot was written to
+ * @error: return location for a #GError, or %NULL
+ *
+ * Delete the snapshot at @filename, if it exists, so that it is not shown
+ * again. This should be called whenever the data it was built from changes.
+ *
+ * Returns: %TRUE on success, %FALSE otherwise
+ * Since: 50
+ */
+gboolean
+gs_overview_snapshot_invalidate (const gchar  *filename,
+				 GError      **error)
+{
+	g_autoptr(GFile) file = NULL;
+	g_autoptr(GError) local_error = NULL;
+
+	g_return_val_if_fail (filename != NULL, FALSE);
+	g_return_val_if_fail (error == NULL || *error == NULL, FALSE);
+
+	file = g_file_new_for_path (filename);
+	if (!g_file_delete (file, NULL, &local_error) &&
+	    !g_error_matches (local_error, G_IO_ERROR, G_IO_ERROR_NOT_FOUND)) {
+		g_propagate_error (error, g_steal_pointer (&local_error));
+		return FALSE;
+	}
+
+	return TRUE;
+}
+
+static void
+gs_overview_snapshot_finalize (GObject *object)
+{
+	GsOverviewSnapshot *self = GS_OVERVIEW_SNAPSHOT (object);
+
+	for (guint i = 0; i < GS_OVERVIEW_SNAPSHOT_SECTION_LAST; i++)
+		g_clear_pointer (&self->sections[i], g_ptr_array_unref);
+	g_hash_table_unref (self->category_sizes);
+	g_free (self->context);
+
+	G_OBJECT_CLASS (gs_overview_snapshot_parent_class)->finalize (object);
+}
+
+static void
+gs_overview_snapshot_class_init (GsOverviewSnapshotClass *klass)
+{
+	GObjectClass *object_class = G_OBJECT_CLASS (klass);
+
+	object_class->finalize = gs_overview_snapshot_finalize;
+}
+
+static void
+gs_overview_snapshot_init (GsOverviewSnapshot *self)
+{
+	self->category_sizes = g_hash_table_new_full (g_str_hash, g_str_equal, g_free, NULL);
+}
+
+/**
+ * gs_overview_snapshot_new:
+ * @context: context string identifying the conditions the overview was
+ *   rendered in, such as the locale and filters
+ *
+ * Create a new, empty #GsOverviewSnapshot.
+ *
+ * Returns: (transfer full): a new #GsOverviewSnapshot
+ * Since: 50
+ */
+GsOverviewSnapshot *
+gs_overview_snapshot_new (const gchar *context)
+{
+	GsOverviewSnapshot *self;
+
+	g_return_val_if_fail (context != NULL, NULL);
+
+	self = g_object_new (GS_TYPE_OVERVIEW_SNAPSHOT, NULL);
+	self->context = g_strdup (context);
+
+	return self;
+}
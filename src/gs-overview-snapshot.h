@@ -0,0 +1,60 @@
+/* -*- Mode: C; tab-width: 8; indent-tabs-mode: t; c-basic-offset: 8 -*-
+ * vi:set noexpandtab tabstop=8 shiftwidth=8:
+ *
+ * Copyright (C) 2026 GNOME Foundation, Inc.
+ *
+ * SPDX-License-Identifier: GPL-2.0-or-later
+ */
+
+#pragma once
+
+#include <glib-object.h>
+
+#include "gnome-software-private.h"
+
+G_BEGIN_DECLS
+
+/**
+ * GsOverviewSnapshotSection:
+ * @GS_OVERVIEW_SNAPSHOT_SECTION_FEATURED: The featured carousel
+ * @GS_OVERVIEW_SNAPSHOT_SECTION_CURATED: The curated (‘Editor’s Choice’) apps
+ * @GS_OVERVIEW_SNAPSHOT_SECTION_RECENT: The recently updated apps
+ * @GS_OVERVIEW_SNAPSHOT_SECTION_DEPLOYMENT_FEATURED: The deployment-featured apps
+ *
+ * The sections of the overview page which are stored in a snapshot.
+ */
+typedef enum {
+	GS_OVERVIEW_SNAPSHOT_SECTION_FEATURED,
+	GS_OVERVIEW_SNAPSHOT_SECTION_CURATED,
+	GS_OVERVIEW_SNAPSHOT_SECTION_RECENT,
+	GS_OVERVIEW_SNAPSHOT_SECTION_DEPLOYMENT_FEATURED,
+	GS_OVERVIEW_SNAPSHOT_SECTION_LAST  /*< skip >*/
+} GsOverviewSnapshotSection;
+
+#define GS_TYPE_OVERVIEW_SNAPSHOT (gs_overview_snapshot_get_type ())
+
+G_DECLARE_FINAL_TYPE (GsOverviewSnapshot, gs_overview_snapshot, GS, OVERVIEW_SNAPSHOT, GObject)
+
+GsOverviewSnapshot	*gs_overview_snapshot_new		(const gchar		*context);
+GsOverviewSnapshot	*gs_overview_snapshot_load		(const gchar		*filename,
+								 const gchar		*context,
+								 GError			**error);
+gboolean		 gs_overview_snapshot_save		(GsOverviewSnapshot	*self,
+								 const gchar		*filename,
+								 GError			**error);
+gboolean		 gs_overview_snapshot_invalidate	(const gchar		*filename,
+								 GError			**error);
+
+void			 gs_overview_snapshot_set_apps		(GsOverviewSnapshot	*self,
+								 GsOverviewSnapshotSection section,
+								 GsAppList		*list);
+GsAppList		*gs_overview_snapshot_dup_apps		(GsOverviewSnapshot	*self,
+								 GsOverviewSnapshotSection section);
+void			 gs_overview_snapshot_set_categories	(GsOverviewSnapshot	*self,
+								 GPtrArray		*categories);
+gboolean		 gs_overview_snapshot_lookup_category_size (GsOverviewSnapshot	*self,
+								 const gchar		*category_id,
+								 guint			*out_size);
+gboolean		 gs_overview_snapshot_has_content	(GsOverviewSnapshot	*self);
+
+G_END_DECLS
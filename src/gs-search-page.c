@@ -101,17 +101,80 @@ typedef struct {
 	guint stamp;
 } GetSearchData;
 
+static void
+gs_search_page_show_results (GsSearchPage *self,
+                             GsAppList *list)
+{
+	GsApp *app;
+	GtkWidget *app_row;
+
+	/* remove old entries */
+	gs_widget_remove_all (self->list_box_search, (GsRemoveFunc) gtk_list_box_remove);
+
+	gtk_stack_set_visible_child_name (GTK_STACK (self->stack_search), "results");
+	for (guint i = 0; i < gs_app_list_length (list); i++) {
+		app = gs_app_list_index (list, i);
+		app_row = gs_app_row_new (app);
+		gs_app_row_set_show_rating (GS_APP_ROW (app_row), TRUE);
+		g_signal_connect (app_row, "button-clicked",
+				  G_CALLBACK (gs_search_page_app_row_clicked_cb),
+				  self);
+		gtk_list_box_append (GTK_LIST_BOX (self->list_box_search), app_row);
+		gs_app_row_set_size_groups (GS_APP_ROW (app_row),
+					    self->sizegroup_name,
+					    self->sizegroup_button_label,
+					    self->sizegroup_button_image);
+		gtk_widget_set_visible (app_row, TRUE);
+	}
+
+	/* too many results */
+	if (gs_app_list_has_flag (list, GS_APP_LIST_FLAG_IS_TRUNCATED)) {
+		GtkWidget *w = gtk_label_new (NULL);
+		g_autofree gchar *str = NULL;
+
+		/* TRANSLATORS: this is when there are too many search results
+		 * to show in in the search page */
+		str = g_strdup_printf (ngettext("%u more match",
+		                                "%u more matches",
+		                                gs_app_list_get_size_peak (list) - gs_app_list_length (list)),
+		                       gs_app_list_get_size_peak (list) - gs_app_list_length (list));
+		gtk_label_set_label (GTK_LABEL (w), str);
+		gtk_widget_set_margin_bottom (w, 20);
+		gtk_widget_set_margin_top (w, 20);
+		gtk_widget_set_margin_start (w, 20);
+		gtk_widget_set_margin_end (w, 20);
+		gtk_widget_add_css_class (w, "dim-label");
+		gtk_list_box_append (GTK_LIST_BOX (self->list_box_search), w);
+		gtk_widget_set_visible (w, TRUE);
+	}
+}
+
+static void
+gs_search_page_partial_results_cb (GsPluginJobListApps *list_apps_job,
+                                   GsAppList *list,
+                                   gpointer user_data)
+{
+	GetSearchData *search_data = user_data;
+	GsSearchPage *self = search_data->self;
+
+	/* different stamps means another search had been started since */
+	if (search_data->stamp != self->stamp)
+		return;
+
+	/* show the results from the fastest plugins while the others are
+	 * still running; the full list replaces these when the job finishes */
+	gs_search_page_waiting_cancel (self);
+	gs_search_page_show_results (self, list);
+}
+
 static void
 gs_search_page_get_search_cb (GObject *source_object,
                               GAsyncResult *res,
                               gpointer user_data)
 {
-	guint i;
 	g_autofree GetSearchData *search_data = user_data;
-	GsApp *app;
 	GsSearchPage *self = search_data->self;
 	GsPluginLoader *plugin_loader = GS_PLUGIN_LOADER (source_object);
-	GtkWidget *app_row;
 	g_autoptr(GError) error = NULL;
 	g_autoptr(GsPluginJobListApps) list_apps_job = NULL;
 	GsAppList *list;
@@ -149,48 +212,11 @@ gs_search_page_get_search_cb (GObject *source_object,
 		return;
 	}
 
-	/* remove old entries */
-	gs_widget_remove_all (self->list_box_search, (GsRemoveFunc) gtk_list_box_remove);
-
-	gtk_stack_set_visible_child_name (GTK_STACK (self->stack_search), "results");
-	for (i = 0; i < gs_app_list_length (list); i++) {
-		app = gs_app_list_index (list, i);
-		app_row = gs_app_row_new (app);
-		gs_app_row_set_show_rating (GS_APP_ROW (app_row), TRUE);
-		g_signal_connect (app_row, "button-clicked",
-				  G_CALLBACK (gs_search_page_app_row_clicked_cb),
-				  self);
-		gtk_list_box_append (GTK_LIST_BOX (self->list_box_search), app_row);
-		gs_app_row_set_size_groups (GS_APP_ROW (app_row),
-					    self->sizegroup_name,
-					    self->sizegroup_button_label,
-					    self->sizegroup_button_image);
-		gtk_widget_set_visible (app_row, TRUE);
-	}
-
-	/* too many results */
-	if (gs_app_list_has_flag (list, GS_APP_LIST_FLAG_IS_TRUNCATED)) {
-		GtkWidget *w = gtk_label_new (NULL);
-		g_autofree gchar *str = NULL;
+	gs_search_page_show_results (self, list);
 
-		/* TRANSLATORS: this is when there are too many search results
-		 * to show in in the search page */
-		str = g_strdup_printf (ngettext("%u more match",
-		                                "%u more matches",
-		                                gs_app_list_get_size_peak (list) - gs_app_list_length (list)),
-		                       gs_app_list_get_size_peak (list) - gs_app_list_length (list));
-		gtk_label_set_label (GTK_LABEL (w), str);
-		gtk_widget_set_margin_bottom (w, 20);
-		gtk_widget_set_margin_top (w, 20);
-		gtk_widget_set_margin_start (w, 20);
-		gtk_widget_set_margin_end (w, 20);
-		gtk_widget_add_css_class (w, "dim-label");
-		gtk_list_box_append (GTK_LIST_BOX (self->list_box_search), w);
-		gtk_widget_set_visible (w, TRUE);
-	} else {
-		/* reset to default */
+	/* reset to default */
+	if (!gs_app_list_has_flag (list, GS_APP_LIST_FLAG_IS_TRUNCATED))
 		self->max_results = GS_SEARCH_PAGE_MAX_RESULTS;
-	}
 
 	if (self->appid_to_show != NULL) {
 		g_autoptr (GsApp) a = NULL;
@@ -273,6 +299,7 @@ gs_search_page_load (GsSearchPage *self)
 	g_autoptr(GsAppQuery) query = NULL;
 	const gchar *keywords[2] = { NULL, };
 	g_autofree GetSearchData *search_data = NULL;
+	GetSearchData *partial_data;
 
 	self->changed = FALSE;
 
@@ -301,7 +328,6 @@ gs_search_page_load (GsSearchPage *self)
 	query = gs_app_query_new ("keywords", keywords,
 				  "refine-require-flags", GS_PLUGIN_REFINE_REQUIRE_FLAGS_ICON |
 							  GS_PLUGIN_REFINE_REQUIRE_FLAGS_VERSION |
-							  GS_PLUGIN_REFINE_REQUIRE_FLAGS_HISTORY |
 							  GS_PLUGIN_REFINE_REQUIRE_FLAGS_SETUP_ACTION |
 							  GS_PLUGIN_REFINE_REQUIRE_FLAGS_REVIEW_RATINGS |
 							  GS_PLUGIN_REFINE_REQUIRE_FLAGS_DESCRIPTION |
@@ -317,6 +343,15 @@ gs_search_page_load (GsSearchPage *self)
 				  "developer-verified-type", gs_page_get_query_developer_verified_type (GS_PAGE (self)),
 				  NULL);
 	plugin_job = gs_plugin_job_list_apps_new (query, GS_PLUGIN_LIST_APPS_FLAGS_NONE);
+
+	/* show results as each plugin returns them */
+	partial_data = g_new0 (GetSearchData, 1);
+	partial_data->self = self;
+	partial_data->stamp = self->stamp;
+	g_signal_connect_data (plugin_job, "partial-results",
+			       G_CALLBACK (gs_search_page_partial_results_cb),
+			       partial_data, (GClosureNotify) g_free, 0);
+
 	gs_plugin_loader_job_process_async (self->plugin_loader, plugin_job,
 					    self->search_cancellable,
 					    gs_search_page_get_search_cb,
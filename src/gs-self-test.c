@@ -8,9 +8,16 @@
 
 #include "config.h"
 
+#include <glib/gstdio.h>
+
 #include "gnome-software-private.h"
 
+#include <adwaita.h>
+
+#include "gs-app-list-view.h"
 #include "gs-css.h"
+#include "gs-overview-snapshot.h"
+#include "gs-updates-cache.h"
 #include "gs-test.h"
 
 static void
@@ -40,6 +47,310 @@ gs_css_func (void)
 	g_assert_cmpstr (tmp, ==, "color: white;");
 }
 
+static void
+gs_overview_snapshot_func (void)
+{
+	gboolean ret;
+	GsApp *app;
+	g_autofree gchar *tmp_dir = NULL;
+	g_autofree gchar *filename = NULL;
+	g_autoptr(GError) error = NULL;
+	g_autoptr(GIcon) icon = NULL;
+	g_autoptr(GsApp) app1 = gs_app_new ("org.gnome.Builder");
+	g_autoptr(GsApp) app2 = gs_app_new ("org.gnome.Maps");
+	g_autoptr(GsAppList) list = gs_app_list_new ();
+	g_autoptr(GsAppList) list_loaded = NULL;
+	g_autoptr(GsOverviewSnapshot) snapshot = gs_overview_snapshot_new ("en_GB;0;0");
+	g_autoptr(GsOverviewSnapshot) snapshot_loaded = NULL;
+	g_autoptr(GPtrArray) icons = NULL;
+
+	tmp_dir = g_dir_make_tmp ("gs-overview-snapshot-XXXXXX", &error);
+	g_assert_no_error (error);
+	filename = g_build_filename (tmp_dir, "snapshot.gvariant", NULL);
+
+	gs_app_set_kind (app1, AS_COMPONENT_KIND_DESKTOP_APP);
+	gs_app_set_name (app1, GS_APP_QUALITY_NORMAL, "Builder");
+	gs_app_set_summary (app1, GS_APP_QUALITY_NORMAL, "Create applications for GNOME");
+	gs_app_set_release_date (app1, 1234567890);
+	icon = g_themed_icon_new ("org.gnome.Builder");
+	gs_icon_set_width (icon, 64);
+	gs_icon_set_height (icon, 64);
+	gs_app_add_icon (app1, icon);
+	gs_app_list_add (list, app1);
+	gs_app_set_name (app2, GS_APP_QUALITY_NORMAL, "Maps");
+	gs_app_list_add (list, app2);
+
+	/* nothing stored yet */
+	g_assert_false (gs_overview_snapshot_has_content (snapshot));
+	gs_overview_snapshot_set_apps (snapshot, GS_OVERVIEW_SNAPSHOT_SECTION_CURATED, list);
+	g_assert_true (gs_overview_snapshot_has_content (snapshot));
+
+	ret = gs_overview_snapshot_save (snapshot, filename, &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+
+	/* a different locale or set of filters must not use the snapshot */
+	snapshot_loaded = gs_overview_snapshot_load (filename, "de_DE;0;0", &error);
+	g_assert_error (error, G_IO_ERROR, G_IO_ERROR_INVALID_DATA);
+	g_assert_null (snapshot_loaded);
+	g_clear_error (&error);
+
+	snapshot_loaded = gs_overview_snapshot_load (filename, "en_GB;0;0", &error);
+	g_assert_no_error (error);
+	g_assert_nonnull (snapshot_loaded);
+
+	g_assert_null (gs_overview_snapshot_dup_apps (snapshot_loaded, GS_OVERVIEW_SNAPSHOT_SECTION_FEATURED));
+	list_loaded = gs_overview_snapshot_dup_apps (snapshot_loaded, GS_OVERVIEW_SNAPSHOT_SECTION_CURATED);
+	g_assert_nonnull (list_loaded);
+	g_assert_cmpuint (gs_app_list_length (list_loaded), ==, 2);
+
+	app = gs_app_list_index (list_loaded, 0);
+	g_assert_cmpstr (gs_app_get_id (app), ==, "org.gnome.Builder");
+	g_assert_cmpint (gs_app_get_kind (app), ==, AS_COMPONENT_KIND_DESKTOP_APP);
+	g_assert_cmpstr (gs_app_get_name (app), ==, "Builder");
+	g_assert_cmpstr (gs_app_get_summary (app), ==, "Create applications for GNOME");
+	g_assert_cmpuint (gs_app_get_release_date (app), ==, 1234567890);
+	g_assert_cmpint (gs_app_get_icons_state (app), ==, GS_APP_ICONS_STATE_AVAILABLE);
+	icons = gs_app_dup_icons (app);
+	g_assert_nonnull (icons);
+	g_assert_cmpuint (icons->len, ==, 1);
+	g_assert_true (G_IS_THEMED_ICON (g_ptr_array_index (icons, 0)));
+	g_assert_cmpuint (gs_icon_get_width (g_ptr_array_index (icons, 0)), ==, 64);
+
+	app = gs_app_list_index (list_loaded, 1);
+	g_assert_cmpstr (gs_app_get_id (app), ==, "org.gnome.Maps");
+	g_assert_cmpstr (gs_app_get_name (app), ==, "Maps");
+
+	/* invalidating removes it, and is fine to do twice */
+	ret = gs_overview_snapshot_invalidate (filename, &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+	g_assert_false (g_file_test (filename, G_FILE_TEST_EXISTS));
+	ret = gs_overview_snapshot_invalidate (filename, &error);
+	g_assert_no_error (error);
+	g_assert_true (ret);
+
+	g_assert_cmpint (g_rmdir (tmp_dir), ==, 0);
+}
+
+static void
+gs_app_list_view_count_rows (GtkWidget *widget,
+			     guint *n_rows)
+{
+	for (GtkWidget *child = gtk_widget_get_first_child (widget);
+	     child != NULL;
+	     child = gtk_widget_get_next_sibling (child)) {
+		if (GS_IS_APP_ROW (child))
+			(*n_rows)++;
+		else
+			gs_app_list_view_count_rows (child, n_rows);
+	}
+}
+
+static void
+gs_app_list_view_after_paint_cb (GdkFrameClock *frame_clock,
+				 guint *n_paints)
+{
+	(*n_paints)++;
+}
+
+/* Run the main loop until the next frame has been painted, and return how
+ * long it took, in microseconds. */
+static gint64
+gs_app_list_view_wait_for_paint (guint *n_paints)
+{
+	guint n_paints_old = *n_paints;
+	gint64 start = g_get_monotonic_time ();
+
+	while (*n_paints == n_paints_old &&
+	       g_get_monotonic_time () - start < 5 * G_USEC_PER_SEC)
+		g_main_context_iteration (NULL, TRUE);
+	g_assert_cmpuint (*n_paints, >, n_paints_old);
+
+	return g_get_monotonic_time () - start;
+}
+
+static gint
+gs_app_list_view_sort_by_name_cb (GsApp *app1,
+				  GsApp *app2,
+				  gpointer user_data)
+{
+	return g_strcmp0 (gs_app_get_name (app1), gs_app_get_name (app2));
+}
+
+static gboolean
+gs_app_list_view_filter_odd_cb (GsApp *app,
+				gpointer user_data)
+{
+	return GPOINTER_TO_UINT (g_object_get_data (G_OBJECT (app), "index")) % 2 == 0;
+}
+
+static void
+gs_app_list_view_func (void)
+{
+	const guint n_apps = 5000;
+	const guint n_frames = 100;
+	GtkWidget *window;
+	GtkWidget *scrolled_window;
+	GtkWidget *list_view;
+	GtkAdjustment *vadjustment;
+	GdkFrameClock *frame_clock;
+	guint n_paints = 0;
+	guint n_rows = 0;
+	gint64 scroll_total = 0, scroll_max = 0;
+	gint64 redraw_total = 0, redraw_max = 0;
+	g_autoptr(GsAppList) list = gs_app_list_new ();
+
+	if (!gtk_init_check ()) {
+		g_test_skip ("No display available");
+		return;
+	}
+	adw_init ();
+
+	/* a synthetic list of apps, in reverse order so they need sorting */
+	for (guint i = 0; i < n_apps; i++) {
+		g_autoptr(GsApp) app = NULL;
+		g_autofree gchar *id = g_strdup_printf ("org.example.App%04u", i);
+		g_autofree gchar *name = g_strdup_printf ("App %04u", n_apps - i);
+
+		app = gs_app_new (id);
+		gs_app_set_kind (app, AS_COMPONENT_KIND_DESKTOP_APP);
+		gs_app_set_state (app, GS_APP_STATE_INSTALLED);
+		gs_app_set_name (app, GS_APP_QUALITY_NORMAL, name);
+		gs_app_set_summary (app, GS_APP_QUALITY_NORMAL, "An app for testing");
+		g_object_set_data (G_OBJECT (app), "index", GUINT_TO_POINTER (i));
+		gs_app_list_add (list, app);
+	}
+	g_assert_cmpuint (gs_app_list_length (list), ==, n_apps);
+
+	list_view = gs_app_list_view_new ();
+	gs_app_list_view_set_sort_func (GS_APP_LIST_VIEW (list_view),
+					gs_app_list_view_sort_by_name_cb, NULL);
+	gs_app_list_view_add_apps (GS_APP_LIST_VIEW (list_view), list);
+	g_assert_cmpuint (gs_app_list_view_get_n_apps (GS_APP_LIST_VIEW (list_view)), ==, n_apps);
+	g_assert_true (gs_app_list_view_has_app (GS_APP_LIST_VIEW (list_view),
+						 gs_app_list_index (list, 0)));
+
+	/* adding them again is a no-op */
+	gs_app_list_view_add_apps (GS_APP_LIST_VIEW (list_view), list);
+	g_assert_cmpuint (gs_app_list_view_get_n_apps (GS_APP_LIST_VIEW (list_view)), ==, n_apps);
+
+	scrolled_window = gtk_scrolled_window_new ();
+	gtk_scrolled_window_set_child (GTK_SCROLLED_WINDOW (scrolled_window), list_view);
+	window = gtk_window_new ();
+	gtk_window_set_default_size (GTK_WINDOW (window), 640, 600);
+	gtk_window_set_child (GTK_WINDOW (window), scrolled_window);
+	gtk_window_present (GTK_WINDOW (window));
+
+	frame_clock = gtk_widget_get_frame_clock (window);
+	g_assert_nonnull (frame_clock);
+	g_signal_connect (frame_clock, "after-paint",
+			  G_CALLBACK (gs_app_list_view_after_paint_cb), &n_paints);
+	gs_app_list_view_wait_for_paint (&n_paints);
+	gs_app_list_view_wait_for_paint (&n_paints);
+
+	/* only the visible rows should have widgets */
+	gs_app_list_view_count_rows (list_view, &n_rows);
+	g_test_message ("%u rows for %u apps", n_rows, n_apps);
+	g_assert_cmpuint (n_rows, >, 0);
+	g_assert_cmpuint (n_rows, <, n_apps / 10);
+
+	/* scroll a page at a time */
+	vadjustment = gtk_scrolled_window_get_vadjustment (GTK_SCROLLED_WINDOW (scrolled_window));
+	for (guint i = 0; i < n_frames; i++) {
+		gint64 elapsed;
+
+		gtk_adjustment_set_value (vadjustment,
+					  gtk_adjustment_get_value (vadjustment) +
+					  gtk_adjustment_get_page_size (vadjustment));
+		elapsed = gs_app_list_view_wait_for_paint (&n_paints);
+		scroll_total += elapsed;
+		scroll_max = MAX (scroll_max, elapsed);
+	}
+
+	/* rows are recycled rather than created while scrolling */
+	n_rows = 0;
+	gs_app_list_view_count_rows (list_view, &n_rows);
+	g_assert_cmpuint (n_rows, <, n_apps / 10);
+
+	/* redraw without scrolling */
+	for (guint i = 0; i < n_frames; i++) {
+		gint64 elapsed;
+
+		gtk_widget_queue_draw (list_view);
+		elapsed = gs_app_list_view_wait_for_paint (&n_paints);
+		redraw_total += elapsed;
+		redraw_max = MAX (redraw_max, elapsed);
+	}
+
+	g_test_message ("scroll: %" G_GINT64_FORMAT "µs mean, %" G_GINT64_FORMAT "µs max per frame",
+			scroll_total / n_frames, scroll_max);
+	g_test_message ("redraw: %" G_GINT64_FORMAT "µs mean, %" G_GINT64_FORMAT "µs max per frame",
+			redraw_total / n_frames, redraw_max);
+
+	/* filtering and removing */
+	gs_app_list_view_set_filter_func (GS_APP_LIST_VIEW (list_view),
+					  gs_app_list_view_filter_odd_cb, NULL);
+	g_assert_cmpuint (gs_app_list_view_get_n_shown (GS_APP_LIST_VIEW (list_view)), ==, n_apps / 2);
+	gs_app_list_view_remove_app (GS_APP_LIST_VIEW (list_view), gs_app_list_index (list, 0));
+	g_assert_false (gs_app_list_view_has_app (GS_APP_LIST_VIEW (list_view),
+						  gs_app_list_index (list, 0)));
+	g_assert_cmpuint (gs_app_list_view_get_n_shown (GS_APP_LIST_VIEW (list_view)), ==, n_apps / 2 - 1);
+	gs_app_list_view_remove_all (GS_APP_LIST_VIEW (list_view));
+	g_assert_cmpuint (gs_app_list_view_get_n_apps (GS_APP_LIST_VIEW (list_view)), ==, 0);
+
+	gtk_window_destroy (GTK_WINDOW (window));
+}
+
+static void
+gs_updates_cache_func (void)
+{
+	g_autoptr(GsUpdatesCache) cache = gs_updates_cache_new ();
+	g_autoptr(GsAppList) apps = gs_app_list_new ();
+	g_autoptr(GsAppList) apps2 = gs_app_list_new ();
+	g_autoptr(GsApp) app = gs_app_new ("org.example.Update");
+	guint serial, serial2;
+
+	gs_app_list_add (apps, app);
+
+	/* nothing cached yet */
+	g_assert_null (gs_updates_cache_lookup (cache, "1", &serial));
+	gs_updates_cache_store (cache, "1", serial, apps);
+
+	/* reused for the same stamp */
+	g_assert_true (gs_updates_cache_lookup (cache, "1", NULL) == apps);
+	g_assert_true (gs_updates_cache_lookup (cache, "1", NULL) == apps);
+
+	/* missed for a changed stamp, and replaced by the new result */
+	g_assert_null (gs_updates_cache_lookup (cache, "2", &serial));
+	gs_updates_cache_store (cache, "2", serial, apps2);
+	g_assert_null (gs_updates_cache_lookup (cache, "1", NULL));
+	g_assert_true (gs_updates_cache_lookup (cache, "2", NULL) == apps2);
+
+	/* a NULL stamp never reuses the result, even if one was stored */
+	g_assert_null (gs_updates_cache_lookup (cache, NULL, &serial));
+	gs_updates_cache_store (cache, NULL, serial, apps);
+	g_assert_null (gs_updates_cache_lookup (cache, NULL, NULL));
+
+	/* invalidation drops the result */
+	gs_updates_cache_store (cache, "3", serial, apps);
+	g_assert_true (gs_updates_cache_lookup (cache, "3", NULL) == apps);
+	gs_updates_cache_invalidate (cache);
+	g_assert_null (gs_updates_cache_lookup (cache, "3", NULL));
+
+	/* a check in flight across an invalidation doesn’t store its result */
+	g_assert_null (gs_updates_cache_lookup (cache, "4", &serial));
+	gs_updates_cache_invalidate (cache);
+	gs_updates_cache_store (cache, "4", serial, apps);
+	g_assert_null (gs_updates_cache_lookup (cache, "4", &serial2));
+	g_assert_cmpuint (serial2, !=, serial);
+	gs_updates_cache_store (cache, "4", serial2, apps);
+	g_assert_true (gs_updates_cache_lookup (cache, "4", NULL) == apps);
+
+	g_assert_cmpuint (gs_updates_cache_get_n_checks (cache), ==, 13);
+	g_assert_cmpuint (gs_updates_cache_get_n_skipped (cache), ==, 5);
+}
+
 int
 main (int argc, char **argv)
 {
@@ -47,6 +358,9 @@ main (int argc, char **argv)
 
 	/* tests go here */
 	g_test_add_func ("/gnome-software/src/css", gs_css_func);
+	g_test_add_func ("/gnome-software/src/overview-snapshot", gs_overview_snapshot_func);
+	g_test_add_func ("/gnome-software/src/updates-cache", gs_updates_cache_func);
+	g_test_add_func ("/gnome-software/src/app-list-view", gs_app_list_view_func);
 
 	return g_test_run ();
 }
@@ -19,10 +19,10 @@
 typedef struct
 {
 	GtkSizeGroup		*sizegroup_name;
-	GtkListBox		*listbox;
+	GsAppList		*list;
 } GsUpdateListPrivate;
 
-G_DEFINE_TYPE_WITH_PRIVATE (GsUpdateList, gs_update_list, GTK_TYPE_WIDGET)
+G_DEFINE_TYPE_WITH_PRIVATE (GsUpdateList, gs_update_list, GS_TYPE_APP_LIST_VIEW)
 
 enum {
 	SIGNAL_SHOW_UPDATE,
@@ -31,54 +31,87 @@ enum {
 static guint signals [SIGNAL_SHOW_UPDATE + 1] = { 0 };
 
 static void
-installed_updates_row_activated_cb (GtkListBox    *list_box,
-                                    GtkListBoxRow *row,
+installed_updates_app_activated_cb (GsAppListView *list_view,
+                                    GsApp         *app,
                                     GsUpdateList  *self)
 {
-	GsApp *app = gs_app_row_get_app (GS_APP_ROW (row));
-
 	g_signal_emit (self, signals[SIGNAL_SHOW_UPDATE], 0, app);
 }
 
 static void
-gs_update_list_app_state_notify_cb (GsApp *app, GParamSpec *pspec, gpointer user_data)
+gs_update_list_app_state_changed_cb (GsAppList *list, GsApp *app, gpointer user_data)
 {
-	if (gs_app_get_state (app) == GS_APP_STATE_INSTALLED) {
-		GsAppRow *app_row = GS_APP_ROW (user_data);
-		gs_app_row_unreveal (app_row);
-	}
+	GsUpdateList *update_list = GS_UPDATE_LIST (user_data);
+
+	if (gs_app_get_state (app) == GS_APP_STATE_INSTALLED)
+		gs_app_list_view_unreveal_app (GS_APP_LIST_VIEW (update_list), app);
 }
 
-void
-gs_update_list_add_app (GsUpdateList *update_list, GsApp *app)
+static void
+gs_update_list_app_unrevealed_cb (GsAppListView *list_view,
+				  GsApp *app,
+				  gpointer user_data)
+{
+	GsUpdateList *update_list = GS_UPDATE_LIST (list_view);
+	GsUpdateListPrivate *priv = gs_update_list_get_instance_private (update_list);
+
+	gs_app_list_remove (priv->list, app);
+}
+
+static void
+gs_update_list_setup_row_cb (GsAppListView *list_view,
+			     GsAppRow *app_row,
+			     gpointer user_data)
 {
+	GsUpdateList *update_list = GS_UPDATE_LIST (list_view);
 	GsUpdateListPrivate *priv = gs_update_list_get_instance_private (update_list);
-	GtkWidget *app_row;
-
-	app_row = gs_app_row_new (app);
-	gs_app_row_set_show_description (GS_APP_ROW (app_row), FALSE);
-	gs_app_row_set_show_update (GS_APP_ROW (app_row), FALSE);
-	gs_app_row_set_show_buttons (GS_APP_ROW (app_row), FALSE);
-	gs_app_row_set_show_installed (GS_APP_ROW (app_row), FALSE);
-	gtk_list_box_append (priv->listbox, app_row);
-	gs_app_row_set_size_groups (GS_APP_ROW (app_row),
+
+	gs_app_row_set_show_description (app_row, FALSE);
+	gs_app_row_set_show_update (app_row, FALSE);
+	gs_app_row_set_show_buttons (app_row, FALSE);
+	gs_app_row_set_show_installed (app_row, FALSE);
+	gs_app_row_set_size_groups (app_row,
 				    priv->sizegroup_name,
 				    NULL,
 				    NULL);
-	g_signal_connect_object (app, "notify::state",
-	                         G_CALLBACK (gs_update_list_app_state_notify_cb),
-	                         app_row, 0);
-	gtk_widget_set_visible (app_row, TRUE);
+}
+
+void
+gs_update_list_add_app (GsUpdateList *update_list, GsApp *app)
+{
+	GsUpdateListPrivate *priv = gs_update_list_get_instance_private (update_list);
+
+	g_return_if_fail (GS_IS_UPDATE_LIST (update_list));
+
+	gs_app_list_add (priv->list, app);
+	gs_app_list_view_add_app (GS_APP_LIST_VIEW (update_list), app);
+}
+
+/**
+ * gs_update_list_add_apps:
+ * @update_list: a #GsUpdateList
+ * @list: a #GsAppList
+ *
+ * Add all the apps in @list, sorting them only once.
+ *
+ * Since: 50
+ */
+void
+gs_update_list_add_apps (GsUpdateList *update_list, GsAppList *list)
+{
+	GsUpdateListPrivate *priv = gs_update_list_get_instance_private (update_list);
+
+	g_return_if_fail (GS_IS_UPDATE_LIST (update_list));
+
+	gs_app_list_add_list (priv->list, list);
+	gs_app_list_view_add_apps (GS_APP_LIST_VIEW (update_list), list);
 }
 
 static gint
-list_sort_func (GtkListBoxRow *a,
-		GtkListBoxRow *b,
+list_sort_func (GsApp *a1,
+		GsApp *b1,
 		gpointer user_data)
 {
-	GsApp *a1 = gs_app_row_get_app (GS_APP_ROW (a));
-	GsApp *b1 = gs_app_row_get_app (GS_APP_ROW (b));
-
 	return gs_utils_app_sort_kind (a1, b1);
 }
 
@@ -88,12 +121,8 @@ gs_update_list_dispose (GObject *object)
 	GsUpdateList *update_list = GS_UPDATE_LIST (object);
 	GsUpdateListPrivate *priv = gs_update_list_get_instance_private (update_list);
 
-	if (priv->listbox != NULL) {
-		gtk_widget_unparent (GTK_WIDGET (priv->listbox));
-		priv->listbox = NULL;
-	}
-
 	g_clear_object (&priv->sizegroup_name);
+	g_clear_object (&priv->list);
 
 	G_OBJECT_CLASS (gs_update_list_parent_class)->dispose (object);
 }
@@ -104,21 +133,28 @@ gs_update_list_init (GsUpdateList *update_list)
 	GsUpdateListPrivate *priv = gs_update_list_get_instance_private (update_list);
 	priv->sizegroup_name = gtk_size_group_new (GTK_SIZE_GROUP_HORIZONTAL);
 
-	priv->listbox = GTK_LIST_BOX (gtk_list_box_new ());
-	gtk_list_box_set_selection_mode (priv->listbox, GTK_SELECTION_NONE);
-	gtk_widget_set_parent (GTK_WIDGET (priv->listbox), GTK_WIDGET (update_list));
-	gtk_list_box_set_sort_func (priv->listbox, list_sort_func, update_list, NULL);
-	gtk_widget_add_css_class (GTK_WIDGET (priv->listbox), "boxed-list");
-
-	g_signal_connect (priv->listbox, "row-activated",
-			  G_CALLBACK (installed_updates_row_activated_cb), update_list);
+	/* only used to watch the state of the apps */
+	priv->list = gs_app_list_new ();
+	gs_app_list_add_flag (priv->list, GS_APP_LIST_FLAG_WATCH_APPS);
+	g_signal_connect_object (priv->list, "app-state-changed",
+				 G_CALLBACK (gs_update_list_app_state_changed_cb),
+				 update_list, 0);
+
+	gs_app_list_view_set_row_funcs (GS_APP_LIST_VIEW (update_list),
+					gs_update_list_setup_row_cb, NULL, NULL);
+	gs_app_list_view_set_sort_func (GS_APP_LIST_VIEW (update_list),
+					list_sort_func, NULL);
+
+	g_signal_connect (update_list, "app-activated",
+			  G_CALLBACK (installed_updates_app_activated_cb), update_list);
+	g_signal_connect (update_list, "app-unrevealed",
+			  G_CALLBACK (gs_update_list_app_unrevealed_cb), NULL);
 }
 
 static void
 gs_update_list_class_init (GsUpdateListClass *klass)
 {
 	GObjectClass *object_class = G_OBJECT_CLASS (klass);
-	GtkWidgetClass *widget_class = GTK_WIDGET_CLASS (klass);
 
 	object_class->dispose = gs_update_list_dispose;
 
@@ -127,8 +163,6 @@ gs_update_list_class_init (GsUpdateListClass *klass)
 			      G_TYPE_FROM_CLASS (object_class), G_SIGNAL_RUN_LAST,
 			      0, NULL, NULL, g_cclosure_marshal_VOID__OBJECT,
 			      G_TYPE_NONE, 1, GS_TYPE_APP);
-
-	gtk_widget_class_set_layout_manager_type (widget_class, GTK_TYPE_BIN_LAYOUT);
 }
 
 GtkWidget *
@@ -147,5 +181,6 @@ gs_update_list_remove_all (GsUpdateList *update_list)
 	g_return_if_fail (GS_IS_UPDATE_LIST (update_list));
 
 	priv = gs_update_list_get_instance_private (update_list);
-	gs_widget_remove_all (GTK_WIDGET (priv->listbox), (GsRemoveFunc) gtk_list_box_remove);
+	gs_app_list_remove_all (priv->list);
+	gs_app_list_view_remove_all (GS_APP_LIST_VIEW (update_list));
 }
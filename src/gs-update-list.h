@@ -12,21 +12,24 @@
 #include <gtk/gtk.h>
 
 #include "gnome-software-private.h"
+#include "gs-app-list-view.h"
 
 G_BEGIN_DECLS
 
 #define GS_TYPE_UPDATE_LIST (gs_update_list_get_type ())
 
-G_DECLARE_DERIVABLE_TYPE (GsUpdateList, gs_update_list, GS, UPDATE_LIST, GtkWidget)
+G_DECLARE_DERIVABLE_TYPE (GsUpdateList, gs_update_list, GS, UPDATE_LIST, GsAppListView)
 
 struct _GsUpdateListClass
 {
-	GtkWidgetClass		 parent_class;
+	GsAppListViewClass	 parent_class;
 };
 
 GtkWidget	*gs_update_list_new			(void);
 void		 gs_update_list_remove_all		(GsUpdateList	*update_list);
 void		 gs_update_list_add_app			(GsUpdateList	*update_list,
 							 GsApp		*app);
+void		 gs_update_list_add_apps		(GsUpdateList	*update_list,
+							 GsAppList	*list);
 
 G_END_DECLS
@@ -16,6 +16,7 @@
 
 #include "gs-update-monitor.h"
 #include "gs-common.h"
+#include "gs-updates-cache.h"
 
 #define SECONDS_IN_AN_HOUR (60 * 60)
 #define SECONDS_IN_A_DAY (SECONDS_IN_AN_HOUR * 24)
@@ -68,6 +69,10 @@ struct _GsUpdateMonitor {
 
 	gint64		 last_notification_time_usec;	/* to notify once per day only */
 	gint64		 last_get_updates;		/* used when automatic updates are off */
+
+	/* the result of the last full updates check; if the plugins’ updates
+	 * stamp is unchanged, the next check is skipped */
+	GsUpdatesCache	*updates_cache;			/* (owned) */
 	gint		 randomized_hour;		/* to avoid all clients checking at same small interval */
 };
 
@@ -76,12 +81,15 @@ G_DEFINE_TYPE (GsUpdateMonitor, gs_update_monitor, G_TYPE_OBJECT)
 typedef struct {
 	GsUpdateMonitor		*monitor;
 	gint64			 check_timestamp;	/* "check-timestamp" to set, or 0 to not set it */
+	gchar			*updates_stamp;		/* (owned) (nullable) */
+	guint			 updates_cache_serial;
 } DownloadUpdatesData;
 
 static void
 download_updates_data_free (DownloadUpdatesData *data)
 {
 	g_clear_object (&data->monitor);
+	g_free (data->updates_stamp);
 	g_slice_free (DownloadUpdatesData, data);
 }
 
@@ -578,33 +586,18 @@ download_finished_cb (GObject *object, GAsyncResult *res, gpointer user_data)
 }
 
 static void
-get_updates_finished_cb (GObject *object, GAsyncResult *res, gpointer user_data)
+handle_updates (GsUpdateMonitor *monitor,
+		GsAppList       *apps,
+		gint64           check_timestamp)
 {
-	g_autoptr(DownloadUpdatesData) download_updates_data = (DownloadUpdatesData *) user_data;
-	GsUpdateMonitor *monitor = download_updates_data->monitor;
 	guint64 security_timestamp = 0;
-	g_autoptr(GError) error = NULL;
-	g_autoptr(GsPluginJobListApps) list_apps_job = NULL;
-	GsAppList *apps;
 	gboolean install_timestamp_outdated;
 	gboolean should_download;
 
-	/* get result */
-	if (!gs_plugin_loader_job_process_finish (GS_PLUGIN_LOADER (object), res, (GsPluginJob **) &list_apps_job, &error)) {
-		if (!g_error_matches (error, GS_PLUGIN_ERROR, GS_PLUGIN_ERROR_CANCELLED) &&
-		    !g_error_matches (error, G_IO_ERROR, G_IO_ERROR_CANCELLED)) {
-			g_warning ("failed to get updates: %s", error->message);
-			notify_about_pending_updates (monitor, NULL, TRUE);
-		}
-		return;
-	}
-
-	apps = gs_plugin_job_list_apps_get_result_list (list_apps_job);
-
 	/* Update the check-timestamp, when this call is part of the auto-update */
-	if (download_updates_data->check_timestamp > 0) {
+	if (check_timestamp > 0) {
 		g_signal_handler_block (monitor->settings, monitor->settings_changed_handler);
-		g_settings_set (monitor->settings, "check-timestamp", "x", download_updates_data->check_timestamp);
+		g_settings_set (monitor->settings, "check-timestamp", "x", check_timestamp);
 		g_signal_handler_unblock (monitor->settings, monitor->settings_changed_handler);
 	}
 
@@ -716,6 +709,37 @@ get_updates_finished_cb (GObject *object, GAsyncResult *res, gpointer user_data)
 	}
 }
 
+static void
+get_updates_finished_cb (GObject *object, GAsyncResult *res, gpointer user_data)
+{
+	g_autoptr(DownloadUpdatesData) download_updates_data = (DownloadUpdatesData *) user_data;
+	GsUpdateMonitor *monitor = download_updates_data->monitor;
+	g_autoptr(GError) error = NULL;
+	g_autoptr(GsPluginJobListApps) list_apps_job = NULL;
+	GsAppList *apps;
+
+	/* get result */
+	if (!gs_plugin_loader_job_process_finish (GS_PLUGIN_LOADER (object), res, (GsPluginJob **) &list_apps_job, &error)) {
+		if (!g_error_matches (error, GS_PLUGIN_ERROR, GS_PLUGIN_ERROR_CANCELLED) &&
+		    !g_error_matches (error, G_IO_ERROR, G_IO_ERROR_CANCELLED)) {
+			g_warning ("failed to get updates: %s", error->message);
+			notify_about_pending_updates (monitor, NULL, TRUE);
+		}
+		return;
+	}
+
+	apps = gs_plugin_job_list_apps_get_result_list (list_apps_job);
+
+	/* remember the result, so the next check can be skipped if nothing
+	 * changes in the meantime */
+	gs_updates_cache_store (monitor->updates_cache,
+				download_updates_data->updates_stamp,
+				download_updates_data->updates_cache_serial,
+				apps);
+
+	handle_updates (monitor, apps, download_updates_data->check_timestamp);
+}
+
 static gboolean
 should_show_upgrade_notification (GsUpdateMonitor *monitor)
 {
@@ -830,6 +854,9 @@ get_updates (GsUpdateMonitor *monitor,
 	g_autoptr(GsAppQuery) query = NULL;
 	g_autoptr(GsPluginJob) plugin_job = NULL;
 	g_autoptr(DownloadUpdatesData) download_updates_data = NULL;
+	g_autofree gchar *updates_stamp = NULL;
+	GsAppList *cached_apps;
+	guint updates_cache_serial;
 
 	/* disabled in gsettings or from a plugin */
 	if (!gs_plugin_loader_get_allow_updates (monitor->plugin_loader)) {
@@ -837,9 +864,20 @@ get_updates (GsUpdateMonitor *monitor,
 		return;
 	}
 
+	/* skip listing and refining the updates if no plugin’s updates could
+	 * have changed since the last check */
+	updates_stamp = gs_plugin_loader_dup_updates_stamp (monitor->plugin_loader);
+	cached_apps = gs_updates_cache_lookup (monitor->updates_cache, updates_stamp, &updates_cache_serial);
+	if (cached_apps != NULL) {
+		handle_updates (monitor, cached_apps, check_timestamp);
+		return;
+	}
+
 	download_updates_data = g_slice_new0 (DownloadUpdatesData);
 	download_updates_data->monitor = g_object_ref (monitor);
 	download_updates_data->check_timestamp = check_timestamp;
+	download_updates_data->updates_stamp = g_steal_pointer (&updates_stamp);
+	download_updates_data->updates_cache_serial = updates_cache_serial;
 
 	/* NOTE: this doesn't actually do any network access */
 	g_debug ("Getting updates");
@@ -1316,6 +1354,14 @@ network_available_notify_cb (GsPluginLoader *plugin_loader,
 	check_updates (monitor);
 }
 
+static void
+updates_changed_cb (GsPluginLoader  *plugin_loader,
+		    GsUpdateMonitor *monitor)
+{
+	/* a plugin knows its updates changed, so don’t reuse the last result */
+	gs_updates_cache_invalidate (monitor->updates_cache);
+}
+
 static void
 get_updates_historical_cb (GObject *object, GAsyncResult *res, gpointer data)
 {
@@ -1580,6 +1626,8 @@ gs_update_monitor_init (GsUpdateMonitor *monitor)
 	GNetworkMonitor *network_monitor;
 	g_autoptr(GError) error = NULL;
 
+	monitor->updates_cache = gs_updates_cache_new ();
+
 	monitor->settings = g_settings_new ("org.gnome.software");
 	monitor->settings_changed_handler = g_signal_connect (monitor->settings, "changed",
 							      G_CALLBACK (check_updates_settings_changed_cb),
@@ -1684,6 +1732,9 @@ gs_update_monitor_dispose (GObject *object)
 		g_signal_handlers_disconnect_by_func (monitor->plugin_loader,
 						      network_available_notify_cb,
 						      monitor);
+		g_signal_handlers_disconnect_by_func (monitor->plugin_loader,
+						      updates_changed_cb,
+						      monitor);
 		g_clear_object (&monitor->plugin_loader);
 	}
 
@@ -1703,6 +1754,7 @@ gs_update_monitor_finalize (GObject *object)
 
 	g_application_release (G_APPLICATION (monitor->application));
 	g_clear_error (&monitor->last_offline_error);
+	g_clear_object (&monitor->updates_cache);
 
 	G_OBJECT_CLASS (gs_update_monitor_parent_class)->finalize (object);
 }
@@ -1730,6 +1782,8 @@ gs_update_monitor_new (GsApplication  *application,
 			  G_CALLBACK (allow_updates_notify_cb), monitor);
 	g_signal_connect (monitor->plugin_loader, "notify::network-available",
 			  G_CALLBACK (network_available_notify_cb), monitor);
+	g_signal_connect (monitor->plugin_loader, "updates-changed",
+			  G_CALLBACK (updates_changed_cb), monitor);
 
 	return monitor;
 }
@@ -0,0 +1,207 @@
+/* -*- Mode: C; tab-width: 8; indent-tabs-mode: t; c-basic-offset: 8 -*-
+ * vi:set noexpandtab tabstop=8 shiftwidth=8:
+ *
+ * Copyright (C) 2026 GNOME Foundation, Inc.
+ *
+ * SPDX-License-Identifier: GPL-2.0-or-later
+ */
+
+/**
+ * SECTION:gs-updates-cache
+ * @short_description: The result of the last updates check
+ *
+ * #GsUpdatesCache stores the list of updates found by the last full updates
+ * check, along with the plugins’ updates stamp (see
+ * gs_plugin_loader_dup_updates_stamp()) at the time the check was started.
+ *
+ * If the stamp is unchanged when the next check is due, none of the plugins’
+ * updates can have changed, and the cached list can be reused rather than
+ * listing and refining the updates again.
+ *
+ * The cache can also be invalidated explicitly, for example when a plugin
+ * emits #GsPluginLoader::updates-changed. A check which was already in flight
+ * when the cache was invalidated will not store its result, as it may be out
+ * of date.
+ */
+
+#include "config.h"
+
+#include "gs-updates-cache.h"
+
+struct _GsUpdatesCache
+{
+	GObject			 parent_instance;
+
+	gchar			*stamp;  /* (owned) (nullable) */
+	GsAppList		*apps;  /* (owned) (nullable) */
+	guint			 serial;  /* incremented on invalidation */
+	guint			 n_checks;
+	guint			 n_skipped;
+};
+
+G_DEFINE_TYPE (GsUpdatesCache, gs_updates_cache, G_TYPE_OBJECT)
+
+static void
+gs_updates_cache_finalize (GObject *object)
+{
+	GsUpdatesCache *self = GS_UPDATES_CACHE (object);
+
+	g_free (self->stamp);
+	g_clear_object (&self->apps);
+
+	G_OBJECT_CLASS (gs_updates_cache_parent_class)->finalize (object);
+}
+
+static void
+gs_updates_cache_class_init (GsUpdatesCacheClass *klass)
+{
+	GObjectClass *object_class = G_OBJECT_CLASS (klass);
+
+	object_class->finalize = gs_updates_cache_finalize;
+}
+
+static void
+gs_updates_cache_init (GsUpdatesCache *self)
+{
+}
+
+/**
+ * gs_updates_cache_new:
+ *
+ * Create a new, empty #GsUpdatesCache.
+ *
+ * Returns: (transfer full): a new #GsUpdatesCache
+ * Since: 50
+ */
+GsUpdatesCache *
+gs_updates_cache_new (void)
+{
+	return g_object_new (GS_TYPE_UPDATES_CACHE, NULL);
+}
+
+/**
+ * gs_updates_cache_lookup:
+ * @self: a #GsUpdatesCache
+ * @stamp: (nullable): the current updates stamp, or %NULL if it is unknown
+ * @out_serial: (out) (optional): return location for the invalidation serial,
+ *   to pass to gs_updates_cache_store() once the check has finished
+ *
+ * Look up the updates found by the last check, if they are still valid for
+ * @stamp. A %NULL @stamp never matches, as at least one plugin cannot tell
+ * whether its updates have changed.
+ *
+ * This counts as an updates check, whether or not the cached result is reused.
+ *
+ * Returns: (transfer none) (nullable): the cached updates, or %NULL if a full
+ *   check is needed
+ * Since: 50
+ */
+GsAppList *
+gs_updates_cache_lookup (GsUpdatesCache *self,
+			 const gchar    *stamp,
+			 guint          *out_serial)
+{
+	g_return_val_if_fail (GS_IS_UPDATES_CACHE (self), NULL);
+
+	if (out_serial != NULL)
+		*out_serial = self->serial;
+
+	self->n_checks++;
+	if (stamp == NULL || self->apps == NULL ||
+	    g_strcmp0 (stamp, self->stamp) != 0)
+		return NULL;
+
+	self->n_skipped++;
+	g_debug ("Nothing changed since the last updates check, reusing its %u updates "
+		 "(skipped %u of %u checks)",
+		 gs_app_list_length (self->apps), self->n_skipped, self->n_checks);
+
+	return self->apps;
+}
+
+/**
+ * gs_updates_cache_store:
+ * @self: a #GsUpdatesCache
+ * @stamp: (nullable): the updates stamp from when the check was started
+ * @serial: the serial returned by gs_updates_cache_lookup() when the check
+ *   was started
+ * @apps: the updates found by the check
+ *
+ * Store the result of a full updates check.
+ *
+ * If the cache has been invalidated since @serial was returned, the result is
+ * dropped, as it may predate the change which caused the invalidation.
+ *
+ * Since: 50
+ */
+void
+gs_updates_cache_store (GsUpdatesCache *self,
+			const gchar    *stamp,
+			guint           serial,
+			GsAppList      *apps)
+{
+	g_return_if_fail (GS_IS_UPDATES_CACHE (self));
+	g_return_if_fail (GS_IS_APP_LIST (apps));
+
+	if (serial != self->serial) {
+		g_debug ("Updates changed during the last updates check, not caching its result");
+		return;
+	}
+
+	g_free (self->stamp);
+	self->stamp = g_strdup (stamp);
+	g_set_object (&self->apps, apps);
+}
+
+/**
+ * gs_updates_cache_invalidate:
+ * @self: a #GsUpdatesCache
+ *
+ * Drop the cached updates, so the next check is a full one. Any check which is
+ * currently in flight will not store its result.
+ *
+ * Since: 50
+ */
+void
+gs_updates_cache_invalidate (GsUpdatesCache *self)
+{
+	g_return_if_fail (GS_IS_UPDATES_CACHE (self));
+
+	g_clear_pointer (&self->stamp, g_free);
+	g_clear_object (&self->apps);
+	self->serial++;
+}
+
+/**
+ * gs_updates_cache_get_n_checks:
+ * @self: a #GsUpdatesCache
+ *
+ * Get the number of updates checks looked up in the cache.
+ *
+ * Returns: number of checks
+ * Since: 50
+ */
+guint
+gs_updates_cache_get_n_checks (GsUpdatesCache *self)
+{
+	g_return_val_if_fail (GS_IS_UPDATES_CACHE (self), 0);
+
+	return self->n_checks;
+}
+
+/**
+ * gs_updates_cache_get_n_skipped:
+ * @self: a #GsUpdatesCache
+ *
+ * Get the number of updates checks which reused the cached result.
+ *
+ * Returns: number of skipped checks
+ * Since: 50
+ */
+guint
+gs_updates_cache_get_n_skipped (GsUpdatesCache *self)
+{
+	g_return_val_if_fail (GS_IS_UPDATES_CACHE (self), 0);
+
+	return self->n_skipped;
+}
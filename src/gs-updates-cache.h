@@ -0,0 +1,33 @@
+/* -*- Mode: C; tab-width: 8; indent-tabs-mode: t; c-basic-offset: 8 -*-
+ * vi:set noexpandtab tabstop=8 shiftwidth=8:
+ *
+ * Copyright (C) 2026 GNOME Foundation, Inc.
+ *
+ * SPDX-License-Identifier: GPL-2.0-or-later
+ */
+
+#pragma once
+
+#include <glib-object.h>
+
+#include "gnome-software-private.h"
+
+G_BEGIN_DECLS
+
+#define GS_TYPE_UPDATES_CACHE (gs_updates_cache_get_type ())
+
+G_DECLARE_FINAL_TYPE (GsUpdatesCache, gs_updates_cache, GS, UPDATES_CACHE, GObject)
+
+GsUpdatesCache	*gs_updates_cache_new		(void);
+GsAppList	*gs_updates_cache_lookup	(GsUpdatesCache	*self,
+						 const gchar	*stamp,
+						 guint		*out_serial);
+void		 gs_updates_cache_store		(GsUpdatesCache	*self,
+						 const gchar	*stamp,
+						 guint		 serial,
+						 GsAppList	*apps);
+void		 gs_updates_cache_invalidate	(GsUpdatesCache	*self);
+guint		 gs_updates_cache_get_n_checks	(GsUpdatesCache	*self);
+guint		 gs_updates_cache_get_n_skipped	(GsUpdatesCache	*self);
+
+G_END_DECLS
@@ -13,6 +13,7 @@
 #include <gio/gio.h>
 
 #include "gs-app-list-private.h"
+#include "gs-app-list-view.h"
 #include "gs-app-row.h"
 #include "gs-app-update-details-dialog.h"
 #include "gs-application.h"
@@ -31,7 +32,7 @@ struct _GsUpdatesSection
 	GtkWidget		*button_stack;
 	GtkWidget		*button_update;
 	GtkWidget		*description;
-	GtkWidget		*listbox;
+	GtkWidget		*list_view;
 	GtkWidget		*listbox_box;
 	GtkWidget		*section_header;
 	GtkWidget		*title;
@@ -66,20 +67,6 @@ gs_updates_section_get_list (GsUpdatesSection *self)
 	return self->list;
 }
 
-static gboolean
-_listbox_keynav_failed_cb (GsUpdatesSection *self, GtkDirectionType direction, GtkListBox *listbox)
-{
-	GtkRoot *root = gtk_widget_get_root (GTK_WIDGET (listbox));
-
-	if (!root)
-		return FALSE;
-
-	if (direction != GTK_DIR_UP && direction != GTK_DIR_DOWN)
-		return FALSE;
-
-	return gtk_widget_child_focus (GTK_WIDGET (root), direction == GTK_DIR_UP ? GTK_DIR_TAB_BACKWARD : GTK_DIR_TAB_FORWARD);
-}
-
 static void
 gs_updates_section_run_download (GsUpdatesSection *self,
 				 GsApp *only_app);
@@ -99,71 +86,42 @@ _app_row_button_clicked_cb (GsAppRow *app_row, GsUpdatesSection *self)
 }
 
 static void
-_row_unrevealed_cb (GObject *row, GParamSpec *pspec, gpointer data)
+_app_unrevealed_cb (GsUpdatesSection *self, GsApp *app, GsAppListView *list_view)
 {
-	GtkWidget *widget;
-	GsUpdatesSection *self;
-
-	widget = gtk_widget_get_parent (GTK_WIDGET (row));
-	if (widget == NULL)
-		return;
-
-	widget = gtk_widget_get_ancestor (GTK_WIDGET (row), GS_TYPE_UPDATES_SECTION);
-	g_return_if_fail (GS_IS_UPDATES_SECTION (widget));
-	self = GS_UPDATES_SECTION (widget);
-
-	gs_app_list_remove (self->list, gs_app_row_get_app (GS_APP_ROW (row)));
-
-	gtk_list_box_remove (GTK_LIST_BOX (self->listbox), GTK_WIDGET (row));
+	gs_app_list_remove (self->list, app);
 
 	if (!gs_app_list_length (self->list))
-		gtk_widget_set_visible (widget, FALSE);
+		gtk_widget_set_visible (GTK_WIDGET (self), FALSE);
 
 	/* The change in app list has probably changed the update counter. */
 	g_object_notify_by_pspec (G_OBJECT (self), obj_props[PROP_COUNTER]);
 }
 
 static void
-_unreveal_row (GsAppRow *app_row)
+_setup_row_cb (GsAppListView *list_view, GsAppRow *app_row, gpointer user_data)
 {
-	g_signal_connect (app_row, "unrevealed",
-	                  G_CALLBACK (_row_unrevealed_cb), NULL);
-	gs_app_row_unreveal (app_row);
-}
-
-static void
-_app_state_notify_cb (GsApp *app, GParamSpec *pspec, gpointer user_data)
-{
-	if (gs_app_get_state (app) == GS_APP_STATE_INSTALLED) {
-		GsAppRow *app_row = GS_APP_ROW (user_data);
-		_unreveal_row (app_row);
-	}
-}
+	GsUpdatesSection *self = GS_UPDATES_SECTION (user_data);
 
-void
-gs_updates_section_add_app (GsUpdatesSection *self, GsApp *app)
-{
-	GtkWidget *app_row;
-	app_row = gs_app_row_new (app);
-	gs_app_row_set_show_description (GS_APP_ROW (app_row), FALSE);
-	gs_app_row_set_show_update (GS_APP_ROW (app_row), TRUE);
-	gs_app_row_set_show_buttons (GS_APP_ROW (app_row), TRUE);
+	gs_app_row_set_show_description (app_row, FALSE);
+	gs_app_row_set_show_update (app_row, TRUE);
+	gs_app_row_set_show_buttons (app_row, TRUE);
 	g_signal_connect (app_row, "button-clicked",
 			  G_CALLBACK (_app_row_button_clicked_cb),
 			  self);
-	gtk_list_box_append (GTK_LIST_BOX (self->listbox), app_row);
-	gs_app_list_add (self->list, app);
-
-	gs_app_row_set_size_groups (GS_APP_ROW (app_row),
+	gs_app_row_set_size_groups (app_row,
 				    self->sizegroup_name,
 				    self->sizegroup_button_label,
 				    self->sizegroup_button_image);
-	g_signal_connect_object (app, "notify::state",
-	                         G_CALLBACK (_app_state_notify_cb),
-	                         app_row, 0);
 	g_object_bind_property (G_OBJECT (self), "is-narrow",
 				app_row, "is-narrow",
 				G_BINDING_SYNC_CREATE);
+}
+
+void
+gs_updates_section_add_app (GsUpdatesSection *self, GsApp *app)
+{
+	gs_app_list_add (self->list, app);
+	gs_app_list_view_add_app (GS_APP_LIST_VIEW (self->list_view), app);
 	gtk_widget_set_visible (GTK_WIDGET (self), TRUE);
 
 	/* The change in app list has probably changed the update counter. */
@@ -173,9 +131,7 @@ gs_updates_section_add_app (GsUpdatesSection *self, GsApp *app)
 void
 gs_updates_section_remove_all (GsUpdatesSection *self)
 {
-	GtkWidget *child;
-	while ((child = gtk_widget_get_first_child (self->listbox)) != NULL)
-		gtk_list_box_remove (GTK_LIST_BOX (self->listbox), child);
+	gs_app_list_view_remove_all (GS_APP_LIST_VIEW (self->list_view));
 	gs_app_list_remove_all (self->list);
 	gtk_widget_set_visible (GTK_WIDGET (self), FALSE);
 	g_clear_object (&self->cancellable);
@@ -192,11 +148,8 @@ typedef struct {
 } GsUpdatesSectionUpdateHelper;
 
 static gint
-_list_sort_func (GtkListBoxRow *a, GtkListBoxRow *b, gpointer user_data)
+_list_sort_func (GsApp *a1, GsApp *a2, gpointer user_data)
 {
-	GsApp *a1 = gs_app_row_get_app (GS_APP_ROW (a));
-	GsApp *a2 = gs_app_row_get_app (GS_APP_ROW (b));
-
 	return gs_utils_app_sort_kind (a1, a2);
 }
 
@@ -474,6 +427,7 @@ _button_update_all_clicked_cb (GsUpdatesSection *self)
 {
 	g_autoptr(GCancellable) cancellable = g_cancellable_new ();
 	g_autoptr(GsPluginJob) plugin_job = NULL;
+	GsPluginUpdateAppsFlags flags = GS_PLUGIN_UPDATE_APPS_FLAGS_INTERACTIVE;
 	GsUpdatesSectionUpdateHelper *helper = g_new0 (GsUpdatesSectionUpdateHelper, 1);
 
 	helper->self = g_object_ref (self);
@@ -492,9 +446,18 @@ _button_update_all_clicked_cb (GsUpdatesSection *self)
 			helper->do_reboot_notification = TRUE;
 	}
 
+	/* Online updates are applied independently of each other, so
+	 * downloading one can overlap with applying another. This is opt-in
+	 * until it has seen wider testing. */
+	if (self->kind == GS_UPDATES_SECTION_KIND_ONLINE) {
+		g_autoptr(GSettings) settings = g_settings_new ("org.gnome.software");
+
+		if (g_settings_get_boolean (settings, "pipelined-updates"))
+			flags |= GS_PLUGIN_UPDATE_APPS_FLAGS_PIPELINED;
+	}
+
 	g_set_object (&self->cancellable, cancellable);
-	plugin_job = gs_plugin_job_update_apps_new (self->list,
-						    GS_PLUGIN_UPDATE_APPS_FLAGS_INTERACTIVE);
+	plugin_job = gs_plugin_job_update_apps_new (self->list, flags);
 	helper->job = g_object_ref (plugin_job);
 	gs_plugin_loader_job_process_async (self->plugin_loader, plugin_job,
 					    self->cancellable,
@@ -534,9 +497,8 @@ _setup_section_header (GsUpdatesSection *self)
 }
 
 static void
-_app_row_activated_cb (GsUpdatesSection *self, GtkListBoxRow *row)
+_app_activated_cb (GsUpdatesSection *self, GsApp *app, GsAppListView *list_view)
 {
-	GsApp *app = gs_app_row_get_app (GS_APP_ROW (row));
 	GtkWidget *dialog;
 	g_autofree gchar *str = NULL;
 
@@ -673,15 +635,15 @@ gs_updates_section_class_init (GsUpdatesSectionClass *klass)
 	gtk_widget_class_bind_template_child (widget_class, GsUpdatesSection, button_stack);
 	gtk_widget_class_bind_template_child (widget_class, GsUpdatesSection, button_update);
 	gtk_widget_class_bind_template_child (widget_class, GsUpdatesSection, description);
-	gtk_widget_class_bind_template_child (widget_class, GsUpdatesSection, listbox);
+	gtk_widget_class_bind_template_child (widget_class, GsUpdatesSection, list_view);
 	gtk_widget_class_bind_template_child (widget_class, GsUpdatesSection, listbox_box);
 	gtk_widget_class_bind_template_child (widget_class, GsUpdatesSection, section_header);
 	gtk_widget_class_bind_template_child (widget_class, GsUpdatesSection, title);
-	gtk_widget_class_bind_template_callback (widget_class, _app_row_activated_cb);
+	gtk_widget_class_bind_template_callback (widget_class, _app_activated_cb);
+	gtk_widget_class_bind_template_callback (widget_class, _app_unrevealed_cb);
 	gtk_widget_class_bind_template_callback (widget_class, _button_cancel_clicked_cb);
 	gtk_widget_class_bind_template_callback (widget_class, _button_download_clicked_cb);
 	gtk_widget_class_bind_template_callback (widget_class, _button_update_all_clicked_cb);
-	gtk_widget_class_bind_template_callback (widget_class, _listbox_keynav_failed_cb);
 }
 
 void
@@ -721,6 +683,9 @@ gs_updates_section_app_state_changed_cb (GsAppList *list,
 					 GsApp *in_app,
 					 GsUpdatesSection *self)
 {
+	if (gs_app_get_state (in_app) == GS_APP_STATE_INSTALLED)
+		gs_app_list_view_unreveal_app (GS_APP_LIST_VIEW (self->list_view), in_app);
+
 	if (self->kind == GS_UPDATES_SECTION_KIND_ONLINE) {
 		guint busy, len;
 
@@ -744,6 +709,7 @@ gs_updates_section_app_state_changed_cb (GsAppList *list,
 static void
 gs_updates_section_init (GsUpdatesSection *self)
 {
+	g_type_ensure (GS_TYPE_APP_LIST_VIEW);
 	g_type_ensure (GS_TYPE_PROGRESS_BUTTON);
 
 	gtk_widget_init_template (GTK_WIDGET (self));
@@ -763,11 +729,10 @@ gs_updates_section_init (GsUpdatesSection *self)
 					 G_CALLBACK (gs_updates_section_progress_notify_cb),
 					 self, 0);
 
-	gtk_list_box_set_selection_mode (GTK_LIST_BOX (self->listbox),
-					 GTK_SELECTION_NONE);
-	gtk_list_box_set_sort_func (GTK_LIST_BOX (self->listbox),
-				    _list_sort_func,
-				    self, NULL);
+	gs_app_list_view_set_row_funcs (GS_APP_LIST_VIEW (self->list_view),
+					_setup_row_cb, NULL, self);
+	gs_app_list_view_set_sort_func (GS_APP_LIST_VIEW (self->list_view),
+					_list_sort_func, self);
 }
 
 /**